@@ -2,6 +2,7 @@
 Configuración de la aplicación
 """
 import os
+import tempfile
 from typing import List
 from dotenv import load_dotenv
 
@@ -20,9 +21,75 @@ APP_VERSION = os.getenv("APP_VERSION", "0.1.0")
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
 
 # Configuración de validación
+VALIDATOR_ENGINE = os.getenv("VALIDATOR_ENGINE", "python")  # python (en proceso) | node (estricto)
 VALIDATION_TIMEOUT = int(os.getenv("VALIDATION_TIMEOUT", "5"))  # segundos
+VALIDATION_MAX_CODE = int(os.getenv("VALIDATION_MAX_CODE", "50000"))  # caracteres; más largo se rechaza sin parsear
 NODE_CHECK_COMMAND = os.getenv("NODE_CHECK_COMMAND", "node,--check").split(",")
+NODE_WORKER_POOL_SIZE = int(os.getenv("NODE_WORKER_POOL_SIZE", "4"))  # 0 = un proceso por validación
+NODE_WORKER_MAX_JOBS = int(os.getenv("NODE_WORKER_MAX_JOBS", "500"))  # reciclar worker tras N trabajos
+VALIDATION_MAX_CONCURRENCY = int(os.getenv("VALIDATION_MAX_CONCURRENCY", "32"))  # validaciones simultáneas
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "200"))  # programas por lote
+VALIDATION_CACHE_SIZE = int(os.getenv("VALIDATION_CACHE_SIZE", "4096"))  # entradas; 0 = sin cache
+VALIDATION_CACHE_TTL = int(os.getenv("VALIDATION_CACHE_TTL", "3600"))  # segundos
+VALIDATION_CACHE_BACKEND = os.getenv("VALIDATION_CACHE_BACKEND", "memory")  # memory (por proceso) | sqlite (compartido)
+VALIDATION_CACHE_PATH = os.getenv(
+    "VALIDATION_CACHE_PATH", os.path.join(tempfile.gettempdir(), "codeshyri-validation-cache.sqlite3")
+)
+
+# Validación en vivo por WebSocket (/api/execute/live)
+LIVE_VALIDATION_DEBOUNCE = float(os.getenv("LIVE_VALIDATION_DEBOUNCE", "0.15"))  # segundos sin ediciones antes de validar
+LIVE_VALIDATION_MAX_DELAY = float(os.getenv("LIVE_VALIDATION_MAX_DELAY", "1.0"))  # espera máxima con ediciones continuas
+LIVE_VALIDATION_MAX_CODE = int(os.getenv("LIVE_VALIDATION_MAX_CODE", "100000"))  # caracteres
+
+# Límite de requests por cliente (token bucket: ráfaga + tasa sostenida por segundo)
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_KEY = os.getenv("RATE_LIMIT_KEY", "session")  # session | ip | ip+session
+# Proxies (IPs o redes CIDR) cuyo X-Forwarded-For se cree; vacío = usar la IP de la conexión
+RATE_LIMIT_TRUSTED_PROXIES = [p.strip() for p in os.getenv("RATE_LIMIT_TRUSTED_PROXIES", "").split(",") if p.strip()]
+RATE_LIMIT_EXECUTE_RATE = float(os.getenv("RATE_LIMIT_EXECUTE_RATE", "2"))  # /api/execute por segundo; 0 = sin límite
+RATE_LIMIT_EXECUTE_BURST = float(os.getenv("RATE_LIMIT_EXECUTE_BURST", "10"))
+RATE_LIMIT_VALIDATE_RATE = float(os.getenv("RATE_LIMIT_VALIDATE_RATE", "5"))  # /api/levels/{id}/validate por segundo
+RATE_LIMIT_VALIDATE_BURST = float(os.getenv("RATE_LIMIT_VALIDATE_BURST", "20"))
+RATE_LIMIT_SWEEP_INTERVAL = float(os.getenv("RATE_LIMIT_SWEEP_INTERVAL", "60"))  # segundos entre barridos
+
+# Catálogo de niveles (un archivo JSON por nivel)
+LEVELS_DIR = os.getenv(
+    "LEVELS_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "levels")
+)
+LEVEL_RELOAD_INTERVAL = float(os.getenv("LEVEL_RELOAD_INTERVAL", "2"))  # segundos; 0 = sin recarga
+LEVELS_PAGE_MAX = int(os.getenv("LEVELS_PAGE_MAX", "200"))  # niveles por página en /api/levels
+
+# Cache HTTP de datos estáticos (niveles, personajes, funciones); se revalidan con ETag
+STATIC_CACHE_CONTROL = os.getenv("STATIC_CACHE_CONTROL", "public, no-cache")
+STATIC_COMPRESSION_MIN_SIZE = int(os.getenv("STATIC_COMPRESSION_MIN_SIZE", "512"))  # bytes; menores no se comprimen
+
+# Configuración de simulación de niveles
+MAX_SIMULATION_STEPS = int(os.getenv("MAX_SIMULATION_STEPS", "10000"))  # pasos por traza
+
+# Perfilado opt-in por request (Server-Timing + pilas colapsadas para flamegraphs)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))  # fracción de requests; 0 = solo por cabecera
+PROFILE_HEADER_TOKEN = os.getenv("PROFILE_HEADER_TOKEN", "")  # valor de X-Profile que activa el perfilado; vacío = desactivado
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "codeshyri-profiles"))
+
+# Progreso de los jugadores (SQLite en modo WAL con escritura diferida)
+PROGRESS_DB_PATH = os.getenv(
+    "PROGRESS_DB_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "progress.sqlite3")
+)
+PROGRESS_FLUSH_INTERVAL = float(os.getenv("PROGRESS_FLUSH_INTERVAL", "1.0"))  # segundos entre escrituras
+PROGRESS_BATCH_SIZE = int(os.getenv("PROGRESS_BATCH_SIZE", "500"))  # registros pendientes que adelantan la escritura
+
+# Tablas de posiciones por nivel (en memoria, guardadas periódicamente en JSON)
+LEADERBOARD_PATH = os.getenv(
+    "LEADERBOARD_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "leaderboards.json")
+)
+LEADERBOARD_SIZE = int(os.getenv("LEADERBOARD_SIZE", "50000"))  # entradas por nivel
+LEADERBOARD_SAVE_INTERVAL = float(os.getenv("LEADERBOARD_SAVE_INTERVAL", "30"))  # segundos entre guardados
+LEADERBOARD_PAGE_MAX = int(os.getenv("LEADERBOARD_PAGE_MAX", "100"))  # entradas por página
 
 # Configuración de logging
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_SAMPLING = os.getenv("LOG_SAMPLING", "")  # "logger=tasa,...", p. ej. "app.routers.execution=0.1"
 
@@ -62,6 +62,17 @@ const console = {{
 {user_code}
 """
 
+# Geometría del grid del juego (coincide con GridRenderer en el frontend)
+GRID_CELL_SIZE = 60  # píxeles por celda
+GRID_HORIZON_Y = 198  # línea del horizonte: 33% de un canvas de 600 px de alto
+DEFAULT_START_POSITION: Dict[str, int] = {"gridX": 1, "gridY": 2}
+
+# Ángulos de faceDirection (0° = Este, 90° = Sur, 180° = Oeste, 270° = Norte)
+FACE_DIRECTIONS: Dict[str, float] = {
+    "north": 270, "south": 90, "east": 0, "west": 180,
+    "norte": 270, "sur": 90, "este": 0, "oeste": 180
+}
+
 # Personajes disponibles
 CHARACTERS: List[Dict[str, Any]] = [
     {
@@ -75,139 +86,6 @@ CHARACTERS: List[Dict[str, Any]] = [
     }
 ]
 
-# Niveles disponibles
-LEVELS: Dict[str, Dict[str, Any]] = {
-    "1": {
-        "id": "1",
-        "title": "Primeros Pasos con Kitu",
-        "description": "Sigue la forma de la letra S: mueve y gira para completar el recorrido",
-        "character": "kitu",
-        "objectives": [
-            "Sigue el patrón en forma de S",
-            "Realiza al menos 4 giros",
-            "Recolecta el premio final"
-        ],
-        "initialCode": "// Nivel 1: Primeros Pasos\n// Sigue la forma de la letra \"S\" para llegar al objetivo\n// Recuerda: mueve, gira, mueve, gira...\n\nmoveForward(2);\nturnRight();\nmoveForward(2);\nturnRight();\nmoveForward(2);\nturnRight();\nmoveForward(2);\nturnRight();\nmoveForward(11);\n",
-        "startPosition": {"gridX": 1, "gridY": 1},
-        "goalPosition": {"gridX": 18, "gridY": 5},
-        "lake": {
-            "centerX": 30,  # Columna 0, centro de celda (60/2 = 30)
-            "centerY": 630,  # Fila 7, centro de celda (horizonY=198 + 7*60 + 30 = 630)
-            "width": 200,
-            "height": 100
-        },
-        "path": [
-            {"x": 1, "y": 1},
-            {"x": 2, "y": 1},
-            {"x": 3, "y": 1},
-            {"x": 4, "y": 1},
-            {"x": 4, "y": 2},
-            {"x": 4, "y": 3},
-            {"x": 5, "y": 3},
-            {"x": 6, "y": 3},
-            {"x": 6, "y": 4},
-            {"x": 7, "y": 5},
-            {"x": 8, "y": 5},
-            {"x": 9, "y": 5},
-            {"x": 10, "y": 5},
-            {"x": 11, "y": 5},
-            {"x": 12, "y": 5},
-            {"x": 13, "y": 5},
-            {"x": 14, "y": 5},
-            {"x": 15, "y": 5},
-            {"x": 16, "y": 5},
-            {"x": 17, "y": 5},
-            {"x": 18, "y": 5}
-        ],
-        "maizePositions": [
-            {"gridX": 2, "gridY": 1},
-            {"gridX": 4, "gridY": 1},
-            {"gridX": 4, "gridY": 3},
-            {"gridX": 6, "gridY": 3},
-            {"gridX": 8, "gridY": 5},
-            {"gridX": 10, "gridY": 5},
-            {"gridX": 12, "gridY": 5},
-            {"gridX": 14, "gridY": 5},
-            {"gridX": 16, "gridY": 5},
-            {"gridX": 17, "gridY": 5}
-        ],
-        "validation": {
-            "targetPosition": {"x": 1110, "y": 530, "tolerance": 50},
-            "minSteps": 19,
-            "minRotations": 4
-        },
-        "availableFunctions": {
-            "movement": [
-                "moveForward(steps=1)",
-                "moveBackward(steps=1)"
-            ],
-            "rotation": [
-                "turnRight(degrees=90)",
-                "turnLeft(degrees=90)"
-            ]
-        }
-    },
-    "2": {
-        "id": "2",
-        "title": "Explorando el Camino",
-        "description": "Combina movimiento y rotación para navegar",
-        "character": "kitu",
-        "objectives": [
-            "Mueve hacia adelante 2 pasos",
-            "Gira a la derecha",
-            "Mueve hacia adelante 2 pasos más",
-            "Gira a la izquierda",
-            "Mueve hacia adelante 1 paso"
-        ],
-        "initialCode": "// Nivel 2: Explorando el Camino\n// Combina movimiento y rotación para crear un camino\n\nmoveForward(2);\nturnRight();\nmoveForward(2);\nturnLeft();\nmoveForward(1);\n",
-        "validation": {
-            "targetPosition": {"x": 400, "y": 300, "tolerance": 50},
-            "minSteps": 5,
-            "requiredActions": ["moveForward", "turnRight", "turnLeft"]
-        },
-        "availableFunctions": {
-            "movement": [
-                "moveForward(steps=1)",
-                "moveBackward(steps=1)"
-            ],
-            "rotation": [
-                "turnRight(degrees=90)",
-                "turnLeft(degrees=90)",
-                "turn(degrees)"
-            ]
-        }
-    },
-    "3": {
-        "id": "3",
-        "title": "Bucles con Kitu",
-        "description": "Aprende a usar bucles para repetir acciones",
-        "character": "kitu",
-        "objectives": [
-            "Usa un bucle for para mover 4 pasos",
-            "Gira a la derecha después de cada movimiento",
-            "Crea un patrón cuadrado"
-        ],
-        "initialCode": "// Nivel 3: Bucles con Kitu\n// Usa un bucle for para repetir acciones\n\nfor (let i = 0; i < 4; i++) {\n  moveForward(2);\n  turnRight();\n}\n",
-        "validation": {
-            "targetPosition": {"x": 100, "y": 400, "tolerance": 50},
-            "minSteps": 8,
-            "minRotations": 4,
-            "requiresLoop": True
-        },
-        "availableFunctions": {
-            "movement": [
-                "moveForward(steps=1)",
-                "moveBackward(steps=1)"
-            ],
-            "rotation": [
-                "turnRight(degrees=90)",
-                "turnLeft(degrees=90)",
-                "turn(degrees)"
-            ]
-        }
-    }
-}
-
 # Definición completa de funciones disponibles
 FUNCTIONS_DEFINITION: Dict[str, Any] = {
     "movement": {
@@ -31,9 +31,39 @@ class LevelNotFoundError(CodeShyriException):
         )
 
 
+class ProgressNotFoundError(CodeShyriException):
+    """Excepción para cuando un jugador no tiene intentos en un nivel"""
+    
+    def __init__(self, player_id: str, level_id: str):
+        super().__init__(
+            detail=f"Sin progreso de '{player_id}' en el nivel '{level_id}'",
+            status_code=status.HTTP_404_NOT_FOUND
+        )
+
+
+class PlayerNotRankedError(CodeShyriException):
+    """Excepción para cuando un jugador no está en la tabla de posiciones de un nivel"""
+    
+    def __init__(self, player_id: str, level_id: str):
+        super().__init__(
+            detail=f"'{player_id}' no está en la tabla de posiciones del nivel '{level_id}'",
+            status_code=status.HTTP_404_NOT_FOUND
+        )
+
+
 class ServiceError(CodeShyriException):
     """Excepción para errores en servicios"""
     
     def __init__(self, detail: str, status_code: int = status.HTTP_500_INTERNAL_SERVER_ERROR):
         super().__init__(detail=detail, status_code=status_code)
 
+
+class RateLimitError(CodeShyriException):
+    """Excepción para clientes que exceden su límite de requests"""
+    
+    def __init__(self, retry_after: int):
+        super().__init__(
+            detail=f"Demasiadas solicitudes, intenta de nuevo en {retry_after} s",
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS
+        )
+        self.headers = {"Retry-After": str(retry_after)}
@@ -1,54 +1,150 @@
 """
-Configuración de logging estructurado para la aplicación
+Configuración de logging estructurado para la aplicación.
+
+Los loggers no escriben directamente en stdout: cada registro se encola sin
+formatear y un único hilo (QueueListener) lo formatea y lo escribe, de modo
+que el event loop nunca se bloquea esperando la salida.
 """
+import atexit
+import itertools
+import json
 import logging
+import queue
 import sys
-from typing import Optional
-from app.config import LOG_LEVEL, ENVIRONMENT
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from threading import Lock
+from typing import Any, Dict, Optional
+from app.config import LOG_LEVEL, ENVIRONMENT, LOG_SAMPLING
+
+# Atributos propios de LogRecord; el resto viene de `extra=`
+_RECORD_ATTRIBUTES = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_listener: Optional[QueueListener] = None
+_listener_lock = Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """Formatea cada registro como una línea JSON, incluyendo los campos de `extra`"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "location": f"{record.filename}:{record.lineno}",
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class LazyQueueHandler(QueueHandler):
+    """
+    Encola el registro tal cual: el mensaje (msg % args) se formatea en el
+    hilo del listener, no en el que llama al logger.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """Deja pasar 1 de cada N registros INFO/DEBUG; WARNING o superior siempre pasan"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.every = round(1 / rate) if rate > 0 else 0
+        self._counter = itertools.count()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+        if self.every == 0:
+            return False
+        return next(self._counter) % self.every == 0
+
+
+def _parse_sampling(spec: str) -> Dict[str, float]:
+    """Interpreta LOG_SAMPLING ("app.routers.execution=0.1,otro=0.5")"""
+    rates = {}
+    for item in spec.split(","):
+        name, _, rate = item.strip().partition("=")
+        if name and rate:
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+_SAMPLING_RATES = _parse_sampling(LOG_SAMPLING)
+
+
+def _build_formatter() -> logging.Formatter:
+    if ENVIRONMENT == "development":
+        # Formato más legible para desarrollo
+        return logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
+    # Formato JSON para producción
+    return JsonFormatter()
+
+
+def start_logging() -> None:
+    """Inicia (una sola vez) el hilo que escribe los registros encolados"""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            return
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(_build_formatter())
+        _listener = QueueListener(_log_queue, console_handler, respect_handler_level=True)
+        _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging() -> None:
+    """Escribe los registros pendientes y detiene el hilo de logging"""
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        _listener = None
 
 
 def setup_logger(name: Optional[str] = None) -> logging.Logger:
     """
     Configura y retorna un logger con formato estructurado.
-    
+
     Args:
         name: Nombre del logger (opcional, por defecto usa el nombre del módulo)
-        
+
     Returns:
         Logger configurado
     """
     logger = logging.getLogger(name or __name__)
-    
+
     # Evitar duplicar handlers si ya está configurado
     if logger.handlers:
         return logger
-    
+
     logger.setLevel(getattr(logging, LOG_LEVEL.upper(), logging.INFO))
-    
-    # Handler para consola
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(getattr(logging, LOG_LEVEL.upper(), logging.INFO))
-    
-    # Formato estructurado
-    if ENVIRONMENT == "development":
-        # Formato más legible para desarrollo
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-    else:
-        # Formato JSON para producción (puede extenderse)
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-    
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
+
+    # Handler que solo encola; el formato y la escritura ocurren en el listener
+    queue_handler = LazyQueueHandler(_log_queue)
+    rate = _SAMPLING_RATES.get(logger.name)
+    if rate is not None and rate < 1:
+        queue_handler.addFilter(SamplingFilter(rate))
+    logger.addHandler(queue_handler)
+
+    start_logging()
     return logger
 
 
 # Logger principal de la aplicación
 app_logger = setup_logger("codeshyri")
-
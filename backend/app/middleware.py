@@ -0,0 +1,142 @@
+"""
+Middlewares ASGI de la aplicación
+"""
+import asyncio
+import cProfile
+import hmac
+import itertools
+import os
+import random
+import re
+import threading
+import time
+from typing import Optional
+from app.config import PROFILE_DIR, PROFILE_HEADER_TOKEN, PROFILE_SAMPLE_RATE
+from app.logger import setup_logger
+from app.services.metrics import http_request_duration_seconds, http_requests_in_flight, http_requests_total
+from app.services.profiling import RequestProfile, activate, deactivate, write_collapsed
+
+logger = setup_logger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+
+
+class MetricsMiddleware:
+    """
+    Registra conteo y latencia de cada request por método, ruta y status.
+
+    La ruta es la plantilla de FastAPI (`/api/levels/{level_id}`), no la URL,
+    para que el número de series no crezca con los ids.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests_in_flight.dec()
+            route = scope.get("route")
+            route_path = route.path if route is not None else "unmatched"
+            http_requests_total.inc(scope["method"], route_path, str(status_code))
+            http_request_duration_seconds.observe(elapsed, scope["method"], route_path)
+
+
+class ProfilingMiddleware:
+    """
+    Perfila requests puntuales: las que traen `X-Profile: <PROFILE_HEADER_TOKEN>`
+    y una fracción `PROFILE_SAMPLE_RATE` del resto.
+
+    La respuesta lleva `Server-Timing` con la duración de cada fase de
+    `CodeValidator.validate` (cache, pattern_scan, template, tempfile, node...)
+    y el total, y las pilas de cProfile del event loop y del hilo de la
+    validación se escriben en PROFILE_DIR como `.folded` para flamegraph.pl.
+
+    cProfile en el event loop también registra otras requests concurrentes;
+    solo una request a la vez se perfila ahí, las demás solo en su hilo.
+    """
+
+    _ids = itertools.count(1)
+    # sys.setprofile es por hilo: un solo perfil del event loop a la vez
+    _loop_profiler_lock = threading.Lock()
+
+    def __init__(self, app, sample_rate: float = PROFILE_SAMPLE_RATE,
+                 token: str = PROFILE_HEADER_TOKEN, directory: str = PROFILE_DIR):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.token = token.encode("utf-8")
+        self.directory = directory
+
+    def _should_profile(self, scope) -> bool:
+        if self.token:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER:
+                    return hmac.compare_digest(value, self.token)
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _profile_path(self, scope, profile_id: int) -> str:
+        route = scope.get("route")
+        route_path = route.path if route is not None else scope["path"]
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", route_path).strip("_") or "root"
+        return os.path.join(self.directory, f"{int(time.time())}-{profile_id}-{scope['method']}-{slug}.folded")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        profile_id = next(self._ids)
+        path: Optional[str] = None
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            nonlocal path
+            if message["type"] == "http.response.start":
+                # La ruta ya se resolvió: el archivo se nombra con su plantilla
+                path = self._profile_path(scope, profile_id)
+                timing = profile.server_timing(total=time.perf_counter() - started)
+                value = f'{timing}, profile;desc="{os.path.basename(path)}"'
+                message = {**message, "headers": [*message.get("headers", []), (b"server-timing", value.encode("latin-1"))]}
+            await send(message)
+
+        loop_profiler: Optional[cProfile.Profile] = None
+        if self._loop_profiler_lock.acquire(blocking=False):
+            loop_profiler = cProfile.Profile()
+        token = activate(profile)
+        try:
+            if loop_profiler is not None:
+                loop_profiler.enable()
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            if loop_profiler is not None:
+                loop_profiler.disable()
+                profile.profilers.append(loop_profiler)
+                self._loop_profiler_lock.release()
+            deactivate(token)
+
+        # La respuesta ya se envió: las pilas se procesan fuera del event loop
+        path = path or self._profile_path(scope, profile_id)
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                None, lambda: write_collapsed(path, profile.collapsed_stacks())
+            )
+            logger.info("Perfil %d escrito en %s", profile_id, path, extra={"phases": profile.phase_totals()})
+        except OSError as e:
+            logger.warning("No se pudo escribir el perfil %d: %s", profile_id, e)
@@ -1,8 +1,8 @@
 """
 Modelos Pydantic para la API
 """
-from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any, Union
 
 
 class CodeExecutionRequest(BaseModel):
@@ -18,6 +18,18 @@ class CodeExecutionResponse(BaseModel):
     error: Optional[str] = None
 
 
+class CodeExecutionBatchResponse(BaseModel):
+    """Response model para validación de código en lote"""
+    results: List[CodeExecutionResponse]
+    uniquePrograms: int
+
+
+class CommandTraceItem(BaseModel):
+    """Comando ejecutado por el programa del usuario, en orden de ejecución"""
+    name: str  # p. ej. "moveForward"
+    args: List[Union[float, str]] = []
+
+
 class LevelValidationRequest(BaseModel):
     """Request model para validación de nivel completado"""
     levelId: str
@@ -26,6 +38,15 @@ class LevelValidationRequest(BaseModel):
     actionsExecuted: List[str] = []  # Lista de acciones ejecutadas
     stepsMoved: int = 0
     rotationsMade: int = 0
+    # Traza de comandos: si se envía, el servidor simula el recorrido y
+    # los campos anteriores reportados por el cliente se ignoran
+    commands: Optional[List[CommandTraceItem]] = None
+    # Si se envía, el mejor intento del jugador en el nivel queda guardado
+    playerId: Optional[str] = Field(None, min_length=1, max_length=64)
+    # Código del programa; con playerId y commands, una solución completada
+    # entra en la tabla de posiciones del nivel (se usa su largo) si el código
+    # es válido y llama a los comandos de la traza
+    code: Optional[str] = None
 
 
 class LevelValidationResponse(BaseModel):
@@ -34,4 +55,48 @@ class LevelValidationResponse(BaseModel):
     message: str
     objectivesCompleted: List[str] = []
     objectivesPending: List[str] = []
+    simulated: bool = False  # True si se validó simulando la traza de comandos
+    leaderboardRank: Optional[int] = None  # Posición del jugador en la tabla del nivel
+    efficiency: Optional[float] = None  # 0-1 respecto de la solución óptima; solo si se completó
+
+
+class LevelListResponse(BaseModel):
+    """Response model para el listado paginado de niveles"""
+    levels: List[Dict[str, Any]]  # Resúmenes con los campos pedidos
+    nextCursor: Optional[str] = None  # None en la última página
+    total: int  # Niveles que cumplen el filtro
+
+
+class ProgressEntryResponse(BaseModel):
+    """Mejor intento de un jugador en un nivel"""
+    levelId: str
+    completed: bool
+    stepsMoved: float
+    rotationsMade: int
+    objectivesCompleted: List[str] = []
+    objectivesPending: List[str] = []
+    attempts: int  # Intentos validados en el nivel
+    updatedAt: float  # Último intento (segundos desde epoch)
+
+
+class PlayerProgressResponse(BaseModel):
+    """Response model para el progreso de un jugador en todos los niveles"""
+    playerId: str
+    levels: List[ProgressEntryResponse]
 
+
+class LeaderboardEntryResponse(BaseModel):
+    """Solución de un jugador en la tabla de posiciones"""
+    rank: int
+    playerId: str
+    stepsMoved: float
+    rotationsMade: int
+    codeLength: int  # Caracteres sin comentarios ni espacios sobrantes
+    submittedAt: float
+
+
+class LeaderboardResponse(BaseModel):
+    """Response model para la tabla de posiciones de un nivel"""
+    levelId: str
+    total: int  # Jugadores en la tabla
+    entries: List[LeaderboardEntryResponse]
@@ -1,9 +1,17 @@
 """
 Router para ejecución y validación de código
 """
-from fastapi import APIRouter
-from app.models import CodeExecutionRequest, CodeExecutionResponse
+import asyncio
+import json
+from functools import partial
+from typing import AsyncIterator, Dict, List, Tuple
+from fastapi import APIRouter, Depends, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from app.models import CodeExecutionRequest, CodeExecutionResponse, CodeExecutionBatchResponse
 from app.services.code_validator import CodeValidator
+from app.services.live_validation import EditError, LiveValidationSession
+from app.services.rate_limiter import charge, client_key, execute_limiter, rate_limit
+from app.config import BATCH_MAX_ITEMS
 from app.exceptions import ValidationError, ServiceError
 from app.logger import setup_logger
 
@@ -11,33 +19,15 @@ router = APIRouter(prefix="/api", tags=["execution"])
 logger = setup_logger(__name__)
 
 
-@router.post("/execute", response_model=CodeExecutionResponse)
-async def execute_code(request: CodeExecutionRequest):
-    """
-    Valida código JavaScript de forma segura.
-    El código se ejecuta en el frontend, aquí solo validamos sintaxis y seguridad.
-    
-    Funciones disponibles para el usuario:
-    - Movimiento básico: moveForward(steps=1), moveBackward(steps=1), moveUp(steps=1), 
-      moveDown(steps=1), moveLeft(steps=1), moveRight(steps=1)
-    - Rotación: turnRight(degrees=90), turnLeft(degrees=90), turn(degrees), 
-      faceDirection(direction)
-    - Movimiento avanzado: moveTo(x, y), moveDistance(distance), sprint(steps=1)
-    - Acciones: jump(), attack(), wait(milliseconds), teleport(x, y), spin()
-    - Console: console.log(message)
-    """
+async def _validate_code(code: str, level_id: str) -> CodeExecutionResponse:
+    """Valida un programa y construye la respuesta (los errores se devuelven, no se lanzan)"""
     try:
-        logger.info(
-            f"Validando código para nivel: {request.levelId}",
-            extra={"level_id": request.levelId, "code_length": len(request.code)}
-        )
-        
-        is_valid, success_msg, error_msg = CodeValidator.validate(request.code)
+        is_valid, success_msg, error_msg = await CodeValidator.validate_async(code)
         
         if not is_valid:
             logger.warning(
-                f"Validación fallida: {error_msg}",
-                extra={"level_id": request.levelId}
+                "Validación fallida: %s", error_msg,
+                extra={"level_id": level_id}
             )
             # Devolver respuesta de error en lugar de lanzar excepción
             return CodeExecutionResponse(
@@ -47,8 +37,8 @@ async def execute_code(request: CodeExecutionRequest):
             )
         
         logger.info(
-            f"Código validado exitosamente para nivel: {request.levelId}",
-            extra={"level_id": request.levelId}
+            "Código validado exitosamente para nivel: %s", level_id,
+            extra={"level_id": level_id}
         )
         
         return CodeExecutionResponse(
@@ -61,7 +51,7 @@ async def execute_code(request: CodeExecutionRequest):
         logger.error(
             f"Error inesperado durante validación: {str(e)}",
             exc_info=True,
-            extra={"level_id": request.levelId}
+            extra={"level_id": level_id}
         )
         # Devolver respuesta de error en lugar de lanzar excepción
         return CodeExecutionResponse(
@@ -70,3 +60,125 @@ async def execute_code(request: CodeExecutionRequest):
             error=f"Error al validar código: {str(e)}"
         )
 
+
+@router.post("/execute", response_model=CodeExecutionResponse, dependencies=[Depends(rate_limit(execute_limiter))])
+async def execute_code(request: CodeExecutionRequest):
+    """
+    Valida código JavaScript de forma segura.
+    El código se ejecuta en el frontend, aquí solo validamos sintaxis y seguridad.
+    
+    Funciones disponibles para el usuario:
+    - Movimiento básico: moveForward(steps=1), moveBackward(steps=1), moveUp(steps=1), 
+      moveDown(steps=1), moveLeft(steps=1), moveRight(steps=1)
+    - Rotación: turnRight(degrees=90), turnLeft(degrees=90), turn(degrees), 
+      faceDirection(direction)
+    - Movimiento avanzado: moveTo(x, y), moveDistance(distance), sprint(steps=1)
+    - Acciones: jump(), attack(), wait(milliseconds), teleport(x, y), spin()
+    - Console: console.log(message)
+    """
+    logger.info(
+        "Validando código para nivel: %s", request.levelId,
+        extra={"level_id": request.levelId, "code_length": len(request.code)}
+    )
+    return await _validate_code(request.code, request.levelId)
+
+
+@router.post("/execute/batch", response_model=CodeExecutionBatchResponse)
+async def execute_code_batch(requests: List[CodeExecutionRequest], http_request: Request, stream: bool = False):
+    """
+    Valida en lote los programas de una clase.
+    
+    Cada programa consume un token del mismo límite que /execute. Los
+    programas idénticos se validan una sola vez y los distintos se validan
+    en paralelo. Con `?stream=true` la respuesta es NDJSON: una línea
+    `{"index": i, "success": ..., "output": ..., "error": ...}` por programa,
+    en el orden en que terminan.
+    """
+    if len(requests) > BATCH_MAX_ITEMS:
+        raise ValidationError(f"El lote excede el máximo de {BATCH_MAX_ITEMS} programas")
+    charge(execute_limiter, http_request, cost=len(requests))
+    
+    # Agrupar índices por código para validar cada programa distinto una vez
+    indexes_by_code: Dict[str, List[int]] = {}
+    for index, item in enumerate(requests):
+        indexes_by_code.setdefault(item.code, []).append(index)
+    
+    logger.info(
+        "Validando lote de %d programas (%d distintos)", len(requests), len(indexes_by_code),
+        extra={"batch_size": len(requests), "unique_programs": len(indexes_by_code)}
+    )
+    
+    async def validate_group(code: str, indexes: List[int]) -> Tuple[List[int], CodeExecutionResponse]:
+        return indexes, await _validate_code(code, requests[indexes[0]].levelId)
+    
+    tasks = [
+        asyncio.ensure_future(validate_group(code, indexes))
+        for code, indexes in indexes_by_code.items()
+    ]
+    
+    if stream:
+        async def ndjson_lines() -> AsyncIterator[str]:
+            try:
+                for finished in asyncio.as_completed(tasks):
+                    indexes, response = await finished
+                    for index in indexes:
+                        yield json.dumps({"index": index, **response.model_dump()}) + "\n"
+            finally:
+                # El cliente puede cerrar la conexión antes de terminar
+                for task in tasks:
+                    task.cancel()
+        
+        return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+    
+    try:
+        groups = await asyncio.gather(*tasks)
+    except Exception as e:
+        logger.error(f"Error al validar lote: {str(e)}", exc_info=True)
+        raise ServiceError(f"Error al validar lote: {str(e)}")
+    
+    results: List[CodeExecutionResponse] = [None] * len(requests)
+    for indexes, response in groups:
+        for index in indexes:
+            results[index] = response
+    
+    return CodeExecutionBatchResponse(results=results, uniquePrograms=len(indexes_by_code))
+
+
+@router.websocket("/execute/live")
+async def live_validation(websocket: WebSocket, levelId: str = ""):
+    """
+    Validación mientras se escribe.
+    
+    El editor envía ediciones JSON `{"version": n, "code": "..."}` o
+    `{"version": n, "changes": [{"offset", "length", "text"}]}` y recibe
+    `{"type": "diagnostics", "version": n, "valid": ..., "diagnostics": [...]}`
+    solo para la última versión. Si una edición no se puede aplicar se
+    responde `{"type": "error", "message": ..., "resync": true}` y el editor
+    debe reenviar el código completo.
+    
+    Cada validación consume un token del límite de /execute; sin tokens, la
+    validación de la última versión espera a que el cliente los recupere.
+    """
+    await websocket.accept()
+    session = LiveValidationSession(websocket.send_json, acquire=partial(execute_limiter.acquire, client_key(websocket)))
+    runner = asyncio.ensure_future(session.run())
+    logger.info("Sesión de validación en vivo iniciada para nivel: %s", levelId, extra={"level_id": levelId})
+    try:
+        while True:
+            raw = await websocket.receive_text()
+            try:
+                message = json.loads(raw)
+                if not isinstance(message, dict):
+                    raise EditError("Cada mensaje debe ser un objeto JSON")
+                session.edit(message)
+            except (ValueError, EditError) as e:
+                await websocket.send_json({"type": "error", "message": str(e), "resync": True})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        runner.cancel()
+        logger.info(
+            "Sesión de validación en vivo cerrada: %d ediciones, %d validaciones, %d descartadas, %d demoradas",
+            session.edits, session.validations, session.superseded, session.throttled,
+            extra={"level_id": levelId}
+        )
@@ -1,33 +1,85 @@
 """
 Router para datos del juego (niveles, personajes, funciones)
 """
-from fastapi import APIRouter
+import json
+import math
+import time
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, Query, Request, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError as PydanticValidationError
+from app.services.static_responses import static_responses, payload_response
+from app.services.level_summaries import level_summaries, SUMMARY_FIELDS
+from app.config import LEADERBOARD_PAGE_MAX, LEVELS_PAGE_MAX
 from app.services.data_provider import DataProvider
+from app.services.leaderboard import LeaderboardEntry, leaderboards, verified_code_length
+from app.services.level_rules import level_specs
 from app.services.level_validator import LevelValidator
-from app.models import LevelValidationRequest, LevelValidationResponse
-from app.exceptions import LevelNotFoundError, ServiceError
+from app.services.progress_store import ProgressEntry, progress_recorder
+from app.services.rate_limiter import client_key, rate_limit, validate_limiter
+from app.services.trace_validation import TraceValidation
+from app.models import (
+    CommandTraceItem, LeaderboardEntryResponse, LeaderboardResponse, LevelValidationRequest,
+    LevelValidationResponse, LevelListResponse
+)
+from app.exceptions import LevelNotFoundError, PlayerNotRankedError, ServiceError, ValidationError
 from app.logger import setup_logger
 
 router = APIRouter(prefix="/api", tags=["game-data"])
 logger = setup_logger(__name__)
 
 
+@router.get("/levels", response_model=LevelListResponse)
+async def list_levels(
+    limit: int = Query(50, ge=1, le=LEVELS_PAGE_MAX),
+    cursor: Optional[str] = None,
+    character: Optional[str] = None,
+    fields: Optional[str] = None
+):
+    """
+    Lista los niveles con paginación por cursor.
+    
+    Retorna resúmenes livianos (sin path, maizePositions ni initialCode).
+    `fields` limita los campos (p. ej. `id,title`), `character` filtra por
+    personaje y `nextCursor` se envía como `cursor` para la siguiente página.
+    """
+    selected_fields = None
+    if fields:
+        requested = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in requested if field not in SUMMARY_FIELDS]
+        if unknown:
+            raise ValidationError(
+                f"Campos desconocidos: {', '.join(unknown)}. Disponibles: {', '.join(SUMMARY_FIELDS)}"
+            )
+        selected_fields = ["id"] + [field for field in SUMMARY_FIELDS if field in requested and field != "id"]
+    
+    try:
+        levels, next_cursor, total = level_summaries.page(limit, cursor, character, selected_fields)
+    except ValueError as e:
+        raise ValidationError(str(e))
+    except Exception as e:
+        logger.error(f"Error al listar niveles: {str(e)}", exc_info=True)
+        raise ServiceError(f"Error al listar niveles: {str(e)}")
+    
+    return LevelListResponse(levels=levels, nextCursor=next_cursor, total=total)
+
+
 @router.get("/levels/{level_id}")
-async def get_level(level_id: str):
+async def get_level(level_id: str, request: Request):
     """
     Obtiene información de un nivel específico.
     Incluye objetivos, personaje y funciones disponibles.
+    La respuesta está pre-serializada y admite If-None-Match (304).
     """
     try:
-        logger.info(f"Solicitando nivel: {level_id}")
-        level = DataProvider.get_level(level_id)
+        logger.info("Solicitando nivel: %s", level_id)
+        payload = static_responses.level(level_id)
         
-        if not level:
-            logger.warning(f"Nivel no encontrado: {level_id}")
+        if payload is None:
+            logger.warning("Nivel no encontrado: %s", level_id)
             raise LevelNotFoundError(level_id)
         
-        logger.info(f"Nivel encontrado: {level_id}")
-        return level
+        logger.info("Nivel encontrado: %s", level_id)
+        return payload_response(request, payload)
         
     except LevelNotFoundError:
         raise
@@ -40,11 +92,11 @@ async def get_level(level_id: str):
 
 
 @router.get("/characters")
-async def get_characters():
+async def get_characters(request: Request):
     """Obtiene la lista de personajes disponibles"""
     try:
         logger.debug("Solicitando lista de personajes")
-        return DataProvider.get_characters()
+        return payload_response(request, static_responses.characters())
     except Exception as e:
         logger.error(
             f"Error al obtener personajes: {str(e)}",
@@ -54,14 +106,14 @@ async def get_characters():
 
 
 @router.get("/functions")
-async def get_available_functions():
+async def get_available_functions(request: Request):
     """
     Obtiene la lista completa de funciones disponibles para el usuario.
     Útil para autocompletado y documentación en el editor.
     """
     try:
         logger.debug("Solicitando lista de funciones")
-        return DataProvider.get_functions()
+        return payload_response(request, static_responses.functions())
     except Exception as e:
         logger.error(
             f"Error al obtener funciones: {str(e)}",
@@ -70,31 +122,66 @@ async def get_available_functions():
         raise ServiceError(f"Error al obtener funciones: {str(e)}")
 
 
-@router.post("/levels/{level_id}/validate", response_model=LevelValidationResponse)
+@router.post(
+    "/levels/{level_id}/validate",
+    response_model=LevelValidationResponse,
+    dependencies=[Depends(rate_limit(validate_limiter))]
+)
 async def validate_level_completion(level_id: str, request: LevelValidationRequest):
     """
     Valida si los objetivos de un nivel fueron completados.
     Recibe la posición final del personaje, acciones ejecutadas, etc.
+    Si la request incluye `commands`, el recorrido se simula en el servidor.
+    Con `playerId` el intento se guarda en el progreso del jugador (en
+    segundo plano, sin esperar al disco). Si además el nivel se completó
+    simulando `commands` y se envió `code`, la solución entra en la tabla de
+    posiciones del nivel (los contadores reportados por el cliente no cuentan),
+    siempre que el código pase la validación de /execute y llame a cada
+    comando de la traza.
     """
     try:
-        logger.info(f"Validando nivel {level_id}")
+        logger.info("Validando nivel %s", level_id)
         
-        completed, message, completed_obj, pending_obj = LevelValidator.validate_level(
+        result = await LevelValidator.evaluate_async(
             level_id=level_id,
             player_position=request.playerPosition,
             player_angle=request.playerAngle,
             actions_executed=request.actionsExecuted,
             steps_moved=request.stepsMoved,
-            rotations_made=request.rotationsMade
+            rotations_made=request.rotationsMade,
+            commands=[(item.name, item.args) for item in request.commands]
+            if request.commands is not None else None
         )
         
+        if result is None:
+            return LevelValidationResponse(
+                completed=False, message="Nivel no encontrado", simulated=request.commands is not None
+            )
+        if request.playerId:
+            progress_recorder.record(ProgressEntry(
+                request.playerId, level_id, result.completed, result.steps, result.rotations,
+                result.objectives_completed, result.objectives_pending
+            ))
+        rank = None
+        if result.completed and request.playerId and request.commands is not None and request.code is not None:
+            length = await verified_code_length(request.code, (item.name for item in request.commands))
+            if length is not None:
+                rank = leaderboards.submit(level_id, LeaderboardEntry(
+                    result.steps, result.rotations, length, time.time(), request.playerId
+                ))
+        
         return LevelValidationResponse(
-            completed=completed,
-            message=message,
-            objectivesCompleted=completed_obj,
-            objectivesPending=pending_obj
+            completed=result.completed,
+            message=result.message,
+            objectivesCompleted=result.objectives_completed,
+            objectivesPending=result.objectives_pending,
+            simulated=request.commands is not None,
+            leaderboardRank=rank,
+            efficiency=result.efficiency
         )
         
+    except ValidationError:
+        raise
     except Exception as e:
         logger.error(
             f"Error al validar nivel {level_id}: {str(e)}",
@@ -102,3 +189,115 @@ async def validate_level_completion(level_id: str, request: LevelValidationReque
         )
         raise ServiceError(f"Error al validar nivel: {str(e)}")
 
+
+
+@router.get("/levels/{level_id}/leaderboard", response_model=LeaderboardResponse)
+async def get_leaderboard(
+    level_id: str,
+    limit: int = Query(10, ge=1, le=LEADERBOARD_PAGE_MAX),
+    offset: int = Query(0, ge=0)
+):
+    """
+    Tabla de posiciones del nivel: menos pasos, luego menos rotaciones y
+    luego código más corto; a igual puntaje, la solución más antigua.
+    """
+    if not DataProvider.get_level(level_id):
+        raise LevelNotFoundError(level_id)
+    board = leaderboards.board(level_id)
+    if board is None:
+        return LeaderboardResponse(levelId=level_id, total=0, entries=[])
+    return LeaderboardResponse(levelId=level_id, total=len(board), entries=board.top(limit, offset))
+
+
+@router.get("/levels/{level_id}/leaderboard/{player_id}", response_model=LeaderboardEntryResponse)
+async def get_leaderboard_rank(level_id: str, player_id: str):
+    """Posición y mejor solución de un jugador en la tabla del nivel"""
+    board = leaderboards.board(level_id)
+    entry = board.rank(player_id) if board is not None else None
+    if entry is None:
+        raise PlayerNotRankedError(player_id, level_id)
+    return entry
+
+
+def _trace_commands(message: Any) -> Optional[List[CommandTraceItem]]:
+    """
+    Comandos de un mensaje de la traza, o None si el mensaje termina la traza.
+
+    Raises:
+        ValidationError: Si el mensaje no tiene una forma válida
+    """
+    if not isinstance(message, dict):
+        raise ValidationError("Cada mensaje debe ser un objeto JSON")
+    if message.get("type") == "end":
+        return None
+    try:
+        if "commands" in message:
+            if not isinstance(message["commands"], list):
+                raise ValidationError("`commands` debe ser una lista")
+            return [CommandTraceItem.model_validate(item) for item in message["commands"]]
+        return [CommandTraceItem.model_validate(message)]
+    except PydanticValidationError as e:
+        raise ValidationError(f"Comando inválido: {e.errors()[0]['msg']}")
+
+
+async def _close_trace(websocket: WebSocket, message: str, code: int = 1008, **extra: Any) -> None:
+    await websocket.send_json({"type": "error", "message": message, **extra})
+    await websocket.close(code=code)
+
+
+@router.websocket("/levels/{level_id}/trace")
+async def stream_level_trace(websocket: WebSocket, level_id: str):
+    """
+    Valida un nivel a medida que el programa ejecuta sus comandos.
+    
+    El cliente envía cada comando `{"name": "moveForward", "args": [2]}` (o
+    varios con `{"commands": [...]}`) y `{"type": "end"}` al terminar. El
+    servidor simula la traza y responde `{"type": "objective", ...}` cada vez
+    que un objetivo cambia de estado y `{"type": "decided", ...}` cuando el
+    nivel queda decidido: al terminar la traza, con el mismo resultado que
+    /validate, o antes si falla de forma irreversible (ver TraceValidation);
+    luego cierra la conexión sin procesar el resto. Un comando inválido responde
+    `{"type": "error", ...}` y cierra la conexión.
+    """
+    await websocket.accept()
+    retry_after = validate_limiter.acquire(client_key(websocket))
+    if retry_after:
+        await _close_trace(websocket, "Demasiadas solicitudes", 1013, retryAfter=math.ceil(retry_after))
+        return
+    level = DataProvider.get_level(level_id)
+    if not level:
+        await _close_trace(websocket, f"Nivel {level_id} no encontrado")
+        return
+    
+    trace = TraceValidation(level_specs.get(level))
+    logger.info("Traza en vivo iniciada para nivel: %s", level_id, extra={"level_id": level_id})
+    try:
+        while not trace.decided:
+            try:
+                commands = _trace_commands(json.loads(await websocket.receive_text()))
+                if commands is None:
+                    trace.finish()
+                    break
+                for command in commands:
+                    for event in trace.feed(command.name, command.args):
+                        # La decisión se envía una sola vez, al salir del bucle
+                        if event["type"] == "objective":
+                            await websocket.send_json(event)
+                    if trace.decided:
+                        break
+            except ValueError:
+                await _close_trace(websocket, "Mensaje JSON inválido")
+                return
+            except ValidationError as e:
+                await _close_trace(websocket, e.detail)
+                return
+        await websocket.send_json(trace.decision)
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        logger.info(
+            "Traza en vivo cerrada tras %d comandos: %s", trace.commands,
+            trace.decision["reason"] if trace.decided else "sin decidir",
+            extra={"level_id": level_id}
+        )
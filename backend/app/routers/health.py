@@ -2,12 +2,34 @@
 Router para endpoints de salud y estado
 """
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse, PlainTextResponse
 from app.config import APP_TITLE, APP_VERSION
+from app.services.metrics import metrics
+from app.services.static_responses import static_responses
+from app.services.validation_cache import validation_cache
+from app.services.warmup import warmup
 from app.logger import setup_logger
 
 router = APIRouter(tags=["health"])
 logger = setup_logger(__name__)
 
+# Métricas del cache de validación, leídas al momento de exponerlas
+for _stat, _kind, _description in (
+    ("hits", "counter", "Aciertos exactos del cache de validación"),
+    ("misses", "counter", "Fallos del cache de validación"),
+    ("normalizedHits", "counter", "Aciertos por código equivalente del cache de validación"),
+    ("evictions", "counter", "Entradas expulsadas del cache de validación"),
+    ("size", "gauge", "Entradas en el cache de validación"),
+    ("hitRatio", "gauge", "Proporción de aciertos exactos del cache de validación"),
+):
+    _name = "".join("_" + c.lower() if c.isupper() else c for c in _stat)
+    metrics.callback(
+        f"codeshyri_validation_cache_{_name}" + ("_total" if _kind == "counter" else ""),
+        _description,
+        lambda stat=_stat: validation_cache.stats()[stat],
+        _kind
+    )
+
 
 @router.get("/")
 async def root():
@@ -26,3 +48,30 @@ async def health():
     logger.debug("Health check endpoint accessed")
     return {"status": "healthy"}
 
+
+@router.get("/api/health/live")
+async def liveness():
+    """Liveness: el proceso responde (aunque aún se esté calentando)"""
+    return {"status": "alive"}
+
+
+@router.get("/api/health/ready")
+async def readiness():
+    """
+    Readiness: 200 solo cuando terminó el calentamiento de inicio; 503
+    mientras corre, si falló o durante el cierre, con el estado de cada paso.
+    """
+    return JSONResponse(warmup.report(), status_code=200 if warmup.ready else 503)
+
+
+@router.get("/api/health/compression")
+async def compression_report():
+    """Tamaños y ratios de las variantes comprimidas de los datos estáticos"""
+    logger.debug("Compression report endpoint accessed")
+    return static_responses.compression_report()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Métricas en formato de texto de Prometheus"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,38 @@
+"""
+Router para el progreso de los jugadores
+"""
+from fastapi import APIRouter
+from app.models import PlayerProgressResponse, ProgressEntryResponse
+from app.services.progress_store import progress_recorder
+from app.exceptions import ProgressNotFoundError, ServiceError
+from app.logger import setup_logger
+
+router = APIRouter(prefix="/api/players", tags=["progress"])
+logger = setup_logger(__name__)
+
+
+@router.get("/{player_id}/progress", response_model=PlayerProgressResponse)
+async def get_player_progress(player_id: str):
+    """
+    Mejor intento del jugador en cada nivel que validó con `playerId`.
+    Incluye los intentos que aún no se guardan en disco.
+    """
+    try:
+        entries = await progress_recorder.for_player_async(player_id)
+    except Exception as e:
+        logger.error(f"Error al obtener progreso de {player_id}: {str(e)}", exc_info=True)
+        raise ServiceError(f"Error al obtener progreso: {str(e)}")
+    return PlayerProgressResponse(playerId=player_id, levels=[entry.to_dict() for entry in entries])
+
+
+@router.get("/{player_id}/progress/{level_id}", response_model=ProgressEntryResponse)
+async def get_level_progress(player_id: str, level_id: str):
+    """Mejor intento del jugador en un nivel"""
+    try:
+        entry = await progress_recorder.get_async(player_id, level_id)
+    except Exception as e:
+        logger.error(f"Error al obtener progreso de {player_id}: {str(e)}", exc_info=True)
+        raise ServiceError(f"Error al obtener progreso: {str(e)}")
+    if entry is None:
+        raise ProgressNotFoundError(player_id, level_id)
+    return entry.to_dict()
@@ -1,16 +1,47 @@
 """
 Servicio para validación de código JavaScript
 """
+import asyncio
+import re
 import subprocess
 import tempfile
 import os
-from typing import Tuple, Optional
-from app.constants import DANGEROUS_PATTERNS, JS_VALIDATION_TEMPLATE
-from app.config import VALIDATION_TIMEOUT, NODE_CHECK_COMMAND
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple, Optional
+from app.constants import JS_VALIDATION_TEMPLATE
+from app.config import (
+    VALIDATION_TIMEOUT, VALIDATION_MAX_CODE, NODE_CHECK_COMMAND, VALIDATION_MAX_CONCURRENCY, VALIDATOR_ENGINE
+)
 from app.logger import setup_logger
+from app.services.js_syntax_checker import check_syntax
+from app.services.metrics import (
+    node_run_seconds, validation_duration_seconds, validation_outcomes_total, validations_in_flight
+)
+from app.services.node_worker_pool import node_worker_pool
+from app.services.pattern_scanner import dangerous_pattern_scanner
+from app.services.profiling import bind, phase
+from app.services.validation_cache import validation_cache
 
 logger = setup_logger(__name__)
 
+TIMEOUT_ERROR = "Tiempo de validación excedido"
+SERVER_ERROR_PREFIX = "Error del servidor"
+DANGEROUS_PATTERN_PREFIX = "Patrón no permitido"
+CODE_TOO_LONG_ERROR = f"El código excede {VALIDATION_MAX_CODE} caracteres"
+
+# Nombres declarados por los stubs de JS_VALIDATION_TEMPLATE
+STUB_DECLARATIONS = {
+    **{name: "function" for name in re.findall(r"^function (\w+)\(", JS_VALIDATION_TEMPLATE, re.M)},
+    **{name: "const" for name in re.findall(r"^const (\w+)", JS_VALIDATION_TEMPLATE, re.M)},
+}
+
+# Executor acotado para validar fuera del event loop de asyncio
+validation_executor = ThreadPoolExecutor(
+    max_workers=VALIDATION_MAX_CONCURRENCY,
+    thread_name_prefix="codeshyri-validation"
+)
+
 
 class CodeValidator:
     """Servicio para validar código JavaScript de forma segura"""
@@ -19,15 +50,15 @@ class CodeValidator:
     def validate_dangerous_patterns(code: str) -> Optional[str]:
         """
         Valida que el código no contenga patrones peligrosos.
+        Los patrones dentro de comentarios y strings se ignoran.
         
         Returns:
             None si es seguro, mensaje de error si encuentra un patrón peligroso
         """
-        code_lower = code.lower()
-        for pattern in DANGEROUS_PATTERNS:
-            if pattern.lower() in code_lower:
-                logger.warning(f"Patrón peligroso detectado: {pattern}")
-                return f"Patrón no permitido: {pattern}"
+        hit = dangerous_pattern_scanner.first(code)
+        if hit:
+            logger.warning("Patrón peligroso detectado: %s (línea %d, columna %d)", hit.pattern, hit.line, hit.column)
+            return f"{DANGEROUS_PATTERN_PREFIX}: {hit.pattern} (línea {hit.line}, columna {hit.column})"
         return None
     
     @staticmethod
@@ -57,17 +88,20 @@ class CodeValidator:
         temp_file = None
         try:
             # Crear archivo temporal
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.js', delete=False) as f:
+            with phase("tempfile"), tempfile.NamedTemporaryFile(mode='w', suffix='.js', delete=False) as f:
                 f.write(validation_code)
                 temp_file = f.name
             
             # Validar sintaxis con Node.js
-            result = subprocess.run(
-                NODE_CHECK_COMMAND + [temp_file],
-                capture_output=True,
-                text=True,
-                timeout=VALIDATION_TIMEOUT
-            )
+            started = time.perf_counter()
+            with phase("node"):
+                result = subprocess.run(
+                    NODE_CHECK_COMMAND + [temp_file],
+                    capture_output=True,
+                    text=True,
+                    timeout=VALIDATION_TIMEOUT
+                )
+            node_run_seconds.observe(time.perf_counter() - started, "process")
             
             if result.returncode == 0:
                 logger.debug("Validación de sintaxis exitosa")
@@ -76,23 +110,92 @@ class CodeValidator:
                 error_msg = result.stderr or "Error de sintaxis desconocido"
                 # Limpiar rutas de archivos temporales del mensaje de error
                 error_msg = error_msg.replace(temp_file, "tu código")
-                logger.warning(f"Error de sintaxis: {error_msg}")
+                logger.warning("Error de sintaxis: %s", error_msg)
                 return False, error_msg
                 
         except subprocess.TimeoutExpired:
             logger.warning("Tiempo de validación excedido")
-            return False, "Tiempo de validación excedido"
+            return False, TIMEOUT_ERROR
         except FileNotFoundError:
             # Node.js no está instalado
             logger.warning("Node.js no está disponible para validación de sintaxis")
             return True, "Validación básica completada (Node.js no disponible para validación de sintaxis)"
         except Exception as e:
             logger.error(f"Error durante validación de sintaxis: {str(e)}", exc_info=True)
-            return False, f"Error del servidor: {str(e)}"
+            return False, f"{SERVER_ERROR_PREFIX}: {str(e)}"
         finally:
             # Limpiar archivo temporal
             if temp_file and os.path.exists(temp_file):
-                os.unlink(temp_file)
+                with phase("tempfile"):
+                    os.unlink(temp_file)
+    
+    @staticmethod
+    def validate_syntax_python(user_code: str) -> Tuple[bool, Optional[str]]:
+        """
+        Valida la sintaxis con el verificador en Python, sin crear procesos.
+        Los stubs de funciones se consideran ya declarados.
+        
+        Args:
+            user_code: Código del usuario a validar
+            
+        Returns:
+            Tupla (es_válido, mensaje_error)
+        """
+        with phase("syntax"):
+            error = check_syntax(user_code, STUB_DECLARATIONS)
+        if error is None:
+            logger.debug("Validación de sintaxis exitosa")
+            return True, None
+        error_msg = error.format(user_code)
+        logger.warning("Error de sintaxis: %s (línea %d, columna %d)", error.message, error.line, error.column)
+        return False, error_msg
+    
+    @staticmethod
+    def validate_syntax_pooled(user_code: str) -> Tuple[bool, Optional[str]]:
+        """
+        Valida la sintaxis usando un worker Node.js persistente del pool.
+        Los stubs de funciones ya están cargados en el worker, por lo que
+        solo se envía el código del usuario.
+        
+        Args:
+            user_code: Código del usuario a validar
+            
+        Returns:
+            Tupla (es_válido, mensaje_error)
+        """
+        try:
+            with phase("node"):
+                is_valid, error_msg = node_worker_pool.check(user_code, VALIDATION_TIMEOUT)
+            if is_valid:
+                logger.debug("Validación de sintaxis exitosa")
+                return True, None
+            error_msg = error_msg or "Error de sintaxis desconocido"
+            logger.warning("Error de sintaxis: %s", error_msg)
+            return False, error_msg
+        except subprocess.TimeoutExpired:
+            logger.warning("Tiempo de validación excedido")
+            return False, TIMEOUT_ERROR
+        except FileNotFoundError:
+            logger.warning("Node.js no está disponible para validación de sintaxis")
+            return True, "Validación básica completada (Node.js no disponible para validación de sintaxis)"
+        except Exception as e:
+            logger.error(f"Error durante validación de sintaxis: {str(e)}", exc_info=True)
+            return False, f"{SERVER_ERROR_PREFIX}: {str(e)}"
+    
+    @staticmethod
+    def classify_outcome(result: Tuple[bool, Optional[str], Optional[str]]) -> str:
+        """Clasifica un resultado para las métricas de validación"""
+        is_valid, _, error_msg = result
+        if is_valid:
+            return "valid"
+        error_msg = error_msg or ""
+        if error_msg.startswith(DANGEROUS_PATTERN_PREFIX):
+            return "dangerous_pattern"
+        if error_msg == TIMEOUT_ERROR:
+            return "timeout"
+        if error_msg.startswith(SERVER_ERROR_PREFIX):
+            return "server_error"
+        return "syntax_error"
     
     @classmethod
     def validate(cls, code: str) -> Tuple[bool, Optional[str], Optional[str]]:
@@ -105,19 +208,120 @@ class CodeValidator:
         Returns:
             Tupla (es_válido, mensaje_éxito, mensaje_error)
         """
+        started = time.perf_counter()
+        result = cls._validate(code)
+        outcome = cls.classify_outcome(result)
+        validation_outcomes_total.inc(outcome)
+        validation_duration_seconds.observe(time.perf_counter() - started, outcome)
+        return result
+    
+    @classmethod
+    def _validate(cls, code: str) -> Tuple[bool, Optional[str], Optional[str]]:
+        """Cuerpo de validate(), sin métricas; cada paso se mide como fase del perfil"""
+        # Un programa enorme no se parsea ni se guarda en el cache
+        if len(code) > VALIDATION_MAX_CODE:
+            return False, None, CODE_TOO_LONG_ERROR
+        
+        # Resultado ya calculado para exactamente este código
+        with phase("cache"):
+            cached = validation_cache.get(code)
+        if cached is not None:
+            return cached
+        
         # Validar patrones peligrosos primero
-        dangerous_error = cls.validate_dangerous_patterns(code)
+        with phase("pattern_scan"):
+            dangerous_error = cls.validate_dangerous_patterns(code)
         if dangerous_error:
-            return False, None, dangerous_error
+            result = (False, None, dangerous_error)
+            validation_cache.put(code, result)
+            return result
         
-        # Crear código de validación
-        validation_code = cls.create_validation_code(code)
+        # Un programa equivalente (solo cambia formato/comentarios) ya fue válido
+        with phase("equivalent_cache"):
+            cached = validation_cache.get_equivalent(code)
+        if cached is not None:
+            validation_cache.put(code, cached)
+            return cached
         
-        # Validar sintaxis
-        is_valid, error_msg = cls.validate_syntax(validation_code)
+        # Validar sintaxis (en proceso, pool de workers o un proceso por validación)
+        if VALIDATOR_ENGINE == "python":
+            is_valid, error_msg = cls.validate_syntax_python(code)
+        elif node_worker_pool.enabled:
+            is_valid, error_msg = cls.validate_syntax_pooled(code)
+        else:
+            with phase("template"):
+                validation_code = cls.create_validation_code(code)
+            is_valid, error_msg = cls.validate_syntax(validation_code)
         
         if is_valid:
-            return True, "Código válido", None
+            result = (True, "Código válido", None)
         else:
-            return False, None, error_msg
-
+            result = (False, None, error_msg)
+        
+        # Los timeouts y errores internos son transitorios: no se guardan
+        if cls.classify_outcome(result) not in ("timeout", "server_error"):
+            validation_cache.put(code, result)
+        return result
+    
+    @classmethod
+    def check_backend(cls) -> str:
+        """
+        Verifica que el motor de sintaxis configurado funciona: debe aceptar
+        un programa válido y rechazar uno inválido. No usa el cache.
+        
+        Returns:
+            Nombre del motor verificado (python, node-pool o node)
+            
+        Raises:
+            RuntimeError: Si el motor no está disponible o responde mal
+        """
+        if VALIDATOR_ENGINE == "python":
+            engine, check = "python", cls.validate_syntax_python
+        elif node_worker_pool.enabled:
+            engine, check = "node-pool", cls.validate_syntax_pooled
+        else:
+            engine, check = "node", lambda code: cls.validate_syntax(cls.create_validation_code(code))
+        
+        is_valid, message = check("moveForward(1);\nturnRight(90);")
+        if not is_valid or message:
+            # Sin Node.js la validación se degrada a "básica" con un mensaje
+            raise RuntimeError(f"El motor {engine} no validó un programa correcto: {message}")
+        is_valid, _ = check("moveForward(1;")
+        if is_valid:
+            raise RuntimeError(f"El motor {engine} aceptó un programa con error de sintaxis")
+        return engine
+    
+    @classmethod
+    async def prewarm_cache(cls, codes: List[str]) -> None:
+        """
+        Valida una lista de programas para dejar sus resultados en cache.
+        
+        Args:
+            codes: Programas a prevalidar (por ejemplo, el initialCode de cada nivel)
+        """
+        await asyncio.gather(*(cls.validate_async(code) for code in codes))
+        logger.info(
+            f"Cache de validación precargado con {len(codes)} programas",
+            extra={"cache": validation_cache.stats()}
+        )
+    
+    @classmethod
+    async def validate_async(cls, code: str) -> Tuple[bool, Optional[str], Optional[str]]:
+        """
+        Versión asíncrona de validate() que no bloquea el event loop.
+        La validación corre en un executor con a lo sumo
+        VALIDATION_MAX_CONCURRENCY validaciones simultáneas.
+        Si la request se está perfilando, el perfil se propaga al hilo del executor.
+        
+        Args:
+            code: Código del usuario a validar
+            
+        Returns:
+            Tupla (es_válido, mensaje_éxito, mensaje_error)
+        """
+        loop = asyncio.get_running_loop()
+        validations_in_flight.inc()
+        try:
+            return await loop.run_in_executor(validation_executor, bind(cls.validate, code))
+        finally:
+            validations_in_flight.dec()
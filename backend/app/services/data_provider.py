@@ -2,7 +2,8 @@
 Servicio para proveer datos estáticos (niveles, personajes, funciones)
 """
 from typing import Dict, Any, List, Optional
-from app.constants import CHARACTERS, LEVELS, FUNCTIONS_DEFINITION
+from app.constants import CHARACTERS, FUNCTIONS_DEFINITION
+from app.services.level_catalog import level_catalog
 
 
 class DataProvider:
@@ -29,17 +30,17 @@ class DataProvider:
         Returns:
             Información del nivel o None si no existe
         """
-        return LEVELS.get(level_id)
+        return level_catalog.get(level_id)
     
     @staticmethod
     def get_all_levels() -> Dict[str, Dict[str, Any]]:
         """
-        Obtiene todos los niveles disponibles.
+        Obtiene todos los niveles disponibles (los carga si aún no lo están).
         
         Returns:
             Diccionario con todos los niveles
         """
-        return LEVELS
+        return level_catalog.all()
     
     @staticmethod
     def get_functions() -> Dict[str, Dict[str, Any]]:
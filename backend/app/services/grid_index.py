@@ -0,0 +1,153 @@
+"""
+Índice del grid de un nivel en un arreglo compacto.
+
+Cada celda dentro del rectángulo que cubre el nivel ocupa un byte con
+banderas (camino, maíz, agua, objetivo, inicio), así que preguntar por una
+celda es calcular un offset y leer un byte. El maíz se numera para llevar
+el maíz recogido como una máscara de bits. Las conversiones grid ↔ píxel
+del personaje usan la misma geometría que el frontend (GameScene).
+"""
+import math
+from array import array
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+from app.constants import GRID_CELL_SIZE, GRID_HORIZON_Y
+
+Cell = Tuple[int, int]
+
+# Banderas de cada celda
+PATH = 1
+MAIZE = 2
+WATER = 4
+GOAL = 8
+START = 16
+
+
+def grid_to_pixel_for_player(grid_x: int, grid_y: int) -> Tuple[float, float]:
+    """Posición en píxeles del personaje en una celda (parte inferior de la celda)"""
+    return grid_x * GRID_CELL_SIZE + GRID_CELL_SIZE / 2, GRID_HORIZON_Y + grid_y * GRID_CELL_SIZE + GRID_CELL_SIZE
+
+
+def pixel_to_grid(x: float, y: float) -> Cell:
+    """Celda del grid que contiene un punto en píxeles"""
+    return math.floor(x / GRID_CELL_SIZE), math.floor((y - GRID_HORIZON_Y) / GRID_CELL_SIZE)
+
+
+def water_cells(lake: Optional[Dict[str, float]]) -> FrozenSet[Cell]:
+    """
+    Celdas cuyo centro cae dentro del rectángulo del lago (en píxeles, como
+    en LakeRenderer). Sin centerX ni centerY el frontend ubica el lago al
+    azar, así que no se marca agua.
+    """
+    if not lake or (lake.get("centerX") is None and lake.get("centerY") is None):
+        return frozenset()
+    center_x = lake.get("centerX", 0)
+    center_y = lake.get("centerY", 0)
+    half_width = lake.get("width", 200) / 2
+    half_height = lake.get("height", 100) / 2
+    first_x, first_y = pixel_to_grid(center_x - half_width, center_y - half_height)
+    last_x, last_y = pixel_to_grid(center_x + half_width, center_y + half_height)
+    half = GRID_CELL_SIZE / 2
+    return frozenset(
+        (x, y)
+        for x in range(first_x, last_x + 1)
+        for y in range(first_y, last_y + 1)
+        if abs(x * GRID_CELL_SIZE + half - center_x) < half_width
+        and abs(GRID_HORIZON_Y + y * GRID_CELL_SIZE + half - center_y) < half_height
+    )
+
+
+class GridIndex:
+    """
+    Banderas de las celdas de un nivel en un bytearray de `width * height`
+    (fila por fila desde `origin`). Las celdas fuera del rectángulo no tienen
+    banderas. Los píxeles del personaje por columna y por fila quedan
+    precalculados.
+    """
+
+    __slots__ = ("origin_x", "origin_y", "width", "height", "cells", "maize", "_maize_bits",
+                 "column_x", "row_y")
+
+    def __init__(self, start: Cell, goal: Optional[Cell], maize: Iterable[Cell],
+                 path: Iterable[Cell], water: Iterable[Cell] = ()):
+        maize = sorted(maize)
+        path = list(path)
+        water = list(water)
+        cells = [start, *maize, *path, *water]
+        if goal is not None:
+            cells.append(goal)
+        self.origin_x = min(x for x, _ in cells)
+        self.origin_y = min(y for _, y in cells)
+        self.width = max(x for x, _ in cells) - self.origin_x + 1
+        self.height = max(y for _, y in cells) - self.origin_y + 1
+        self.cells = bytearray(self.width * self.height)
+        # Número de cada maíz (su bit en las máscaras), por celda
+        self.maize: Tuple[Cell, ...] = tuple(maize)
+        self._maize_bits = array("I", bytes(4 * self.width * self.height))
+
+        for flag, flagged in ((PATH, path), (WATER, water), (START, [start])):
+            for x, y in flagged:
+                self.cells[self._offset(x, y)] |= flag
+        if goal is not None:
+            self.cells[self._offset(*goal)] |= GOAL
+        for number, (x, y) in enumerate(maize):
+            offset = self._offset(x, y)
+            self.cells[offset] |= MAIZE
+            self._maize_bits[offset] = number + 1
+
+        self.column_x = tuple(grid_to_pixel_for_player(x, 0)[0] for x in range(self.origin_x, self.origin_x + self.width))
+        self.row_y = tuple(grid_to_pixel_for_player(0, y)[1] for y in range(self.origin_y, self.origin_y + self.height))
+
+    def _offset(self, x: int, y: int) -> int:
+        """Posición de la celda en `cells`, o -1 si está fuera del rectángulo"""
+        column = x - self.origin_x
+        row = y - self.origin_y
+        if 0 <= column < self.width and 0 <= row < self.height:
+            return row * self.width + column
+        return -1
+
+    def flags(self, x: int, y: int) -> int:
+        offset = self._offset(x, y)
+        return self.cells[offset] if offset >= 0 else 0
+
+    def is_path(self, x: int, y: int) -> bool:
+        return bool(self.flags(x, y) & PATH)
+
+    def is_water(self, x: int, y: int) -> bool:
+        return bool(self.flags(x, y) & WATER)
+
+    def maize_bit(self, x: int, y: int) -> int:
+        """Bit del maíz de la celda en las máscaras de maíz recogido (0 si no hay)"""
+        offset = self._offset(x, y)
+        if offset < 0:
+            return 0
+        number = self._maize_bits[offset]
+        return 1 << (number - 1) if number else 0
+
+    @property
+    def all_maize(self) -> int:
+        """Máscara con todo el maíz del nivel"""
+        return (1 << len(self.maize)) - 1
+
+    def maize_cells(self, mask: int) -> FrozenSet[Cell]:
+        """Celdas del maíz de una máscara"""
+        return frozenset(cell for number, cell in enumerate(self.maize) if mask >> number & 1)
+
+    def to_pixel(self, x: int, y: int) -> Tuple[float, float]:
+        """Posición del personaje en la celda, precalculada dentro del rectángulo"""
+        column = x - self.origin_x
+        row = y - self.origin_y
+        if 0 <= column < self.width and 0 <= row < self.height:
+            return self.column_x[column], self.row_y[row]
+        return grid_to_pixel_for_player(x, y)
+
+    @staticmethod
+    def to_cell(x: float, y: float) -> Cell:
+        """Celda que contiene un punto en píxeles"""
+        return pixel_to_grid(x, y)
+
+    def flagged(self, flag: int) -> List[Cell]:
+        """Celdas que tienen una bandera, fila por fila"""
+        return [
+            (self.origin_x + offset % self.width, self.origin_y + offset // self.width)
+            for offset, flags in enumerate(self.cells) if flags & flag
+        ]
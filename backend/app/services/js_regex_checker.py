@@ -0,0 +1,420 @@
+"""
+Verificador de expresiones regulares literales de JavaScript
+
+Revisa las flags y la estructura del patrón (grupos, cuantificadores,
+clases de caracteres, escapes y referencias) con los mismos mensajes que
+V8, sin compilar la expresión. Sin la flag `u` aplica las reglas laxas del
+anexo B, como los navegadores; con la flag `v` las clases de conjuntos solo
+se revisan hasta su cierre.
+"""
+import re
+from typing import List, Optional, Set, Tuple
+
+FLAGS = "dgimsuyv"
+
+# Valores de \p{…} que acepta V8 (Node.js 20)
+_SCRIPTS = frozenset("""
+    Adlam Adlm Aghb Ahom Anatolian_Hieroglyphs Arab Arabic Armenian Armi Armn Avestan Avst
+    Bali Balinese Bamu Bamum Bass Bassa_Vah Batak Batk Beng Bengali Bhaiksuki Bhks Bopo
+    Bopomofo Brah Brahmi Brai Braille Bugi Buginese Buhd Buhid Cakm Canadian_Aboriginal Cans
+    Cari Carian Caucasian_Albanian Chakma Cham Cher Cherokee Chorasmian Chrs Common Copt
+    Coptic Cpmn Cprt Cuneiform Cypriot Cypro_Minoan Cyrillic Cyrl Deseret Deva Devanagari
+    Diak Dives_Akuru Dogr Dogra Dsrt Dupl Duployan Egyp Egyptian_Hieroglyphs Elba Elbasan
+    Elym Elymaic Ethi Ethiopic Gara Garay Geor Georgian Glag Glagolitic Gong Gonm Goth
+    Gothic Gran Grantha Greek Grek Gujarati Gujr Gukh Gunjala_Gondi Gurmukhi Guru
+    Gurung_Khema Han Hang Hangul Hani Hanifi_Rohingya Hano Hanunoo Hatr Hatran Hebr Hebrew
+    Hira Hiragana Hluw Hmng Hmnp Hung Imperial_Aramaic Inherited Inscriptional_Pahlavi
+    Inscriptional_Parthian Ital Java Javanese Kaithi Kali Kana Kannada Katakana Kawi
+    Kayah_Li Khar Kharoshthi Khitan_Small_Script Khmer Khmr Khoj Khojki Khudawadi Kirat_Rai
+    Kits Knda Krai Kthi Lana Lao Laoo Latin Latn Lepc Lepcha Limb Limbu Lina Linb Linear_A
+    Linear_B Lisu Lyci Lycian Lydi Lydian Mahajani Mahj Maka Makasar Malayalam Mand Mandaic
+    Mani Manichaean Marc Marchen Masaram_Gondi Medefaidrin Medf Meetei_Mayek Mend
+    Mende_Kikakui Merc Mero Meroitic_Cursive Meroitic_Hieroglyphs Miao Mlym Modi Mong
+    Mongolian Mro Mroo Mtei Mult Multani Myanmar Mymr Nabataean Nag_Mundari Nagm Nand
+    Nandinagari Narb Nbat New_Tai_Lue Newa Nko Nkoo Nshu Nushu Nyiakeng_Puachue_Hmong Ogam
+    Ogham Ol_Chiki Ol_Onal Olck Old_Hungarian Old_Italic Old_North_Arabian Old_Permic
+    Old_Persian Old_Sogdian Old_South_Arabian Old_Turkic Old_Uyghur Onao Oriya Orkh Orya
+    Osage Osge Osma Osmanya Ougr Pahawh_Hmong Palm Palmyrene Pau_Cin_Hau Pauc Perm Phag
+    Phags_Pa Phli Phlp Phnx Phoenician Plrd Prti Psalter_Pahlavi Qaac Qaai Rejang Rjng Rohg
+    Runic Runr Samaritan Samr Sarb Saur Saurashtra Sgnw Sharada Shavian Shaw Shrd Sidd
+    Siddham SignWriting Sind Sinh Sinhala Sogd Sogdian Sogo Sora Sora_Sompeng Soyo Soyombo
+    Sund Sundanese Sunu Sunuwar Sylo Syloti_Nagri Syrc Syriac Tagalog Tagb Tagbanwa Tai_Le
+    Tai_Tham Tai_Viet Takr Takri Tale Talu Tamil Taml Tang Tangsa Tangut Tavt Telu Telugu
+    Tfng Tglg Thaa Thaana Thai Tibetan Tibt Tifinagh Tirh Tirhuta Tnsa Todhri Todr Toto
+    Tulu_Tigalari Tutg Ugar Ugaritic Unknown Vai Vaii Vith Vithkuqi Wancho Wara Warang_Citi
+    Wcho Xpeo Xsux Yezi Yezidi Yi Yiii Zanabazar_Square Zanb Zinh Zyyy Zzzz
+""".split())
+_CATEGORIES = frozenset("""
+    C Cased_Letter Cc Cf Close_Punctuation Cn Co Combining_Mark Connector_Punctuation
+    Control Cs Currency_Symbol Dash_Punctuation Decimal_Number Enclosing_Mark
+    Final_Punctuation Format Initial_Punctuation L LC Letter Letter_Number Line_Separator Ll
+    Lm Lo Lowercase_Letter Lt Lu M Mark Math_Symbol Mc Me Mn Modifier_Letter Modifier_Symbol
+    N Nd Nl No Nonspacing_Mark Number Open_Punctuation Other Other_Letter Other_Number
+    Other_Punctuation Other_Symbol P Paragraph_Separator Pc Pd Pe Pf Pi Po Private_Use Ps
+    Punctuation S Sc Separator Sk Sm So Space_Separator Spacing_Mark Surrogate Symbol
+    Titlecase_Letter Unassigned Uppercase_Letter Z Zl Zp Zs cntrl digit punct
+""".split())
+_BINARY_PROPERTIES = frozenset("""
+    AHex ASCII ASCII_Hex_Digit Alpha Alphabetic Any Assigned Bidi_C Bidi_Control Bidi_M
+    Bidi_Mirrored CI CWCF CWCM CWKCF CWL CWT CWU Case_Ignorable Cased
+    Changes_When_Casefolded Changes_When_Casemapped Changes_When_Lowercased
+    Changes_When_NFKC_Casefolded Changes_When_Titlecased Changes_When_Uppercased DI Dash
+    Default_Ignorable_Code_Point Dep Deprecated Dia Diacritic EBase EComp EMod EPres Emoji
+    Emoji_Component Emoji_Modifier Emoji_Modifier_Base Emoji_Presentation Ext ExtPict
+    Extended_Pictographic Extender Gr_Base Gr_Ext Grapheme_Base Grapheme_Extend Hex
+    Hex_Digit IDC IDS IDSB IDST IDS_Binary_Operator IDS_Trinary_Operator ID_Continue
+    ID_Start Ideo Ideographic Join_C Join_Control LOE Logical_Order_Exception Lower
+    Lowercase Math NChar Noncharacter_Code_Point Pat_Syn Pat_WS Pattern_Syntax
+    Pattern_White_Space QMark Quotation_Mark RI Radical Regional_Indicator SD STerm
+    Sentence_Terminal Soft_Dotted Term Terminal_Punctuation UIdeo Unified_Ideograph Upper
+    Uppercase VS Variation_Selector WSpace White_Space XIDC XIDS XID_Continue XID_Start
+    space
+""".split())
+# Propiedades de cadenas: solo con la flag v
+_STRING_PROPERTIES = frozenset("""
+    Basic_Emoji Emoji_Keycap_Sequence RGI_Emoji RGI_Emoji_Flag_Sequence
+    RGI_Emoji_Modifier_Sequence RGI_Emoji_Tag_Sequence RGI_Emoji_ZWJ_Sequence
+""".split())
+
+_QUANTIFIER = re.compile(r"\{(\d+)(,(\d*))?\}")
+_GROUP_NAME = re.compile(r"(?:[^\W\d]|\$)[\w$]*")
+_PROPERTY = re.compile(r"\{([A-Za-z_]+)(?:=([A-Za-z0-9_]+))?\}")
+_HEX2 = re.compile(r"[0-9a-fA-F]{2}")
+_UNICODE = re.compile(r"u(?:([0-9a-fA-F]{4})|\{([0-9a-fA-F]+)\})")
+_DIGITS = re.compile(r"\d+")
+_OCTAL = re.compile(r"[0-3][0-7]{0,2}|[4-7][0-7]?")
+
+_SYNTAX_CHARACTERS = set("^$\\.*+?()[]{}|/")
+# Puntuación que se puede escapar dentro de una clase con la flag v
+_CLASS_SET_PUNCTUATORS = set("&-!#%,:;<=>@`~")
+_CONTROL_ESCAPES = {"f": 12, "n": 10, "r": 13, "t": 9, "v": 11}
+_CLASS_ESCAPES = set("dDsSwW")
+
+
+class _RegexError(Exception):
+    """Error en el patrón, con el mensaje de V8"""
+
+
+def check_regex(pattern: str, flags: str) -> Optional[str]:
+    """
+    Verifica una expresión regular literal /pattern/flags.
+
+    Returns:
+        None si es válida, o el mensaje de SyntaxError de V8
+    """
+    if len(set(flags)) != len(flags) or any(flag not in FLAGS for flag in flags) or {"u", "v"} <= set(flags):
+        return "Invalid regular expression flags"
+    try:
+        _Pattern(pattern, flags).parse()
+    except _RegexError as e:
+        return f"Invalid regular expression: /{pattern}/{flags}: {e}"
+    return None
+
+
+class _Pattern:
+    """Parser recursivo descendente de un patrón; solo verifica la gramática"""
+
+    def __init__(self, pattern: str, flags: str):
+        self.pattern = pattern
+        self.length = len(pattern)
+        self.i = 0
+        self.unicode = "u" in flags or "v" in flags
+        self.sets = "v" in flags
+        self.groups, self.names = self._scan_groups()
+        self.declared: Set[str] = set()
+
+    def _scan_groups(self) -> Tuple[int, List[str]]:
+        """Cantidad de grupos de captura y sus nombres, para validar referencias"""
+        pattern = self.pattern
+        count = 0
+        names: List[str] = []
+        in_class = False
+        i = 0
+        while i < self.length:
+            ch = pattern[i]
+            if ch == "\\":
+                i += 2
+                continue
+            if in_class:
+                in_class = ch != "]"
+            elif ch == "[":
+                in_class = True
+            elif ch == "(":
+                if not pattern.startswith("?", i + 1):
+                    count += 1
+                elif pattern.startswith("?<", i + 1) and not pattern.startswith(("?<=", "?<!"), i + 1):
+                    count += 1
+                    m = _GROUP_NAME.match(pattern, i + 3)
+                    if m:
+                        names.append(m.group())
+            i += 1
+        return count, names
+
+    def peek(self) -> str:
+        return self.pattern[self.i:self.i + 1]
+
+    def parse(self) -> None:
+        self.disjunction()
+        if self.i < self.length:
+            # disjunction() solo se detiene antes del final en un ")" sin abrir
+            raise _RegexError("Unmatched ')'")
+
+    def disjunction(self) -> None:
+        self.alternative()
+        while self.peek() == "|":
+            self.i += 1
+            self.alternative()
+
+    def alternative(self) -> None:
+        while self.i < self.length and self.pattern[self.i] not in "|)":
+            self.term()
+
+    def term(self) -> None:
+        pattern, i = self.pattern, self.i
+        ch = pattern[i]
+        kind = "atom"
+        if ch in "^$":
+            self.i += 1
+            kind = "assertion"
+        elif ch == "\\" and pattern[i + 1:i + 2] in ("b", "B"):
+            self.i += 2
+            kind = "assertion"
+        elif ch == "(":
+            kind = self.group()
+        elif ch in "*+?":
+            raise _RegexError("Nothing to repeat")
+        elif ch == "{":
+            if _QUANTIFIER.match(pattern, i):
+                raise _RegexError("Nothing to repeat")
+            if self.unicode:
+                raise _RegexError("Lone quantifier brackets")
+            self.i += 1
+        elif ch in "}]":
+            if self.unicode:
+                raise _RegexError("Lone quantifier brackets")
+            self.i += 1
+        elif ch == "[":
+            self.character_class()
+        elif ch == "\\":
+            self.atom_escape()
+        else:
+            self.i += 1
+        self.quantifier(kind)
+
+    def quantifier(self, kind: str) -> None:
+        pattern, i = self.pattern, self.i
+        ch = self.peek()
+        if ch and ch in "*+?":
+            end = i + 1
+        elif ch == "{":
+            m = _QUANTIFIER.match(pattern, i)
+            if m is None:
+                if self.unicode:
+                    raise _RegexError("Incomplete quantifier")
+                return
+            if m.group(3) and int(m.group(1)) > int(m.group(3)):
+                raise _RegexError("numbers out of order in {} quantifier")
+            end = m.end()
+        else:
+            return
+        if kind == "assertion":
+            raise _RegexError("Nothing to repeat")
+        if kind == "lookbehind" or (kind == "lookahead" and self.unicode):
+            raise _RegexError("Invalid quantifier")
+        self.i = end + (pattern[end:end + 1] == "?")
+
+    def group(self) -> str:
+        """Grupo entre paréntesis; retorna su tipo para validar el cuantificador"""
+        pattern, i = self.pattern, self.i
+        kind = "atom"
+        if pattern.startswith("(?", i):
+            if pattern.startswith(("(?:", "(?=", "(?!"), i):
+                kind = "atom" if pattern[i + 2] == ":" else "lookahead"
+                self.i = i + 3
+            elif pattern.startswith(("(?<=", "(?<!"), i):
+                kind = "lookbehind"
+                self.i = i + 4
+            elif pattern.startswith("(?<", i):
+                self.i = i + 3
+                name = self.group_name()
+                if name in self.declared:
+                    raise _RegexError("Duplicate capture group name")
+                self.declared.add(name)
+            else:
+                raise _RegexError("Invalid group")
+        else:
+            self.i = i + 1
+        self.disjunction()
+        if self.i >= self.length:
+            raise _RegexError("Unterminated group")
+        self.i += 1
+        return kind
+
+    def group_name(self) -> str:
+        """Nombre de grupo hasta el ">" de cierre"""
+        m = _GROUP_NAME.match(self.pattern, self.i)
+        if m is None or not self.pattern.startswith(">", m.end()):
+            raise _RegexError("Invalid capture group name")
+        self.i = m.end() + 1
+        return m.group()
+
+    def atom_escape(self) -> None:
+        pattern, i = self.pattern, self.i
+        ch = pattern[i + 1:i + 2]
+        if ch and ch in "123456789":
+            # Referencia a un grupo; sin la flag u, un número mayor es un escape octal
+            m = _DIGITS.match(pattern, i + 1)
+            if self.unicode and int(m.group()) > self.groups:
+                raise _RegexError("Invalid escape")
+            self.i = m.end()
+            return
+        if ch == "0" and self.unicode and pattern[i + 2:i + 3].isdigit():
+            raise _RegexError("Invalid decimal escape")
+        if ch == "k" and (self.unicode or self.names):
+            if not pattern.startswith("<", i + 2):
+                raise _RegexError("Invalid named reference")
+            self.i = i + 3
+            if self.group_name() not in self.names:
+                raise _RegexError("Invalid named capture referenced")
+            return
+        self.escape(in_class=False)
+
+    def escape(self, in_class: bool) -> Optional[int]:
+        """
+        Escape que empieza en la barra actual; retorna el código del carácter,
+        o None si representa una clase (\\d, \\p{…})
+        """
+        pattern, i = self.pattern, self.i
+        if i + 1 >= self.length:
+            raise _RegexError("\\ at end of pattern")
+        ch = pattern[i + 1]
+        self.i = i + 2
+        if ch in _CLASS_ESCAPES:
+            return None
+        if ch in "pP" and self.unicode:
+            self.property()
+            return None
+        if ch in _CONTROL_ESCAPES:
+            return _CONTROL_ESCAPES[ch]
+        if ch == "c":
+            letter = pattern[i + 2:i + 3]
+            if (letter.isascii() and letter.isalpha()) or (
+                in_class and not self.unicode and (letter.isdigit() or letter == "_")
+            ):
+                self.i += 1
+                return ord(letter) % 32
+            if self.unicode:
+                raise _RegexError("Invalid Unicode escape")
+            # Sin la flag u, "\\c" es una barra literal seguida de "c"
+            self.i = i + 1
+            return ord("\\")
+        if ch == "x":
+            if _HEX2.match(pattern, i + 2):
+                self.i = i + 4
+                return int(pattern[i + 2:i + 4], 16)
+            if self.unicode:
+                raise _RegexError("Invalid escape")
+            return ord(ch)
+        if ch == "u":
+            m = _UNICODE.match(pattern, i + 1)
+            if m and (m.group(1) or self.unicode):
+                value = int(m.group(1) or m.group(2), 16)
+                if value > 0x10FFFF:
+                    raise _RegexError("Invalid Unicode escape")
+                self.i = m.end()
+                return value
+            if self.unicode:
+                raise _RegexError("Invalid Unicode escape")
+            return ord(ch)
+        if ch.isdigit():
+            # Solo llegan aquí \\0 y los dígitos dentro de una clase
+            if self.unicode:
+                if ch == "0" and not pattern[i + 2:i + 3].isdigit():
+                    return 0
+                raise _RegexError("Invalid class escape")
+            m = _OCTAL.match(pattern, i + 1)
+            if m is None:
+                return ord(ch)
+            self.i = m.end()
+            return int(m.group(), 8)
+        if in_class and ch == "b":
+            return 8
+        if self.unicode and ch not in _SYNTAX_CHARACTERS and not (
+            in_class and (ch == "-" or (self.sets and ch in _CLASS_SET_PUNCTUATORS))
+        ):
+            raise _RegexError("Invalid escape")
+        return ord(ch)
+
+    def property(self) -> None:
+        """Nombre de propiedad Unicode de \\p{…} o \\P{…}"""
+        m = _PROPERTY.match(self.pattern, self.i)
+        if m is None:
+            raise _RegexError("Invalid property name")
+        name, value = m.groups()
+        if value is None:
+            valid = name in _CATEGORIES or name in _BINARY_PROPERTIES or (
+                self.sets and name in _STRING_PROPERTIES
+            )
+        elif name in ("General_Category", "gc"):
+            valid = value in _CATEGORIES
+        elif name in ("Script", "sc", "Script_Extensions", "scx"):
+            valid = value in _SCRIPTS
+        else:
+            valid = False
+        if not valid:
+            raise _RegexError("Invalid property name")
+        self.i = m.end()
+
+    def character_class(self) -> None:
+        pattern = self.pattern
+        self.i += 1
+        if self.sets:
+            self.class_set()
+            return
+        if self.peek() == "^":
+            self.i += 1
+        while self.i < self.length:
+            if pattern[self.i] == "]":
+                self.i += 1
+                return
+            start = self.class_atom()
+            if self.peek() == "-" and self.i + 1 < self.length and pattern[self.i + 1] != "]":
+                self.i += 1
+                end = self.class_atom()
+                if start is None or end is None:
+                    if self.unicode:
+                        raise _RegexError("Invalid character class")
+                elif start > end:
+                    raise _RegexError("Range out of order in character class")
+        raise _RegexError("Unterminated character class")
+
+    def class_atom(self) -> Optional[int]:
+        if self.pattern[self.i] == "\\":
+            return self.escape(in_class=True)
+        self.i += 1
+        return ord(self.pattern[self.i - 1])
+
+    def class_set(self) -> None:
+        """Clase con la flag v: admite clases anidadas, \\q{…} y operadores"""
+        pattern = self.pattern
+        depth = 1
+        while self.i < self.length:
+            ch = pattern[self.i]
+            if ch == "\\":
+                if pattern.startswith("q{", self.i + 1):
+                    end = pattern.find("}", self.i)
+                    if end == -1:
+                        raise _RegexError("Invalid escape")
+                    self.i = end + 1
+                else:
+                    self.escape(in_class=True)
+                continue
+            if ch == "[":
+                depth += 1
+            elif ch == "]":
+                depth -= 1
+                if depth == 0:
+                    self.i += 1
+                    return
+            self.i += 1
+        raise _RegexError("Unterminated character class")
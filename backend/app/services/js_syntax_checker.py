@@ -0,0 +1,1436 @@
+"""
+Verificador de sintaxis JavaScript en Python (sin procesos externos)
+
+Cubre el subconjunto de JavaScript que usan los niveles: declaraciones
+var/let/const, funciones y arrow functions, llamadas, expresiones
+aritméticas y lógicas, bloques, if/else, bucles for/while/do, switch,
+try/catch, arrays, objetos, template strings y expresiones regulares
+literales (ver js_regex_checker). Las construcciones fuera de
+ese subconjunto (clases, módulos, generadores) se reportan como no
+soportadas; para validación estricta puede usarse el motor Node.js.
+"""
+import re
+from typing import Dict, List, Optional, Set, Tuple
+from app.services.js_regex_checker import check_regex
+
+SOURCE_NAME = "tu código"
+
+# El parser es recursivo (hasta unos 9 marcos por paréntesis, corchete o
+# llave anidados): más allá de este anidamiento el programa se rechaza antes
+# de parsear, con el mismo error que V8 cuando agota la pila. Las cadenas
+# sin corchetes (`!!!…x`, `a = b = …`) las corta el límite de recursión de
+# Python, que no se modifica.
+MAX_NESTING_DEPTH = 64
+STACK_OVERFLOW = "Maximum call stack size exceeded"
+
+
+class JSSyntaxError(Exception):
+    """Error de sintaxis con su ubicación (línea y columna desde 1)"""
+
+    def __init__(self, message: str, line: int, column: int):
+        super().__init__(message)
+        self.message = message
+        self.line = line
+        self.column = column
+
+    def format(self, code: str) -> str:
+        """Formatea el error al estilo de Node.js, señalando la columna"""
+        lines = code.split("\n")
+        source_line = lines[self.line - 1] if 0 < self.line <= len(lines) else ""
+        caret = " " * (self.column - 1) + "^"
+        return (
+            f"{SOURCE_NAME}:{self.line}:{self.column}\n{source_line}\n{caret}\n\n"
+            f"SyntaxError: {self.message}"
+        )
+
+
+class Token:
+    """Token léxico"""
+
+    __slots__ = ("type", "value", "pos", "newline_before", "parts", "escape_error")
+
+    def __init__(self, type_: str, value: str, pos: int, newline_before: bool, parts=None,
+                 escape_error: Optional["JSSyntaxError"] = None):
+        self.type = type_  # name, num, str, template, regex, punct, eof
+        self.value = value
+        self.pos = pos
+        self.newline_before = newline_before
+        self.parts: Optional[List[List["Token"]]] = parts  # expresiones de un template
+        # Escape inválido de un template: solo es error si el template no tiene etiqueta
+        self.escape_error = escape_error
+
+    def describe(self) -> str:
+        if self.type == "eof":
+            return "end of input"
+        if self.type == "name":
+            return f"identifier '{self.value}'" if self.value not in KEYWORDS else f"token '{self.value}'"
+        if self.type == "num":
+            return "number"
+        if self.type == "str":
+            return "string"
+        if self.type == "template":
+            return "template string"
+        return f"token '{self.value}'"
+
+
+KEYWORDS: Set[str] = {
+    "break", "case", "catch", "class", "const", "continue", "debugger", "default",
+    "delete", "do", "else", "enum", "export", "extends", "false", "finally", "for",
+    "function", "if", "import", "in", "instanceof", "new", "null", "return", "super",
+    "switch", "this", "throw", "true", "try", "typeof", "var", "void", "while", "with",
+}
+UNSUPPORTED: Set[str] = {"class", "export", "import", "with", "super", "enum"}
+
+PUNCTUATORS = sorted([
+    ">>>=", "...", "===", "!==", "**=", "<<=", ">>=", ">>>", "&&=", "||=", "??=",
+    "=>", "==", "!=", "<=", ">=", "&&", "||", "??", "?.", "++", "--", "+=", "-=",
+    "*=", "/=", "%=", "&=", "|=", "^=", "**", "<<", ">>",
+    "{", "}", "(", ")", "[", "]", ";", ",", "<", ">", "+", "-", "*", "/", "%",
+    "&", "|", "^", "!", "~", "?", ":", "=", ".",
+], key=len, reverse=True)
+
+_SPACE = re.compile("[ \t\f\v\u00a0\ufeff]+")
+_IDENT = re.compile(
+    r"(?:[^\W\d]|\$|\\u(?:[0-9a-fA-F]{4}|\{[0-9a-fA-F]+\}))"
+    r"(?:[\w$]|\\u(?:[0-9a-fA-F]{4}|\{[0-9a-fA-F]+\}))*"
+)
+_PUNCT = re.compile("|".join(re.escape(p) for p in PUNCTUATORS))
+_REGEX_FLAGS = re.compile(r"[\w$]*")
+_UNICODE_ESCAPE = re.compile(r"u(?:[0-9a-fA-F]{4}|\{([0-9a-fA-F]+)\})")
+_HEX_ESCAPE = re.compile(r"x[0-9a-fA-F]{2}")
+
+DECIMAL_DIGITS = frozenset("0123456789")
+# Dígitos de los literales 0x, 0b y 0o
+_RADIX_DIGITS = {"x": frozenset("0123456789abcdefABCDEF"), "b": frozenset("01"), "o": frozenset("01234567")}
+
+# Tokens después de los cuales una "/" inicia una expresión regular
+_REGEX_AFTER_NAMES = {
+    "return", "typeof", "instanceof", "in", "of", "new", "delete", "void",
+    "throw", "case", "do", "else", "await", "yield",
+}
+# Sentencias cuyo "(...)" es una condición: después del ")" empieza una sentencia
+_CONDITION_NAMES = {"if", "while", "for", "with"}
+# Tokens después de los cuales "{" abre un objeto y no un bloque
+_OBJECT_AFTER_NAMES = {
+    "return", "typeof", "instanceof", "in", "of", "new", "delete", "void",
+    "throw", "case", "await", "yield",
+}
+
+ASSIGNMENT_OPERATORS = {
+    "=", "+=", "-=", "*=", "/=", "%=", "**=", "<<=", ">>=", ">>>=",
+    "&=", "|=", "^=", "&&=", "||=", "??=",
+}
+BINARY_PRECEDENCE: Dict[str, int] = {
+    "??": 1, "||": 2, "&&": 3, "|": 4, "^": 5, "&": 6,
+    "==": 7, "!=": 7, "===": 7, "!==": 7,
+    "<": 8, ">": 8, "<=": 8, ">=": 8, "instanceof": 8, "in": 8,
+    "<<": 9, ">>": 9, ">>>": 9,
+    "+": 10, "-": 10,
+    "*": 11, "/": 11, "%": 11,
+    "**": 12,
+}
+UNARY_OPERATORS = {"!", "~", "+", "-", "typeof", "void", "delete"}
+
+
+class _Lexer:
+    """Convierte el código en tokens, incluyendo templates anidados"""
+
+    def __init__(self, code: str):
+        self.code = code
+        self.length = len(code)
+
+    def error(self, message: str, pos: int) -> JSSyntaxError:
+        return JSSyntaxError(message, *location(self.code, pos))
+
+    def tokenize(self, pos: int = 0, in_template: bool = False) -> Tuple[List[Token], int]:
+        code = self.code
+        n = self.length
+        tokens: List[Token] = []
+        newline = False
+        depth = 0
+        # Por cada (, [ o { abierto: si después de su cierre puede empezar una regex
+        brackets: List[bool] = []
+        regex_after_close = False
+        while True:
+            m = _SPACE.match(code, pos)
+            if m:
+                pos = m.end()
+            if pos >= n:
+                if in_template:
+                    raise self.error("Missing } in template expression", pos)
+                tokens.append(Token("eof", "", pos, True))
+                return tokens, pos
+            ch = code[pos]
+
+            if ch in "\n\r\u2028\u2029":
+                newline = True
+                pos += 1
+                continue
+            if code.startswith("//", pos):
+                end = code.find("\n", pos)
+                pos = n if end == -1 else end
+                continue
+            if code.startswith("/*", pos):
+                end = code.find("*/", pos + 2)
+                if end == -1:
+                    raise self.error("Invalid or unexpected token", pos)
+                if "\n" in code[pos:end]:
+                    newline = True
+                pos = end + 2
+                continue
+
+            start = pos
+            if ch == "_" or ch == "$" or ch == "\\" or ch.isalpha():
+                m = _IDENT.match(code, pos)
+                if m is None:
+                    raise self.error("Invalid Unicode escape sequence", pos)
+                tokens.append(Token("name", m.group(), start, newline))
+                pos = m.end()
+            elif ch in DECIMAL_DIGITS or (ch == "." and code[pos + 1:pos + 2] in DECIMAL_DIGITS):
+                pos = self._scan_number(pos)
+                if pos < n and (code[pos].isalnum() or code[pos] in "_$"):
+                    raise self.error("Invalid or unexpected token", pos)
+                tokens.append(Token("num", code[start:pos], start, newline))
+            elif ch == '"' or ch == "'":
+                pos = self._scan_string(pos, ch)
+                tokens.append(Token("str", code[start:pos], start, newline))
+            elif ch == "`":
+                parts, pos, escape_error = self._scan_template(pos)
+                tokens.append(Token("template", code[start:pos], start, newline, parts, escape_error))
+            elif ch == "/" and self._regex_allowed(tokens, regex_after_close):
+                pos = self._scan_regex(pos)
+                tokens.append(Token("regex", code[start:pos], start, newline))
+            else:
+                if in_template:
+                    if ch == "{":
+                        depth += 1
+                    elif ch == "}":
+                        if depth == 0:
+                            tokens.append(Token("eof", "", pos, newline))
+                            return tokens, pos + 1
+                        depth -= 1
+                m = _PUNCT.match(code, pos)
+                if not m:
+                    raise self.error("Invalid or unexpected token", pos)
+                value = m.group()
+                if value == "?." and code[pos + 2:pos + 3].isdigit():
+                    # a?.5:1 es un condicional con el número .5
+                    value = "?"
+                if value == "(":
+                    brackets.append(bool(tokens) and tokens[-1].type == "name"
+                                    and tokens[-1].value in _CONDITION_NAMES)
+                elif value == "{":
+                    brackets.append(self._opens_block(tokens))
+                elif value == "[":
+                    brackets.append(False)
+                elif value in (")", "]", "}"):
+                    regex_after_close = brackets.pop() if brackets else False
+                tokens.append(Token("punct", value, start, newline))
+                pos = start + len(value)
+            newline = False
+
+    @staticmethod
+    def _opens_block(tokens: List[Token]) -> bool:
+        """Indica si un "{" en esta posición abre un bloque (y no un objeto)"""
+        if not tokens:
+            return True
+        prev = tokens[-1]
+        if prev.type == "punct":
+            return prev.value in (";", "{", "}", ")", "=>")
+        if prev.type == "name":
+            return prev.value not in _OBJECT_AFTER_NAMES
+        return True
+
+    @staticmethod
+    def _regex_allowed(tokens: List[Token], regex_after_close: bool) -> bool:
+        """
+        Indica si una "/" inicia una regex: después de un cierre solo si
+        cerraba la condición de if/while/for o un bloque
+        """
+        if not tokens:
+            return True
+        prev = tokens[-1]
+        if prev.type == "punct":
+            if prev.value in (")", "]", "}"):
+                return regex_after_close
+            return prev.value not in ("++", "--")
+        if prev.type == "name":
+            return prev.value in _REGEX_AFTER_NAMES
+        return False
+
+    def _scan_number(self, pos: int) -> int:
+        """Fin del literal numérico que empieza en `pos`, validando los separadores `_`"""
+        code = self.code
+        prefix = code[pos + 1:pos + 2].lower()
+        if code[pos] == "0" and prefix in _RADIX_DIGITS:
+            digits = _RADIX_DIGITS[prefix]
+            if code[pos + 2:pos + 3] not in digits:
+                raise self.error("Invalid or unexpected token", pos + 2)
+            end = self._scan_digits(pos + 2, digits)
+            return end + (code[end:end + 1] == "n")
+        if code[pos] == "0" and prefix in DECIMAL_DIGITS:
+            # Literal heredado con cero inicial: 07 es octal; 08 y 09 son decimales
+            end = pos + 1
+            while code[end:end + 1] in DECIMAL_DIGITS:
+                end += 1
+            if all(digit < "8" for digit in code[pos:end]):
+                return end
+            return self._scan_decimal_tail(end)
+        if prefix == "_" and code[pos] == "0":
+            raise self.error("Numeric separator can not be used after leading 0.", pos + 1)
+        end = pos if code[pos] == "." else self._scan_digits(pos, DECIMAL_DIGITS)
+        integer = code[end:end + 1] not in (".", "e", "E")
+        end = self._scan_decimal_tail(end)
+        return end + (integer and code[end:end + 1] == "n")
+
+    def _scan_decimal_tail(self, pos: int) -> int:
+        """Parte decimal y exponente opcionales desde `pos`"""
+        code = self.code
+        if code[pos:pos + 1] == ".":
+            pos += 1
+            if code[pos:pos + 1] in DECIMAL_DIGITS:
+                pos = self._scan_digits(pos, DECIMAL_DIGITS)
+        if code[pos:pos + 1] in ("e", "E"):
+            pos += 1
+            if code[pos:pos + 1] in ("+", "-"):
+                pos += 1
+            if code[pos:pos + 1] not in DECIMAL_DIGITS:
+                raise self.error("Invalid or unexpected token", pos)
+            pos = self._scan_digits(pos, DECIMAL_DIGITS)
+        return pos
+
+    def _scan_digits(self, pos: int, digits: frozenset) -> int:
+        """Dígitos con separadores `_` (solo uno, y entre dos dígitos)"""
+        code = self.code
+        n = self.length
+        while pos < n:
+            ch = code[pos]
+            if ch == "_":
+                if code[pos + 1:pos + 2] == "_":
+                    raise self.error("Only one underscore is allowed as numeric separator", pos + 1)
+                if code[pos + 1:pos + 2] not in digits:
+                    raise self.error("Numeric separators are not allowed at the end of numeric literals", pos)
+            elif ch not in digits:
+                break
+            pos += 1
+        return pos
+
+    def _escape_error(self, pos: int, template: bool) -> Optional[JSSyntaxError]:
+        """Error del escape que empieza en la barra de `pos`, o None si es válido"""
+        code = self.code
+        ch = code[pos + 1:pos + 2]
+        if ch == "x" and not _HEX_ESCAPE.match(code, pos + 1):
+            return self.error("Invalid hexadecimal escape sequence", pos)
+        if ch == "u":
+            m = _UNICODE_ESCAPE.match(code, pos + 1)
+            if m is None:
+                return self.error("Invalid Unicode escape sequence", pos)
+            if m.group(1) and int(m.group(1), 16) > 0x10FFFF:
+                return self.error("Undefined Unicode code-point", pos)
+        if template:
+            if ch in ("8", "9"):
+                return self.error("\\8 and \\9 are not allowed in template strings.", pos)
+            if ch in DECIMAL_DIGITS and (ch != "0" or code[pos + 2:pos + 3] in DECIMAL_DIGITS):
+                return self.error("Octal escape sequences are not allowed in template strings.", pos)
+        return None
+
+    def _scan_string(self, pos: int, quote: str) -> int:
+        code = self.code
+        n = self.length
+        i = pos + 1
+        while i < n:
+            ch = code[i]
+            if ch == quote:
+                return i + 1
+            if ch == "\\":
+                error = self._escape_error(i, template=False)
+                if error:
+                    raise error
+                i += 2
+                continue
+            if ch == "\n":
+                break
+            i += 1
+        raise self.error("Invalid or unexpected token", pos)
+
+    def _scan_template(self, pos: int) -> Tuple[List[List[Token]], int, Optional[JSSyntaxError]]:
+        code = self.code
+        n = self.length
+        parts: List[List[Token]] = []
+        escape_error = None
+        i = pos + 1
+        while i < n:
+            ch = code[i]
+            if ch == "`":
+                return parts, i + 1, escape_error
+            if ch == "\\":
+                escape_error = escape_error or self._escape_error(i, template=True)
+                i += 2
+            elif ch == "$" and code.startswith("${", i):
+                tokens, i = self.tokenize(i + 2, in_template=True)
+                parts.append(tokens)
+            else:
+                i += 1
+        raise self.error("Unexpected end of input", n)
+
+    def _scan_regex(self, pos: int) -> int:
+        code = self.code
+        n = self.length
+        i = pos + 1
+        in_class = False
+        while i < n:
+            ch = code[i]
+            if ch == "\n":
+                break
+            if ch == "\\":
+                i += 2
+                continue
+            if ch == "[":
+                in_class = True
+            elif ch == "]":
+                in_class = False
+            elif ch == "/" and not in_class:
+                end = _REGEX_FLAGS.match(code, i + 1).end()
+                message = check_regex(code[pos + 1:i], code[i + 1:end])
+                if message:
+                    raise self.error(message, pos)
+                return end
+            i += 1
+        raise self.error("Invalid regular expression: missing /", pos)
+
+
+def tokenize(code: str) -> List[Token]:
+    """
+    Tokens del código, terminados en un token eof. Las expresiones de los
+    templates quedan en `Token.parts`.
+
+    Raises:
+        JSSyntaxError: Si el código no se puede separar en tokens
+    """
+    tokens, _ = _Lexer(code).tokenize()
+    return tokens
+
+
+def location(code: str, pos: int) -> Tuple[int, int]:
+    """Convierte una posición absoluta en (línea, columna) desde 1"""
+    line_start = code.rfind("\n", 0, pos) + 1
+    return code.count("\n", 0, pos) + 1, pos - line_start + 1
+
+
+def _match_brackets(tokens: List[Token], depth: int = 0) -> Tuple[List[int], Dict[int, int]]:
+    """
+    En una sola pasada: el índice del cierre de cada (, [ o { (-1 si no
+    cierra) y el anidamiento de cada template. `depth` es el anidamiento
+    en que empiezan los tokens.
+
+    Raises:
+        JSSyntaxError: Si el anidamiento supera MAX_NESTING_DEPTH
+    """
+    matches = [-1] * len(tokens)
+    templates: Dict[int, int] = {}
+    opened: List[int] = []
+    for i, t in enumerate(tokens):
+        if t.type == "punct":
+            if t.value in ("(", "[", "{"):
+                opened.append(i)
+                if depth + len(opened) > MAX_NESTING_DEPTH:
+                    raise JSSyntaxError(STACK_OVERFLOW, 1, 1)
+            elif t.value in (")", "]", "}") and opened:
+                matches[opened.pop()] = i
+        elif t.type == "template" and t.parts:
+            templates[i] = depth + len(opened) + 1
+            if templates[i] > MAX_NESTING_DEPTH:
+                raise JSSyntaxError(STACK_OVERFLOW, 1, 1)
+    return matches, templates
+
+
+def _is_member_chain(tokens: List[Token]) -> bool:
+    """Indica si los tokens forman solo accesos a miembros y llamadas (a.b[c](d).e)"""
+    depth = 0
+    prev: Optional[Token] = None
+    for i, t in enumerate(tokens):
+        if t.type == "punct" and t.value in ("(", "[", "{"):
+            if depth == 0 and t.value == "{" and i > 0:
+                return False
+            depth += 1
+        elif t.type == "punct" and t.value in (")", "]", "}"):
+            depth -= 1
+        elif depth == 0:
+            if t.type == "name":
+                if i > 0 and prev.value not in (".", "new"):
+                    return False
+            elif t.type == "punct":
+                if t.value != ".":
+                    return False
+            elif i > 0 and t.type != "template":
+                return False
+        prev = t
+    return True
+
+
+class _Scope:
+    """Ámbito léxico para detectar redeclaraciones"""
+
+    __slots__ = ("names", "is_function")
+
+    def __init__(self, is_function: bool):
+        self.names: Dict[str, str] = {}
+        self.is_function = is_function
+
+
+class _Parser:
+    """Parser recursivo descendente que solo verifica la gramática"""
+
+    def __init__(self, code: str, tokens: List[Token], scopes: List[_Scope], in_function: bool = False,
+                 in_async: bool = False, new_target: bool = False, depth: int = 0):
+        self.code = code
+        self.tokens = tokens
+        # Cierres precalculados: buscar el ")" de cada "(" no es cuadrático
+        self.matches, self.template_depths = _match_brackets(tokens, depth)
+        self.index = 0
+        self.tok = tokens[0]
+        self.scopes = scopes
+        self.in_async = in_async
+        self.in_function = in_function
+        self.new_target = new_target  # dentro de una función que no es arrow
+        self.loop_depth = 0
+        self.switch_depth = 0
+        self.labels: List[str] = []
+        # Propiedades abreviadas con "=" ({a = 1}): solo válidas si el objeto
+        # termina siendo un patrón de desestructuración
+        self.cover_initializers: List[Token] = []
+
+    # --- utilidades -------------------------------------------------------
+
+    def error(self, message: str, token: Optional[Token] = None) -> JSSyntaxError:
+        token = token or self.tok
+        return JSSyntaxError(message, *location(self.code, token.pos))
+
+    def unexpected(self, token: Optional[Token] = None) -> JSSyntaxError:
+        token = token or self.tok
+        if token.type == "name" and token.value in UNSUPPORTED:
+            if token.value in ("import", "export"):
+                return self.error(f"Cannot use {token.value} statement outside a module", token)
+            return self.error(f"Sintaxis no soportada: '{token.value}'", token)
+        previous = self.tokens[self.index - 1] if token is self.tok and self.index else None
+        if (previous is not None and previous.type == "name" and previous.value == "await"
+                and not self.in_async and not token.newline_before):
+            # `await x` fuera de una función async: await era un identificador
+            return self.error("await is only valid in async functions and the top level bodies of modules", previous)
+        return self.error(f"Unexpected {token.describe()}", token)
+
+    def advance(self) -> Token:
+        token = self.tok
+        self.index += 1
+        self.tok = self.tokens[self.index] if self.index < len(self.tokens) else self.tokens[-1]
+        return token
+
+    def peek(self, offset: int = 1) -> Token:
+        i = self.index + offset
+        return self.tokens[i] if i < len(self.tokens) else self.tokens[-1]
+
+    def at(self, value: str) -> bool:
+        return self.tok.value == value and self.tok.type in ("punct", "name")
+
+    def eat(self, value: str) -> bool:
+        if self.at(value):
+            self.advance()
+            return True
+        return False
+
+    def expect(self, value: str, message: Optional[str] = None) -> Token:
+        if not self.at(value):
+            if message and self.tok.type != "eof":
+                raise self.error(message)
+            raise self.unexpected()
+        return self.advance()
+
+    def semicolon(self) -> None:
+        """Consume ';' aplicando la inserción automática de punto y coma"""
+        if self.eat(";"):
+            return
+        if self.at("}") or self.tok.type == "eof" or self.tok.newline_before:
+            return
+        raise self.unexpected()
+
+    def binding_identifier(self) -> Token:
+        token = self.tok
+        if token.type != "name":
+            raise self.unexpected()
+        if token.value in KEYWORDS:
+            raise self.unexpected()
+        if token.value == "await" and self.in_async:
+            raise self.unexpected()
+        return self.advance()
+
+    # --- ámbitos ------------------------------------------------------------
+
+    def declare(self, token: Token, kind: str) -> None:
+        """
+        Registra una declaración: "var", "let", "const", "function" o
+        "catch" (parámetro simple de catch, que un var puede redeclarar).
+        """
+        name = token.value
+        if kind == "var":
+            for scope in reversed(self.scopes):
+                existing = scope.names.get(name)
+                if existing in ("let", "const") or (existing == "function" and not scope.is_function):
+                    raise self.error(f"Identifier '{name}' has already been declared", token)
+                if scope.is_function:
+                    scope.names.setdefault(name, "var")
+                    return
+                if existing is None:
+                    # El var atraviesa el bloque: un let o una función posterior
+                    # en el mismo bloque también lo redeclara
+                    scope.names[name] = "var"
+            return
+        if name == "let" and kind in ("let", "const"):
+            raise self.error("let is disallowed as a lexically bound name", token)
+        scope = self.scopes[-1]
+        existing = scope.names.get(name)
+        # En modo no estricto una función puede redeclarar otra función (también
+        # dentro de un bloque) o un var del cuerpo de la función
+        if existing is not None and not (
+            kind == "function" and (existing == "function" or (existing == "var" and scope.is_function))
+        ):
+            raise self.error(f"Identifier '{name}' has already been declared", token)
+        scope.names[name] = kind
+
+    def push_scope(self, is_function: bool = False) -> None:
+        self.scopes.append(_Scope(is_function))
+
+    def pop_scope(self) -> None:
+        self.scopes.pop()
+
+    # --- sentencias -----------------------------------------------------------
+
+    def parse_program(self) -> None:
+        while self.tok.type != "eof":
+            self.statement()
+
+    def statement(self, context: Optional[str] = None) -> None:
+        """
+        Una sentencia. `context` es None en una lista de sentencias, o "if",
+        "label" u "other" (bucles) si es el cuerpo de otra sentencia: ahí no
+        se permiten let ni const, y funciones solo en if y etiquetas.
+        """
+        tok = self.tok
+        if tok.type == "punct":
+            if tok.value == "{":
+                self.push_scope()
+                self.block()
+                self.pop_scope()
+                return
+            if tok.value == ";":
+                self.advance()
+                return
+        elif tok.type == "name":
+            value = tok.value
+            if value == "let" and context is not None and self._let_is_lexical():
+                raise self.error("Lexical declaration cannot appear in a single-statement context")
+            if value == "var" or (context is None and (
+                value == "const" or (value == "let" and self._let_is_declaration())
+            )):
+                self.advance()
+                self.declarations(value)
+                self.semicolon()
+                return
+            is_async = value == "async" and self.peek().value == "function" and not self.peek().newline_before
+            if value == "function" or is_async:
+                if context is not None and is_async:
+                    raise self.error("Async functions can only be declared at the top level or inside a block.")
+                if context == "other":
+                    raise self.error("In non-strict mode code, functions can only be declared at top level, "
+                                     "inside a block, or as the body of an if statement.")
+                self.function(declaration=True)
+                return
+            handler = self._STATEMENTS.get(value)
+            if handler:
+                handler(self)
+                return
+            if value in UNSUPPORTED:
+                raise self.unexpected()
+            if self.peek().value == ":" and value not in KEYWORDS:
+                # Sentencia etiquetada
+                self.advance()
+                self.advance()
+                self.labels.append(value)
+                self.statement("label" if context in (None, "label") else "other")
+                self.labels.pop()
+                return
+        self.expression()
+        self.semicolon()
+
+    def _let_is_declaration(self) -> bool:
+        nxt = self.peek()
+        return nxt.type == "name" or nxt.value in ("[", "{")
+
+    def _let_is_lexical(self) -> bool:
+        """En el cuerpo de otra sentencia: si `let` empieza una declaración (y no es un identificador)"""
+        nxt = self.peek()
+        if nxt.type == "punct" and nxt.value == "[":
+            return True
+        return (not nxt.newline_before and (nxt.type == "name" or nxt.value == "{")
+                and nxt.value not in ("in", "instanceof"))
+
+    def block(self) -> None:
+        self.expect("{")
+        while not self.at("}"):
+            if self.tok.type == "eof":
+                raise self.unexpected()
+            self.statement()
+        self.advance()
+
+    def declarations(self, kind: str, in_for: bool = False) -> List[Tuple[bool, bool]]:
+        """Declaraciones separadas por comas; por cada una, si es un identificador simple y si tiene inicializador"""
+        bindings = []
+        while True:
+            target = self.binding_target(kind)
+            initialized = self.eat("=")
+            if initialized:
+                self.assignment(no_in=in_for)
+            elif not in_for and (kind == "const" or target is None):
+                raise self.error("Missing initializer in const declaration"
+                                 if kind == "const" else "Missing initializer in destructuring declaration")
+            bindings.append((target is not None, initialized))
+            if not self.eat(","):
+                return bindings
+
+    def binding_target(self, kind: str, names: Optional[List[Token]] = None) -> Optional[Token]:
+        """
+        Identificador o patrón de desestructuración; None si es un patrón.
+        Si se pasa `names`, se le agregan los identificadores declarados.
+        """
+        if self.at("[") or self.at("{"):
+            closing = "]" if self.at("[") else "}"
+            self.advance()
+            while not self.eat(closing):
+                if self.eat(","):
+                    continue
+                if self.at("..."):
+                    rest = self.advance()
+                    if self.binding_target(kind, names) is None and closing == "}":
+                        raise self.error("`...` must be followed by an identifier in declaration contexts", rest)
+                    if self.at("="):
+                        raise self.error("Invalid destructuring assignment target")
+                    if not self.at(closing):
+                        raise self.error("Rest element must be last element", rest)
+                    continue
+                if closing == "}" and self.peek().value == ":":
+                    self.property_name()
+                    self.expect(":")
+                    self.binding_target(kind, names)
+                else:
+                    self.binding_target(kind, names)
+                if self.eat("="):
+                    self.assignment()
+                if not self.at(closing):
+                    self.expect(",")
+            return None
+        token = self.binding_identifier()
+        if kind:
+            self.declare(token, kind)
+        if names is not None:
+            names.append(token)
+        return token
+
+    def _if(self) -> None:
+        self.advance()
+        self.expect("(")
+        self.expression()
+        self.expect(")")
+        self.statement("if")
+        if self.eat("else"):
+            self.statement("if")
+
+    def _for(self) -> None:
+        self.advance()
+        if self.in_async and self.at("await"):
+            self.advance()
+        self.expect("(")
+        self.push_scope()
+        if self.at(";"):
+            self.advance()
+            self._for_rest()
+        else:
+            head = self.tok
+            kind = head.value
+            if kind in ("var", "const") or (kind == "let" and self._let_is_declaration() and self.peek().value != "in"):
+                self.advance()
+                bindings = self.declarations(kind, in_for=True)
+                if self.at("of") or self.at("in"):
+                    loop = self.tok.value
+                    if len(bindings) > 1:
+                        raise self.error(f"Invalid left-hand side in for-{loop} loop: Must have a single binding.", head)
+                    simple, initialized = bindings[0]
+                    # Solo `for (var x = 1 in …)` admite inicializador (anexo B)
+                    if initialized and (loop == "of" or kind != "var" or not simple):
+                        raise self.error(f"for-{loop} loop variable declaration may not have an initializer.", head)
+                    self._for_in_rest()
+                    return
+            else:
+                start = self.index
+                mark = len(self.cover_initializers)
+                self.assignment(no_in=True, cover=True)
+                if self.at("of") or self.at("in"):
+                    if self.at("of") and head.type == "name" and head.value in ("let", "async"):
+                        if head.value == "let":
+                            raise self.error("The left-hand side of a for-of loop may not start with 'let'.", head)
+                        if self.index == start + 1:
+                            raise self.error("The left-hand side of a for-of loop may not be 'async'.", head)
+                    self.check_assignable(start, message="Invalid left-hand side in for-loop")
+                    del self.cover_initializers[mark:]
+                    self._for_in_rest()
+                    return
+                self.check_cover(mark)
+                while self.eat(","):
+                    self.assignment(no_in=True)
+                if self.at("of") or self.at("in"):
+                    raise self.error("Invalid left-hand side in for-loop", head)
+            self.expect(";")
+            self._for_rest()
+        self.pop_scope()
+
+    def _for_in_rest(self) -> None:
+        """Desde el `in` u `of` hasta el cuerpo; for-in admite una expresión con comas"""
+        if self.advance().value == "in":
+            self.expression()
+        else:
+            self.assignment()
+        self.expect(")")
+        self.loop_body()
+        self.pop_scope()
+
+    def _for_rest(self) -> None:
+        if not self.at(";"):
+            self.expression()
+        self.expect(";")
+        if not self.at(")"):
+            self.expression()
+        self.expect(")")
+        self.loop_body()
+
+    def loop_body(self) -> None:
+        self.loop_depth += 1
+        self.statement("other")
+        self.loop_depth -= 1
+
+    def _while(self) -> None:
+        self.advance()
+        self.expect("(")
+        self.expression()
+        self.expect(")")
+        self.loop_body()
+
+    def _do(self) -> None:
+        self.advance()
+        self.loop_body()
+        self.expect("while")
+        self.expect("(")
+        self.expression()
+        self.expect(")")
+        self.eat(";")
+
+    def _break(self) -> None:
+        token = self.advance()
+        if self.tok.type == "name" and not self.tok.newline_before and self.tok.value not in KEYWORDS:
+            label = self.advance()
+            if label.value not in self.labels:
+                raise self.error(f"Undefined label '{label.value}'", label)
+        elif token.value == "break" and not (self.loop_depth or self.switch_depth):
+            raise self.error("Illegal break statement", token)
+        elif token.value == "continue" and not self.loop_depth:
+            raise self.error("Illegal continue statement: no surrounding iteration statement", token)
+        self.semicolon()
+
+    def _return(self) -> None:
+        token = self.advance()
+        if not self.in_function:
+            raise self.error("Illegal return statement", token)
+        if not (self.at(";") or self.at("}") or self.tok.type == "eof" or self.tok.newline_before):
+            self.expression()
+        self.semicolon()
+
+    def _throw(self) -> None:
+        token = self.advance()
+        if self.tok.newline_before:
+            raise self.error("Illegal newline after throw", token)
+        self.expression()
+        self.semicolon()
+
+    def _try(self) -> None:
+        self.advance()
+        self.push_scope()
+        self.block()
+        self.pop_scope()
+        handled = False
+        if self.eat("catch"):
+            handled = True
+            self.push_scope()
+            if self.eat("("):
+                self.binding_target("let" if self.at("[") or self.at("{") else "catch")
+                self.expect(")")
+            self.block()
+            self.pop_scope()
+        if self.eat("finally"):
+            handled = True
+            self.push_scope()
+            self.block()
+            self.pop_scope()
+        if not handled:
+            raise self.error("Missing catch or finally after try")
+
+    def _switch(self) -> None:
+        self.advance()
+        self.expect("(")
+        self.expression()
+        self.expect(")")
+        self.expect("{")
+        self.push_scope()
+        self.switch_depth += 1
+        has_default = False
+        while not self.eat("}"):
+            if self.eat("case"):
+                self.expression()
+            elif self.at("default"):
+                if has_default:
+                    raise self.error("More than one default clause in switch statement")
+                has_default = True
+                self.advance()
+            else:
+                raise self.unexpected()
+            self.expect(":")
+            while not (self.at("case") or self.at("default") or self.at("}")):
+                if self.tok.type == "eof":
+                    raise self.unexpected()
+                self.statement()
+        self.switch_depth -= 1
+        self.pop_scope()
+
+    def _debugger(self) -> None:
+        self.advance()
+        self.semicolon()
+
+    _STATEMENTS = {
+        "if": _if, "for": _for, "while": _while, "do": _do,
+        "break": _break, "continue": _break, "return": _return, "throw": _throw,
+        "try": _try, "switch": _switch, "debugger": _debugger,
+    }
+
+    # --- funciones ------------------------------------------------------------
+
+    def function(self, declaration: bool) -> None:
+        is_async = self.eat("async")
+        self.expect("function")
+        if self.at("*"):
+            raise self.error("Sintaxis no soportada: generadores")
+        if declaration or self.tok.type == "name":
+            name = self.binding_identifier()
+            if declaration:
+                self.declare(name, "function")
+        self.function_rest(is_async, arrow=False)
+
+    def function_rest(self, is_async: bool, arrow: bool, method: bool = False) -> None:
+        """Parámetros y cuerpo de una función"""
+        saved = (self.in_function, self.in_async, self.new_target, self.loop_depth, self.switch_depth, self.labels)
+        self.in_function, self.in_async = True, is_async
+        self.new_target = self.new_target or not arrow
+        self.loop_depth = self.switch_depth = 0
+        self.labels = []
+        self.push_scope(is_function=True)
+        names: List[Token] = []
+        if not arrow or self.at("("):
+            simple = self.params(names)
+        else:
+            simple = self.binding_target("var", names) is not None
+        # Los parámetros repetidos solo se permiten en funciones comunes con
+        # parámetros simples (sin valores por defecto, resto ni patrones)
+        if arrow or method or not simple:
+            seen: Set[str] = set()
+            for token in names:
+                if token.value in seen:
+                    raise self.error("Duplicate parameter name not allowed in this context", token)
+                seen.add(token.value)
+        if arrow:
+            self.expect("=>")
+            if self.at("{"):
+                self.block()
+            else:
+                self.assignment()
+        else:
+            self.block()
+        self.pop_scope()
+        (self.in_function, self.in_async, self.new_target,
+         self.loop_depth, self.switch_depth, self.labels) = saved
+
+    def params(self, names: List[Token]) -> bool:
+        """Parámetros formales; retorna si son todos identificadores simples"""
+        self.expect("(")
+        simple = True
+        while not self.eat(")"):
+            if self.eat("..."):
+                simple = False
+                self.binding_target("var", names)
+                if self.at("="):
+                    raise self.error("Rest parameter may not have a default initializer")
+                if not self.at(")"):
+                    raise self.error("Rest parameter must be last formal parameter")
+                continue
+            if self.binding_target("var", names) is None:
+                simple = False
+            if self.eat("="):
+                simple = False
+                self.assignment()
+            if not self.at(")"):
+                self.expect(",")
+        return simple
+
+    def _arrow_ahead(self) -> bool:
+        """Determina si desde el token actual comienza una arrow function"""
+        tok = self.tok
+        if tok.type == "name":
+            nxt = self.peek()
+            return nxt.value == "=>" and nxt.type == "punct" and not nxt.newline_before
+        if tok.value != "(" or tok.type != "punct":
+            return False
+        end = self.matches[self.index]
+        if end == -1:
+            return False
+        nxt = self.tokens[end + 1] if end + 1 < len(self.tokens) else self.tokens[-1]
+        return nxt.value == "=>" and nxt.type == "punct" and not nxt.newline_before
+
+    # --- expresiones ------------------------------------------------------------
+
+    def expression(self, no_in: bool = False) -> None:
+        self.assignment(no_in)
+        while self.eat(","):
+            self.assignment(no_in)
+
+    def assignment(self, no_in: bool = False, cover: bool = False) -> None:
+        """
+        Expresión de asignación. Con `cover`, un literal de objeto o arreglo
+        con propiedades `{a = 1}` queda pendiente: quien llama decide si es
+        un patrón (elementos de otro literal, cabecera de for-in/of).
+        """
+        if self.at("async") and not self.peek().newline_before:
+            nxt = self.peek()
+            if nxt.value == "function":
+                self.function(declaration=False)
+                self.postfix_chain()
+                return
+            if nxt.type == "name" or nxt.value == "(":
+                self.advance()
+                if self._arrow_ahead():
+                    self.function_rest(is_async=True, arrow=True)
+                    return
+                self.index -= 1
+                self.tok = self.tokens[self.index]
+        if self._arrow_ahead():
+            self.function_rest(is_async=False, arrow=True)
+            return
+        start = self.index
+        mark = len(self.cover_initializers)
+        self.conditional(no_in)
+        if self.tok.type == "punct" and self.tok.value in ASSIGNMENT_OPERATORS:
+            # Solo "=" admite desestructuración
+            self.check_assignable(start, allow_pattern=self.tok.value == "=")
+            if self._is_literal(start):
+                del self.cover_initializers[mark:]
+            self.check_cover(mark)
+            self.advance()
+            self.assignment(no_in)
+        elif not (cover and self._is_literal(start)):
+            self.check_cover(mark)
+
+    def _is_literal(self, start: int) -> bool:
+        """Indica si la expresión entre `start` y el token actual es un literal de objeto o arreglo"""
+        first = self.tokens[start]
+        return first.type == "punct" and first.value in ("[", "{") and self.matches[start] == self.index - 1
+
+    def check_cover(self, mark: int) -> None:
+        """Rechaza las propiedades `{a = 1}` pendientes desde `mark`: el objeto no fue un patrón"""
+        if len(self.cover_initializers) > mark:
+            raise self.error("Invalid shorthand property initializer", self.cover_initializers[mark])
+
+    def check_assignable(self, start: int, allow_pattern: bool = True,
+                         message: str = "Invalid left-hand side in assignment") -> None:
+        """Verifica que la expresión entre el token `start` y el actual sea asignable"""
+        end = self.index - 1
+        if end < start:
+            raise self.unexpected()
+        if allow_pattern and self._is_literal(start):
+            self.check_pattern(start, end)
+        elif not self._is_reference(start, end, allow_call=True):
+            raise self.error(message, self.tokens[start])
+
+    def _is_reference(self, start: int, end: int, allow_call: bool) -> bool:
+        """
+        Indica si los tokens entre `start` y `end` son un identificador o un
+        acceso a miembro, quizás entre paréntesis. V8 también acepta una
+        llamada (`f() = 1` falla recién al ejecutarse), salvo en patrones.
+        """
+        tokens = self.tokens
+        while tokens[start].value == "(" and tokens[start].type == "punct" and self.matches[start] == end:
+            start, end = start + 1, end - 1
+        if start > end:
+            return False
+        first, last = tokens[start], tokens[end]
+        if start == end:
+            return first.type == "name" and first.value not in KEYWORDS
+        if first.type == "punct" and self.matches[start] == end:
+            return False
+        segment = tokens[start:end + 1]
+        if not _is_member_chain(segment):
+            return False
+        if first.type == "name" and first.value == "new":
+            if len(segment) == 3 and segment[1].value == ".":
+                return False  # new.target
+            # `new A()`: los primeros argumentos son parte del new, no una llamada
+            i = start + 1
+            while i < end and not (tokens[i].type == "punct" and tokens[i].value == "("):
+                if tokens[i].type == "punct" and tokens[i].value in ("[", "{"):
+                    i = self.matches[i]
+                i += 1
+            if self.matches[i] == end:
+                return False
+        if last.type == "name":
+            return segment[-2].value == "." and segment[-2].type == "punct"
+        if last.type != "punct":
+            return False
+        return last.value == "]" or (allow_call and last.value == ")")
+
+    def check_pattern(self, start: int, end: int) -> None:
+        """Verifica que el literal entre `start` y su cierre `end` sea un patrón de asignación"""
+        tokens = self.tokens
+        is_object = tokens[start].value == "{"
+        i = start + 1
+        while i < end:
+            if tokens[i].type == "punct" and tokens[i].value == ",":
+                i += 1
+                continue
+            rest = tokens[i].type == "punct" and tokens[i].value == "..."
+            if rest:
+                i += 1
+            j = i
+            while j < end and not (tokens[j].type == "punct" and tokens[j].value == ","):
+                if tokens[j].type == "punct" and tokens[j].value in ("(", "[", "{"):
+                    j = self.matches[j]
+                j += 1
+            if rest and j != end:
+                raise self.error("Rest element must be last element", tokens[i])
+            target = i
+            if is_object and not rest:
+                # Propiedad: `a`, `a = 1`, `clave: destino` o `[clave]: destino`
+                key_end = self.matches[i] if tokens[i].value == "[" and tokens[i].type == "punct" else i
+                after = tokens[key_end + 1]
+                if key_end + 1 == j or (after.type == "punct" and after.value == "="):
+                    target = -1
+                elif after.type == "punct" and after.value == ":":
+                    target = key_end + 2
+                else:
+                    raise self.error("Invalid destructuring assignment target", tokens[i])
+            if target != -1:
+                self.check_pattern_target(target, j - 1, rest, object_rest=rest and is_object)
+            i = j + 1
+
+    def check_pattern_target(self, start: int, end: int, rest: bool, object_rest: bool) -> None:
+        """Destino de un elemento de patrón, con su valor por defecto opcional"""
+        tokens = self.tokens
+        must_be_reference = "`...` must be followed by an assignable reference in assignment contexts"
+        i = start
+        while i <= end:
+            t = tokens[i]
+            if t.type == "punct":
+                if t.value in ("(", "[", "{"):
+                    i = self.matches[i]
+                elif t.value == "=":
+                    if object_rest:
+                        raise self.error(must_be_reference, tokens[start])
+                    if rest:
+                        raise self.error("Invalid destructuring assignment target", tokens[start])
+                    end = i - 1
+                    break
+            i += 1
+        first = tokens[start]
+        if first.type == "punct" and first.value in ("[", "{") and self.matches[start] == end:
+            if object_rest:
+                raise self.error(must_be_reference, first)
+            self.check_pattern(start, end)
+        elif not self._is_reference(start, end, allow_call=False):
+            raise self.error("Invalid destructuring assignment target", first)
+
+    def conditional(self, no_in: bool = False) -> None:
+        self.binary(0, no_in)
+        if self.eat("?"):
+            self.assignment()
+            self.expect(":")
+            self.assignment(no_in)
+
+    def binary(self, min_precedence: int, no_in: bool, coalesce_operand: bool = False) -> bool:
+        """
+        Expresión binaria por precedencia. `??` no se puede mezclar sin
+        paréntesis con `||` ni `&&`; retorna si la expresión usó `||` o `&&`
+        fuera de paréntesis.
+        """
+        self.unary()
+        coalesce = logical = False
+        while True:
+            tok = self.tok
+            if tok.type not in ("punct", "name"):
+                return logical
+            precedence = BINARY_PRECEDENCE.get(tok.value)
+            if precedence is None or precedence <= min_precedence:
+                return logical
+            if tok.type == "name" and tok.value not in ("instanceof", "in"):
+                return logical
+            if no_in and tok.value == "in":
+                return logical
+            if tok.value == "??":
+                if logical:
+                    raise self.unexpected()
+                coalesce = True
+            elif tok.value in ("||", "&&"):
+                if coalesce or coalesce_operand:
+                    raise self.unexpected()
+                logical = True
+            self.advance()
+            # ** es asociativo a la derecha
+            if self.binary(precedence - 1 if tok.value == "**" else precedence, no_in, tok.value == "??"):
+                logical = True
+
+    def unary(self) -> None:
+        tok = self.tok
+        if tok.value in UNARY_OPERATORS and tok.type in ("punct", "name"):
+            self.advance()
+            self.unary()
+            if self.at("**"):
+                raise self.error("Unary operator used immediately before exponentiation expression. "
+                                 "Parenthesis must be used to disambiguate operator precedence")
+            return
+        if tok.value == "await" and tok.type == "name" and self.in_async:
+            self.advance()
+            self.unary()
+            return
+        if tok.type == "punct" and tok.value in ("++", "--"):
+            self.advance()
+            start = self.index
+            self.unary()
+            self.check_update_target(start, "Invalid left-hand side expression in prefix operation")
+            return
+        start = self.index
+        self.postfix()
+        if self.tok.type == "punct" and self.tok.value in ("++", "--") and not self.tok.newline_before:
+            self.check_update_target(start, "Invalid left-hand side expression in postfix operation")
+            self.advance()
+
+    def check_update_target(self, start: int, message: str) -> None:
+        try:
+            self.check_assignable(start, allow_pattern=False)
+        except JSSyntaxError:
+            raise self.error(message, self.tokens[start])
+
+    def postfix(self) -> None:
+        if self.at("new"):
+            self.new_expression()
+        else:
+            self.primary()
+        self.postfix_chain()
+
+    def new_expression(self) -> None:
+        """`new` con su constructor y argumentos opcionales (admite `new new A()()`)"""
+        new = self.advance()
+        if self.eat("."):
+            if self.tok.value != "target":
+                raise self.unexpected()
+            if not self.new_target:
+                raise self.error("new.target expression is not allowed here", new)
+            self.advance()
+            return
+        if self.at("new"):
+            self.new_expression()
+        else:
+            self.primary()
+        self.member_chain(allow_call=False)
+        if self.at("("):
+            self.arguments()
+
+    def postfix_chain(self) -> None:
+        self.member_chain(allow_call=True)
+
+    def member_chain(self, allow_call: bool) -> None:
+        while True:
+            tok = self.tok
+            if tok.type == "punct":
+                if tok.value == ".":
+                    self.advance()
+                    self.property_identifier()
+                    continue
+                if tok.value == "?.":
+                    if not allow_call:
+                        raise self.error("Invalid optional chain from new expression")
+                    self.advance()
+                    if self.at("("):
+                        self.arguments()
+                    elif self.eat("["):
+                        self.expression()
+                        self.expect("]")
+                    else:
+                        self.property_identifier()
+                    continue
+                if tok.value == "[":
+                    self.advance()
+                    self.expression()
+                    self.expect("]")
+                    continue
+                if tok.value == "(" and allow_call:
+                    self.arguments()
+                    continue
+            elif tok.type == "template":
+                self.template(tok)
+                self.advance()
+                continue
+            return
+
+    def property_identifier(self) -> None:
+        if self.tok.type != "name":
+            raise self.unexpected()
+        self.advance()
+
+    def arguments(self) -> None:
+        self.expect("(")
+        while not self.eat(")"):
+            self.eat("...")
+            self.assignment()
+            if not self.at(")"):
+                if self.tok.type == "eof" or not self.at(","):
+                    raise self.error("missing ) after argument list")
+                self.advance()
+
+    def primary(self) -> None:
+        tok = self.tok
+        kind = tok.type
+        if kind in ("num", "str", "regex"):
+            self.advance()
+            return
+        if kind == "template":
+            # Sin etiqueta, un escape inválido es error de sintaxis
+            if tok.escape_error:
+                raise tok.escape_error
+            self.template(tok)
+            self.advance()
+            return
+        if kind == "name":
+            value = tok.value
+            if value == "function":
+                self.function(declaration=False)
+                return
+            if value in ("this", "null", "true", "false"):
+                self.advance()
+                return
+            if value in KEYWORDS or value in UNSUPPORTED:
+                raise self.unexpected()
+            self.advance()
+            return
+        if kind == "punct":
+            if tok.value == "(":
+                self.advance()
+                self.expression()
+                self.expect(")")
+                return
+            if tok.value == "[":
+                self.array_literal()
+                return
+            if tok.value == "{":
+                self.object_literal()
+                return
+        raise self.unexpected()
+
+    def template(self, tok: Token) -> None:
+        depth = self.template_depths.get(self.index, 0)
+        for part in tok.parts or ():
+            parser = _Parser(self.code, part, self.scopes, self.in_function, self.in_async, self.new_target, depth)
+            if parser.tok.type == "eof":
+                raise parser.unexpected()
+            parser.expression()
+            if parser.tok.type != "eof":
+                raise parser.unexpected()
+
+    def array_literal(self) -> None:
+        self.expect("[")
+        while not self.eat("]"):
+            if self.eat(","):
+                continue
+            self.eat("...")
+            self.assignment(cover=True)
+            if not self.at("]"):
+                self.expect(",")
+
+    def object_literal(self) -> None:
+        self.expect("{")
+        while not self.eat("}"):
+            if self.eat("..."):
+                self.assignment()
+            else:
+                is_async = self.tok.value == "async" and self.peek().value not in (",", ":", "(", "}", "=")
+                if is_async:
+                    self.advance()
+                accessor = self.tok.value in ("get", "set") and self.peek().value not in (",", ":", "(", "}", "=")
+                if accessor:
+                    self.advance()
+                key = self.tok
+                self.property_name()
+                if self.at("("):
+                    self.function_rest(is_async, arrow=False, method=True)
+                elif is_async or accessor:
+                    raise self.unexpected()
+                elif self.eat(":"):
+                    self.assignment(cover=True)
+                elif key.type == "name" and key.value not in KEYWORDS:
+                    # Propiedad abreviada (o valor por defecto en desestructuración)
+                    if self.at("="):
+                        self.cover_initializers.append(key)
+                        self.advance()
+                        self.assignment()
+                else:
+                    raise self.unexpected()
+            if not self.at("}"):
+                self.expect(",")
+
+    def property_name(self) -> None:
+        tok = self.tok
+        if tok.type in ("name", "str", "num"):
+            self.advance()
+            return
+        if self.eat("["):
+            self.assignment()
+            self.expect("]")
+            return
+        raise self.unexpected()
+
+
+def _prelude_scope(predeclared: Dict[str, str]) -> _Scope:
+    scope = _Scope(is_function=True)
+    scope.names.update(predeclared)
+    return scope
+
+
+def check_syntax(code: str, predeclared: Optional[Dict[str, str]] = None) -> Optional[JSSyntaxError]:
+    """
+    Verifica la sintaxis de un programa JavaScript.
+
+    Args:
+        code: Código a verificar
+        predeclared: Nombres ya declarados en el ámbito global y su tipo
+            ("function", "const", "let", "var"), por ejemplo los stubs del juego
+
+    Returns:
+        None si la sintaxis es válida, JSSyntaxError con línea y columna si no
+    """
+    try:
+        tokens = tokenize(code)
+        _Parser(code, tokens, [_prelude_scope(predeclared or {})]).parse_program()
+    except JSSyntaxError as e:
+        return e
+    except RecursionError:
+        return JSSyntaxError(STACK_OVERFLOW, 1, 1)
+    return None
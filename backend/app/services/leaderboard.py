@@ -0,0 +1,386 @@
+"""
+Tablas de posiciones por nivel: las soluciones completadas se ordenan por
+pasos, rotaciones y largo del código, con top-N y posición de un jugador en
+O(log n) y guardado periódico en disco
+"""
+import asyncio
+import json
+import os
+import time
+from bisect import bisect_left, insort
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from app.config import LEADERBOARD_PATH, LEADERBOARD_SAVE_INTERVAL, LEADERBOARD_SIZE
+from app.logger import setup_logger
+from app.services.code_validator import CodeValidator
+from app.services.js_syntax_checker import JSSyntaxError, tokenize
+from app.services.validation_cache import normalize_code
+
+logger = setup_logger(__name__)
+
+
+def code_length(code: str) -> int:
+    """Largo del código sin comentarios ni espacios sobrantes (ver normalize_code)"""
+    return len(normalize_code(code))
+
+
+async def verified_code_length(code: str, commands: Iterable[str]) -> Optional[int]:
+    """
+    Largo del código de una solución, o None si no puede entrar en la tabla.
+
+    El código se ejecuta en el frontend, así que el servidor solo comprueba
+    lo que puede: que pase la misma validación que /execute (el resultado
+    suele estar en cache) y que llame a cada comando de la traza simulada.
+
+    Args:
+        code: Código enviado junto con la traza
+        commands: Nombres de los comandos de la traza
+    """
+    is_valid, _, error_msg = await CodeValidator.validate_async(code)
+    if not is_valid:
+        logger.info("Solución fuera de la tabla, código inválido: %s", error_msg)
+        return None
+    try:
+        names = {token.value for token in tokenize(code) if token.type == "name"}
+    except JSSyntaxError:
+        return None
+    missing = set(commands) - names
+    if missing:
+        logger.info("Solución fuera de la tabla, el código no llama a: %s", ", ".join(sorted(missing)))
+        return None
+    return code_length(code)
+
+
+class LeaderboardEntry(NamedTuple):
+    """Solución de un jugador; el orden de los campos es el de la tabla (menor es mejor)"""
+    steps: float
+    rotations: int
+    code_length: int
+    submitted_at: float  # a igual puntaje, gana quien llegó primero
+    player_id: str
+
+    @property
+    def score(self) -> Tuple[float, int, int]:
+        return self.steps, self.rotations, self.code_length
+
+    def to_dict(self, rank: int) -> Dict[str, Any]:
+        """Formato de la API (ver LeaderboardEntryResponse)"""
+        return {
+            "rank": rank,
+            "playerId": self.player_id,
+            "stepsMoved": self.steps,
+            "rotationsMade": self.rotations,
+            "codeLength": self.code_length,
+            "submittedAt": self.submitted_at,
+        }
+
+
+class RankedIndex:
+    """
+    Lista ordenada de claves únicas con acceso por posición.
+
+    Las claves se guardan en baldes ordenados de entre `load` y `2 * load`
+    elementos; el máximo de cada balde permite ubicarlo con bisect y un
+    árbol de Fenwick sobre los tamaños de los baldes da la posición global.
+    Insertar, eliminar, obtener la posición de una clave o la clave en una
+    posición cuestan O(log n) (más el desplazamiento dentro de un balde de
+    tamaño acotado). El árbol solo se reconstruye al partir o vaciar un
+    balde, una vez cada ~`load` operaciones.
+    """
+
+    def __init__(self, keys: Optional[List[Any]] = None, load: int = 512):
+        self._load = load
+        self._buckets: List[List[Any]] = []
+        self._maxes: List[Any] = []
+        self._tree: List[int] = [0]
+        self._len = 0
+        if keys:
+            keys = sorted(keys)
+            self._buckets = [keys[i:i + load] for i in range(0, len(keys), load)]
+            self._maxes = [bucket[-1] for bucket in self._buckets]
+            self._len = len(keys)
+            self._rebuild()
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[Any]:
+        for bucket in self._buckets:
+            yield from bucket
+
+    def _rebuild(self) -> None:
+        count = len(self._buckets)
+        tree = [0] * (count + 1)
+        for i, bucket in enumerate(self._buckets, 1):
+            tree[i] += len(bucket)
+            parent = i + (i & -i)
+            if parent <= count:
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _update(self, bucket_index: int, delta: int) -> None:
+        i = bucket_index + 1
+        size = len(self._tree)
+        while i < size:
+            self._tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, bucket_index: int) -> int:
+        """Claves en los baldes anteriores a `bucket_index`"""
+        total = 0
+        i = bucket_index
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def _locate(self, index: int) -> Tuple[int, int]:
+        """(balde, posición en el balde) de la posición global `index`"""
+        bucket_index = 0
+        count = len(self._tree) - 1
+        step = 1 << (count.bit_length() - 1) if count else 0
+        while step:
+            candidate = bucket_index + step
+            if candidate <= count and self._tree[candidate] <= index:
+                bucket_index = candidate
+                index -= self._tree[candidate]
+            step >>= 1
+        return bucket_index, index
+
+    def add(self, key: Any) -> None:
+        if not self._buckets:
+            self._buckets.append([key])
+            self._maxes.append(key)
+            self._rebuild()
+            self._len = 1
+            return
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            i -= 1
+            bucket = self._buckets[i]
+            bucket.append(key)
+            self._maxes[i] = key
+        else:
+            bucket = self._buckets[i]
+            insort(bucket, key)
+        self._len += 1
+        if len(bucket) > 2 * self._load:
+            half = bucket[self._load:]
+            del bucket[self._load:]
+            self._buckets.insert(i + 1, half)
+            self._maxes[i] = bucket[-1]
+            self._maxes.insert(i + 1, half[-1])
+            self._rebuild()
+        else:
+            self._update(i, 1)
+
+    def _find(self, key: Any) -> Tuple[int, int]:
+        i = bisect_left(self._maxes, key)
+        if i < len(self._maxes):
+            bucket = self._buckets[i]
+            j = bisect_left(bucket, key)
+            if bucket[j] == key:
+                return i, j
+        raise ValueError(f"{key!r} no está en el índice")
+
+    def remove(self, key: Any) -> None:
+        """Raises: ValueError si la clave no está"""
+        i, j = self._find(key)
+        bucket = self._buckets[i]
+        del bucket[j]
+        self._len -= 1
+        if not bucket:
+            del self._buckets[i]
+            del self._maxes[i]
+            self._rebuild()
+        else:
+            self._maxes[i] = bucket[-1]
+            self._update(i, -1)
+
+    def index(self, key: Any) -> int:
+        """Posición (desde 0) de la clave. Raises: ValueError si no está"""
+        i, j = self._find(key)
+        return self._prefix(i) + j
+
+    def __getitem__(self, index: int) -> Any:
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("posición fuera del índice")
+        i, j = self._locate(index)
+        return self._buckets[i][j]
+
+    def islice(self, start: int, stop: int) -> Iterator[Any]:
+        """Claves en las posiciones [start, stop)"""
+        stop = min(stop, self._len)
+        if start >= stop:
+            return
+        i, j = self._locate(start)
+        remaining = stop - start
+        while remaining > 0:
+            chunk = self._buckets[i][j:j + remaining]
+            yield from chunk
+            remaining -= len(chunk)
+            i, j = i + 1, 0
+
+
+class LevelLeaderboard:
+    """
+    Tabla de un nivel: la mejor solución de cada jugador, con a lo sumo
+    `max_size` entradas. Con la tabla llena, una solución peor que la
+    última no entra y una mejor desplaza a la última.
+    """
+
+    def __init__(self, max_size: int = LEADERBOARD_SIZE, entries: Optional[List[LeaderboardEntry]] = None):
+        self.max_size = max_size
+        self._players: Dict[str, LeaderboardEntry] = {}
+        for entry in entries or ():
+            current = self._players.get(entry.player_id)
+            if current is None or entry < current:
+                self._players[entry.player_id] = entry
+        self._index = RankedIndex(list(self._players.values()))
+        while len(self._index) > max_size:
+            self._evict_last()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __iter__(self) -> Iterator[LeaderboardEntry]:
+        return iter(self._index)
+
+    def _evict_last(self) -> None:
+        last = self._index[-1]
+        self._index.remove(last)
+        del self._players[last.player_id]
+
+    def submit(self, entry: LeaderboardEntry) -> Optional[int]:
+        """
+        Registra una solución si mejora la del jugador.
+
+        Returns:
+            Posición del jugador (desde 1), o None si no entró en la tabla
+        """
+        current = self._players.get(entry.player_id)
+        if current is not None:
+            if entry.score >= current.score:
+                return self._index.index(current) + 1
+            self._index.remove(current)
+            del self._players[entry.player_id]
+        elif len(self._index) >= self.max_size:
+            if entry >= self._index[-1]:
+                return None
+            self._evict_last()
+        self._index.add(entry)
+        self._players[entry.player_id] = entry
+        return self._index.index(entry) + 1
+
+    def top(self, limit: int, offset: int = 0) -> List[Dict[str, Any]]:
+        """Entradas en las posiciones offset+1 .. offset+limit"""
+        return [
+            entry.to_dict(rank)
+            for rank, entry in enumerate(self._index.islice(offset, offset + limit), offset + 1)
+        ]
+
+    def rank(self, player_id: str) -> Optional[Dict[str, Any]]:
+        """Entrada y posición del jugador, o None si no está en la tabla"""
+        entry = self._players.get(player_id)
+        if entry is None:
+            return None
+        return entry.to_dict(self._index.index(entry) + 1)
+
+
+class LeaderboardRegistry:
+    """
+    Tablas de todos los niveles, en memoria. Se guardan en un archivo JSON
+    cada `save_interval` segundos si cambiaron (la escritura corre en un
+    hilo y reemplaza el archivo de forma atómica) y al cerrar la app; al
+    iniciar se cargan de ese archivo.
+    """
+
+    def __init__(self, path: str = LEADERBOARD_PATH, max_size: int = LEADERBOARD_SIZE,
+                 save_interval: float = LEADERBOARD_SAVE_INTERVAL):
+        self.path = path
+        self.max_size = max_size
+        self.save_interval = save_interval
+        self._boards: Dict[str, LevelLeaderboard] = {}
+        self._dirty = False
+        self._task: Optional[asyncio.Task] = None
+
+    def board(self, level_id: str) -> Optional[LevelLeaderboard]:
+        return self._boards.get(level_id)
+
+    def submit(self, level_id: str, entry: LeaderboardEntry) -> Optional[int]:
+        """Registra una solución completada; retorna la posición del jugador o None"""
+        board = self._boards.get(level_id)
+        if board is None:
+            board = self._boards[level_id] = LevelLeaderboard(self.max_size)
+        rank = board.submit(entry)
+        self._dirty = True
+        return rank
+
+    def load(self) -> None:
+        """Carga las tablas guardadas; un archivo inexistente o dañado deja las tablas vacías"""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            self._boards = {
+                level_id: LevelLeaderboard(self.max_size, [LeaderboardEntry(*row) for row in rows])
+                for level_id, rows in data["levels"].items()
+            }
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.error("No se pudieron cargar las tablas de posiciones de %s: %s", self.path, e)
+            return
+        logger.info("Tablas de posiciones cargadas: %d niveles", len(self._boards))
+
+    def _snapshot(self) -> Dict[str, Any]:
+        return {"levels": {level_id: [list(entry) for entry in board] for level_id, board in self._boards.items()}}
+
+    def _write(self, snapshot: Dict[str, Any]) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(temporary, self.path)
+
+    async def save(self) -> bool:
+        """Guarda las tablas si cambiaron desde la última vez"""
+        if not self._dirty:
+            return False
+        # La copia se toma en el hilo del event loop, donde se modifican las tablas
+        snapshot = self._snapshot()
+        self._dirty = False
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self._write, snapshot)
+        except OSError as e:
+            self._dirty = True
+            logger.warning("No se pudieron guardar las tablas de posiciones: %s", e)
+            return False
+        return True
+
+    async def run(self) -> None:
+        """Guardado periódico; corre hasta que se cancela"""
+        while True:
+            await asyncio.sleep(self.save_interval)
+            await self.save()
+
+    def start(self) -> asyncio.Task:
+        self._task = asyncio.ensure_future(self.run())
+        return self._task
+
+    async def stop(self) -> None:
+        """Detiene el guardado periódico y guarda los cambios pendientes"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.save()
+
+
+# Tablas compartidas por la aplicación
+leaderboards = LeaderboardRegistry()
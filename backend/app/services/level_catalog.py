@@ -0,0 +1,220 @@
+"""
+Catálogo de niveles respaldado por archivos JSON (uno por nivel)
+"""
+import json
+import os
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from app.config import LEVELS_DIR
+from app.services.level_rules import LevelDefinitionError, LevelSpecRegistry, level_specs
+from app.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+INDEX_FILE = "index.json"
+
+# (mtime en ns, tamaño) identifica la versión de un archivo en disco
+Signature = Tuple[int, int]
+# Versión del índice: la de index.json o, si no existe, la del directorio
+IndexVersion = Tuple[Optional[Signature], Optional[Signature]]
+
+
+def _signature(path: str) -> Optional[Signature]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _level_sort_key(level_id: str) -> Tuple[int, Any]:
+    return (0, int(level_id)) if level_id.isdigit() else (1, level_id)
+
+
+class LevelCatalog:
+    """
+    Niveles cargados bajo demanda desde un directorio.
+
+    El índice (`index.json`, o los `*.json` del directorio si no existe) solo
+    lista ids y archivos; cada nivel se lee y valida la primera vez que se
+    pide. `reload_changed` (o el watcher) relee los niveles modificados en
+    disco y reemplaza la versión en memoria de una sola vez: los lectores ven
+    la versión anterior o la nueva, nunca una a medias; también relee el
+    índice si cambió y notifica los niveles agregados y eliminados. Un archivo
+    inválido se registra en el log y se conserva la última versión válida.
+
+    Cada nivel leído se compila en `specs`, que lo valida y deja el nivel
+    compilado listo para la primera validación.
+    """
+
+    def __init__(self, directory: str = LEVELS_DIR, specs: Optional[LevelSpecRegistry] = None):
+        self.directory = directory
+        self.specs = specs if specs is not None else LevelSpecRegistry()
+        self._lock = Lock()
+        self._index: Optional[Dict[str, str]] = None  # id -> ruta del archivo
+        self._index_version: Optional[IndexVersion] = None
+        self._levels: Dict[str, Tuple[Optional[Signature], Dict[str, Any]]] = {}
+        self._failed: Dict[str, Optional[Signature]] = {}
+        self._listeners: List[Callable[[str], None]] = []
+        self._stop = Event()
+        self._watcher: Optional[Thread] = None
+
+    # Índice
+
+    def _current_index_version(self) -> IndexVersion:
+        index_signature = _signature(os.path.join(self.directory, INDEX_FILE))
+        if index_signature is not None:
+            return index_signature, None
+        # Sin índice, agregar o quitar un archivo cambia el mtime del directorio
+        return None, _signature(self.directory)
+
+    def _read_index(self) -> Dict[str, str]:
+        index_path = os.path.join(self.directory, INDEX_FILE)
+        self._index_version = self._current_index_version()
+        if self._index_version[0] is not None:
+            with open(index_path, encoding="utf-8") as f:
+                entries = json.load(f)["levels"]
+            return {
+                str(entry["id"]): os.path.join(self.directory, entry["file"])
+                for entry in entries
+            }
+        # Sin índice: cada <id>.json del directorio es un nivel
+        ids = [
+            name[:-5] for name in os.listdir(self.directory)
+            if name.endswith(".json") and name != INDEX_FILE
+        ]
+        return {
+            level_id: os.path.join(self.directory, f"{level_id}.json")
+            for level_id in sorted(ids, key=_level_sort_key)
+        }
+
+    def _get_index(self) -> Dict[str, str]:
+        index = self._index
+        if index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = self._read_index()
+                index = self._index
+        return index
+
+    def ids(self) -> List[str]:
+        """Ids de los niveles en el orden del índice"""
+        return list(self._get_index())
+
+    # Niveles
+
+    def _read_level(self, level_id: str, path: str) -> Tuple[Optional[Signature], Dict[str, Any]]:
+        """Lee, valida y compila un nivel; lanza OSError o ValueError si es inválido"""
+        signature = _signature(path)
+        with open(path, encoding="utf-8") as f:
+            level = json.load(f)
+        if not isinstance(level, dict) or level.get("id") != level_id:
+            raise LevelDefinitionError(f"El archivo {path} no define el nivel '{level_id}'")
+        self.specs.compile(level)
+        return signature, level
+
+    def get(self, level_id: str) -> Optional[Dict[str, Any]]:
+        """Retorna un nivel, leyéndolo del disco la primera vez"""
+        entry = self._levels.get(level_id)
+        if entry is not None:
+            return entry[1]
+        path = self._get_index().get(level_id)
+        if path is None:
+            return None
+        with self._lock:
+            entry = self._levels.get(level_id)
+            if entry is None:
+                entry = self._read_level(level_id, path)
+                self._levels[level_id] = entry
+        return entry[1]
+
+    def all(self) -> Dict[str, Dict[str, Any]]:
+        """Retorna todos los niveles (los lee si aún no están en memoria)"""
+        levels = {}
+        for level_id in self.ids():
+            level = self.get(level_id)
+            if level is not None:
+                levels[level_id] = level
+        return levels
+
+    # Recarga
+
+    def add_listener(self, listener: Callable[[str], None]) -> None:
+        """Registra una función que se llama con el id de cada nivel recargado"""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def reload_changed(self) -> List[str]:
+        """
+        Relee el índice y los niveles en memoria que cambiaron en disco.
+
+        Returns:
+            Ids de los niveles que cambiaron, se agregaron o se eliminaron
+        """
+        changed: List[str] = []
+        with self._lock:
+            previous = self._index
+            if previous is not None and self._current_index_version() != self._index_version:
+                try:
+                    self._index = self._read_index()
+                except (OSError, ValueError, KeyError) as e:
+                    logger.error(f"Índice de niveles inválido, se conserva el anterior: {e}")
+            index = self._index or {}
+
+            if previous is not None and index is not previous:
+                # Los niveles nuevos se leen al pedirlos; los eliminados se descartan
+                for level_id in previous:
+                    if level_id not in index:
+                        self._levels.pop(level_id, None)
+                        self._failed.pop(level_id, None)
+                        self.specs.invalidate(level_id)
+                        changed.append(level_id)
+                changed.extend(level_id for level_id in index if level_id not in previous)
+
+            for level_id, (signature, _) in list(self._levels.items()):
+                path = index[level_id]
+                current = _signature(path)
+                if current == signature or self._failed.get(level_id) == current:
+                    continue
+                try:
+                    self._levels[level_id] = self._read_level(level_id, path)
+                except (OSError, ValueError) as e:
+                    # Archivo a medio escribir o inválido: reintentar cuando vuelva a cambiar
+                    self._failed[level_id] = current
+                    logger.error(f"No se pudo recargar el nivel {level_id}: {e}")
+                    continue
+                self._failed.pop(level_id, None)
+                changed.append(level_id)
+
+        for level_id in changed:
+            logger.info(f"Nivel recargado: {level_id}")
+            for listener in self._listeners:
+                listener(level_id)
+        return changed
+
+    def start_watcher(self, interval: float) -> None:
+        """Revisa el directorio cada `interval` segundos en un hilo de fondo"""
+        if interval <= 0 or self._watcher is not None:
+            return
+        self._stop.clear()
+
+        def watch() -> None:
+            while not self._stop.wait(interval):
+                try:
+                    self.reload_changed()
+                except Exception as e:
+                    logger.error(f"Error al revisar cambios de niveles: {e}", exc_info=True)
+
+        self._watcher = Thread(target=watch, name="codeshyri-level-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self) -> None:
+        """Detiene el hilo de recarga"""
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
+
+
+# Catálogo compartido por la aplicación
+level_catalog = LevelCatalog(specs=level_specs)
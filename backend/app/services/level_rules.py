@@ -0,0 +1,338 @@
+"""
+Compilación de las reglas de validación de los niveles.
+
+Cada bloque `validation` de un nivel se convierte una sola vez en una lista
+de reglas (closures) con sus parámetros ya resueltos; validar un intento se
+reduce a recorrer esa lista. Las definiciones mal formadas fallan al compilar.
+"""
+import asyncio
+from dataclasses import dataclass
+from numbers import Real
+from threading import Lock
+from typing import Any, Callable, Dict, FrozenSet, Optional, Tuple
+from app.services.level_solver import LevelOptimum, solve_level
+from app.services.movement_simulator import LevelGeometry, SimulationState
+
+
+class LevelDefinitionError(ValueError):
+    """Error en la definición de un nivel"""
+
+
+class PlayerOutcome:
+    """Estado final del jugador que evalúan las reglas"""
+
+    __slots__ = ("x", "y", "angle", "actions", "steps", "rotations", "simulation")
+
+    def __init__(self, x: float, y: float, angle: float, actions: FrozenSet[str],
+                 steps: float, rotations: int, simulation: Optional[SimulationState] = None):
+        self.x = x
+        self.y = y
+        self.angle = angle
+        self.actions = actions
+        self.steps = steps
+        self.rotations = rotations
+        self.simulation = simulation
+
+    @classmethod
+    def from_simulation(cls, simulation: SimulationState) -> "PlayerOutcome":
+        """Estado del jugador según la simulación de su traza de comandos"""
+        return cls(
+            simulation.x, simulation.y, simulation.angle, frozenset(simulation.actions_executed),
+            simulation.steps_moved, simulation.rotations_made, simulation
+        )
+
+
+# Una regla retorna (cumplida, texto del objetivo)
+Rule = Callable[[PlayerOutcome], Tuple[bool, str]]
+
+
+@dataclass(frozen=True, slots=True)
+class LevelSpec:
+    """Nivel compilado: reglas y geometría listas para validar"""
+    level_id: str
+    objectives_count: int
+    rules: Tuple[Rule, ...]
+    rule_keys: Tuple[str, ...]  # clave en "validation" de cada regla
+    geometry: LevelGeometry
+    source: Dict[str, Any]  # configuración de la que se compiló
+
+
+def _number(level_id: str, key: str, value: Any, minimum: Optional[float] = None) -> float:
+    if isinstance(value, bool) or not isinstance(value, Real):
+        raise LevelDefinitionError(f"Nivel {level_id}: '{key}' debe ser numérico, no {value!r}")
+    if minimum is not None and value < minimum:
+        raise LevelDefinitionError(f"Nivel {level_id}: '{key}' debe ser >= {minimum}")
+    return value
+
+
+def _target_position_rule(level_id: str, target: Any) -> Rule:
+    if not isinstance(target, dict):
+        raise LevelDefinitionError(f"Nivel {level_id}: 'targetPosition' debe ser un objeto")
+    target_x = _number(level_id, "targetPosition.x", target.get("x", 0))
+    target_y = _number(level_id, "targetPosition.y", target.get("y", 0))
+    tolerance = _number(level_id, "targetPosition.tolerance", target.get("tolerance", 50), 0)
+    tolerance_sq = tolerance * tolerance
+
+    def rule(outcome: PlayerOutcome) -> Tuple[bool, str]:
+        dx = outcome.x - target_x
+        dy = outcome.y - target_y
+        return dx * dx + dy * dy <= tolerance_sq, "Llegar al objetivo"
+    return rule
+
+
+def _min_steps_rule(level_id: str, min_steps: Any) -> Rule:
+    min_steps = _number(level_id, "minSteps", min_steps, 0)
+    done = f"Mover al menos {min_steps} pasos"
+
+    def rule(outcome: PlayerOutcome) -> Tuple[bool, str]:
+        if outcome.steps >= min_steps:
+            return True, done
+        return False, f"{done} (moviste {outcome.steps})"
+    return rule
+
+
+def _min_rotations_rule(level_id: str, min_rotations: Any) -> Rule:
+    min_rotations = _number(level_id, "minRotations", min_rotations, 0)
+    done = f"Realizar al menos {min_rotations} rotaciones"
+
+    def rule(outcome: PlayerOutcome) -> Tuple[bool, str]:
+        if outcome.rotations >= min_rotations:
+            return True, done
+        return False, f"{done} (hiciste {outcome.rotations})"
+    return rule
+
+
+def _required_rotation_rule(level_id: str, required_rotation: Any) -> Rule:
+    required_rotation = _number(level_id, "requiredRotation", required_rotation)
+    required_mod = required_rotation % 360
+    done = f"Girar {required_rotation} grados"
+
+    def rule(outcome: PlayerOutcome) -> Tuple[bool, str]:
+        # Tolerancia de 10 grados, comparando módulo 360
+        angle_diff = abs((outcome.angle % 360) - required_mod)
+        if angle_diff < 10 or angle_diff > 350:
+            return True, done
+        return False, f"{done} (estás en {outcome.angle:.0f}°)"
+    return rule
+
+
+def _required_actions_rule(level_id: str, required_actions: Any) -> Rule:
+    if not isinstance(required_actions, list) or not all(isinstance(a, str) for a in required_actions):
+        raise LevelDefinitionError(f"Nivel {level_id}: 'requiredActions' debe ser una lista de nombres")
+    ordered = tuple(required_actions)
+    required = frozenset(ordered)
+    done = "Usar las acciones requeridas"
+
+    def rule(outcome: PlayerOutcome) -> Tuple[bool, str]:
+        if required <= outcome.actions:
+            return True, done
+        missing = [action for action in ordered if action not in outcome.actions]
+        return False, f"{done}: faltan {', '.join(missing)}"
+    return rule
+
+
+def _requires_loop_rule(level_id: str, enabled: Any) -> Rule:
+    # Sin acceso al código, se asume que movió mucho porque usó un bucle
+    def rule(outcome: PlayerOutcome) -> Tuple[bool, str]:
+        return outcome.steps >= 8, "Usar un bucle para repetir acciones"
+    return rule
+
+
+def _reach_goal_rule(level_id: str, enabled: Any) -> Rule:
+    def rule(outcome: PlayerOutcome) -> Tuple[bool, str]:
+        simulation = outcome.simulation
+        return simulation is not None and simulation.goal_reached, "Recolectar el premio final"
+    return rule
+
+
+def _collect_all_maize_rule(level_id: str, enabled: Any, geometry: LevelGeometry) -> Rule:
+    total = len(geometry.maize)
+    done = "Recolectar todo el maíz"
+
+    def rule(outcome: PlayerOutcome) -> Tuple[bool, str]:
+        if outcome.simulation is None:
+            return False, done
+        missing = total - bin(outcome.simulation.maize_mask).count("1")
+        return (True, done) if missing == 0 else (False, f"{done} (faltan {missing})")
+    return rule
+
+
+def _stay_on_path_rule(level_id: str, enabled: Any) -> Rule:
+    done = "Seguir el camino"
+
+    def rule(outcome: PlayerOutcome) -> Tuple[bool, str]:
+        if outcome.simulation is None:
+            return False, done
+        off_path = outcome.simulation.off_path_cells
+        if not off_path:
+            return True, done
+        grid_x, grid_y = off_path[0]
+        return False, f"{done} (saliste en la celda {grid_x}, {grid_y})"
+    return rule
+
+
+# Reglas en el orden en que se reportan los objetivos
+_RULE_BUILDERS: Tuple[Tuple[str, Callable[..., Rule], bool], ...] = (
+    # (clave en "validation", constructor, ¿es un flag booleano?)
+    ("targetPosition", _target_position_rule, False),
+    ("minSteps", _min_steps_rule, False),
+    ("minRotations", _min_rotations_rule, False),
+    ("requiredRotation", _required_rotation_rule, False),
+    ("requiredActions", _required_actions_rule, False),
+    ("requiresLoop", _requires_loop_rule, True),
+    ("reachGoal", _reach_goal_rule, True),
+    ("collectAllMaize", _collect_all_maize_rule, True),
+    ("stayOnPath", _stay_on_path_rule, True),
+)
+_KNOWN_RULES = frozenset(key for key, _, _ in _RULE_BUILDERS)
+
+# Reglas que, una vez incumplidas durante la simulación, ya no pueden
+# cumplirse con más comandos (las celdas fuera del camino solo se acumulan)
+IRREVERSIBLE_RULES = frozenset({"stayOnPath"})
+
+
+def compile_level(level: Dict[str, Any]) -> LevelSpec:
+    """
+    Compila la configuración de un nivel.
+
+    Args:
+        level: Configuración del nivel (como en data/levels)
+
+    Returns:
+        Nivel compilado
+
+    Raises:
+        LevelDefinitionError: Si la definición del nivel es inválida
+    """
+    level_id = level.get("id")
+    if not isinstance(level_id, str):
+        raise LevelDefinitionError(f"Nivel sin 'id' válido: {level_id!r}")
+    validation = level.get("validation", {})
+    if not isinstance(validation, dict):
+        raise LevelDefinitionError(f"Nivel {level_id}: 'validation' debe ser un objeto")
+    unknown = set(validation) - _KNOWN_RULES
+    if unknown:
+        raise LevelDefinitionError(f"Nivel {level_id}: reglas desconocidas {sorted(unknown)}")
+
+    try:
+        geometry = LevelGeometry.from_level(level)
+    except (KeyError, TypeError, ValueError) as e:
+        raise LevelDefinitionError(f"Nivel {level_id}: posiciones inválidas ({e})")
+
+    rules = []
+    rule_keys = []
+    for key, builder, is_flag in _RULE_BUILDERS:
+        value = validation.get(key)
+        if value is None:
+            continue
+        if is_flag:
+            if not isinstance(value, bool):
+                raise LevelDefinitionError(f"Nivel {level_id}: '{key}' debe ser true o false")
+            if not value:
+                continue
+        # Los valores en cero se ignoran, como antes de compilar las reglas
+        if key in ("minSteps", "minRotations") and value == 0:
+            continue
+        if key == "requiredActions" and value == []:
+            continue
+        if key == "collectAllMaize":
+            rules.append(builder(level_id, value, geometry))
+        else:
+            rules.append(builder(level_id, value))
+        rule_keys.append(key)
+
+    return LevelSpec(
+        level_id=level_id,
+        objectives_count=len(level.get("objectives", [])),
+        rules=tuple(rules),
+        rule_keys=tuple(rule_keys),
+        geometry=geometry,
+        source=level,
+    )
+
+
+class LevelSpecRegistry:
+    """
+    Niveles compilados, recompilados solo si cambia su configuración.
+
+    La solución óptima de cada nivel (ver level_solver) es cara de buscar:
+    se calcula una sola vez por versión de la configuración, fuera del
+    event loop, y se guarda junto al nivel compilado.
+    """
+
+    def __init__(self):
+        self._specs: Dict[str, LevelSpec] = {}
+        # level_id -> (configuración de la que se calculó, óptimo)
+        self._optima: Dict[str, Tuple[Dict[str, Any], Optional[LevelOptimum]]] = {}
+        self._lock = Lock()
+        self._solve_lock = Lock()
+
+    def compile_all(self, levels: Dict[str, Dict[str, Any]]) -> None:
+        """Compila todos los niveles (al iniciar); falla si alguno es inválido"""
+        specs = {level_id: compile_level(level) for level_id, level in levels.items()}
+        with self._lock:
+            self._specs = specs
+
+    def get(self, level: Dict[str, Any]) -> LevelSpec:
+        """Retorna el nivel compilado, compilándolo si su configuración cambió"""
+        spec = self._specs.get(level.get("id"))
+        if spec is not None and spec.source is level:
+            return spec
+        return self.compile(level)
+
+    def compile(self, level: Dict[str, Any]) -> LevelSpec:
+        """
+        Compila un nivel y reemplaza la versión guardada.
+
+        Raises:
+            LevelDefinitionError: Si la definición del nivel es inválida
+        """
+        spec = compile_level(level)
+        with self._lock:
+            self._specs[spec.level_id] = spec
+        return spec
+
+    def cached_optimum(self, spec: LevelSpec) -> Tuple[bool, Optional[LevelOptimum]]:
+        """(calculado, óptimo) para la versión del nivel compilado, sin calcularlo"""
+        cached = self._optima.get(spec.level_id)
+        if cached is not None and cached[0] is spec.source:
+            return True, cached[1]
+        return False, None
+
+    def optimum(self, spec: LevelSpec) -> Optional[LevelOptimum]:
+        """
+        Mínimos de comandos y pasos del nivel (None si no hay solución en el
+        grid), buscándolos la primera vez. Bloquea: desde el event loop usar
+        optimum_async.
+        """
+        found, optimum = self.cached_optimum(spec)
+        if found:
+            return optimum
+        # Una sola búsqueda a la vez: quien llega después usa el resultado
+        with self._solve_lock:
+            found, optimum = self.cached_optimum(spec)
+            if not found:
+                optimum = solve_level(spec.source, spec.geometry)
+                self._optima[spec.level_id] = (spec.source, optimum)
+        return optimum
+
+    async def optimum_async(self, spec: LevelSpec) -> Optional[LevelOptimum]:
+        """Igual que optimum(), pero la búsqueda corre en el executor por defecto"""
+        found, optimum = self.cached_optimum(spec)
+        if found:
+            return optimum
+        return await asyncio.get_running_loop().run_in_executor(None, self.optimum, spec)
+
+    def invalidate(self, level_id: Optional[str] = None) -> None:
+        """Descarta un nivel compilado y su óptimo (o todos)"""
+        with self._lock:
+            if level_id is None:
+                self._specs.clear()
+                self._optima.clear()
+            else:
+                self._specs.pop(level_id, None)
+                self._optima.pop(level_id, None)
+
+
+# Registro compartido por la aplicación
+level_specs = LevelSpecRegistry()
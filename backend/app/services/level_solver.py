@@ -0,0 +1,245 @@
+"""
+Solución óptima de cada nivel, calculada una vez al compilarlo.
+
+Busca con A* sobre estados (celda, orientación, contadores de las reglas)
+usando solo los comandos de FUNCTIONS_DEFINITION que mueven por el grid
+(moveForward) o rotan (turnRight, turnLeft, turn, faceDirection), con la
+misma semántica que MovementSimulator. El resultado permite medir qué tan
+eficiente fue la solución de un jugador sin buscar en cada request.
+"""
+import heapq
+import math
+from itertools import count
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+from app.constants import FUNCTIONS_DEFINITION
+from app.logger import setup_logger
+from app.services.grid_index import GOAL, MAIZE, PATH, Cell, pixel_to_grid
+from app.services.movement_simulator import LevelGeometry
+
+logger = setup_logger(__name__)
+
+# Orientaciones en el orden de los ángulos 0°, 90°, 180°, -90° (Este, Sur, Oeste, Norte)
+_DIRECTIONS: Tuple[Cell, ...] = ((1, 0), (0, 1), (-1, 0), (0, -1))
+_ROTATION_COMMANDS = ("turnRight", "turnLeft", "turn", "faceDirection")
+_KNOWN_FUNCTIONS = frozenset(
+    function["name"] for category in FUNCTIONS_DEFINITION.values() for function in category["list"]
+)
+# Celdas alrededor del nivel donde se permite buscar (el grid no tiene bordes)
+SEARCH_MARGIN = 1
+MAX_STATES = 200_000
+
+
+class LevelOptimum(NamedTuple):
+    """Mínimos de una solución válida del nivel"""
+    commands: int  # comandos ejecutados (un moveForward(n) cuenta como uno)
+    steps: int  # pasos de moveForward
+
+
+def _heading(angle: float) -> int:
+    """Orientación de un ángulo según las mismas franjas que moveForward"""
+    angle = -180 + ((angle + 180) % 360)
+    if -45 <= angle < 45:
+        return 0
+    if 45 <= angle < 135:
+        return 1
+    if angle >= 135 or angle < -135:
+        return 2
+    return 3
+
+
+def available_commands(level: Dict[str, Any]) -> FrozenSet[str]:
+    """Comandos de FUNCTIONS_DEFINITION habilitados en el nivel (todos si no los restringe)"""
+    declared = level.get("availableFunctions")
+    if not isinstance(declared, dict):
+        return _KNOWN_FUNCTIONS
+    names = {
+        signature.split("(", 1)[0].strip()
+        for signatures in declared.values() if isinstance(signatures, list)
+        for signature in signatures if isinstance(signature, str)
+    }
+    return frozenset(names) & _KNOWN_FUNCTIONS
+
+
+class _Problem:
+    """Restricciones de un nivel traducidas al grid"""
+
+    def __init__(self, level: Dict[str, Any], geometry: LevelGeometry):
+        validation = level.get("validation") or {}
+        commands = available_commands(level)
+        self.geometry = geometry
+        self.index = geometry.index
+        self.can_move = "moveForward" in commands
+        self.rotations = tuple(name for name in _ROTATION_COMMANDS if name in commands)
+
+        min_steps = validation.get("minSteps") or 0
+        if validation.get("requiresLoop"):
+            min_steps = max(min_steps, 8)
+        self.min_steps = math.ceil(min_steps)
+        self.min_rotations = math.ceil(validation.get("minRotations") or 0)
+        self.reach_goal = bool(validation.get("reachGoal")) and geometry.goal is not None
+        self.stay_on_path = bool(validation.get("stayOnPath")) and bool(geometry.path)
+        # Máscara del maíz a recolectar, con los bits de GridIndex
+        self.all_maize = self.index.all_maize if validation.get("collectAllMaize") else 0
+
+        # Acciones requeridas: las que el grid no produce cuestan un comando cada una
+        required = list(dict.fromkeys(validation.get("requiredActions") or []))
+        self.required = tuple(name for name in required if name == "moveForward" or name in self.rotations)
+        self.extra_commands = len(required) - len(self.required)
+        self.all_actions = (1 << len(self.required)) - 1
+
+        self.heading: Optional[int] = None
+        required_rotation = validation.get("requiredRotation")
+        if required_rotation is not None:
+            self.heading = _heading(required_rotation)
+            if required_rotation % 90:
+                self.extra_commands += 1  # un giro final para dejar el ángulo exacto
+
+        cells = [geometry.start, *geometry.path, *geometry.maize]
+        if geometry.goal is not None:
+            cells.append(geometry.goal)
+        target = validation.get("targetPosition")
+        if target:
+            target_x, target_y = target.get("x", 0), target.get("y", 0)
+            reach = math.ceil(target.get("tolerance", 50) / 60) + 1
+            center_x, center_y = pixel_to_grid(target_x, target_y)
+            cells += [(center_x - reach, center_y - reach), (center_x + reach, center_y + reach)]
+        self.min_x = min(x for x, _ in cells) - SEARCH_MARGIN
+        self.max_x = max(x for x, _ in cells) + SEARCH_MARGIN
+        self.min_y = min(y for _, y in cells) - SEARCH_MARGIN
+        self.max_y = max(y for _, y in cells) + SEARCH_MARGIN
+
+        self.targets: Optional[FrozenSet[Cell]] = None
+        if target:
+            tolerance_sq = target.get("tolerance", 50) ** 2
+            self.targets = frozenset(
+                (x, y)
+                for x in range(self.min_x, self.max_x + 1)
+                for y in range(self.min_y, self.max_y + 1)
+                if (self.index.to_pixel(x, y)[0] - target_x) ** 2
+                + (self.index.to_pixel(x, y)[1] - target_y) ** 2 <= tolerance_sq
+            )
+        # Distancia de cada celda al objetivo más cercano, para la heurística de A*
+        self._target_distance: Dict[Cell, int] = {}
+        if self.targets:
+            self._target_distance = {
+                (x, y): min(abs(x - tx) + abs(y - ty) for tx, ty in self.targets)
+                for x in range(self.min_x, self.max_x + 1)
+                for y in range(self.min_y, self.max_y + 1)
+            }
+
+    def in_bounds(self, cell: Cell) -> bool:
+        return self.min_x <= cell[0] <= self.max_x and self.min_y <= cell[1] <= self.max_y
+
+    def distance(self, cell: Cell, goal_reached: bool) -> int:
+        """Cota inferior de los pasos que faltan para las reglas de posición"""
+        x, y = cell
+        bound = self._target_distance.get(cell, 0)
+        if self.reach_goal and not goal_reached:
+            goal_x, goal_y = self.geometry.goal
+            bound = max(bound, abs(x - goal_x) + abs(y - goal_y))
+        return bound
+
+    def solved(self, state: Tuple) -> bool:
+        cell, heading, steps, rotations, actions, maize, goal_reached = state
+        return (
+            (self.targets is None or cell in self.targets)
+            and (not self.reach_goal or goal_reached)
+            and maize & self.all_maize == self.all_maize
+            and steps >= self.min_steps
+            and rotations >= self.min_rotations
+            and actions == self.all_actions
+            and (self.heading is None or heading == self.heading)
+        )
+
+    def rotation_marks(self, actions: int) -> List[int]:
+        """Acciones marcadas tras un giro: una variante por giro requerido y una genérica"""
+        marks = {actions | (1 << self.required.index(name)) for name in self.rotations if name in self.required}
+        if any(name not in self.required for name in self.rotations):
+            marks.add(actions)
+        return list(marks)
+
+    def successors(self, state: Tuple) -> List[Tuple[Tuple, int]]:
+        """Estados alcanzables con un comando, con los pasos que cuesta cada uno"""
+        cell, heading, steps, rotations, actions, maize, goal_reached = state
+        result = []
+        rotated = min(rotations + 1, self.min_rotations)
+        for marked in self.rotation_marks(actions):
+            # Todos los giros aceptan grados (o dirección), incluido quedar igual: rotaciones extra
+            for new_heading in range(4):
+                result.append(((cell, new_heading, steps, rotated, marked, maize, goal_reached), 0))
+        if not self.can_move:
+            return result
+
+        if "moveForward" in self.required:
+            actions |= 1 << self.required.index("moveForward")
+        index = self.index
+        dx, dy = _DIRECTIONS[heading]
+        x, y = cell
+        for n in range(1, max(self.max_x - self.min_x, self.max_y - self.min_y) + 1):
+            x, y = x + dx, y + dy
+            if not self.in_bounds((x, y)):
+                break
+            flags = index.flags(x, y)
+            if self.stay_on_path and not flags & PATH:
+                break
+            if flags & MAIZE:
+                maize |= index.maize_bit(x, y) & self.all_maize
+            if flags & GOAL:
+                goal_reached = True
+            moved = min(steps + n, self.min_steps)
+            result.append((((x, y), heading, moved, rotations, actions, maize, goal_reached), n))
+        return result
+
+
+def _search(problem: _Problem, by_steps: bool) -> Optional[Tuple[int, int]]:
+    """
+    A* con costo lexicográfico: (pasos, comandos) si `by_steps`, si no
+    (comandos, pasos). Retorna (comandos, pasos) o None si no hay solución.
+    """
+    geometry = problem.geometry
+    start = (geometry.start, 0, 0, 0, 0, 0, geometry.start == geometry.goal)
+    best: Dict[Tuple, Tuple[int, int]] = {start: (0, 0)}
+    tie = count()
+    queue = [(0, 0, 0, next(tie), start)]
+    while queue:
+        _, primary, secondary, _, state = heapq.heappop(queue)
+        if best.get(state, (primary, secondary)) < (primary, secondary):
+            continue
+        if problem.solved(state):
+            return (secondary, primary) if by_steps else (primary, secondary)
+        if len(best) > MAX_STATES:
+            return None
+        for successor, moved in problem.successors(state):
+            if by_steps:
+                cost = (primary + moved, secondary + 1)
+                estimate = problem.distance(successor[0], successor[6])
+            else:
+                cost = (primary + 1, secondary + moved)
+                # Falta al menos un avance si no está en posición, y un giro por rotación pendiente
+                estimate = (problem.distance(successor[0], successor[6]) > 0) + problem.min_rotations - successor[3]
+            if cost < best.get(successor, (math.inf, math.inf)):
+                best[successor] = cost
+                heapq.heappush(queue, (cost[0] + estimate, cost[0], cost[1], next(tie), successor))
+    return None
+
+
+def solve_level(level: Dict[str, Any], geometry: LevelGeometry) -> Optional[LevelOptimum]:
+    """
+    Mínimo de comandos y mínimo de pasos (cada uno por separado) de una
+    solución que cumple las reglas de `validation` del nivel.
+
+    Los movimientos libres en píxeles (moveBackward, moveTo, ...) no se
+    consideran, y las acciones requeridas que no mueven por el grid (p. ej.
+    jump) se suman como un comando cada una.
+
+    Returns:
+        Los mínimos, o None si el nivel no tiene solución en el grid o la
+        búsqueda excede MAX_STATES estados
+    """
+    problem = _Problem(level, geometry)
+    fewest_commands = _search(problem, by_steps=False)
+    fewest_steps = _search(problem, by_steps=True)
+    if fewest_commands is None or fewest_steps is None:
+        logger.warning("Sin solución óptima para el nivel %s", level.get("id"))
+        return None
+    return LevelOptimum(fewest_commands[0] + problem.extra_commands, fewest_steps[1])
@@ -0,0 +1,115 @@
+"""
+Resúmenes precalculados de los niveles para el listado paginado
+"""
+import base64
+import binascii
+from bisect import bisect_right
+from threading import Lock
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from app.services.data_provider import DataProvider
+
+# Campos disponibles en un resumen ("id" siempre se incluye)
+SUMMARY_FIELDS = ("id", "title", "description", "character", "objectiveCount")
+
+
+def summarize_level(level: Dict[str, Any]) -> Dict[str, Any]:
+    """Resumen liviano de un nivel (sin path, maizePositions ni initialCode)"""
+    return {
+        "id": level["id"],
+        "title": level.get("title", ""),
+        "description": level.get("description", ""),
+        "character": level.get("character"),
+        "objectiveCount": len(level.get("objectives", [])),
+    }
+
+
+def encode_cursor(level_id: str) -> str:
+    """Cursor opaco que apunta al último nivel entregado"""
+    return base64.urlsafe_b64encode(level_id.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+    """Retorna el id del nivel del cursor; lanza ValueError si es inválido"""
+    try:
+        return base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+    except (binascii.Error, UnicodeDecodeError) as e:
+        raise ValueError(f"Cursor inválido: {cursor}") from e
+
+
+class LevelSummaries:
+    """
+    Listado de resúmenes en el orden del catálogo.
+
+    Los resúmenes, la posición de cada id y las posiciones por personaje se
+    calculan una vez; cada página es una búsqueda binaria más un slice.
+    `invalidate` los descarta cuando cambia algún nivel.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        # (resúmenes, posición por id, posiciones por personaje), reemplazados juntos
+        self._snapshot: Optional[Tuple[List[Dict[str, Any]], Dict[str, int], Dict[str, List[int]]]] = None
+
+    def _build(self) -> Tuple[List[Dict[str, Any]], Dict[str, int], Dict[str, List[int]]]:
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+        with self._lock:
+            if self._snapshot is None:
+                summaries = [summarize_level(level) for level in DataProvider.get_all_levels().values()]
+                by_character: Dict[str, List[int]] = {}
+                for position, summary in enumerate(summaries):
+                    by_character.setdefault(summary["character"], []).append(position)
+                positions = {summary["id"]: position for position, summary in enumerate(summaries)}
+                self._snapshot = (summaries, positions, by_character)
+            return self._snapshot
+
+    def page(self, limit: int, cursor: Optional[str] = None, character: Optional[str] = None,
+             fields: Optional[Sequence[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str], int]:
+        """
+        Retorna una página de resúmenes.
+
+        Args:
+            limit: Máximo de niveles en la página
+            cursor: Cursor de la página anterior (None para la primera)
+            character: Filtrar por personaje
+            fields: Campos a incluir (None para todos)
+
+        Returns:
+            Tupla (resúmenes, cursor de la siguiente página o None, total con el filtro)
+
+        Raises:
+            ValueError: Si el cursor no corresponde a ningún nivel
+        """
+        summaries, position_by_id, by_character = self._build()
+        if character is None:
+            positions: Sequence[int] = range(len(summaries))
+        else:
+            positions = by_character.get(character, [])
+
+        start = 0
+        if cursor is not None:
+            last = position_by_id.get(decode_cursor(cursor))
+            if last is None:
+                raise ValueError(f"Cursor inválido: {cursor}")
+            start = bisect_right(positions, last)
+
+        selected = [summaries[position] for position in positions[start:start + limit]]
+        if fields is not None:
+            selected = [{field: summary[field] for field in fields} for summary in selected]
+        has_more = start + limit < len(positions)
+        next_cursor = encode_cursor(selected[-1]["id"]) if has_more and selected else None
+        return selected, next_cursor, len(positions)
+
+    def warm_up(self) -> None:
+        """Calcula los resúmenes por adelantado"""
+        self._build()
+
+    def invalidate(self) -> None:
+        """Descarta los resúmenes para recalcularlos en el próximo acceso"""
+        with self._lock:
+            self._snapshot = None
+
+
+# Resúmenes compartidos por la aplicación
+level_summaries = LevelSummaries()
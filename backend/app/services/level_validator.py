@@ -1,23 +1,44 @@
 """
 Servicio para validar si un nivel ha sido completado
 """
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, NamedTuple, Optional, Sequence, Tuple
 from app.services.data_provider import DataProvider
+from app.services.level_rules import LevelSpec, PlayerOutcome, level_specs
+from app.services.level_solver import LevelOptimum
+from app.services.movement_simulator import MovementSimulator
 from app.logger import setup_logger
 
 logger = setup_logger(__name__)
 
 
+class LevelResult(NamedTuple):
+    """Resultado de validar un nivel, con los pasos y rotaciones evaluados"""
+    completed: bool
+    message: str
+    objectives_completed: List[str]
+    objectives_pending: List[str]
+    steps: float
+    rotations: int
+    efficiency: Optional[float] = None  # solo si se completó (ver efficiency_score)
+
+
 class LevelValidator:
     """Servicio para validar si los objetivos de un nivel fueron completados"""
     
     @staticmethod
     def validate_level(level_id: str, player_position: Dict[str, float], 
                       player_angle: float, actions_executed: List[str],
-                      steps_moved: int = 0, rotations_made: int = 0) -> Tuple[bool, str, List[str], List[str]]:
+                      steps_moved: int = 0, rotations_made: int = 0,
+                      commands: Optional[List[Tuple[str, Sequence[Any]]]] = None) -> Tuple[bool, str, List[str], List[str]]:
         """
         Valida si un nivel fue completado basado en los objetivos.
         
+        Las reglas del nivel se compilan una sola vez (ver level_rules) y aquí
+        solo se evalúan en orden.
+        
+        Si se recibe la traza de comandos, el recorrido se simula en el servidor
+        y la posición, ángulo, acciones, pasos y rotaciones reportados se ignoran.
+        
         Args:
             level_id: ID del nivel
             player_position: Posición final del jugador {"x": float, "y": float}
@@ -25,6 +46,7 @@ class LevelValidator:
             actions_executed: Lista de acciones ejecutadas
             steps_moved: Número de pasos movidos
             rotations_made: Número de rotaciones realizadas
+            commands: Traza opcional de comandos (nombre, argumentos)
             
         Returns:
             Tupla (completado, mensaje, objetivos_completados, objetivos_pendientes)
@@ -32,90 +54,110 @@ class LevelValidator:
         level = DataProvider.get_level(level_id)
         if not level:
             return False, "Nivel no encontrado", [], []
+        result = LevelValidator._check_rules(
+            level_specs.get(level), player_position, player_angle, actions_executed,
+            steps_moved, rotations_made, commands
+        )
+        return result.completed, result.message, result.objectives_completed, result.objectives_pending
+    
+    @staticmethod
+    def evaluate(level_id: str, player_position: Dict[str, float],
+                 player_angle: float, actions_executed: List[str],
+                 steps_moved: int = 0, rotations_made: int = 0,
+                 commands: Optional[List[Tuple[str, Sequence[Any]]]] = None) -> Optional[LevelResult]:
+        """
+        Igual que validate_level, pero retorna el resultado completo (con los
+        pasos y rotaciones simulados o reportados), o None si el nivel no existe.
         
-        validation_rules = level.get("validation", {})
-        objectives = level.get("objectives", [])
+        Si el nivel se completó y su óptimo aún no se calculó, la búsqueda
+        bloquea; desde el event loop usar evaluate_async.
+        """
+        level = DataProvider.get_level(level_id)
+        if not level:
+            return None
+        spec = level_specs.get(level)
+        result = LevelValidator._check_rules(
+            spec, player_position, player_angle, actions_executed, steps_moved, rotations_made, commands
+        )
+        if not result.completed:
+            return result
+        return LevelValidator._with_efficiency(result, level_specs.optimum(spec), commands)
+    
+    @staticmethod
+    async def evaluate_async(level_id: str, player_position: Dict[str, float],
+                             player_angle: float, actions_executed: List[str],
+                             steps_moved: int = 0, rotations_made: int = 0,
+                             commands: Optional[List[Tuple[str, Sequence[Any]]]] = None) -> Optional[LevelResult]:
+        """Igual que evaluate, pero el óptimo del nivel se busca fuera del event loop"""
+        level = DataProvider.get_level(level_id)
+        if not level:
+            return None
+        spec = level_specs.get(level)
+        result = LevelValidator._check_rules(
+            spec, player_position, player_angle, actions_executed, steps_moved, rotations_made, commands
+        )
+        if not result.completed:
+            return result
+        return LevelValidator._with_efficiency(result, await level_specs.optimum_async(spec), commands)
+    
+    @staticmethod
+    def _check_rules(spec: LevelSpec, player_position: Dict[str, float],
+                     player_angle: float, actions_executed: List[str],
+                     steps_moved: int, rotations_made: int,
+                     commands: Optional[List[Tuple[str, Sequence[Any]]]]) -> LevelResult:
+        """Evalúa las reglas del nivel compilado (sin eficiencia)"""
+        if commands is not None:
+            outcome = PlayerOutcome.from_simulation(MovementSimulator(spec.geometry).run(commands))
+        else:
+            outcome = PlayerOutcome(
+                player_position.get("x", 0), player_position.get("y", 0), player_angle,
+                frozenset(actions_executed), steps_moved, rotations_made
+            )
         
         completed_objectives = []
         pending_objectives = []
-        all_completed = True
-        
-        # Validar posición objetivo
-        target_pos = validation_rules.get("targetPosition")
-        if target_pos:
-            target_x = target_pos.get("x", 0)
-            target_y = target_pos.get("y", 0)
-            tolerance = target_pos.get("tolerance", 50)
-            
-            player_x = player_position.get("x", 0)
-            player_y = player_position.get("y", 0)
-            
-            distance = ((player_x - target_x) ** 2 + (player_y - target_y) ** 2) ** 0.5
-            
-            if distance <= tolerance:
-                completed_objectives.append("Llegar al objetivo")
+        for rule in spec.rules:
+            passed, objective = rule(outcome)
+            if passed:
+                completed_objectives.append(objective)
             else:
-                pending_objectives.append("Llegar al objetivo")
-                all_completed = False
-        
-        # Validar número mínimo de pasos
-        min_steps = validation_rules.get("minSteps", 0)
-        if min_steps > 0:
-            if steps_moved >= min_steps:
-                completed_objectives.append(f"Mover al menos {min_steps} pasos")
-            else:
-                pending_objectives.append(f"Mover al menos {min_steps} pasos (moviste {steps_moved})")
-                all_completed = False
-        
-        # Validar rotaciones mínimas
-        min_rotations = validation_rules.get("minRotations", 0)
-        if min_rotations > 0:
-            if rotations_made >= min_rotations:
-                completed_objectives.append(f"Realizar al menos {min_rotations} rotaciones")
-            else:
-                pending_objectives.append(f"Realizar al menos {min_rotations} rotaciones (hiciste {rotations_made})")
-                all_completed = False
-        
-        # Validar rotación requerida
-        required_rotation = validation_rules.get("requiredRotation")
-        if required_rotation is not None:
-            # Verificar si el ángulo está cerca del requerido (módulo 360)
-            angle_diff = abs((player_angle % 360) - (required_rotation % 360))
-            if angle_diff < 10 or angle_diff > 350:  # Tolerancia de 10 grados
-                completed_objectives.append(f"Girar {required_rotation} grados")
-            else:
-                pending_objectives.append(f"Girar {required_rotation} grados (estás en {player_angle:.0f}°)")
-                all_completed = False
-        
-        # Validar acciones requeridas
-        required_actions = validation_rules.get("requiredActions", [])
-        if required_actions:
-            missing_actions = [action for action in required_actions if action not in actions_executed]
-            if not missing_actions:
-                completed_objectives.append("Usar las acciones requeridas")
-            else:
-                pending_objectives.append(f"Usar las acciones requeridas: faltan {', '.join(missing_actions)}")
-                all_completed = False
-        
-        # Validar uso de bucles (nivel 3)
-        requires_loop = validation_rules.get("requiresLoop", False)
-        if requires_loop:
-            # Verificar si el código contiene palabras clave de bucles
-            # Esto se validaría mejor en el código, pero por ahora verificamos si hay múltiples movimientos
-            if steps_moved >= 8:  # Si movió mucho, probablemente usó un bucle
-                completed_objectives.append("Usar un bucle para repetir acciones")
-            else:
-                pending_objectives.append("Usar un bucle para repetir acciones")
-                all_completed = False
-        
-        # Mensaje final
+                pending_objectives.append(objective)
+        all_completed = not pending_objectives
+        message = LevelValidator.result_message(all_completed, len(completed_objectives), spec.objectives_count)
+        return LevelResult(
+            all_completed, message, completed_objectives, pending_objectives,
+            outcome.steps, outcome.rotations
+        )
+    
+    @staticmethod
+    def _with_efficiency(result: LevelResult, optimum: Optional[LevelOptimum],
+                         commands: Optional[List[Tuple[str, Sequence[Any]]]]) -> LevelResult:
+        if optimum is None:
+            return result
+        efficiency = LevelValidator.efficiency_score(
+            optimum, result.steps, len(commands) if commands is not None else None
+        )
+        return result._replace(efficiency=efficiency)
+    
+    @staticmethod
+    def efficiency_score(optimum: LevelOptimum, steps: float, commands: Optional[int] = None) -> float:
+        """
+        Qué tan cerca está una solución de la óptima precalculada del nivel,
+        entre 0 y 1: el promedio de pasos óptimos / pasos y comandos óptimos /
+        comandos ejecutados (solo pasos si no hay traza de comandos).
+        """
+        ratios = [optimum.steps / steps if steps > optimum.steps else 1.0]
+        if commands is not None:
+            ratios.append(optimum.commands / commands if commands > optimum.commands else 1.0)
+        return round(sum(ratios) / len(ratios), 3)
+    
+    @staticmethod
+    def result_message(all_completed: bool, completed_count: int, objectives_count: int) -> str:
+        """Mensaje final para el jugador según los objetivos cumplidos"""
         if all_completed:
-            message = "¡Felicidades! Has completado todos los objetivos del nivel."
-        elif completed_objectives:
-            message = f"Buen progreso. Completaste {len(completed_objectives)} de {len(objectives)} objetivos."
-        else:
-            message = "Intenta nuevamente. Revisa los objetivos del nivel."
-        
-        return all_completed, message, completed_objectives, pending_objectives
+            return "¡Felicidades! Has completado todos los objetivos del nivel."
+        if completed_count:
+            return f"Buen progreso. Completaste {completed_count} de {objectives_count} objetivos."
+        return "Intenta nuevamente. Revisa los objetivos del nivel."
 
 
@@ -0,0 +1,201 @@
+"""
+Validación en vivo mientras se escribe: el editor envía ediciones por
+WebSocket y el servidor valida solo la última versión del programa
+"""
+import asyncio
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from app.config import LIVE_VALIDATION_DEBOUNCE, LIVE_VALIDATION_MAX_DELAY, LIVE_VALIDATION_MAX_CODE
+from app.services.code_validator import CodeValidator
+
+ValidationResult = Tuple[bool, Optional[str], Optional[str]]
+
+# "mensaje (línea 3, columna 7)" (patrones peligrosos y verificador en Python)
+_POSITION_SUFFIX = re.compile(r"^(?P<message>.*?) \(línea (?P<line>\d+), columna (?P<column>\d+)\)")
+# "tu código:3:7\n...\nSyntaxError: mensaje" (formato de Node.js)
+_NODE_LOCATION = re.compile(r"^tu código:(?P<line>\d+)(?::(?P<column>\d+))?")
+
+
+class EditError(ValueError):
+    """Edición que no se puede aplicar; el cliente debe reenviar el código completo"""
+
+
+def parse_diagnostics(error_msg: Optional[str]) -> List[Dict[str, Any]]:
+    """Convierte el mensaje de error de CodeValidator en diagnósticos con posición"""
+    if not error_msg:
+        return []
+    match = _POSITION_SUFFIX.match(error_msg)
+    if match:
+        return [{
+            "severity": "error",
+            "message": match["message"],
+            "line": int(match["line"]),
+            "column": int(match["column"]),
+        }]
+    match = _NODE_LOCATION.match(error_msg)
+    if match:
+        lines = [line for line in error_msg.splitlines() if line.strip()]
+        return [{
+            "severity": "error",
+            "message": lines[-1],
+            "line": int(match["line"]),
+            "column": int(match["column"]) if match["column"] else None,
+        }]
+    return [{"severity": "error", "message": error_msg, "line": None, "column": None}]
+
+
+class LiveDocument:
+    """Texto del programa y versión de la última edición aplicada"""
+
+    __slots__ = ("text", "version")
+
+    def __init__(self):
+        self.text = ""
+        self.version = -1
+
+    def apply(self, message: Dict[str, Any]) -> bool:
+        """
+        Aplica una edición del editor:
+            {"version": n, "code": "..."}                                   texto completo
+            {"version": n, "changes": [{"offset", "length", "text"}, ...]}  cambios de Monaco
+
+        Los offsets de `changes` se refieren al texto anterior a la edición.
+
+        Returns:
+            False si la edición es de una versión ya superada (se ignora)
+
+        Raises:
+            EditError: si la edición no tiene forma válida o no calza con el texto
+        """
+        version = message.get("version")
+        if not isinstance(version, int):
+            raise EditError("La edición debe incluir un número de versión")
+        if version <= self.version:
+            return False
+
+        if isinstance(message.get("code"), str):
+            text = message["code"]
+        elif isinstance(message.get("changes"), list):
+            text = self.text
+            try:
+                changes = sorted(
+                    ((int(change["offset"]), int(change["length"]), str(change["text"]))
+                     for change in message["changes"]),
+                    reverse=True
+                )
+            except (KeyError, TypeError, ValueError) as e:
+                raise EditError(f"Cambio inválido: {e}")
+            for offset, length, inserted in changes:
+                if offset < 0 or length < 0 or offset + length > len(text):
+                    raise EditError("El cambio no corresponde al texto actual")
+                text = text[:offset] + inserted + text[offset + length:]
+        else:
+            raise EditError("La edición debe incluir `code` o `changes`")
+
+        if len(text) > LIVE_VALIDATION_MAX_CODE:
+            raise EditError(f"El código excede {LIVE_VALIDATION_MAX_CODE} caracteres")
+        self.text = text
+        self.version = version
+        return True
+
+
+class LiveValidationSession:
+    """
+    Sesión de validación en vivo de un editor.
+
+    Las ediciones solo actualizan el documento (costo casi nulo por tecla).
+    Un bucle valida tras `debounce` segundos sin ediciones, o a lo sumo
+    `max_delay` segundos después de la primera edición pendiente, de modo que
+    una ráfaga de teclas produce una sola validación. Una validación en curso
+    que queda superada por una edición nueva se cancela y su resultado nunca
+    se envía: el cliente solo recibe diagnósticos de la última versión.
+    Antes de cada validación se llama a `acquire` (el límite de requests del
+    cliente), que retorna los segundos que hay que esperar o 0.
+    """
+
+    def __init__(self, send: Callable[[Dict[str, Any]], Awaitable[None]],
+                 debounce: float = LIVE_VALIDATION_DEBOUNCE, max_delay: float = LIVE_VALIDATION_MAX_DELAY,
+                 validate: Callable[[str], Awaitable[ValidationResult]] = CodeValidator.validate_async,
+                 acquire: Callable[[], float] = lambda: 0.0):
+        self.send = send
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.validate = validate
+        self.acquire = acquire
+        self.document = LiveDocument()
+        self.edits = 0
+        self.validations = 0
+        self.superseded = 0
+        self.throttled = 0
+        self._changed = asyncio.Event()
+        self._last_edit = 0.0
+        self._pending_since: Optional[float] = None
+        self._inflight: Optional[asyncio.Task] = None
+
+    def edit(self, message: Dict[str, Any]) -> None:
+        """
+        Registra una edición del cliente.
+
+        Raises:
+            EditError: si la edición no se pudo aplicar
+        """
+        if not self.document.apply(message):
+            return
+        self.edits += 1
+        now = asyncio.get_running_loop().time()
+        self._last_edit = now
+        if self._pending_since is None:
+            self._pending_since = now
+        if self._inflight is not None and not self._inflight.done():
+            self._inflight.cancel()
+        self._changed.set()
+
+    async def _wait_for_quiet(self) -> None:
+        """Espera `debounce` sin ediciones, sin pasar de `max_delay` desde la primera pendiente"""
+        loop = asyncio.get_running_loop()
+        while True:
+            wake = min(self._last_edit + self.debounce, self._pending_since + self.max_delay)
+            remaining = wake - loop.time()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(remaining)
+
+    async def run(self) -> None:
+        """Bucle de validación; corre hasta que se cancela"""
+        while True:
+            await self._changed.wait()
+            await self._wait_for_quiet()
+            retry_after = self.acquire()
+            if retry_after:
+                # Sin tokens: se reintenta con la versión que haya después de esperar
+                self.throttled += 1
+                await asyncio.sleep(retry_after)
+                continue
+            self._changed.clear()
+            self._pending_since = None
+
+            version, code = self.document.version, self.document.text
+            self.validations += 1
+            task = self._inflight = asyncio.ensure_future(self.validate(code))
+            try:
+                # asyncio.wait no propaga la cancelación de la tarea, solo la de run()
+                await asyncio.wait({task})
+            except asyncio.CancelledError:
+                task.cancel()
+                raise
+            finally:
+                self._inflight = None
+            if task.cancelled() or version != self.document.version:
+                self.superseded += 1
+                continue
+
+            try:
+                is_valid, _, error_msg = task.result()
+            except Exception as e:
+                is_valid, error_msg = False, f"Error al validar código: {e}"
+            await self.send({
+                "type": "diagnostics",
+                "version": version,
+                "valid": is_valid,
+                "diagnostics": [] if is_valid else parse_diagnostics(error_msg),
+            })
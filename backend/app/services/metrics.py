@@ -0,0 +1,206 @@
+"""
+Métricas en proceso con exposición en formato de texto de Prometheus
+"""
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from threading import Lock
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+# Buckets de latencia (segundos), de 1 ms a 10 s
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    @abstractmethod
+    def samples(self) -> Iterable[str]:
+        """Líneas de muestras en formato de texto de Prometheus"""
+
+
+class Counter(_Metric):
+    """Contador monótono por combinación de etiquetas"""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """Valor que sube y baja (p. ej. requests en curso)"""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}"
+
+
+class CallbackMetric(_Metric):
+    """Gauge o contador cuyo valor se lee de otro componente al exponer las métricas"""
+
+    def __init__(self, name: str, documentation: str, callback: Callable[[], float], kind: str = "gauge"):
+        super().__init__(name, documentation)
+        self.callback = callback
+        self.kind = kind
+
+    def samples(self) -> Iterable[str]:
+        yield f"{self.name} {_format_value(self.callback())}"
+
+
+class Histogram(_Metric):
+    """
+    Histograma de observaciones por combinación de etiquetas.
+
+    Cada observación es una búsqueda binaria sobre los límites y un incremento;
+    los buckets acumulados se calculan solo al exponer las métricas.
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Por etiquetas: [conteo por bucket (+Inf al final), suma]
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def samples(self) -> Iterable[str]:
+        bucket_names = self.label_names + ("le",)
+        for labels, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield f"{self.name}_bucket{_format_labels(bucket_names, labels + (_format_value(bound),))} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.label_names, labels)} {_format_value(total[0])}"
+            yield f"{self.name}_count{_format_labels(self.label_names, labels)} {cumulative}"
+
+
+class MetricsRegistry:
+    """Conjunto de métricas de la aplicación"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labels))
+
+    def callback(self, name: str, documentation: str, callback: Callable[[], float],
+                 kind: str = "gauge") -> CallbackMetric:
+        return self.register(CallbackMetric(name, documentation, callback, kind))
+
+    def histogram(self, name: str, documentation: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def render(self) -> str:
+        """Texto en formato de exposición de Prometheus (versión 0.0.4)"""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+# Registro compartido por la aplicación
+metrics = MetricsRegistry()
+
+http_requests_total = metrics.counter(
+    "codeshyri_http_requests_total", "Requests HTTP atendidas", ("method", "route", "status")
+)
+http_request_duration_seconds = metrics.histogram(
+    "codeshyri_http_request_duration_seconds", "Latencia de las requests HTTP", ("method", "route")
+)
+http_requests_in_flight = metrics.gauge(
+    "codeshyri_http_requests_in_flight", "Requests HTTP en curso"
+)
+validations_in_flight = metrics.gauge(
+    "codeshyri_validations_in_flight", "Validaciones de código en curso en el pool de hilos"
+)
+validation_outcomes_total = metrics.counter(
+    "codeshyri_validation_outcomes_total",
+    "Resultados de validación de código (valid, dangerous_pattern, syntax_error, timeout, server_error)",
+    ("outcome",)
+)
+validation_duration_seconds = metrics.histogram(
+    "codeshyri_validation_duration_seconds", "Duración de CodeValidator.validate", ("outcome",)
+)
+node_spawn_seconds = metrics.histogram(
+    "codeshyri_node_spawn_seconds", "Tiempo en iniciar un proceso Node.js", ("kind",)
+)
+node_run_seconds = metrics.histogram(
+    "codeshyri_node_run_seconds", "Tiempo de una verificación de sintaxis en Node.js", ("kind",)
+)
@@ -0,0 +1,251 @@
+"""
+Simulador determinista de los comandos de movimiento del juego.
+
+Reproduce en el servidor la semántica de MovementCommands, RotationCommands y
+ActionCommands del frontend (misma geometría de grid, mismos ángulos y mismos
+contadores que GameScene) para validar un nivel a partir de la traza de
+comandos, sin confiar en la posición que reporta el cliente.
+"""
+import math
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+from app.config import MAX_SIMULATION_STEPS
+from app.constants import DEFAULT_START_POSITION, FACE_DIRECTIONS
+from app.exceptions import ValidationError
+from app.services.grid_index import (
+    GOAL, MAIZE, PATH, Cell, GridIndex, grid_to_pixel_for_player, pixel_to_grid, water_cells
+)
+
+FREE_STEP_DISTANCE = 50  # píxeles por paso de moveBackward/moveUp/...
+SPRINT_STEP_DISTANCE = 75  # píxeles por paso de sprint
+
+
+def wrap_angle(angle: float) -> float:
+    """Normaliza un ángulo a [-180, 180), igual que Phaser.Math.Angle.WrapDegrees"""
+    return -180 + ((angle + 180) % 360)
+
+
+def _cell(position: Dict[str, Any], x_key: str = "gridX", y_key: str = "gridY") -> Cell:
+    return int(position[x_key]), int(position[y_key])
+
+
+class LevelGeometry:
+    """Celdas relevantes de un nivel y su índice en arreglo (ver GridIndex)"""
+
+    __slots__ = ("start", "goal", "maize", "path", "water", "index")
+
+    def __init__(self, start: Cell, goal: Optional[Cell],
+                 maize: FrozenSet[Cell], path: FrozenSet[Cell], water: FrozenSet[Cell] = frozenset()):
+        self.start = start
+        self.goal = goal
+        self.maize = maize
+        self.path = path
+        self.water = water
+        self.index = GridIndex(start, goal, maize, path, water)
+
+    @classmethod
+    def from_level(cls, level: Dict[str, Any]) -> "LevelGeometry":
+        """Construye la geometría a partir de la configuración del nivel"""
+        start = _cell(level.get("startPosition") or DEFAULT_START_POSITION)
+        goal = _cell(level["goalPosition"]) if level.get("goalPosition") else None
+        # El frontend no coloca maíz en la celda inicial ni en la del objetivo
+        maize = frozenset(
+            cell for cell in map(_cell, level.get("maizePositions", []))
+            if cell != start and cell != goal
+        )
+        path = frozenset(_cell(cell, "x", "y") for cell in level.get("path", []))
+        return cls(start, goal, maize, path, water_cells(level.get("lake")))
+
+
+_geometry_cache: Dict[str, Tuple[Dict[str, Any], LevelGeometry]] = {}
+
+
+def geometry_for_level(level: Dict[str, Any]) -> LevelGeometry:
+    """Retorna la geometría del nivel, calculándola una sola vez por configuración"""
+    cached = _geometry_cache.get(level.get("id"))
+    if cached is not None and cached[0] is level:
+        return cached[1]
+    geometry = LevelGeometry.from_level(level)
+    _geometry_cache[level.get("id")] = (level, geometry)
+    return geometry
+
+
+class SimulationState:
+    """Estado del personaje tras reproducir una traza de comandos"""
+
+    __slots__ = (
+        "x", "y", "angle", "grid_x", "grid_y", "steps_moved", "rotations_made",
+        "actions_executed", "maize_mask", "goal_reached", "off_path_cells", "_index"
+    )
+
+    def __init__(self, geometry: LevelGeometry):
+        self._index = geometry.index
+        self.grid_x, self.grid_y = geometry.start
+        self.x, self.y = geometry.index.to_pixel(self.grid_x, self.grid_y)
+        self.angle = 0.0  # 0° = Este, 90° = Sur, 180° = Oeste, -90° = Norte
+        self.steps_moved: float = 0
+        self.rotations_made = 0
+        self.actions_executed: List[str] = []
+        self.maize_mask = 0  # maíz recogido, un bit por maíz (ver GridIndex.maize_bit)
+        self.goal_reached = False
+        self.off_path_cells: List[Cell] = []
+
+    @property
+    def maize_collected(self) -> FrozenSet[Cell]:
+        """Celdas del maíz recogido"""
+        return self._index.maize_cells(self.maize_mask)
+
+    @property
+    def position(self) -> Dict[str, float]:
+        """Posición final en píxeles, con el formato de LevelValidationRequest"""
+        return {"x": self.x, "y": self.y}
+
+
+def _number(value: Any, command: str) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValidationError(f"Argumento inválido para {command}: {value!r}")
+    return value
+
+
+class MovementSimulator:
+    """
+    Reproduce una traza de comandos sobre la geometría de un nivel.
+
+    Solo moveForward avanza por el grid (y recoge maíz, alcanza el objetivo y
+    se compara contra el camino); el resto de movimientos son libres en
+    píxeles y no cambian la celda, igual que en el frontend.
+    """
+
+    def __init__(self, geometry: LevelGeometry, max_steps: int = MAX_SIMULATION_STEPS):
+        self.geometry = geometry
+        self.max_steps = max_steps
+        self._commands: Dict[str, Callable[..., None]] = {
+            "moveForward": self._move_forward,
+            "moveBackward": lambda state, steps=1: self._free_steps(state, steps, state.angle + 180, FREE_STEP_DISTANCE),
+            "moveUp": lambda state, steps=1: self._free_steps(state, steps, -90, FREE_STEP_DISTANCE),
+            "moveDown": lambda state, steps=1: self._free_steps(state, steps, 90, FREE_STEP_DISTANCE),
+            "moveLeft": lambda state, steps=1: self._free_steps(state, steps, 180, FREE_STEP_DISTANCE),
+            "moveRight": lambda state, steps=1: self._free_steps(state, steps, 0, FREE_STEP_DISTANCE),
+            "sprint": lambda state, steps=1: self._free_steps(state, steps, state.angle, SPRINT_STEP_DISTANCE),
+            "moveDistance": self._move_distance,
+            "moveTo": self._set_position,
+            "teleport": self._set_position,
+            "turnRight": lambda state, degrees=90: self._rotate(state, state.angle + degrees),
+            "turnLeft": lambda state, degrees=90: self._rotate(state, state.angle - degrees),
+            "turn": lambda state, degrees: self._rotate(state, state.angle + degrees),
+            "spin": lambda state: self._rotate(state, state.angle + 360),
+            "faceDirection": self._face_direction,
+            "jump": lambda state: None,
+            "attack": lambda state: None,
+            "wait": lambda state, milliseconds=0: None,
+        }
+        self._budget = 0
+
+    def run(self, commands: Iterable[Tuple[str, Sequence[Any]]]) -> SimulationState:
+        """
+        Ejecuta la traza completa.
+
+        Args:
+            commands: Pares (nombre del comando, argumentos) en orden de ejecución
+
+        Returns:
+            Estado final del personaje
+
+        Raises:
+            ValidationError: Si un comando no existe, sus argumentos son inválidos
+                o la traza excede el máximo de pasos
+        """
+        state = self.start()
+        for name, args in commands:
+            self.step(state, name, args)
+        return state
+
+    def start(self) -> SimulationState:
+        """Estado inicial para reproducir una traza comando a comando con step()"""
+        self._budget = self.max_steps
+        return SimulationState(self.geometry)
+
+    def step(self, state: SimulationState, name: str, args: Sequence[Any]) -> None:
+        """
+        Aplica un comando al estado.
+
+        Raises:
+            ValidationError: Igual que run()
+        """
+        handler = self._commands.get(name)
+        if handler is None:
+            raise ValidationError(f"Comando desconocido en la traza: {name}")
+        if name != "faceDirection":
+            args = [_number(arg, name) for arg in args]
+        try:
+            handler(state, *args)
+        except TypeError:
+            raise ValidationError(f"Número de argumentos inválido para {name}")
+        # Pocas acciones distintas: buscar en la lista es tan barato como en un set
+        if name not in state.actions_executed:
+            state.actions_executed.append(name)
+
+    def _consume(self, steps: int) -> None:
+        self._budget -= steps
+        if self._budget < 0:
+            raise ValidationError(f"La traza excede el máximo de {self.max_steps} pasos")
+
+    def _move_forward(self, state: SimulationState, steps: float = 1) -> None:
+        state.steps_moved += steps
+        count = max(0, math.ceil(steps))
+        self._consume(count)
+        index = self.geometry.index
+        has_path = bool(self.geometry.path)
+        angle = state.angle
+        if -45 <= angle < 45:
+            dx, dy = 1, 0  # Este
+        elif 45 <= angle < 135:
+            dx, dy = 0, 1  # Sur
+        elif angle >= 135 or angle < -135:
+            dx, dy = -1, 0  # Oeste
+        else:
+            dx, dy = 0, -1  # Norte
+        for _ in range(count):
+            state.grid_x += dx
+            state.grid_y += dy
+            flags = index.flags(state.grid_x, state.grid_y)
+            if flags & MAIZE:
+                state.maize_mask |= index.maize_bit(state.grid_x, state.grid_y)
+            if has_path and not flags & PATH:
+                state.off_path_cells.append((state.grid_x, state.grid_y))
+            if flags & GOAL:
+                state.goal_reached = True
+        state.x, state.y = index.to_pixel(state.grid_x, state.grid_y)
+
+    def _free_steps(self, state: SimulationState, steps: float, angle: float, distance: float) -> None:
+        state.steps_moved += steps
+        # Con steps <= 1 el frontend da exactamente un paso; si no, floor(steps)
+        count = 1 if steps <= 1 else math.floor(steps)
+        self._consume(count)
+        radians = math.radians(angle)
+        state.x += math.cos(radians) * distance * count
+        state.y += math.sin(radians) * distance * count
+
+    def _move_distance(self, state: SimulationState, distance: float) -> None:
+        state.steps_moved += math.floor(distance / FREE_STEP_DISTANCE)
+        radians = math.radians(state.angle)
+        state.x += math.cos(radians) * distance
+        state.y += math.sin(radians) * distance
+
+    @staticmethod
+    def _set_position(state: SimulationState, x: float, y: float) -> None:
+        state.x, state.y = x, y
+
+    @staticmethod
+    def _rotate(state: SimulationState, angle: float) -> None:
+        state.rotations_made += 1
+        state.angle = wrap_angle(angle)
+
+    def _face_direction(self, state: SimulationState, direction: str) -> None:
+        if not isinstance(direction, str):
+            raise ValidationError(f"Argumento inválido para faceDirection: {direction!r}")
+        self._rotate(state, FACE_DIRECTIONS.get(direction.lower(), state.angle))
+
+
+def simulate_level(level: Dict[str, Any], commands: Iterable[Tuple[str, Sequence[Any]]]) -> SimulationState:
+    """Reproduce una traza de comandos sobre un nivel y retorna el estado final"""
+    return MovementSimulator(geometry_for_level(level)).run(commands)
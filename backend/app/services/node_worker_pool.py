@@ -0,0 +1,213 @@
+"""
+Pool de procesos Node.js persistentes para validación de sintaxis
+"""
+import json
+import queue
+import subprocess
+import threading
+import time
+from typing import Optional, Tuple
+from app.constants import JS_VALIDATION_TEMPLATE
+from app.config import NODE_CHECK_COMMAND, NODE_WORKER_POOL_SIZE, NODE_WORKER_MAX_JOBS
+from app.logger import setup_logger
+from app.services.metrics import node_run_seconds, node_spawn_seconds
+
+logger = setup_logger(__name__)
+
+# Script que ejecuta cada worker: lee trabajos JSON por stdin (uno por línea),
+# compila el código como script (sin ejecutarlo, y sin el envoltorio de
+# función que aceptaría un `return` en el nivel superior) y responde con el
+# resultado por stdout. Los stubs de JS_VALIDATION_TEMPLATE llegan una sola
+# vez como argumento.
+WORKER_SCRIPT = r"""
+const vm = require('vm');
+const readline = require('readline');
+const prelude = process.argv[1] || '';
+const rl = readline.createInterface({ input: process.stdin, terminal: false });
+rl.on('line', (line) => {
+  let job;
+  try { job = JSON.parse(line); } catch (e) { return; }
+  const reply = { id: job.id, ok: true, error: null };
+  try {
+    new vm.Script(prelude + job.code, { filename: 'tu código' });
+  } catch (e) {
+    reply.ok = false;
+    reply.error = String(e && e.stack ? e.stack : e).split('\n    at ')[0];
+  }
+  process.stdout.write(JSON.stringify(reply) + '\n');
+});
+rl.on('close', () => process.exit(0));
+"""
+
+# Stubs de funciones (todo lo que precede al código del usuario)
+VALIDATION_PRELUDE = JS_VALIDATION_TEMPLATE.format(user_code="")
+
+
+class WorkerCrashedError(Exception):
+    """El proceso Node.js terminó mientras procesaba un trabajo"""
+
+
+class NodeWorker:
+    """Proceso Node.js de larga duración que valida sintaxis por un pipe"""
+
+    def __init__(self):
+        started = time.perf_counter()
+        self.process = subprocess.Popen(
+            [NODE_CHECK_COMMAND[0], "-e", WORKER_SCRIPT, VALIDATION_PRELUDE],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+        )
+        node_spawn_seconds.observe(time.perf_counter() - started, "worker")
+        self.jobs_done = 0
+        self._next_id = 0
+        self._responses: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._reader = threading.Thread(target=self._read_stdout, daemon=True)
+        self._reader.start()
+
+    def _read_stdout(self) -> None:
+        """Reenvía cada línea de stdout a la cola de respuestas (None = EOF)"""
+        try:
+            for line in self.process.stdout:
+                self._responses.put(line)
+        except (ValueError, OSError):
+            pass
+        self._responses.put(None)
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def check(self, user_code: str, timeout: float) -> Tuple[bool, Optional[str]]:
+        """
+        Envía código al worker y espera el resultado.
+
+        Raises:
+            subprocess.TimeoutExpired: si el worker no responde a tiempo
+            WorkerCrashedError: si el proceso terminó durante el trabajo
+        """
+        self._next_id += 1
+        job_id = self._next_id
+        started = time.perf_counter()
+        try:
+            self.process.stdin.write(json.dumps({"id": job_id, "code": user_code}) + "\n")
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError, ValueError) as e:
+            raise WorkerCrashedError(str(e))
+
+        while True:
+            try:
+                line = self._responses.get(timeout=timeout)
+            except queue.Empty:
+                raise subprocess.TimeoutExpired(NODE_CHECK_COMMAND[0], timeout)
+            if line is None:
+                raise WorkerCrashedError(f"código de salida {self.process.poll()}")
+            reply = json.loads(line)
+            # Ignorar respuestas atrasadas de trabajos anteriores
+            if reply.get("id") == job_id:
+                self.jobs_done += 1
+                node_run_seconds.observe(time.perf_counter() - started, "worker")
+                return bool(reply.get("ok")), reply.get("error")
+
+    def close(self) -> None:
+        """Termina el proceso del worker"""
+        try:
+            if self.process.stdin:
+                self.process.stdin.close()
+        except OSError:
+            pass
+        if self.alive:
+            self.process.kill()
+        try:
+            self.process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            pass
+
+
+class NodeWorkerPool:
+    """
+    Pool de workers Node.js reutilizables.
+
+    Los workers se crean bajo demanda, se reemplazan si fallan o exceden el
+    timeout y se reciclan después de `max_jobs` trabajos.
+    """
+
+    def __init__(self, size: int = NODE_WORKER_POOL_SIZE, max_jobs: int = NODE_WORKER_MAX_JOBS):
+        self.size = size
+        self.max_jobs = max_jobs
+        # Cada espacio del pool contiene un worker o None (aún no creado)
+        self._slots: "queue.LifoQueue[Optional[NodeWorker]]" = queue.LifoQueue()
+        for _ in range(size):
+            self._slots.put(None)
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0
+
+    def _release(self, worker: Optional[NodeWorker]) -> None:
+        """Devuelve un worker al pool, descartándolo si murió o debe reciclarse"""
+        if worker is not None and (not worker.alive or worker.jobs_done >= self.max_jobs):
+            logger.debug("Reciclando worker Node.js tras %d trabajos", worker.jobs_done)
+            worker.close()
+            worker = None
+        self._slots.put(worker)
+
+    def check(self, user_code: str, timeout: float) -> Tuple[bool, Optional[str]]:
+        """
+        Valida la sintaxis del código del usuario en un worker del pool.
+
+        Args:
+            user_code: Código del usuario (los stubs ya están cargados en el worker)
+            timeout: Tiempo máximo de espera en segundos
+
+        Returns:
+            Tupla (es_válido, mensaje_error)
+
+        Raises:
+            subprocess.TimeoutExpired: si no hay worker libre o no responde a tiempo
+            FileNotFoundError: si Node.js no está instalado
+        """
+        try:
+            worker = self._slots.get(timeout=timeout)
+        except queue.Empty:
+            raise subprocess.TimeoutExpired(NODE_CHECK_COMMAND[0], timeout)
+
+        try:
+            for attempt in range(2):
+                if worker is None or not worker.alive:
+                    worker = NodeWorker()
+                try:
+                    return worker.check(user_code, timeout)
+                except WorkerCrashedError as e:
+                    logger.warning(f"Worker Node.js terminó inesperadamente: {e}")
+                    worker.close()
+                    worker = None
+                    if attempt:
+                        raise
+                except subprocess.TimeoutExpired:
+                    # El worker puede estar atascado: se descarta
+                    worker.close()
+                    worker = None
+                    raise
+        finally:
+            self._release(worker)
+
+    def shutdown(self) -> None:
+        """Termina todos los workers inactivos del pool"""
+        workers = []
+        while True:
+            try:
+                workers.append(self._slots.get_nowait())
+            except queue.Empty:
+                break
+        for worker in workers:
+            if worker is not None:
+                worker.close()
+            self._slots.put(None)
+
+
+# Pool compartido por la aplicación
+node_worker_pool = NodeWorkerPool()
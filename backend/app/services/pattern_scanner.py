@@ -0,0 +1,142 @@
+"""
+Detector de patrones peligrosos sobre el flujo de tokens del código
+"""
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from app.constants import DANGEROUS_PATTERNS
+from app.services.js_syntax_checker import JSSyntaxError, Token, tokenize
+
+# Los identificadores salen del mismo lexer que el verificador de sintaxis,
+# que distingue comentarios, strings, regex y templates; las expresiones
+# ${...} de los templates se analizan como código porque pueden ejecutarse.
+# Si el código no se puede separar en tokens se buscan los identificadores
+# en todo el texto, sin ignorar comentarios ni strings.
+_IDENTIFIER = re.compile(r"(?:[^\W\d]|\$|\\u(?:[0-9a-fA-F]{4}|\{[0-9a-fA-F]+\}))(?:[\w$]|\\u(?:[0-9a-fA-F]{4}|\{[0-9a-fA-F]+\}))*")
+_UNICODE_ESCAPE = re.compile(r"\\u(?:\{([0-9a-fA-F]+)\}|([0-9a-fA-F]{4}))")
+_PATTERN_SHAPE = re.compile(r"^([A-Za-z_$][\w$]*)(.*)$", re.S)
+
+# Formas equivalentes del token que sigue al identificador
+_FOLLOWERS: Dict[str, Tuple[str, ...]] = {
+    "(": ("(", "?.(", "`"),  # llamada, llamada opcional o template etiquetado
+    ".": (".", "?.", "["),   # acceso a miembro
+}
+
+
+class DangerousPatternHit(NamedTuple):
+    """Aparición de un patrón peligroso en el código"""
+    pattern: str
+    position: int
+    line: int
+    column: int
+
+
+def _decode_identifier(text: str) -> str:
+    """Resuelve escapes \\uXXXX dentro de un identificador (p. ej. \\u0065val)"""
+    if "\\" not in text:
+        return text
+    return _UNICODE_ESCAPE.sub(lambda m: chr(int(m.group(1) or m.group(2), 16)), text)
+
+
+class DangerousPatternScanner:
+    """
+    Detecta patrones peligrosos en una sola pasada lineal sobre el código.
+
+    Cada patrón de DANGEROUS_PATTERNS se compila como un identificador más,
+    opcionalmente, el token que debe seguirlo ("eval(" → eval + llamada).
+    Los patrones que no tienen esa forma se buscan como texto literal.
+    """
+
+    def __init__(self, patterns: List[str]):
+        self.by_identifier: Dict[str, List[Tuple[str, Tuple[str, ...]]]] = {}
+        self.literal_patterns: List[str] = []
+        for pattern in patterns:
+            m = _PATTERN_SHAPE.match(pattern)
+            if m is None:
+                self.literal_patterns.append(pattern)
+                continue
+            identifier, follower = m.groups()
+            followers = _FOLLOWERS.get(follower, (follower,)) if follower else ()
+            self.by_identifier.setdefault(identifier, []).append((pattern, followers))
+
+    def scan(self, code: str, first_only: bool = False) -> List[DangerousPatternHit]:
+        """
+        Busca todos los patrones peligrosos fuera de comentarios y strings.
+
+        Args:
+            code: Código del usuario
+            first_only: Detenerse en el primer hallazgo
+
+        Returns:
+            Lista de hallazgos en orden de aparición
+        """
+        hits: List[Tuple[str, int]] = []
+        try:
+            self._scan_tokens(code, tokenize(code), hits, first_only)
+        except (JSSyntaxError, RecursionError):
+            hits = []
+            self._scan_text(code, hits, first_only)
+
+        for pattern in self.literal_patterns:
+            position = code.find(pattern)
+            if position != -1:
+                hits.append((pattern, position))
+        hits.sort(key=lambda hit: hit[1])
+        if first_only:
+            hits = hits[:1]
+        return self._locate(code, hits)
+
+    def _match(self, code: str, identifier: str, after: Optional[int]) -> Optional[str]:
+        """
+        Patrón que coincide con un identificador seguido del texto en
+        `after`; con `after=None` basta el identificador
+        """
+        for pattern, followers in self.by_identifier.get(_decode_identifier(identifier), ()):
+            if not followers or after is None or code.startswith(followers, after):
+                return pattern
+        return None
+
+    def _scan_tokens(self, code: str, tokens: List[Token], hits: List[Tuple[str, int]], first_only: bool) -> bool:
+        """Agrega los hallazgos de una lista de tokens; retorna True si debe detenerse"""
+        for i, token in enumerate(tokens):
+            if token.type == "template":
+                if self._scan_tokens(code, [t for part in token.parts or () for t in part], hits, first_only):
+                    return True
+            elif token.type == "name":
+                pattern = self._match(code, token.value, tokens[i + 1].pos if i + 1 < len(tokens) else None)
+                if pattern is not None:
+                    hits.append((pattern, token.pos))
+                    if first_only:
+                        return True
+        return False
+
+    def _scan_text(self, code: str, hits: List[Tuple[str, int]], first_only: bool) -> None:
+        """Búsqueda conservadora en todo el texto, para código que no se puede tokenizar"""
+        for m in _IDENTIFIER.finditer(code):
+            pattern = self._match(code, m.group(), None)
+            if pattern is not None:
+                hits.append((pattern, m.start()))
+                if first_only:
+                    return
+
+    @staticmethod
+    def _locate(code: str, hits: List[Tuple[str, int]]) -> List[DangerousPatternHit]:
+        """Calcula línea y columna de cada hallazgo avanzando una sola vez"""
+        located = []
+        line, line_start, last = 1, 0, 0
+        for pattern, position in hits:
+            newlines = code.count("\n", last, position)
+            if newlines:
+                line += newlines
+                line_start = code.rfind("\n", last, position) + 1
+            last = position
+            located.append(DangerousPatternHit(pattern, position, line, position - line_start + 1))
+        return located
+
+    def first(self, code: str) -> Optional[DangerousPatternHit]:
+        """Retorna el primer patrón peligroso o None si el código es seguro"""
+        hits = self.scan(code, first_only=True)
+        return hits[0] if hits else None
+
+
+# Detector compilado con los patrones de la aplicación
+dangerous_pattern_scanner = DangerousPatternScanner(DANGEROUS_PATTERNS)
@@ -0,0 +1,183 @@
+"""
+Perfilado por request: duración de cada fase de la validación y pilas
+colapsadas (formato "folded" de flamegraph.pl) a partir de cProfile
+"""
+import cProfile
+import os
+import pstats
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Profundidad máxima de una pila colapsada (corta ciclos largos de llamadas)
+MAX_STACK_DEPTH = 128
+# Las ramas con menos de este tiempo (segundos) no se expanden
+MIN_BRANCH_SECONDS = 1e-6
+
+
+class RequestProfile:
+    """Datos de perfilado de una request: fases medidas y un cProfile por hilo"""
+
+    __slots__ = ("phases", "profilers", "with_cprofile")
+
+    def __init__(self, with_cprofile: bool = True):
+        self.phases: List[Tuple[str, float]] = []
+        self.profilers: List[cProfile.Profile] = []
+        self.with_cprofile = with_cprofile
+
+    def record(self, name: str, seconds: float) -> None:
+        # list.append es atómico: las fases pueden llegar desde otros hilos
+        self.phases.append((name, seconds))
+
+    def phase_totals(self) -> Dict[str, float]:
+        """Segundos por fase, sumando repeticiones, en orden de aparición"""
+        totals: Dict[str, float] = {}
+        for name, seconds in self.phases:
+            totals[name] = totals.get(name, 0.0) + seconds
+        return totals
+
+    def server_timing(self, **extra: float) -> str:
+        """Valor de la cabecera Server-Timing (duraciones en ms)"""
+        totals = {**self.phase_totals(), **extra}
+        return ", ".join(f"{name};dur={seconds * 1000:.3f}" for name, seconds in totals.items())
+
+    def collapsed_stacks(self) -> Dict[str, int]:
+        """Pilas colapsadas de todos los hilos perfilados, en microsegundos"""
+        if not self.profilers:
+            return {}
+        stats = pstats.Stats(self.profilers[0])
+        for profiler in self.profilers[1:]:
+            stats.add(profiler)
+        return collapse_stats(stats.stats)
+
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("codeshyri_profile", default=None)
+
+
+def current_profile() -> Optional[RequestProfile]:
+    return _current_profile.get()
+
+
+def activate(profile: RequestProfile):
+    """Asocia el perfil al contexto actual; retorna el token para `deactivate`"""
+    return _current_profile.set(profile)
+
+
+def deactivate(token) -> None:
+    _current_profile.reset(token)
+
+
+class phase:
+    """
+    Mide un bloque como fase del perfil de la request en curso:
+
+        with phase("pattern_scan"):
+            ...
+
+    Sin perfil activo solo cuesta leer una ContextVar.
+    """
+
+    __slots__ = ("name", "profile", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.profile = _current_profile.get()
+
+    def __enter__(self) -> "phase":
+        if self.profile is not None:
+            self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self.profile is not None:
+            self.profile.record(self.name, time.perf_counter() - self.started)
+
+
+def bind(func: Callable[..., T], *args) -> Callable[[], T]:
+    """
+    Prepara `func(*args)` para correr en otro hilo (p. ej. un executor)
+    conservando el perfil de la request: registra la espera en la cola como
+    fase "queue" y, si corresponde, perfila el hilo con cProfile.
+    """
+    profile = _current_profile.get()
+    if profile is None:
+        return partial(func, *args)
+    submitted = time.perf_counter()
+
+    def run() -> T:
+        profile.record("queue", time.perf_counter() - submitted)
+        token = _current_profile.set(profile)
+        profiler = cProfile.Profile() if profile.with_cprofile else None
+        try:
+            if profiler is None:
+                return func(*args)
+            profiler.enable()
+            try:
+                return func(*args)
+            finally:
+                profiler.disable()
+                profile.profilers.append(profiler)
+        finally:
+            _current_profile.reset(token)
+
+    return run
+
+
+def _frame_label(func: Tuple[str, int, str]) -> str:
+    filename, line, name = func
+    if filename == "~":
+        # Funciones built-in: "<built-in method time.perf_counter>"
+        return name.replace(";", ",")
+    return f"{name} ({os.path.basename(filename)}:{line})".replace(";", ",")
+
+
+def collapse_stats(stats: Dict) -> Dict[str, int]:
+    """
+    Convierte estadísticas de pstats en pilas colapsadas.
+
+    cProfile solo guarda pares llamador→llamado, así que el tiempo de cada
+    función se reparte entre sus llamadores en proporción al tiempo de cada
+    llamada; el resultado es una aproximación de las pilas reales.
+
+    Returns:
+        {"raíz;...;función": microsegundos de tiempo propio}
+    """
+    callees: Dict[Tuple, List[Tuple[Tuple, float]]] = defaultdict(list)
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, caller_stats in callers.items():
+            callees[caller].append((func, caller_stats[3]))
+    roots = [func for func, entry in stats.items() if not any(caller in stats for caller in entry[4])]
+
+    folded: Dict[str, float] = defaultdict(float)
+
+    def walk(func: Tuple, stack: Tuple[str, ...], share: float, visiting: frozenset) -> None:
+        _, _, own_time, _, _ = stats[func]
+        stack = stack + (_frame_label(func),)
+        if own_time * share > 0:
+            folded[";".join(stack)] += own_time * share
+        if len(stack) >= MAX_STACK_DEPTH:
+            return
+        visiting = visiting | {func}
+        for child, edge_time in callees.get(func, ()):
+            child_total = stats[child][3]
+            if child in visiting or child_total <= 0:
+                continue
+            child_share = share * min(edge_time / child_total, 1.0)
+            if child_total * child_share >= MIN_BRANCH_SECONDS:
+                walk(child, stack, child_share, visiting)
+
+    for root in roots:
+        walk(root, (), 1.0, frozenset())
+    return {stack: round(seconds * 1_000_000) for stack, seconds in folded.items() if seconds >= 5e-7}
+
+
+def write_collapsed(path: str, stacks: Dict[str, int]) -> None:
+    """Escribe las pilas en formato folded ("pila conteo" por línea)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, micros in sorted(stacks.items()):
+            f.write(f"{stack} {micros}\n")
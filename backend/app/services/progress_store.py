@@ -0,0 +1,326 @@
+"""
+Progreso de los jugadores: mejor intento por jugador y nivel en SQLite (modo
+WAL), con escrituras diferidas que se agrupan en transacciones periódicas
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from app.config import PROGRESS_BATCH_SIZE, PROGRESS_DB_PATH, PROGRESS_FLUSH_INTERVAL
+from app.logger import setup_logger
+from app.services.metrics import metrics
+
+logger = setup_logger(__name__)
+
+progress_writes = metrics.counter(
+    "codeshyri_progress_writes_total", "Intentos guardados en el progreso de los jugadores, por resultado", ["result"]
+)
+
+# Columnas del mejor intento; se reemplazan juntas cuando llega uno mejor
+_BEST_COLUMNS = ("completed", "objectives_done", "steps", "rotations", "objectives")
+# Orden de los intentos (menor es mejor): completado, más objetivos, menos pasos, menos rotaciones
+_BETTER = (
+    "(-excluded.completed, -excluded.objectives_done, excluded.steps, excluded.rotations)"
+    " < (-progress.completed, -progress.objectives_done, progress.steps, progress.rotations)"
+)
+_UPSERT = (
+    "INSERT INTO progress (player_id, level_id, completed, objectives_done, steps, rotations,"
+    " objectives, attempts, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    " ON CONFLICT (player_id, level_id) DO UPDATE SET "
+    + ", ".join(f"{column} = CASE WHEN {_BETTER} THEN excluded.{column} ELSE progress.{column} END"
+                for column in _BEST_COLUMNS)
+    + ", attempts = progress.attempts + excluded.attempts, updated_at = excluded.updated_at"
+)
+_SELECT = (
+    "SELECT player_id, level_id, completed, steps, rotations, objectives, attempts, updated_at FROM progress"
+)
+
+
+@dataclass(slots=True)
+class ProgressEntry:
+    """Mejor intento de un jugador en un nivel"""
+    player_id: str
+    level_id: str
+    completed: bool
+    steps: float
+    rotations: int
+    objectives_completed: List[str]
+    objectives_pending: List[str]
+    attempts: int = 1
+    updated_at: float = field(default_factory=time.time)
+
+    def rank(self) -> Tuple[bool, int, float, int]:
+        """Clave de orden de los intentos (menor es mejor), igual que en SQLite"""
+        return not self.completed, -len(self.objectives_completed), self.steps, self.rotations
+
+    def merge(self, other: "ProgressEntry") -> "ProgressEntry":
+        """Combina dos registros del mismo jugador y nivel: el mejor intento y la suma de intentos"""
+        best = other if other.rank() < self.rank() else self
+        return replace(
+            best, attempts=self.attempts + other.attempts, updated_at=max(self.updated_at, other.updated_at)
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Formato de la API (ver ProgressEntryResponse)"""
+        return {
+            "levelId": self.level_id,
+            "completed": self.completed,
+            "stepsMoved": self.steps,
+            "rotationsMade": self.rotations,
+            "objectivesCompleted": self.objectives_completed,
+            "objectivesPending": self.objectives_pending,
+            "attempts": self.attempts,
+            "updatedAt": self.updated_at,
+        }
+
+
+class ProgressStore:
+    """
+    Tabla `progress` en SQLite, una fila por (jugador, nivel). La clave
+    primaria indexa tanto las lecturas de un nivel como las de todos los
+    niveles de un jugador. En modo WAL las lecturas no esperan a las
+    escrituras, que llegan en lotes desde ProgressRecorder.
+    """
+
+    def __init__(self, path: str = PROGRESS_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Conexión propia del hilo actual; la primera crea el archivo y la tabla"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS progress ("
+                " player_id TEXT NOT NULL, level_id TEXT NOT NULL, completed INTEGER NOT NULL,"
+                " objectives_done INTEGER NOT NULL, steps REAL NOT NULL, rotations INTEGER NOT NULL,"
+                " objectives TEXT NOT NULL, attempts INTEGER NOT NULL, updated_at REAL NOT NULL,"
+                " PRIMARY KEY (player_id, level_id)) WITHOUT ROWID"
+            )
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def _entry(row: Tuple) -> ProgressEntry:
+        player_id, level_id, completed, steps, rotations, objectives, attempts, updated_at = row
+        objectives = json.loads(objectives)
+        return ProgressEntry(
+            player_id, level_id, bool(completed), steps, rotations,
+            objectives["completed"], objectives["pending"], attempts, updated_at
+        )
+
+    def write_batch(self, entries: List[ProgressEntry]) -> None:
+        """Guarda varios intentos en una sola transacción (un solo fsync)"""
+        rows = [
+            (entry.player_id, entry.level_id, int(entry.completed), len(entry.objectives_completed),
+             entry.steps, entry.rotations,
+             json.dumps({"completed": entry.objectives_completed, "pending": entry.objectives_pending},
+                        ensure_ascii=False),
+             entry.attempts, entry.updated_at)
+            for entry in entries
+        ]
+        connection = self._connection()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.executemany(_UPSERT, rows)
+
+    def get(self, player_id: str, level_id: str) -> Optional[ProgressEntry]:
+        row = self._connection().execute(
+            f"{_SELECT} WHERE player_id = ? AND level_id = ?", (player_id, level_id)
+        ).fetchone()
+        return self._entry(row) if row else None
+
+    def for_player(self, player_id: str) -> List[ProgressEntry]:
+        rows = self._connection().execute(f"{_SELECT} WHERE player_id = ? ORDER BY level_id", (player_id,))
+        return [self._entry(row) for row in rows]
+
+
+class ProgressRecorder:
+    """
+    Escritura diferida (write-behind) del progreso.
+
+    record() no toca el disco: combina el intento en memoria con los
+    pendientes del mismo jugador y nivel. Un bucle en segundo plano guarda
+    los pendientes cada `flush_interval` segundos, o antes si se acumulan
+    `batch_size`, en una sola transacción en un hilo dedicado, así que las
+    requests nunca esperan un fsync. Las lecturas combinan lo guardado con
+    lo pendiente, de modo que un jugador ve su intento apenas lo envía; desde
+    el event loop se usan get_async y for_player_async, que leen SQLite en el
+    executor por defecto.
+
+    Si una escritura falla (SQLite o el sistema de archivos), el lote vuelve
+    a quedar pendiente y el bucle sigue; lo que no se alcanzó a guardar antes
+    de cerrar con stop() se pierde.
+
+    Los lotes se numeran. El hilo de escritura cuenta cada lote como
+    confirmado bajo el mismo lock que su commit; cada lectura sabe así hasta
+    qué lote refleja y solo combina el lote en curso si no lo incluye, para
+    no contar dos veces sus intentos.
+    """
+
+    def __init__(self, store: ProgressStore, flush_interval: float = PROGRESS_FLUSH_INTERVAL,
+                 batch_size: int = PROGRESS_BATCH_SIZE):
+        self.store = store
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._pending: Dict[Tuple[str, str], ProgressEntry] = {}
+        self._flushing: Dict[Tuple[str, str], ProgressEntry] = {}
+        self._flushing_batch = 0  # número del lote en _flushing
+        self._committed = 0  # lotes confirmados en SQLite; lo actualiza el hilo de escritura
+        self._commit_lock = threading.Lock()
+        self._flushed = 0  # último lote que ya no está en memoria
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="progress")
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def record(self, entry: ProgressEntry) -> None:
+        """Encola un intento; se guarda en el próximo lote"""
+        key = (entry.player_id, entry.level_id)
+        previous = self._pending.get(key)
+        self._pending[key] = previous.merge(entry) if previous else entry
+        if len(self._pending) >= self.batch_size and self._wake is not None:
+            self._wake.set()
+
+    async def flush(self) -> int:
+        """Guarda los intentos pendientes; retorna cuántos registros se escribieron"""
+        if not self._pending:
+            return 0
+        batch, self._pending = self._pending, {}
+        number = self._committed + 1
+        self._flushing, self._flushing_batch = batch, number
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._write, list(batch.values())
+            )
+        except Exception as e:
+            logger.warning("No se pudo guardar el progreso (%d registros): %s", len(batch), e)
+            progress_writes.inc("error", amount=len(batch))
+            for entry in batch.values():
+                self.record(entry)
+            return 0
+        finally:
+            self._flushing = {}
+        self._flushed = number
+        progress_writes.inc("ok", amount=len(batch))
+        return len(batch)
+
+    def _write(self, entries: List[ProgressEntry]) -> None:
+        """Guarda un lote (en el hilo de escritura) y lo cuenta como confirmado junto con el commit"""
+        with self._commit_lock:
+            self.store.write_batch(entries)
+            self._committed += 1
+
+    async def run(self) -> None:
+        """Bucle de escritura; corre hasta que se cancela"""
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    def start(self) -> asyncio.Task:
+        """Inicia el bucle de escritura en segundo plano"""
+        self._wake = asyncio.Event()
+        self._task = asyncio.ensure_future(self.run())
+        return self._task
+
+    async def stop(self) -> None:
+        """Detiene el bucle y guarda lo pendiente"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._wake = None
+        await self.flush()
+
+    def _unsaved(self, committed: int) -> Tuple[Dict[Tuple[str, str], ProgressEntry], ...]:
+        """Intentos en memoria que no refleja una lectura al día con `committed` lotes"""
+        if self._flushing_batch > committed:
+            return self._flushing, self._pending
+        return (self._pending,)
+
+    def _overlay(self, key: Tuple[str, str], entry: Optional[ProgressEntry],
+                 committed: int) -> Optional[ProgressEntry]:
+        for unsaved in self._unsaved(committed):
+            if key in unsaved:
+                entry = entry.merge(unsaved[key]) if entry else unsaved[key]
+        return entry
+
+    def _overlay_player(self, player_id: str, stored: List[ProgressEntry],
+                        committed: int) -> List[ProgressEntry]:
+        entries = {entry.level_id: entry for entry in stored}
+        unsaved = self._unsaved(committed)
+        for player, level_id in {key for batch in unsaved for key in batch}:
+            if player == player_id:
+                entries[level_id] = self._overlay((player, level_id), entries.get(level_id), committed)
+        return [entries[level_id] for level_id in sorted(entries)]
+
+    def _read_committed(self, read: Callable[..., Any], *args: Any) -> Tuple[Any, int]:
+        """
+        Ejecuta una lectura de SQLite y retorna (resultado, lotes confirmados
+        que refleja). Si se confirma un lote durante la lectura no se sabe si
+        lo alcanzó a ver: se repite.
+        """
+        while True:
+            with self._commit_lock:
+                committed = self._committed
+            result = read(*args)
+            with self._commit_lock:
+                if self._committed == committed:
+                    return result, committed
+
+    async def _read(self, read: Callable[..., Any], *args: Any) -> Tuple[Any, int]:
+        """
+        Igual que _read_committed, en el executor por defecto (en modo WAL la
+        lectura no espera al hilo de escritura). Si al volver ya se descartó de
+        memoria un lote que la lectura no incluye, sus registros no se pueden
+        combinar: se repite la lectura.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            result, committed = await loop.run_in_executor(None, self._read_committed, read, *args)
+            if self._flushed <= committed:
+                return result, committed
+
+    def get(self, player_id: str, level_id: str) -> Optional[ProgressEntry]:
+        """Mejor intento del jugador en el nivel (búsqueda por clave primaria)"""
+        entry, committed = self._read_committed(self.store.get, player_id, level_id)
+        return self._overlay((player_id, level_id), entry, committed)
+
+    async def get_async(self, player_id: str, level_id: str) -> Optional[ProgressEntry]:
+        """Igual que get, sin bloquear el event loop"""
+        entry, committed = await self._read(self.store.get, player_id, level_id)
+        return self._overlay((player_id, level_id), entry, committed)
+
+    def for_player(self, player_id: str) -> List[ProgressEntry]:
+        """Mejores intentos del jugador en todos los niveles, ordenados por nivel"""
+        return self._overlay_player(player_id, *self._read_committed(self.store.for_player, player_id))
+
+    async def for_player_async(self, player_id: str) -> List[ProgressEntry]:
+        """Igual que for_player, sin bloquear el event loop"""
+        return self._overlay_player(player_id, *await self._read(self.store.for_player, player_id))
+
+
+# Progreso compartido por la aplicación
+progress_recorder = ProgressRecorder(ProgressStore())
+metrics.callback("codeshyri_progress_pending", "Intentos en espera de guardarse", lambda: progress_recorder.pending)
@@ -0,0 +1,178 @@
+"""
+Limitación de requests por cliente con token buckets en memoria
+"""
+import ipaddress
+import math
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Union
+from fastapi import Request
+from starlette.requests import HTTPConnection
+from app.config import (
+    RATE_LIMIT_ENABLED, RATE_LIMIT_KEY, RATE_LIMIT_TRUSTED_PROXIES, RATE_LIMIT_SWEEP_INTERVAL,
+    RATE_LIMIT_EXECUTE_RATE, RATE_LIMIT_EXECUTE_BURST,
+    RATE_LIMIT_VALIDATE_RATE, RATE_LIMIT_VALIDATE_BURST,
+)
+from app.exceptions import RateLimitError
+from app.services.metrics import metrics
+
+SESSION_HEADER = "x-session-id"
+FORWARDED_FOR_HEADER = "x-forwarded-for"
+
+Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+rate_limited_total = metrics.counter(
+    "codeshyri_rate_limited_total", "Requests rechazadas por límite de frecuencia", ("budget",)
+)
+
+
+class TokenBucketLimiter:
+    """
+    Un token bucket por cliente: `burst` requests seguidas y luego `rate`
+    por segundo.
+
+    Cada bucket guarda solo [tokens, última actualización]; los tokens se
+    reponen al consultarlo, así que cada request es O(1). Un bucket inactivo
+    el tiempo suficiente para llenarse equivale a uno nuevo, y se descarta en
+    un barrido cada `sweep_interval` segundos. Una request que cuesta más que
+    `burst` (p. ej. un lote) se permite con el bucket lleno y lo deja en
+    negativo: el cliente espera lo que costó antes de la siguiente.
+
+    Se usa desde el event loop, por lo que no necesita lock.
+    """
+
+    def __init__(self, name: str, rate: float, burst: float,
+                 sweep_interval: float = RATE_LIMIT_SWEEP_INTERVAL, enabled: bool = True,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.sweep_interval = sweep_interval
+        self.enabled = enabled and rate > 0
+        self._clock = clock
+        self._buckets: Dict[str, List[float]] = {}
+        self._next_sweep = clock() + sweep_interval
+
+    def acquire(self, key: str, cost: float = 1.0) -> float:
+        """
+        Consume `cost` tokens del bucket de `key` (si `cost` supera `burst`,
+        basta con que el bucket esté lleno).
+
+        Returns:
+            0 si la request se permite; si no, segundos hasta que haya tokens
+        """
+        if not self.enabled:
+            return 0.0
+        now = self._clock()
+        if now >= self._next_sweep:
+            self.sweep(now)
+
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [self.burst, now]
+        else:
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+
+        required = min(cost, self.burst)
+        if bucket[0] >= required:
+            bucket[0] -= cost
+            return 0.0
+        rate_limited_total.inc(self.name)
+        return (required - bucket[0]) / self.rate
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Descarta los buckets que ya se llenaron; retorna cuántos se eliminaron"""
+        now = self._clock() if now is None else now
+        full_after = self.burst / self.rate
+        idle = [key for key, (tokens, updated) in self._buckets.items()
+                if now - updated >= full_after - tokens / self.rate]
+        for key in idle:
+            del self._buckets[key]
+        self._next_sweep = now + self.sweep_interval
+        return len(idle)
+
+    def reset(self) -> None:
+        self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+def parse_networks(values: Sequence[str]) -> List[Network]:
+    """Convierte IPs o redes CIDR ("10.0.0.0/8") en redes; falla si alguna es inválida"""
+    return [ipaddress.ip_network(value, strict=False) for value in values]
+
+
+_trusted_proxies = parse_networks(RATE_LIMIT_TRUSTED_PROXIES)
+
+
+def _is_trusted(ip: str, proxies: Sequence[Network]) -> bool:
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return False
+    return any(address in network for network in proxies)
+
+
+def client_ip(request: HTTPConnection, proxies: Sequence[Network] = _trusted_proxies) -> str:
+    """
+    IP del cliente. Si la conexión llega de un proxy de confianza
+    (RATE_LIMIT_TRUSTED_PROXIES), se recorre X-Forwarded-For de derecha a
+    izquierda saltando los proxies de confianza: la primera IP restante es
+    la del cliente. Las entradas a su izquierda las escribe el propio
+    cliente y no se usan.
+    """
+    ip = request.client.host if request.client else "desconocido"
+    if not proxies or not _is_trusted(ip, proxies):
+        return ip
+    forwarded = ",".join(request.headers.getlist(FORWARDED_FOR_HEADER))
+    for hop in reversed([hop.strip() for hop in forwarded.split(",") if hop.strip()]):
+        ip = hop
+        if not _is_trusted(hop, proxies):
+            break
+    return ip
+
+
+def client_key(request: HTTPConnection, mode: str = RATE_LIMIT_KEY) -> str:
+    """
+    Identifica al cliente según RATE_LIMIT_KEY: "session" (cabecera
+    X-Session-Id, con la IP como respaldo), "ip" o "ip+session". Contar por IP
+    hace que una clase detrás de un mismo NAT comparta el límite.
+    """
+    ip = client_ip(request)
+    if mode == "ip":
+        return ip
+    session = request.headers.get(SESSION_HEADER)
+    if mode == "session":
+        return f"s:{session}" if session else ip
+    return f"{ip}|{session}" if session else ip
+
+
+def charge(limiter: TokenBucketLimiter, request: Request, cost: float = 1.0) -> None:
+    """
+    Consume `cost` tokens del cliente de la request.
+
+    Raises:
+        RateLimitError: Si el cliente no tiene tokens suficientes (429)
+    """
+    if not limiter.enabled:
+        return
+    retry_after = limiter.acquire(client_key(request), cost)
+    if retry_after:
+        raise RateLimitError(math.ceil(retry_after))
+
+
+def rate_limit(limiter: TokenBucketLimiter) -> Callable:
+    """Dependencia de FastAPI que rechaza con 429 las requests sin tokens"""
+    async def check_rate_limit(request: Request) -> None:
+        charge(limiter, request)
+    return check_rate_limit
+
+
+# Presupuestos separados para validar código y validar niveles
+execute_limiter = TokenBucketLimiter(
+    "execute", RATE_LIMIT_EXECUTE_RATE, RATE_LIMIT_EXECUTE_BURST, enabled=RATE_LIMIT_ENABLED
+)
+validate_limiter = TokenBucketLimiter(
+    "validate", RATE_LIMIT_VALIDATE_RATE, RATE_LIMIT_VALIDATE_BURST, enabled=RATE_LIMIT_ENABLED
+)
@@ -0,0 +1,191 @@
+"""
+Respuestas pre-serializadas para los datos estáticos del juego
+"""
+import gzip
+import hashlib
+import json
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import brotli
+from fastapi import Request, Response
+from app.config import STATIC_CACHE_CONTROL, STATIC_COMPRESSION_MIN_SIZE
+from app.services.data_provider import DataProvider
+
+# Codificaciones en orden de preferencia del servidor
+_COMPRESSORS: List[Tuple[str, Callable[[bytes], bytes]]] = [
+    ("br", lambda body: brotli.compress(body, quality=11)),
+    ("gzip", lambda body: gzip.compress(body, compresslevel=9, mtime=0)),
+]
+
+
+class StaticPayload:
+    """
+    Cuerpo JSON ya serializado con su ETag fuerte y sus variantes comprimidas.
+
+    Las variantes se comprimen una sola vez al construir el payload; cada una
+    tiene su propio ETag (el de la representación sin comprimir más un sufijo).
+    """
+
+    __slots__ = ("body", "etag", "variants")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self.etag = f'"{digest}"'
+        self.variants: Dict[str, Tuple[bytes, str]] = {}
+        if len(body) >= STATIC_COMPRESSION_MIN_SIZE:
+            for encoding, compress in _COMPRESSORS:
+                compressed = compress(body)
+                if len(compressed) < len(body):
+                    self.variants[encoding] = (compressed, f'"{digest}-{encoding}"')
+
+    def select(self, accept_encoding: Optional[str]) -> Tuple[Optional[str], bytes, str]:
+        """Elige la variante según Accept-Encoding: (codificación, cuerpo, ETag)"""
+        if accept_encoding and self.variants:
+            accepted = _accepted_encodings(accept_encoding)
+            for encoding, (body, etag) in self.variants.items():
+                if accepted.get(encoding, accepted.get("*", 0)) > 0:
+                    return encoding, body, etag
+        return None, self.body, self.etag
+
+
+def serialize(data: Any) -> bytes:
+    """Serializa igual que JSONResponse de FastAPI (UTF-8, compacto)"""
+    return json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def _accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    """Interpreta Accept-Encoding ("br;q=1.0, gzip;q=0.5") como {codificación: q}"""
+    accepted: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        encoding, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[encoding.strip().lower()] = quality
+    return accepted
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Compara If-None-Match (lista separada por comas, admite W/ y *) con el ETag"""
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class StaticResponseCache:
+    """
+    Cache de payloads serializados por clave ("characters", "functions", "level:<id>").
+
+    Cada payload se serializa una sola vez; `invalidate` fuerza a regenerarlo
+    la próxima vez que se pida (p. ej. cuando cambian los datos). La carga y
+    la serialización corren sin el lock: `invalidate` incrementa una versión
+    y un payload solo se guarda si la versión no cambió desde que empezó su
+    carga, para no guardar datos que ya se descartaron.
+    """
+
+    def __init__(self):
+        self._payloads: Dict[str, StaticPayload] = {}
+        self._version = 0
+        self._lock = Lock()
+
+    def get(self, key: str, load: Callable[[], Optional[Any]]) -> Optional[StaticPayload]:
+        """
+        Retorna el payload de una clave, serializando `load()` si no está en cache.
+
+        Returns:
+            Payload o None si `load()` retorna None (dato inexistente)
+        """
+        payload = self._payloads.get(key)
+        if payload is not None:
+            return payload
+        version = self._version
+        data = load()
+        if data is None:
+            return None
+        payload = StaticPayload(serialize(data))
+        with self._lock:
+            if self._version == version:
+                self._payloads[key] = payload
+        return payload
+
+    def level(self, level_id: str) -> Optional[StaticPayload]:
+        return self.get(f"level:{level_id}", lambda: DataProvider.get_level(level_id))
+
+    def characters(self) -> StaticPayload:
+        return self.get("characters", DataProvider.get_characters)
+
+    def functions(self) -> StaticPayload:
+        return self.get("functions", DataProvider.get_functions)
+
+    def warm_up(self) -> None:
+        """Serializa por adelantado todos los datos estáticos"""
+        self.characters()
+        self.functions()
+        for level_id in DataProvider.get_all_levels():
+            self.level(level_id)
+
+    def compression_report(self) -> Dict[str, Any]:
+        """Tamaños y ratios de compresión de los payloads en cache (para operaciones)"""
+        payloads = []
+        total = {"identity": 0}
+        for key, payload in sorted(self._payloads.items()):
+            sizes = {"identity": len(payload.body)}
+            for encoding, _ in _COMPRESSORS:
+                # Sin variante (payload pequeño o incompresible) se sirve sin comprimir
+                variant = payload.variants.get(encoding)
+                sizes[encoding] = len(variant[0]) if variant else len(payload.body)
+            for encoding, size in sizes.items():
+                total[encoding] = total.get(encoding, 0) + size
+            payloads.append({"key": key, "sizes": sizes, "ratios": _ratios(sizes)})
+        return {
+            "encodings": [encoding for encoding, _ in _COMPRESSORS],
+            "payloads": payloads,
+            "total": {"sizes": total, "ratios": _ratios(total)},
+        }
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Descarta un payload (o todos) para que se regenere en el próximo acceso"""
+        with self._lock:
+            self._version += 1
+            if key is None:
+                self._payloads.clear()
+            else:
+                self._payloads.pop(key, None)
+
+
+def _ratios(sizes: Dict[str, int]) -> Dict[str, float]:
+    identity = sizes["identity"]
+    return {
+        encoding: round(size / identity, 3) if identity else 1.0
+        for encoding, size in sizes.items() if encoding != "identity"
+    }
+
+
+def payload_response(request: Request, payload: StaticPayload) -> Response:
+    """
+    Construye la respuesta con la variante negociada por Accept-Encoding.
+    Retorna 304 si el cliente ya tiene la versión actual.
+    """
+    encoding, body, etag = payload.select(request.headers.get("accept-encoding"))
+    headers = {"ETag": etag, "Cache-Control": STATIC_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+# Cache compartido por la aplicación
+static_responses = StaticResponseCache()
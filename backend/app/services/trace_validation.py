@@ -0,0 +1,103 @@
+"""
+Validación incremental de una traza de comandos: se simula comando a
+comando y se informa cada objetivo apenas cambia de estado
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from app.config import MAX_SIMULATION_STEPS
+from app.services.level_rules import IRREVERSIBLE_RULES, LevelSpec, PlayerOutcome
+from app.services.level_validator import LevelValidator
+from app.services.movement_simulator import MovementSimulator
+
+# Motivos por los que el nivel queda decidido
+IRREVERSIBLE = "irreversible"  # se incumplió una regla que ya no puede cumplirse
+END = "end"  # el cliente terminó la traza
+
+
+class TraceValidation:
+    """
+    Reproduce una traza de comandos de un nivel a medida que llega.
+
+    Tras cada comando se evalúan las reglas compiladas del nivel sobre el
+    estado simulado (costo proporcional al número de reglas, no al largo de
+    la traza) y se emite un evento por cada objetivo que cambia de estado.
+
+    Antes del final solo se decide un fracaso irreversible (una regla como
+    stayOnPath incumplida, que ningún comando posterior puede revertir):
+    cumplir todos los objetivos en un momento no basta, porque
+    targetPosition o requiredRotation pueden dejar de cumplirse con los
+    comandos siguientes. Si no, el nivel se decide cuando el cliente termina
+    la traza, con el estado final, igual que /validate. Una vez decidido,
+    los comandos siguientes no se procesan.
+    """
+
+    def __init__(self, spec: LevelSpec, max_steps: int = MAX_SIMULATION_STEPS):
+        self.spec = spec
+        self.simulator = MovementSimulator(spec.geometry, max_steps)
+        self.state = self.simulator.start()
+        self.commands = 0
+        self.decision: Optional[Dict[str, Any]] = None
+        self._irreversible = tuple(key in IRREVERSIBLE_RULES for key in spec.rule_keys)
+        self._results = self._evaluate()
+
+    @property
+    def decided(self) -> bool:
+        return self.decision is not None
+
+    def _evaluate(self) -> List[Tuple[bool, str]]:
+        outcome = PlayerOutcome.from_simulation(self.state)
+        return [rule(outcome) for rule in self.spec.rules]
+
+    def _decide(self, completed: bool, reason: str) -> Dict[str, Any]:
+        completed_objectives = [objective for passed, objective in self._results if passed]
+        pending_objectives = [objective for passed, objective in self._results if not passed]
+        self.decision = {
+            "type": "decided",
+            "completed": completed,
+            "reason": reason,
+            "message": LevelValidator.result_message(
+                completed, len(completed_objectives), self.spec.objectives_count
+            ),
+            "objectivesCompleted": completed_objectives,
+            "objectivesPending": pending_objectives,
+            "commands": self.commands,
+        }
+        return self.decision
+
+    def feed(self, name: str, args: Sequence[Any]) -> List[Dict[str, Any]]:
+        """
+        Aplica un comando y retorna los eventos que produjo: un
+        `{"type": "objective", ...}` por cada objetivo que cambió de estado y,
+        si el nivel quedó decidido, el `{"type": "decided", ...}` final.
+
+        Raises:
+            ValidationError: Si el comando es inválido o se excede el máximo de pasos
+        """
+        if self.decision is not None:
+            return []
+        self.simulator.step(self.state, name, args)
+        self.commands += 1
+
+        previous, self._results = self._results, self._evaluate()
+        events: List[Dict[str, Any]] = []
+        failed_irreversible = False
+        for index, ((passed, objective), (was_passed, _)) in enumerate(zip(self._results, previous)):
+            if passed != was_passed:
+                events.append({
+                    "type": "objective",
+                    "index": index,
+                    "objective": objective,
+                    "completed": passed,
+                    "command": self.commands,
+                })
+            if not passed and self._irreversible[index]:
+                failed_irreversible = True
+
+        if failed_irreversible:
+            events.append(self._decide(False, IRREVERSIBLE))
+        return events
+
+    def finish(self) -> Dict[str, Any]:
+        """Decide el nivel con el estado actual (fin de la traza) y retorna la decisión"""
+        if self.decision is None:
+            self._decide(all(passed for passed, _ in self._results), END)
+        return self.decision
@@ -0,0 +1,381 @@
+"""
+Cache de resultados de validación de código direccionado por contenido
+"""
+import hashlib
+from abc import ABC, abstractmethod
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+from app.config import (
+    VALIDATION_CACHE_SIZE, VALIDATION_CACHE_TTL, VALIDATION_CACHE_BACKEND, VALIDATION_CACHE_PATH,
+    VALIDATOR_ENGINE,
+)
+from app.logger import setup_logger
+from app.services.js_syntax_checker import PUNCTUATORS, JSSyntaxError, Token, tokenize
+
+logger = setup_logger(__name__)
+
+ValidationResult = Tuple[bool, Optional[str], Optional[str]]
+
+# Versión de los resultados: incrementarla cuando un motor cambie lo que
+# acepta o sus mensajes, para no reutilizar resultados de la versión anterior
+# guardados en un cache compartido
+CACHE_VERSION = 2
+
+def normalize_code(code: str) -> str:
+    """
+    Normaliza código JavaScript para compararlo ignorando formato.
+
+    Reconstruye el código desde los tokens del lexer de js_syntax_checker,
+    así que comentarios y espacios desaparecen sin confundir strings,
+    templates ni regex. Los saltos de línea entre tokens se conservan
+    porque afectan la inserción automática de punto y coma. Si el código
+    no se puede tokenizar se retorna sin cambios (solo equivale a sí mismo).
+
+    Args:
+        code: Código del usuario
+
+    Returns:
+        Código normalizado
+    """
+    try:
+        tokens = tokenize(code)
+    except (JSSyntaxError, RecursionError):
+        return code
+    out = []
+    prev: Optional[Token] = None
+    for token in tokens:
+        if token.type == "eof":
+            break
+        if prev is not None:
+            if token.newline_before:
+                out.append("\n")
+            elif _needs_space(prev, token):
+                out.append(" ")
+        out.append(token.value)
+        prev = token
+    return "".join(out)
+
+
+def _needs_space(prev: Token, token: Token) -> bool:
+    """Indica si dos tokens seguidos se leerían distinto al juntarlos"""
+    left, right = prev.value[-1], token.value[0]
+    if (left.isalnum() or left in "_$\\") and (right.isalnum() or right in "_$\\"):
+        return True
+    if (prev.type == "num" and right == ".") or (token.type == "num" and left in "?."):
+        return True
+    if right == "/" and left in "/*":
+        return True
+    if prev.type == "punct" and token.type == "punct":
+        # p. ej. "+" "+" no es "++", ni "?" "." es "?."
+        joined = prev.value + right
+        return any(punctuator.startswith(joined) for punctuator in PUNCTUATORS)
+    return False
+
+
+def _digest(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class CacheBackend(ABC):
+    """
+    Almacenamiento de un ValidationCache: guarda resultados por clave
+    ("<motor>.v<versión>:raw:<hash>" o "...:tokens:<hash>") con tamaño
+    máximo y expiración.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[ValidationResult]:
+        """Resultado vigente para la clave, o None"""
+
+    @abstractmethod
+    def put(self, keys: Iterable[str], result: ValidationResult) -> int:
+        """Guarda el resultado bajo cada clave; retorna cuántas entradas se expulsaron"""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Elimina todas las entradas"""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Cantidad de entradas guardadas"""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """LRU en memoria del proceso"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        super().__init__(maxsize, ttl)
+        self._entries: "OrderedDict[str, Tuple[float, ValidationResult]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[ValidationResult]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, result = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return result
+
+    def put(self, keys: Iterable[str], result: ValidationResult) -> int:
+        expires_at = time.monotonic() + self.ttl
+        evicted = 0
+        with self._lock:
+            for key in keys:
+                self._entries[key] = (expires_at, result)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                evicted += 1
+        return evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    Cache compartido por todos los procesos de la máquina (p. ej. los workers
+    de uvicorn) en un archivo SQLite en modo WAL: las lecturas no bloquean a
+    las escrituras y cada resultado se valida una sola vez entre todos.
+
+    La expiración usa la hora del sistema (time.time) porque los relojes
+    monótonos no se comparten entre procesos. El orden LRU se aproxima:
+    `last_used` se actualiza a lo sumo cada `touch_interval` segundos por
+    entrada, y el tamaño se ajusta cada `evict_every` escrituras, así que
+    puede excederse brevemente en esa cantidad por proceso.
+
+    Un error de SQLite (p. ej. base bloqueada) se trata como fallo de cache;
+    clear() y len() tampoco lo propagan (len() retorna 0). Las conexiones son
+    por hilo, así que las escrituras se serializan con el lock de escritura
+    de SQLite (BEGIN IMMEDIATE) en vez de un lock del proceso.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, path: str = VALIDATION_CACHE_PATH,
+                 touch_interval: float = 30.0, evict_every: int = 64):
+        super().__init__(maxsize, ttl)
+        self.path = path
+        self.touch_interval = touch_interval
+        self.evict_every = evict_every
+        self._local = threading.local()
+        self._puts = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS validation_cache ("
+            " key TEXT PRIMARY KEY, is_valid INTEGER NOT NULL, output TEXT, error TEXT,"
+            " expires_at REAL NOT NULL, last_used REAL NOT NULL) WITHOUT ROWID"
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS validation_cache_last_used ON validation_cache (last_used)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        """Conexión propia del hilo actual (sqlite3 no comparte conexiones entre hilos)"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # Autocommit: cada sentencia es su propia transacción corta
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str) -> Optional[ValidationResult]:
+        now = time.time()
+        try:
+            connection = self._connection()
+            row = connection.execute(
+                "SELECT is_valid, output, error, expires_at, last_used FROM validation_cache WHERE key = ?",
+                (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            is_valid, output, error, expires_at, last_used = row
+            if expires_at < now:
+                connection.execute("DELETE FROM validation_cache WHERE key = ? AND expires_at < ?", (key, now))
+                return None
+            if now - last_used >= self.touch_interval:
+                connection.execute("UPDATE validation_cache SET last_used = ? WHERE key = ?", (now, key))
+            return bool(is_valid), output, error
+        except sqlite3.Error as e:
+            logger.warning("Cache de validación SQLite no disponible: %s", e)
+            return None
+
+    def put(self, keys: Iterable[str], result: ValidationResult) -> int:
+        now = time.time()
+        is_valid, output, error = result
+        rows = [(key, int(is_valid), output, error, now + self.ttl, now) for key in keys]
+        try:
+            connection = self._connection()
+            with connection:
+                connection.execute("BEGIN IMMEDIATE")
+                connection.executemany("INSERT OR REPLACE INTO validation_cache VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._puts += 1
+            if self._puts % self.evict_every == 0:
+                return self._evict(connection, now)
+        except sqlite3.Error as e:
+            logger.warning("No se pudo guardar en el cache de validación SQLite: %s", e)
+        return 0
+
+    def _evict(self, connection: sqlite3.Connection, now: float) -> int:
+        """Elimina las entradas vencidas y luego las menos usadas que excedan maxsize"""
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            expired = connection.execute("DELETE FROM validation_cache WHERE expires_at < ?", (now,)).rowcount
+            excess = connection.execute("SELECT COUNT(*) FROM validation_cache").fetchone()[0] - self.maxsize
+            evicted = 0
+            if excess > 0:
+                evicted = connection.execute(
+                    "DELETE FROM validation_cache WHERE key IN"
+                    " (SELECT key FROM validation_cache ORDER BY last_used LIMIT ?)",
+                    (excess,)
+                ).rowcount
+        return expired + evicted
+
+    def clear(self) -> None:
+        try:
+            connection = self._connection()
+            with connection:
+                connection.execute("BEGIN IMMEDIATE")
+                connection.execute("DELETE FROM validation_cache")
+        except sqlite3.Error as e:
+            logger.warning("No se pudo vaciar el cache de validación SQLite: %s", e)
+
+    def __len__(self) -> int:
+        try:
+            return self._connection().execute("SELECT COUNT(*) FROM validation_cache").fetchone()[0]
+        except sqlite3.Error as e:
+            logger.warning("Cache de validación SQLite no disponible: %s", e)
+            return 0
+
+
+def create_backend(kind: str = VALIDATION_CACHE_BACKEND, maxsize: int = VALIDATION_CACHE_SIZE,
+                   ttl: float = VALIDATION_CACHE_TTL) -> CacheBackend:
+    """Crea el almacenamiento configurado en VALIDATION_CACHE_BACKEND (memory | sqlite)"""
+    if kind == "sqlite" and maxsize > 0:
+        return SQLiteCacheBackend(maxsize, ttl)
+    if kind not in ("memory", "sqlite"):
+        raise ValueError(f"VALIDATION_CACHE_BACKEND desconocido: {kind}")
+    return MemoryCacheBackend(maxsize, ttl)
+
+
+class ValidationCache:
+    """
+    Cache con expiración (TTL) para resultados de CodeValidator.validate.
+
+    Cada resultado se guarda bajo el hash exacto del código. Los resultados
+    exitosos además se guardan bajo el hash del código normalizado, de modo
+    que reformatear o comentar un programa válido no obliga a revalidarlo.
+    Los errores solo se reutilizan para el mismo código exacto, porque sus
+    mensajes incluyen números de línea.
+
+    Las entradas viven en un CacheBackend (LRU en memoria o SQLite compartido
+    entre procesos); los contadores de aciertos son de este proceso. Las
+    claves llevan el motor de validación y CACHE_VERSION como prefijo: los
+    motores python y node no aceptan exactamente lo mismo, y procesos con
+    motores distintos pueden compartir el mismo archivo SQLite.
+    """
+
+    def __init__(self, maxsize: int = VALIDATION_CACHE_SIZE, ttl: float = VALIDATION_CACHE_TTL,
+                 backend: Optional[CacheBackend] = None, engine: str = VALIDATOR_ENGINE):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.backend = backend if backend is not None else MemoryCacheBackend(maxsize, ttl)
+        self.namespace = f"{engine}.v{CACHE_VERSION}"
+        self.hits = 0
+        self.misses = 0
+        self.normalized_hits = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    def _key(self, kind: str, text: str) -> str:
+        return f"{self.namespace}:{kind}:{_digest(text)}"
+
+    def get(self, code: str) -> Optional[ValidationResult]:
+        """Busca el resultado guardado para exactamente este código"""
+        if not self.enabled:
+            return None
+        result = self.backend.get(self._key("raw", code))
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return result
+
+    def get_equivalent(self, code: str) -> Optional[ValidationResult]:
+        """
+        Busca un resultado exitoso de un código equivalente tras normalizar.
+        Solo debe usarse después de verificar patrones peligrosos sobre el
+        código original, ya que la normalización descarta los comentarios.
+        """
+        if not self.enabled:
+            return None
+        result = self.backend.get(self._key("tokens", normalize_code(code)))
+        if result is not None:
+            with self._lock:
+                self.normalized_hits += 1
+        return result
+
+    def put(self, code: str, result: ValidationResult) -> None:
+        """
+        Guarda el resultado de validar `code`, expulsando las entradas
+        menos usadas recientemente si se excede el tamaño máximo.
+        """
+        if not self.enabled:
+            return
+        keys = [self._key("raw", code)]
+        if result[0]:
+            keys.append(self._key("tokens", normalize_code(code)))
+        evicted = self.backend.put(keys, result)
+        if evicted:
+            with self._lock:
+                self.evictions += evicted
+
+    def clear(self) -> None:
+        """Elimina todas las entradas y reinicia los contadores"""
+        self.backend.clear()
+        with self._lock:
+            self.hits = self.misses = self.normalized_hits = self.evictions = 0
+
+    def stats(self) -> Dict[str, float]:
+        """Retorna contadores de uso del cache"""
+        size = len(self.backend)
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": size,
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "normalizedHits": self.normalized_hits,
+                "evictions": self.evictions,
+                "hitRatio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Cache compartido por la aplicación
+validation_cache = ValidationCache(backend=create_backend())
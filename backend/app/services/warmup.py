@@ -0,0 +1,140 @@
+"""
+Calentamiento al iniciar: deja listos reglas, payloads, motor de sintaxis y
+cache de validación antes de declarar el worker listo para recibir tráfico
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+from app.logger import setup_logger
+from app.services.code_validator import CodeValidator, validation_executor
+from app.services.data_provider import DataProvider
+from app.services.level_rules import level_specs
+from app.services.level_summaries import level_summaries
+from app.services.static_responses import static_responses
+
+logger = setup_logger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+READY = "ready"
+FAILED = "failed"
+STOPPING = "stopping"
+
+
+class Warmup:
+    """
+    Ejecuta en segundo plano los pasos de calentamiento y registra su estado.
+
+    La app acepta conexiones apenas inicia (liveness), pero solo se declara
+    lista (readiness) cuando todos los pasos terminaron; si uno falla el
+    worker queda como no listo y el error se reporta en /api/health/ready.
+    """
+
+    def __init__(self):
+        self.status = PENDING
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        self.error: Optional[str] = None
+        self.duration: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status == READY
+
+    async def _step(self, name: str, run: Callable[[], Awaitable[Optional[Dict[str, Any]]]]) -> None:
+        started = time.perf_counter()
+        self.steps[name] = {"status": RUNNING}
+        detail = await run()
+        self.steps[name] = {
+            "status": READY,
+            "durationMs": round((time.perf_counter() - started) * 1000, 3),
+            **(detail or {}),
+        }
+
+    async def run(self) -> None:
+        """Ejecuta todos los pasos en orden; no lanza excepciones"""
+        self.status = RUNNING
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        current = None
+        try:
+            # Leer y compilar los niveles, serializar payloads y buscar óptimos
+            # es trabajo de CPU: se hace en el executor para no frenar el event
+            # loop, que ya atiende /api/health mientras tanto
+            levels = await loop.run_in_executor(None, DataProvider.get_all_levels)
+
+            async def compile_rules():
+                specs = await loop.run_in_executor(
+                    None, lambda: [level_specs.get(level) for level in levels.values()]
+                )
+                await asyncio.gather(*(level_specs.optimum_async(spec) for spec in specs))
+                return {"levels": len(levels)}
+
+            async def serialize_payloads():
+                await loop.run_in_executor(None, static_responses.warm_up)
+                await loop.run_in_executor(None, level_summaries.warm_up)
+
+            async def check_syntax_backend():
+                # Descubre Node.js (o el motor en proceso) antes de la primera request
+                engine = await loop.run_in_executor(validation_executor, CodeValidator.check_backend)
+                return {"engine": engine}
+
+            async def prewarm_validation_cache():
+                codes = [level["initialCode"] for level in levels.values() if level.get("initialCode")]
+                await CodeValidator.prewarm_cache(codes)
+                return {"programs": len(codes)}
+
+            for current, step in (
+                ("levelRules", compile_rules),
+                ("staticPayloads", serialize_payloads),
+                ("syntaxBackend", check_syntax_backend),
+                ("validationCache", prewarm_validation_cache),
+            ):
+                await self._step(current, step)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.status = FAILED
+            self.error = f"{current or 'levels'}: {e}"
+            if current:
+                self.steps[current] = {"status": FAILED, "error": str(e)}
+            logger.error("Calentamiento fallido en %s: %s", current, e, exc_info=True)
+            return
+        finally:
+            self.duration = time.perf_counter() - started
+
+        self.status = READY
+        logger.info("Calentamiento completado en %.1f ms", self.duration * 1000, extra={"steps": self.steps})
+
+    def start(self) -> asyncio.Task:
+        """Inicia el calentamiento en segundo plano"""
+        self._task = asyncio.ensure_future(self.run())
+        return self._task
+
+    async def wait(self) -> None:
+        """Espera a que termine el calentamiento iniciado con start()"""
+        if self._task is not None:
+            await asyncio.shield(self._task)
+
+    async def stop(self) -> None:
+        """Marca el worker como no listo (para que el balanceador lo retire) y cancela el calentamiento"""
+        self.status = STOPPING
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def report(self) -> Dict[str, Any]:
+        """Estado para /api/health/ready"""
+        report: Dict[str, Any] = {"status": self.status, "steps": self.steps}
+        if self.duration is not None:
+            report["durationMs"] = round(self.duration * 1000, 3)
+        if self.error:
+            report["error"] = self.error
+        return report
+
+
+# Calentamiento compartido por la aplicación
+warmup = Warmup()
@@ -0,0 +1,3 @@
+"""
+Benchmarks de carga y latencia de la API
+"""
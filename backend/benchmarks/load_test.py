@@ -0,0 +1,426 @@
+"""
+Prueba de carga de la API: mezclas realistas de requests a niveles de
+concurrencia fijos, con throughput y percentiles de latencia comparados
+contra una línea base guardada.
+
+Uso (desde backend/):
+    python -m benchmarks.load_test                         # app de main.py en proceso
+    python -m benchmarks.load_test --url http://localhost:8000
+    python -m benchmarks.load_test --update-baseline       # guardar la nueva línea base
+
+La suite se repite --repeat veces y se compara la mediana de cada métrica.
+Termina con código 1 si hubo requests con error, si el throughput o p50
+empeoran más que --threshold, o si p95/p99 empeoran más que
+--tail-threshold respecto de la línea base.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_CONCURRENCY = (1, 8, 32)
+DEFAULT_REQUESTS = 400
+DEFAULT_WARMUP = 20
+DEFAULT_REPEATS = 3
+DEFAULT_THRESHOLD = 0.25
+# Los percentiles altos dependen de unas pocas requests: se toleran más
+DEFAULT_TAIL_THRESHOLD = 0.60
+# Diferencias de latencia menores a esto (ms) se consideran ruido
+MIN_LATENCY_DELTA_MS = 1.0
+# Estados esperados: cualquier otro cuenta como error
+EXPECTED_STATUSES = frozenset({200, 304})
+
+
+@dataclass(frozen=True)
+class RequestSpec:
+    """Una request de la mezcla"""
+    method: str
+    path: str
+    json: Optional[Dict[str, Any]] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class Workload:
+    """Datos del servidor usados para construir las requests (niveles y ETags)"""
+    levels: List[Dict[str, Any]]
+    etags: Dict[str, str]
+
+
+RequestFactory = Callable[[random.Random, Workload], RequestSpec]
+
+
+def _execute_request(rng: random.Random, workload: Workload) -> RequestSpec:
+    """
+    POST /api/execute: mayormente el código inicial de un nivel (acierto de
+    cache), más programas nuevos, errores de sintaxis y patrones peligrosos.
+    """
+    level = rng.choice(workload.levels)
+    roll = rng.random()
+    if roll < 0.6:
+        code = level["initialCode"]
+    elif roll < 0.85:
+        code = "".join(f"moveForward({rng.randint(1, 9)});\nturnRight({rng.choice((90, 180, 270))});\n"
+                       for _ in range(rng.randint(2, 8)))
+    elif roll < 0.95:
+        code = f"for (let i = 0; i < {rng.randint(2, 9)}; i++) {{\n  moveForward(1);\n"
+    else:
+        code = f"moveForward(1);\neval('turnRight({rng.randint(1, 359)})');\n"
+    return RequestSpec("POST", "/api/execute", json={"code": code, "levelId": level["id"]})
+
+
+def _validate_request(rng: random.Random, workload: Workload) -> RequestSpec:
+    """POST /api/levels/{id}/validate, la mitad con traza de comandos simulada"""
+    level = rng.choice(workload.levels)
+    payload: Dict[str, Any] = {
+        "levelId": level["id"],
+        "playerPosition": {"x": rng.uniform(0, 1200), "y": rng.uniform(198, 700)},
+        "playerAngle": rng.choice((0, 90, 180, -90)),
+        "actionsExecuted": ["moveForward", "turnRight"],
+        "stepsMoved": rng.randint(0, 20),
+        "rotationsMade": rng.randint(0, 6),
+    }
+    if rng.random() < 0.5:
+        payload["commands"] = [
+            {"name": "moveForward", "args": [rng.randint(1, 4)]} if i % 2 == 0
+            else {"name": rng.choice(("turnRight", "turnLeft")), "args": []}
+            for i in range(rng.randint(2, 12))
+        ]
+    return RequestSpec("POST", f"/api/levels/{level['id']}/validate", json=payload)
+
+
+def _static_request(rng: random.Random, workload: Workload) -> RequestSpec:
+    """GET de datos estáticos; la mitad revalida con If-None-Match (304)"""
+    roll = rng.random()
+    if roll < 0.5:
+        path = f"/api/levels/{rng.choice(workload.levels)['id']}"
+    elif roll < 0.7:
+        path = "/api/characters"
+    elif roll < 0.85:
+        path = "/api/functions"
+    else:
+        return RequestSpec("GET", "/api/levels?limit=20")
+    headers = {"Accept-Encoding": "gzip, br"}
+    etag = workload.etags.get(path)
+    if etag and rng.random() < 0.5:
+        headers["If-None-Match"] = etag
+    return RequestSpec("GET", path, headers=headers)
+
+
+# Mezclas disponibles: (peso, generador de request)
+SCENARIOS: Dict[str, Sequence[Tuple[float, RequestFactory]]] = {
+    "execute": ((1.0, _execute_request),),
+    "validate": ((1.0, _validate_request),),
+    "static": ((1.0, _static_request),),
+    "mixed": ((0.35, _execute_request), (0.25, _validate_request), (0.40, _static_request)),
+}
+
+
+def pick_request(mix: Sequence[Tuple[float, RequestFactory]], rng: random.Random,
+                 workload: Workload) -> RequestSpec:
+    """Elige un generador de la mezcla según su peso y construye la request"""
+    factories = [factory for _, factory in mix]
+    weights = [weight for weight, _ in mix]
+    return rng.choices(factories, weights)[0](rng, workload)
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """Percentil por rango más cercano sobre valores ya ordenados"""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(fraction * len(sorted_values))
+    return sorted_values[min(max(rank, 1), len(sorted_values)) - 1]
+
+
+def summarize(latencies: Sequence[float], elapsed: float, errors: int) -> Dict[str, float]:
+    """Throughput (req/s) y percentiles de latencia (ms) de una corrida"""
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "throughput": round(len(ordered) / elapsed, 2) if elapsed > 0 else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+    }
+
+
+async def load_workload(client: httpx.AsyncClient) -> Workload:
+    """Descarga los niveles y los ETags de los datos estáticos desde la propia API"""
+    listing = (await client.get("/api/levels", params={"limit": 200})).json()
+    levels, etags = [], {}
+    for summary in listing["levels"]:
+        response = await client.get(f"/api/levels/{summary['id']}")
+        levels.append(response.json())
+        etags[f"/api/levels/{summary['id']}"] = response.headers.get("etag", "")
+    for path in ("/api/characters", "/api/functions"):
+        etags[path] = (await client.get(path)).headers.get("etag", "")
+    return Workload(levels=levels, etags=etags)
+
+
+async def run_scenario(client: httpx.AsyncClient, workload: Workload, scenario: str,
+                       concurrency: int, total: int, warmup: int = 0,
+                       seed: int = 0) -> Dict[str, float]:
+    """
+    Ejecuta `total` requests de una mezcla con `concurrency` clientes simultáneos.
+
+    Las primeras `warmup` requests no se miden.
+    """
+    mix = SCENARIOS[scenario]
+    rng = random.Random(f"{seed}:{scenario}:{concurrency}")
+    specs = [pick_request(mix, rng, workload) for _ in range(warmup + total)]
+
+    async def send(spec: RequestSpec) -> Tuple[float, bool]:
+        started = time.perf_counter()
+        try:
+            response = await client.request(spec.method, spec.path, json=spec.json, headers=spec.headers)
+            ok = response.status_code in EXPECTED_STATUSES
+        except httpx.HTTPError:
+            ok = False
+        return time.perf_counter() - started, ok
+
+    for spec in specs[:warmup]:
+        await send(spec)
+
+    pending = iter(specs[warmup:])
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        # Cada cliente toma la siguiente request libre hasta agotar la lista
+        for spec in pending:
+            latency, ok = await send(spec)
+            latencies.append(latency)
+            errors += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - started, errors)
+
+
+async def run_suite(client: httpx.AsyncClient, scenarios: Sequence[str], concurrency: Sequence[int],
+                    total: int, warmup: int = DEFAULT_WARMUP, seed: int = 0,
+                    report: Optional[Callable[[str, Dict[str, float]], None]] = None) -> Dict[str, Dict[str, float]]:
+    """Corre cada mezcla en cada nivel de concurrencia; las claves son "mezcla@concurrencia" """
+    workload = await load_workload(client)
+    results = {}
+    for scenario in scenarios:
+        for level in concurrency:
+            key = f"{scenario}@{level}"
+            results[key] = await run_scenario(client, workload, scenario, level, total, warmup, seed)
+            if report:
+                report(key, results[key])
+    return results
+
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float = 60.0) -> None:
+    """Espera a que /api/health/ready responda 200 (calentamiento terminado)"""
+    deadline = time.monotonic() + timeout
+    while True:
+        response = await client.get("/api/health/ready")
+        if response.status_code == 200:
+            return
+        if response.json().get("status") == "failed" or time.monotonic() > deadline:
+            raise RuntimeError(f"El servidor no está listo: {response.text}")
+        await asyncio.sleep(0.05)
+
+
+async def run_in_process(run: Callable[[httpx.AsyncClient], Awaitable[Any]], lifespan: bool = True) -> Any:
+    """
+    Ejecuta `run` con un cliente conectado a la app de main.py por el
+    transporte ASGI de httpx (sin red ni uvicorn).
+
+    Args:
+        run: Corrutina que recibe el cliente
+        lifespan: Ejecutar los eventos de inicio y cierre de la app
+    """
+    from main import app
+    from app.services.rate_limiter import execute_limiter, validate_limiter
+
+    # Toda la carga sale de un mismo cliente: el límite por cliente la rechazaría
+    limiters = (execute_limiter, validate_limiter)
+    previous = [limiter.enabled for limiter in limiters]
+    for limiter in limiters:
+        limiter.enabled = False
+
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=30) as client:
+            if not lifespan:
+                return await run(client)
+            async with app.router.lifespan_context(app):
+                await wait_until_ready(client)
+                return await run(client)
+    finally:
+        for limiter, enabled in zip(limiters, previous):
+            limiter.enabled = enabled
+
+
+async def run_remote(run: Callable[[httpx.AsyncClient], Awaitable[Any]], url: str) -> Any:
+    """
+    Ejecuta `run` contra un servidor en marcha (p. ej. uvicorn), que debe
+    iniciarse con RATE_LIMIT_ENABLED=false para no rechazar la carga con 429.
+    """
+    async with httpx.AsyncClient(base_url=url, timeout=30) as client:
+        await wait_until_ready(client)
+        return await run(client)
+
+
+def median_results(runs: Sequence[Dict[str, Dict[str, float]]]) -> Dict[str, Dict[str, float]]:
+    """
+    Combina varias corridas de la suite: mediana de throughput y de cada
+    percentil (requests por corrida) y suma de los errores de todas.
+    """
+    combined = {}
+    for key in runs[0]:
+        results = [run[key] for run in runs if key in run]
+        combined[key] = {
+            "requests": results[0]["requests"],
+            "errors": sum(result["errors"] for result in results),
+            **{metric: round(statistics.median(result[metric] for result in results), 3)
+               for metric in ("throughput", "p50_ms", "p95_ms", "p99_ms")},
+        }
+    return combined
+
+
+def compare_to_baseline(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+                        threshold: float = DEFAULT_THRESHOLD,
+                        tail_threshold: float = DEFAULT_TAIL_THRESHOLD) -> List[str]:
+    """
+    Compara resultados con la línea base.
+
+    Returns:
+        Descripción de cada regresión (vacía si no hay ninguna). Cuentan los
+        errores, una caída de throughput o un aumento de p50 mayores que
+        `threshold` (fracción) y un aumento de p95/p99 mayor que
+        `tail_threshold`; los resultados sin línea base se ignoran.
+    """
+    regressions = []
+    for key, result in results.items():
+        if result["errors"]:
+            regressions.append(f"{key}: {result['errors']} requests con error")
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if result["throughput"] < base["throughput"] * (1 - threshold):
+            regressions.append(
+                f"{key}: throughput {result['throughput']:.1f} req/s < {base['throughput']:.1f} req/s"
+            )
+        for metric, tolerance in (("p50_ms", threshold), ("p95_ms", tail_threshold), ("p99_ms", tail_threshold)):
+            limit = max(base[metric] * (1 + tolerance), base[metric] + MIN_LATENCY_DELTA_MS)
+            if result[metric] > limit:
+                regressions.append(f"{key}: {metric} {result[metric]:.2f} ms > {base[metric]:.2f} ms")
+    return regressions
+
+
+def load_baseline(path: Path) -> Dict[str, Dict[str, float]]:
+    """Resultados de la línea base ({} si el archivo no existe)"""
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))["results"]
+
+
+def save_baseline(path: Path, results: Dict[str, Dict[str, float]], target: str, repeats: int = 1) -> None:
+    document = {
+        "meta": {
+            "target": target,
+            "repeats": repeats,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "recorded": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": results,
+    }
+    path.write_text(json.dumps(document, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+def _print_result(key: str, result: Dict[str, float]) -> None:
+    print(
+        f"{key:<14} {result['requests']:>6} req {result['throughput']:>9.1f} req/s  "
+        f"p50 {result['p50_ms']:>8.2f} ms  p95 {result['p95_ms']:>8.2f} ms  "
+        f"p99 {result['p99_ms']:>8.2f} ms  errores {result['errors']}",
+        flush=True,
+    )
+
+
+def _parse_args(argv: Optional[Sequence[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Prueba de carga de la API de CodeShyri")
+    parser.add_argument("--url", help="Servidor en marcha (por defecto, la app en proceso)")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Mezclas separadas por comas ({', '.join(SCENARIOS)})")
+    parser.add_argument("--concurrency", default=",".join(map(str, DEFAULT_CONCURRENCY)),
+                        help="Niveles de concurrencia separados por comas")
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS,
+                        help="Requests medidas por mezcla y nivel de concurrencia")
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP, help="Requests de calentamiento")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEATS,
+                        help="Corridas de la suite; se compara la mediana de cada métrica")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Regresión tolerada en throughput y p50 como fracción (0.25 = 25%%)")
+    parser.add_argument("--tail-threshold", type=float, default=DEFAULT_TAIL_THRESHOLD,
+                        help="Regresión tolerada en p95 y p99 como fracción")
+    parser.add_argument("--update-baseline", action="store_true", help="Guardar los resultados como línea base")
+    args = parser.parse_args(argv)
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"Mezclas desconocidas: {', '.join(unknown)}")
+    args.concurrency = [int(level) for level in args.concurrency.split(",")]
+    if args.repeat < 1:
+        parser.error("--repeat debe ser al menos 1")
+    return args
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = _parse_args(argv)
+
+    async def run(client: httpx.AsyncClient) -> Dict[str, Dict[str, float]]:
+        runs = []
+        for repeat in range(1, args.repeat + 1):
+            print(f"Corrida {repeat}/{args.repeat}", flush=True)
+            runs.append(await run_suite(client, args.scenarios, args.concurrency, args.requests,
+                                        args.warmup, args.seed, report=_print_result))
+        return median_results(runs)
+
+    if args.url:
+        target = args.url
+        results = asyncio.run(run_remote(run, args.url))
+    else:
+        # En proceso los logs de cada request compiten con la carga medida
+        os.environ.setdefault("LOG_LEVEL", "ERROR")
+        target = "asgi"
+        results = asyncio.run(run_in_process(run))
+
+    if args.repeat > 1:
+        print(f"Mediana de {args.repeat} corridas", flush=True)
+        for key, result in results.items():
+            _print_result(key, result)
+
+    if args.update_baseline:
+        save_baseline(args.baseline, results, target, args.repeat)
+        print(f"Línea base guardada en {args.baseline}")
+        return 0
+
+    regressions = compare_to_baseline(results, load_baseline(args.baseline), args.threshold, args.tail_threshold)
+    for regression in regressions:
+        print(f"REGRESIÓN {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,10 +5,20 @@ from fastapi import FastAPI, Request, status
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
-from app.config import CORS_ORIGINS, APP_TITLE, APP_VERSION
-from app.routers import execution, game_data, health
+from app.config import CORS_ORIGINS, APP_TITLE, APP_VERSION, LEVEL_RELOAD_INTERVAL
+from app.routers import execution, game_data, health, progress
 from app.exceptions import CodeShyriException
 from app.logger import app_logger
+from app.middleware import MetricsMiddleware, ProfilingMiddleware
+from app.services.node_worker_pool import node_worker_pool
+from app.services.code_validator import validation_executor
+from app.services.level_catalog import level_catalog
+from app.services.level_rules import level_specs
+from app.services.static_responses import static_responses
+from app.services.level_summaries import level_summaries
+from app.services.leaderboard import leaderboards
+from app.services.progress_store import progress_recorder
+from app.services.warmup import warmup
 
 # Crear aplicación FastAPI
 app = FastAPI(title=APP_TITLE, version=APP_VERSION)
@@ -22,6 +32,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Conteo y latencia por ruta para /metrics
+app.add_middleware(MetricsMiddleware)
+
+# Perfilado opt-in (cabecera X-Profile o muestreo): Server-Timing y pilas colapsadas
+app.add_middleware(ProfilingMiddleware)
+
 
 # Exception handlers globales
 @app.exception_handler(CodeShyriException)
@@ -33,7 +49,8 @@ async def codeshyri_exception_handler(request: Request, exc: CodeShyriException)
     )
     return JSONResponse(
         status_code=exc.status_code,
-        content={"error": exc.detail, "type": exc.__class__.__name__}
+        content={"error": exc.detail, "type": exc.__class__.__name__},
+        headers=exc.headers
     )
 
 
@@ -64,15 +81,54 @@ async def general_exception_handler(request: Request, exc: Exception):
     )
 
 
+def invalidate_level_caches(level_id: str):
+    """
+    Descarta la respuesta serializada y los resúmenes de un nivel recargado,
+    agregado o eliminado. El óptimo de la nueva versión se busca aquí, en el
+    hilo del watcher, para que la primera validación no lo espere.
+    """
+    static_responses.invalidate(f"level:{level_id}")
+    level_summaries.invalidate()
+    try:
+        level = level_catalog.get(level_id)
+    except (OSError, ValueError) as e:
+        # Nivel nuevo inválido: se informa al pedirlo
+        app_logger.error("No se pudo leer el nivel agregado %s: %s", level_id, e)
+        return
+    if level is not None:
+        level_specs.optimum(level_specs.get(level))
+
+
 @app.on_event("startup")
 async def startup_event():
     """Evento de inicio de la aplicación"""
     app_logger.info(f"🚀 {APP_TITLE} v{APP_VERSION} iniciado")
+    
+    # Recargar en caliente los niveles modificados en disco
+    level_catalog.add_listener(invalidate_level_caches)
+    level_catalog.start_watcher(LEVEL_RELOAD_INTERVAL)
+    
+    # Reglas, payloads, motor de sintaxis y cache de validación se preparan en
+    # segundo plano; /api/health/ready responde 503 hasta que terminen
+    warmup.start()
+    
+    # Los intentos con playerId se guardan en lotes periódicos
+    progress_recorder.start()
+    
+    # Tablas de posiciones en memoria, guardadas periódicamente en disco
+    leaderboards.load()
+    leaderboards.start()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Evento de cierre de la aplicación"""
+    await warmup.stop()
+    await progress_recorder.stop()
+    await leaderboards.stop()
+    level_catalog.stop_watcher()
+    validation_executor.shutdown(wait=False, cancel_futures=True)
+    node_worker_pool.shutdown()
     app_logger.info(f"👋 {APP_TITLE} cerrado")
 
 
@@ -80,3 +136,4 @@ async def shutdown_event():
 app.include_router(health.router)
 app.include_router(execution.router)
 app.include_router(game_data.router)
+app.include_router(progress.router)
@@ -0,0 +1,89 @@
+"""
+Tests para el harness de pruebas de carga
+"""
+from benchmarks.load_test import (
+    SCENARIOS, compare_to_baseline, median_results, percentile, run_in_process, run_suite, summarize
+)
+
+BASE = {"requests": 100, "errors": 0, "throughput": 1000.0, "p50_ms": 10.0, "p95_ms": 20.0, "p99_ms": 40.0}
+
+
+class TestStatistics:
+    """Tests para percentiles y resúmenes de una corrida"""
+
+    def test_percentile_nearest_rank(self):
+        """Test del percentil por rango más cercano"""
+        values = list(range(1, 101))
+        assert percentile(values, 0.50) == 50
+        assert percentile(values, 0.95) == 95
+        assert percentile(values, 0.99) == 99
+        assert percentile([7], 0.99) == 7
+        assert percentile([], 0.5) == 0.0
+
+    def test_summarize_reports_milliseconds(self):
+        """Test que la latencia se reporta en ms y el throughput en req/s"""
+        result = summarize([0.002, 0.001, 0.003, 0.004], elapsed=0.5, errors=1)
+        assert result["throughput"] == 8.0
+        assert result["p50_ms"] == 2.0
+        assert result["p99_ms"] == 4.0
+        assert result["errors"] == 1
+
+    def test_median_of_repeated_runs(self):
+        """Test que una corrida atípica no mueve el resultado combinado"""
+        runs = [
+            {"mixed@8": {**BASE, "throughput": 1000.0, "p50_ms": 10.0}},
+            {"mixed@8": {**BASE, "throughput": 400.0, "p50_ms": 30.0, "errors": 1}},
+            {"mixed@8": {**BASE, "throughput": 1100.0, "p50_ms": 11.0}},
+        ]
+        combined = median_results(runs)["mixed@8"]
+        assert combined["throughput"] == 1000.0
+        assert combined["p50_ms"] == 11.0
+        assert combined["requests"] == 100
+        assert combined["errors"] == 1
+
+
+class TestCompareToBaseline:
+    """Tests para la detección de regresiones"""
+
+    def test_within_threshold_passes(self):
+        """Test que variaciones dentro del umbral no son regresiones"""
+        result = {**BASE, "throughput": 800.0, "p95_ms": 24.0}
+        assert compare_to_baseline({"mixed@8": result}, {"mixed@8": BASE}, threshold=0.25) == []
+
+    def test_regressions_are_reported(self):
+        """Test que caídas de throughput, latencias altas y errores fallan"""
+        result = {**BASE, "throughput": 500.0, "p99_ms": 80.0, "errors": 2}
+        regressions = compare_to_baseline({"mixed@8": result}, {"mixed@8": BASE}, threshold=0.25)
+
+        assert len(regressions) == 3
+        assert any("throughput" in regression for regression in regressions)
+        assert any("p99_ms" in regression for regression in regressions)
+
+    def test_tail_percentiles_have_wider_tolerance(self):
+        """Test que p95/p99 usan tail_threshold y p50 el umbral normal"""
+        result = {**BASE, "p95_ms": 30.0, "p99_ms": 60.0}
+        assert compare_to_baseline({"mixed@8": result}, {"mixed@8": BASE}, threshold=0.25, tail_threshold=0.6) == []
+        result = {**BASE, "p50_ms": 13.0}
+        regressions = compare_to_baseline({"mixed@8": result}, {"mixed@8": BASE}, threshold=0.25, tail_threshold=0.6)
+        assert len(regressions) == 1 and "p50_ms" in regressions[0]
+
+    def test_small_absolute_latency_changes_are_noise(self):
+        """Test que en latencias sub-milisegundo se tolera el ruido absoluto"""
+        base = {**BASE, "p50_ms": 0.4, "p95_ms": 0.5, "p99_ms": 0.6}
+        result = {**base, "p99_ms": 1.2}
+        assert compare_to_baseline({"static@1": result}, {"static@1": base}) == []
+
+    def test_missing_baseline_is_ignored(self):
+        """Test que un resultado sin línea base no falla"""
+        assert compare_to_baseline({"nuevo@1": BASE}, {}) == []
+
+
+async def test_suite_runs_in_process():
+    """Test que todas las mezclas corren contra la app en proceso sin errores"""
+    async def run(client):
+        return await run_suite(client, list(SCENARIOS), [1, 4], total=12, warmup=2)
+
+    results = await run_in_process(run, lifespan=False)
+
+    assert set(results) == {f"{scenario}@{level}" for scenario in SCENARIOS for level in (1, 4)}
+    assert all(result["requests"] == 12 and result["errors"] == 0 for result in results.values())
@@ -1,7 +1,10 @@
 """
 Tests unitarios para el servicio CodeValidator
 """
-from app.services.code_validator import CodeValidator
+import asyncio
+import time
+from app.config import VALIDATION_MAX_CODE
+from app.services.code_validator import CODE_TOO_LONG_ERROR, CodeValidator
 
 
 class TestCodeValidator:
@@ -57,6 +60,14 @@ class TestCodeValidator:
         
         assert isinstance(is_valid, bool)
     
+    def test_validate_rejects_code_over_max_length(self):
+        """Test que un programa demasiado largo se rechaza sin parsearlo"""
+        code = "(" * (VALIDATION_MAX_CODE + 1)
+        is_valid, success_msg, error_msg = CodeValidator.validate(code)
+        
+        assert is_valid is False
+        assert error_msg == CODE_TOO_LONG_ERROR
+    
     def test_validate_dangerous_patterns_method(self):
         """Test del método validate_dangerous_patterns directamente"""
         safe_code = "moveForward(); turnRight();"
@@ -68,3 +79,26 @@ class TestCodeValidator:
         assert result is not None
         assert "eval" in result.lower()
 
+    
+    async def test_validate_async_matches_sync(self):
+        """Test que validate_async retorna lo mismo que validate"""
+        code = "moveForward(2); turnRight(90);"
+        
+        assert await CodeValidator.validate_async(code) == CodeValidator.validate(code)
+    
+    async def test_validate_async_does_not_block_event_loop(self, monkeypatch):
+        """Test que una validación lenta no bloquea otras corrutinas"""
+        def slow_validate(code):
+            time.sleep(0.3)
+            return True, "Código válido", None
+        
+        monkeypatch.setattr(CodeValidator, "validate", staticmethod(slow_validate))
+        
+        start = time.perf_counter()
+        validation = asyncio.create_task(CodeValidator.validate_async("moveForward();"))
+        await asyncio.sleep(0.05)
+        elapsed = time.perf_counter() - start
+        
+        assert elapsed < 0.25
+        assert not validation.done()
+        assert (await validation)[0] is True
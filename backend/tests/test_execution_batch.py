@@ -0,0 +1,53 @@
+"""
+Tests para el endpoint de validación de código en lote
+"""
+import json
+from fastapi.testclient import TestClient
+from app.config import BATCH_MAX_ITEMS
+from main import app
+
+client = TestClient(app)
+
+
+class TestExecuteBatch:
+    """Tests para POST /api/execute/batch"""
+
+    def test_batch_results_keep_request_order(self):
+        """Test que cada programa recibe su resultado en el orden enviado"""
+        payload = [
+            {"code": "moveForward(2);", "levelId": "1"},
+            {"code": "eval('x');", "levelId": "1"},
+            {"code": "moveForward(2);", "levelId": "1"},
+            {"code": "moveForward(2;", "levelId": "1"},
+        ]
+        response = client.post("/api/execute/batch", json=payload)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [r["success"] for r in data["results"]] == [True, False, True, False]
+        assert data["uniquePrograms"] == 3
+        assert "eval" in data["results"][1]["error"]
+
+    def test_batch_stream_ndjson(self):
+        """Test que con stream=true se recibe una línea NDJSON por programa"""
+        payload = [
+            {"code": "turnLeft();", "levelId": "2"},
+            {"code": "turnLeft();", "levelId": "2"},
+            {"code": "fetch('/x');", "levelId": "2"},
+        ]
+        response = client.post("/api/execute/batch?stream=true", json=payload)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        by_index = {line["index"]: line for line in lines}
+        assert sorted(by_index) == [0, 1, 2]
+        assert by_index[0]["success"] and by_index[1]["success"]
+        assert not by_index[2]["success"]
+
+    def test_batch_too_large(self):
+        """Test que un lote demasiado grande se rechaza"""
+        payload = [{"code": f"moveForward({i});", "levelId": "1"} for i in range(BATCH_MAX_ITEMS + 1)]
+        response = client.post("/api/execute/batch", json=payload)
+
+        assert response.status_code == 400
@@ -0,0 +1,57 @@
+"""
+Tests para el índice del grid de los niveles
+"""
+from app.services.data_provider import DataProvider
+from app.services.grid_index import GOAL, MAIZE, PATH, START, WATER, GridIndex, grid_to_pixel_for_player, water_cells
+from app.services.movement_simulator import LevelGeometry, simulate_level
+from tests.test_movement_simulator import LEVEL_1_PATH_TRACE
+
+LEVELS = DataProvider.get_all_levels()
+
+
+class TestWaterCells:
+    """Tests para water_cells"""
+
+    def test_level_lake(self):
+        """Test que se marcan las celdas cuyo centro cae dentro del lago del nivel 1"""
+        assert water_cells(LEVELS["1"]["lake"]) == {(x, y) for x in range(-1, 2) for y in (6, 7)}
+
+    def test_random_lake(self):
+        """Test que un lago sin centro (ubicado al azar por el frontend) no marca agua"""
+        assert water_cells({"width": 200, "height": 100}) == frozenset()
+        assert water_cells(None) == frozenset()
+
+
+class TestGridIndex:
+    """Tests para GridIndex"""
+
+    def test_flags(self):
+        """Test que las banderas del índice coinciden con las celdas del nivel"""
+        geometry = LevelGeometry.from_level(LEVELS["1"])
+        index = geometry.index
+        assert set(index.flagged(PATH)) == geometry.path
+        assert set(index.flagged(MAIZE)) == geometry.maize
+        assert set(index.flagged(WATER)) == geometry.water
+        assert index.flagged(START) == [geometry.start]
+        assert index.flagged(GOAL) == [geometry.goal]
+        assert index.is_path(2, 1) and not index.is_path(2, 2)
+        assert index.flags(100, -100) == 0
+
+    def test_maize_mask(self):
+        """Test que cada maíz tiene su bit y la máscara se decodifica a sus celdas"""
+        index = GridIndex((0, 0), None, [(3, 0), (1, 0)], [(0, 0)])
+        assert index.maize_bit(1, 0) | index.maize_bit(3, 0) == index.all_maize == 0b11
+        assert index.maize_bit(0, 0) == 0
+        assert index.maize_cells(index.maize_bit(3, 0)) == {(3, 0)}
+
+    def test_pixel_transforms(self):
+        """Test que las posiciones precalculadas coinciden con la conversión grid ↔ píxel"""
+        index = LevelGeometry.from_level(LEVELS["1"]).index
+        for cell in [(-1, 1), (5, 3), (18, 7), (40, -3)]:
+            assert index.to_pixel(*cell) == grid_to_pixel_for_player(*cell)
+            assert index.to_cell(*index.to_pixel(*cell)) == (cell[0], cell[1] + 1)
+
+    def test_simulation_tracks_maize_as_mask(self):
+        """Test que la simulación lleva el maíz recogido como máscara del índice"""
+        state = simulate_level(LEVELS["1"], LEVEL_1_PATH_TRACE)
+        assert state.maize_mask == LevelGeometry.from_level(LEVELS["1"]).index.all_maize
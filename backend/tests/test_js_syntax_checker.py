@@ -0,0 +1,696 @@
+"""
+Tests unitarios para el verificador de sintaxis JavaScript en Python
+"""
+import json
+import shutil
+import subprocess
+import sys
+import time
+import pytest
+from app.services.data_provider import DataProvider
+from app.services.code_validator import CodeValidator, STUB_DECLARATIONS
+from app.services.js_syntax_checker import MAX_NESTING_DEPTH, STACK_OVERFLOW, check_syntax
+
+LEVELS = DataProvider.get_all_levels()
+
+
+VALID_PROGRAMS = [
+    "",
+    "moveForward(2); turnRight(90); moveForward(1);",
+    "for (let i = 0; i < 4; i++) {\n  moveForward(2);\n  turnRight();\n}",
+    "let pasos = 3\nwhile (pasos > 0) {\n  moveForward()\n  pasos--\n}",
+    "const avanzar = (n = 1) => moveForward(n * 2);\navanzar(3);",
+    "function zigzag(veces) {\n  for (const v of [1, 2]) { turn(v > 1 ? 90 : -90); }\n  return veces;\n}",
+    "if (x) { jump(); } else if (y) { spin(); } else attack()",
+    "console.log(`Paso ${i + 1} de ${total}`);",
+    "do { sprint(); } while (false)",
+    "switch (d) { case 'norte': faceDirection(d); break; default: wait(100); }",
+    "let { a, b: c = 2 } = obj; let [p, q] = [1, 2];",
+    "try { jump(); } catch (e) { var e; }",
+    "{ function paso() {} function paso() {} }",
+    "new new A()()",
+    "(" * (MAX_NESTING_DEPTH - 1) + "moveForward()" + ")" * (MAX_NESTING_DEPTH - 1),
+    "(x) = 1; (x.y) = 1; ((x)) += 1;",
+    "for (let x in a, b);",
+    "if (a) let\nx = 1;",
+    "x = 1_000 + 0x1_F + 1n + /a[/]b/gimsuy;",
+    "[{a = 1}] = b; ({a = 1} = b);",
+]
+
+INVALID_PROGRAMS = [
+    ("moveForward(2; turnRight(90)", 1, 14, "missing ) after argument list"),
+    ("moveForward(2);\nlet x = ;", 2, 9, "Unexpected token ';'"),
+    ("moveForward(2) turnRight()", 1, 16, "Unexpected identifier 'turnRight'"),
+    ("for (let i = 0; i < 4; i++) {\n  moveForward();\n", 3, 1, "Unexpected end of input"),
+    ("import fs from 'fs';", 1, 1, "Cannot use import statement outside a module"),
+    ("let x = 1;\nlet x = 2;", 2, 5, "Identifier 'x' has already been declared"),
+    ("const k;", 1, 8, "Missing initializer in const declaration"),
+    ("a + b = 3", 1, 1, "Invalid left-hand side in assignment"),
+    ("break;", 1, 1, "Illegal break statement"),
+    ("moveForward();\nreturn 5;", 2, 1, "Illegal return statement"),
+    ("a ?? b || c", 1, 8, "Unexpected token '||'"),
+    ("let let = 1;", 1, 5, "let is disallowed as a lexically bound name"),
+    ("(a, a) => 1", 1, 5, "Duplicate parameter name not allowed in this context"),
+    ("'sin cerrar", 1, 1, "Invalid or unexpected token"),
+    ("if (a) let x = 1;", 1, 8, "Lexical declaration cannot appear in a single-statement context"),
+    ("x = 1_;", 1, 6, "Numeric separators are not allowed at the end of numeric literals"),
+    ("x = 1__0;", 1, 7, "Only one underscore is allowed as numeric separator"),
+    ("x = '\\xZZ';", 1, 6, "Invalid hexadecimal escape sequence"),
+    ("x = /a/gg;", 1, 5, "Invalid regular expression flags"),
+    ("x = /(/;", 1, 5, "Invalid regular expression: /(/: Unterminated group"),
+    ("new.target", 1, 1, "new.target expression is not allowed here"),
+    ("({...a, b} = c)", 1, 6, "Rest element must be last element"),
+    ("x = {a = 1}", 1, 6, "Invalid shorthand property initializer"),
+]
+
+
+class TestJSSyntaxChecker:
+    """Tests para check_syntax"""
+
+    @pytest.mark.parametrize("code", VALID_PROGRAMS)
+    def test_valid_programs(self, code):
+        """Test que programas válidos no reportan errores"""
+        assert check_syntax(code) is None
+
+    @pytest.mark.parametrize("code,line,column,message", INVALID_PROGRAMS)
+    def test_invalid_programs_report_location(self, code, line, column, message):
+        """Test que los errores incluyen mensaje, línea y columna"""
+        error = check_syntax(code)
+
+        assert error is not None
+        assert (error.line, error.column, error.message) == (line, column, message)
+
+    def test_level_initial_code_is_valid(self):
+        """Test que el código inicial de todos los niveles es válido"""
+        for level in LEVELS.values():
+            assert check_syntax(level["initialCode"], STUB_DECLARATIONS) is None
+
+    def test_stub_redeclaration_is_an_error(self):
+        """Test que redeclarar un stub con let/const es un error, como en Node.js"""
+        assert check_syntax("let moveForward = 1;", STUB_DECLARATIONS) is not None
+        assert check_syntax("function moveForward() {}", STUB_DECLARATIONS) is None
+
+    @pytest.mark.parametrize("code", [
+        "(" * (MAX_NESTING_DEPTH + 1) + "1" + ")" * (MAX_NESTING_DEPTH + 1),
+        "x = " + "{a: " * (MAX_NESTING_DEPTH + 1) + "1" + "}" * (MAX_NESTING_DEPTH + 1),
+        "`${" * (MAX_NESTING_DEPTH + 1) + "1" + "}`" * (MAX_NESTING_DEPTH + 1),
+        "!" * 5000 + "x",
+        "a = " * 3000 + "b",
+    ])
+    def test_deep_nesting_exceeds_stack(self, code):
+        """Test que el anidamiento excesivo se reporta como en V8, sin tocar el límite de recursión"""
+        limit = sys.getrecursionlimit()
+        error = check_syntax(code)
+
+        assert error is not None and error.message == STACK_OVERFLOW
+        assert sys.getrecursionlimit() == limit
+
+    def test_unclosed_parentheses_are_linear(self):
+        """Test que miles de paréntesis sin cerrar se rechazan sin costo cuadrático"""
+        started = time.perf_counter()
+        assert check_syntax("(" * 50000).message == STACK_OVERFLOW
+        assert check_syntax("x = (" + "(a), " * 10000 + "b);") is None
+        assert time.perf_counter() - started < 2
+
+    def test_formatted_error_points_to_column(self):
+        """Test que el mensaje formateado señala la columna del error"""
+        is_valid, error_msg = CodeValidator.validate_syntax_python("moveForward(2;")
+
+        assert is_valid is False
+        assert error_msg.startswith("tu código:1:14\nmoveForward(2;\n             ^")
+        assert error_msg.endswith("SyntaxError: missing ) after argument list")
+
+
+# Programas comparados con Node.js (vm.Script, como el pool de workers):
+# misma validez, mensaje y línea. Las columnas no se comparan porque V8
+# señala a veces la declaración anterior en vez de la repetida.
+PARITY_PROBES = [
+    "moveForward(1);",
+    "for (let i = 0; i < 3; i++) { moveForward(1); turnRight(90); }",
+    "let x = 1;\nlet x = 2;",
+    "try {} catch (e) { var e; }",
+    "try {} catch ([e]) { var e; }",
+    "try {} catch (e) { let e; }",
+    "try {} catch (e) { function e(){} }",
+    "try {} catch (e) { for (var e of []); }",
+    "{ function a(){} function a(){} }",
+    "{ let a; function a(){} }",
+    "{ function a(){} let a; }",
+    "{ var a; function a(){} }",
+    "{ function a(){} var a; }",
+    "{ var a; let a; }",
+    "function a(){} function a(){}",
+    "var a; function a(){}",
+    "function a(){} var a;",
+    "let a; function a(){}",
+    "new new A()()",
+    "new A",
+    "new A.b.c()",
+    "new (a())()",
+    "new A()?.b",
+    "new A?.b()",
+    "a ?? b || c",
+    "a || b ?? c",
+    "a ?? b && c",
+    "a && b ?? c",
+    "a ?? b ?? c",
+    "(a || b) ?? c",
+    "a ?? (b && c)",
+    "a ?? b | c",
+    "a ?? b ? c : d",
+    "let let = 1;",
+    "const let = 1;",
+    "let [let] = [];",
+    "var let = 1;",
+    "for (let let of x);",
+    "(a, a) => 1",
+    "(a, [a]) => 1",
+    "async (a, a) => 1",
+    "function f(a, a) {}",
+    "function f(a, a = 1) {}",
+    "function f(a, ...a) {}",
+    "function f(a, {a}) {}",
+    "x = {f(a, a) {}};",
+    "x = function (a, a) {};",
+    "a => a",
+    "(a, b) => { return a + b; }",
+    "return 5;",
+    "function f() { return 5; }",
+    "() => { return; }",
+    "break;",
+    "while (true) { break; }",
+    "continue;",
+    "a: for (;;) { continue a; }",
+    "b: { break b; }",
+    "for (;;) { continue b; }",
+    "switch (x) { case 1: break; default: break; default: }",
+    "if (x) moveForward(); else turnLeft();",
+    "do moveForward(); while (false)",
+    "x = [1, 2, ...y];",
+    "x = {a, b: 2, [c]: 3, ...d};",
+    "let {a, b: [c, d = 1], ...e} = obj;",
+    "const k;",
+    "let [a];",
+    "a + b = 3",
+    "a++ = 1",
+    "++a++",
+    "x = a ? b : c ? d : e;",
+    "-a ** 2",
+    "(-a) ** 2",
+    "a ** -b",
+    "`hola ${nombre} y ${`anidado ${x}`}`",
+    "`sin cerrar ${x`",
+    "`sin cerrar",
+    "`abc ${x}",
+    "await g();",
+    "function f() { await (x); }",
+    "function f() { await x; }",
+    "function f() { await\nx; }",
+    "await",
+    "x = a?.b:c",
+    "'sin cerrar",
+    "x = /ab+c/gi.test(y);",
+    "x = a / b / c;",
+    "moveForward(2; turnRight(90)",
+    "moveForward(2) turnRight()",
+    "moveForward(1)\nturnRight(90)",
+    "let x = 1\nlet y = 2",
+    "a\n++b",
+    "throw\nnew Error()",
+    "for (const v of [1, 2]) turn(v);",
+    "for (const v in obj) turn(v);",
+    "for (let i = 0, j = 1; i < j; i++, j--) {}",
+    "for (x.y of z);",
+    "for (a + b of z);",
+    "async function f() { await g(); }",
+    "function f() { await g(); }",
+    "await;",
+    "x = async () => await y;",
+    "x = a?.b?.[c]?.(d);",
+    "x = a?.b = 1;",
+    "obj = { get x() { return 1; }, set x(v) {} };",
+    "if (a) { let b = 1; } else { let b = 2; }",
+    "{ let a = 1; { let a = 2; } }",
+    "let a = 1; { var a = 2; }",
+    "var a = 1; var a = 2;",
+    "function f(a) { let a; }",
+    "function f(a) { var a; }",
+    "import fs from 'fs';",
+    "'use strict'; moveForward();",
+    "1 = 2",
+    "x = 1;;;",
+    "if (x) function f() {}",
+    "label: function f() {}",
+    "x = { a: 1, };",
+    "f(a, ...b, c);",
+    "f(a,);",
+    "f(,);",
+    "x = [,,1];",
+    "x = 0x1F + 0b10 + 0o7 + 1e3 + .5 + 1_000;",
+    "x = 1..toString();",
+    "x = 08;",
+    "x = typeof y === 'undefined';",
+    "delete a.b;",
+    "void 0;",
+    "x = y in z;",
+    "for (var i = 0 in x);",
+    "x = a\n?.5:1",
+    "\\u0061 = 1;",
+    "let \\u{62} = 2;",
+    "(" * MAX_NESTING_DEPTH + "1" + ")" * MAX_NESTING_DEPTH,
+    "[" * MAX_NESTING_DEPTH + "1" + "]" * MAX_NESTING_DEPTH,
+    "{" * MAX_NESTING_DEPTH + "}" * MAX_NESTING_DEPTH,
+    "(" * MAX_NESTING_DEPTH + "1" + ")" * (MAX_NESTING_DEPTH - 1),
+    "x = " + "a + " * 2000 + "b;",
+    # Declaraciones en contexto de sentencia única
+    "if (a) let x = 1;",
+    "if (a) let",
+    "if (a) let [x] = 1;",
+    "while (a) const x = 1;",
+    "if (a) const x = 1;",
+    "for (;;) let x = 1;",
+    "label: let x = 1;",
+    "if (a) let;",
+    "if (a) let = 1;",
+    "if (a) let\n[x] = 1;",
+    "do let x = 1; while (0)",
+    "if (a) let\nx = 1;",
+    "if (a) let {x} = 1;",
+    "if (a) let\n{x} = 1;",
+    "if (a) let.x = 1;",
+    "if (a) let(1);",
+    "if (a) async function f() {}",
+    "while (a) function f() {}",
+    "for (;;) function f() {}",
+    "label: function f() {}",
+    "if (a) label: function f() {}",
+    "while (a) label: function f() {}",
+    "if (a) function f() {} else function g() {}",
+    "for ({a = 1};;);",
+    "label: let\nx = 1;",
+    "if (a) let\nlet = 1;",
+    "do let\nx = 1; while (0)",
+    "for (;;) async function f() {}",
+    "label: async function f() {}",
+    "if (a) a: b: function f() {}",
+    "if (a) function f() {} else label: function g() {}",
+    # Literales numéricos y separadores
+    "1_",
+    "1__0",
+    "1_0",
+    "0x_1",
+    "0x1_",
+    "1._5",
+    "1_.5",
+    "1e1_",
+    "1e_1",
+    "0_1",
+    "._1",
+    "1n",
+    "0b12",
+    "0o8",
+    ".5_",
+    "1_000_000",
+    "1e+_5",
+    "07_7",
+    "07.5",
+    "08.5",
+    "1.5n",
+    "01n",
+    "1e3n",
+    "0x1fn",
+    "1_0n",
+    "0n",
+    "08n",
+    "0.0_1",
+    "1e1_0",
+    "1e+1",
+    "1E-1_2",
+    "09_1",
+    "0b1_0",
+    "0o7_7",
+    "0xA_b",
+    "1__",
+    # Secuencias de escape en strings y templates
+    "'\\xZZ'",
+    "'\\x4'",
+    "'\\x41'",
+    "'á'",
+    "'\\u00g1'",
+    "'\\u{110000}'",
+    "'\\u{41}'",
+    "'\\u{}'",
+    "'\\u{'",
+    "\"\\x\"",
+    "'\\08'",
+    "'\\1'",
+    "`\\xZZ`",
+    "`\\u00g1`",
+    "`\\8`",
+    "`\\01`",
+    "`\\0`",
+    "f`\\xZZ`",
+    "f`\\u00g1`",
+    "`a${1}\\xZZ`",
+    "'\\8'",
+    "'\\u{10FFFF}'",
+    "'\\u{0000000041}'",
+    "'\\u{-1}'",
+    "`a${b}c${`d${e}`}`",
+    "x = `\\u{110000}`",
+    "x = `\\x4`",
+    "f`\\8`",
+    "f`${1}\\xZZ`",
+    "f`\\u{110000}`",
+    "a.b`\\xZZ`",
+    # Literales de expresión regular
+    "/a/gg",
+    "/a/x",
+    "/a/gimsuyd",
+    "/a/v",
+    "/a/uv",
+    "/(/",
+    "/)/",
+    "/[/",
+    "/a{2,1}/",
+    "/*a/",
+    "/a**/",
+    "/?/",
+    "/(?<n>a)/",
+    "/(?<n>a)(?<n>b)/",
+    "/\\k<n>/u",
+    "/(?=a)*/",
+    "/(?=a)*/u",
+    "/a{/",
+    "/a{/u",
+    "/\\p{L}/u",
+    "/\\p{Foo}/u",
+    "/[b-a]/",
+    "/(?:a/",
+    "/a)/",
+    "/a]/",
+    "/a]/u",
+    "/\\1(a)/",
+    "/(?/",
+    "x = /a/ig;",
+    "x = /[/]/;",
+    "/(?i:a)/",
+    "/a{1}?/",
+    "/a??/",
+    "/^*/",
+    "/$*/",
+    "/\\b*/",
+    "/(?<=a)*/",
+    "/(?<!a)+/",
+    "/(?!a)*/",
+    "/{2}/",
+    "/a{2}{3}/",
+    "/{/",
+    "/}/",
+    "/]/",
+    "/a{1,}/",
+    "/a{,5}/",
+    "/a{,5}/u",
+    "/\\1/u",
+    "/(a)\\1/u",
+    "/(a)\\2/u",
+    "/\\2(a)/",
+    "/(?<1a>x)/",
+    "/(?<>x)/",
+    "/(?<a>x)\\k<b>/",
+    "/\\k<a>/",
+    "/(?<a>x)\\k<a>/",
+    "/(?<a>x)\\k/",
+    "/\\k/u",
+    "/\\a/u",
+    "/\\-/u",
+    "/[\\-]/u",
+    "/[\\d-a]/",
+    "/[\\d-a]/u",
+    "/[a-\\d]/u",
+    "/[a-]/",
+    "/[-a]/",
+    "/\\c/",
+    "/\\cA/",
+    "/\\c/u",
+    "/\\u{1F600}/u",
+    "/\\u{110000}/u",
+    "/\\u{41/u",
+    "/\\u12/u",
+    "/\\x1/u",
+    "/\\x1/",
+    "/[z-a]/i",
+    "/\\p{Lu}/u",
+    "/\\p{Letter}/u",
+    "/\\p{Script=Latin}/u",
+    "/\\p{sc=Grek}/u",
+    "/\\p{Script=Foo}/u",
+    "/\\p{ASCII}/u",
+    "/\\p{Any}/u",
+    "/\\p{General_Category=Lu}/u",
+    "/\\p{gc=L}/u",
+    "/\\P{Emoji}/u",
+    "/\\p{L}/",
+    "/\\p/u",
+    "/\\p{/u",
+    "/[\\p{L}]/u",
+    "/a|*/",
+    "/|/",
+    "/()/",
+    "/(?:)/",
+    "/a{99999999999}/",
+    "/a{2,1}?/",
+    "/[]/",
+    "/[^]/",
+    "/a\\//",
+    "/[a-z]/v",
+    "/[[a-z]--[aeiou]]/v",
+    "/\\q{abc}/v",
+    "/[\\q{abc}]/v",
+    "/(?<a>x)|(?<a>y)/",
+    "/(?=a){2}/",
+    "/(?=a){2}/u",
+    "/(/g",
+    "x = /a/g.source",
+    "/(/gg",
+    "/a/gu1",
+    "/a/G",
+    "/(?<a>x)(?<b>y)\\k<a>/",
+    "/(?<a.b>x)/",
+    "/(?<$a>x)/",
+    "/[\\b]/u",
+    "/[\\1]/u",
+    "/[\\0]/u",
+    "/\\0/u",
+    "/\\00/u",
+    "/[\\c]/",
+    "/[\\c1]/",
+    "/[\\x4]/u",
+    "/[\\a]/u",
+    "/[\\-a]/u",
+    "/[a-\\x41]/",
+    "/[\\x41-a]/",
+    "/[\\u{41}-\\u{5a}]/u",
+    "/\\B+/",
+    "/(?=)/",
+    "/a|/",
+    "/[a-z-0]/",
+    "/[a-z-0]/u",
+    "/[%--]/",
+    "/(?<a>.)\\k<a>\\k/",
+    "/\\k<a/",
+    "/\\k<a/u",
+    # new.target
+    "new.target",
+    "function f() { return new.target; }",
+    "() => new.target",
+    "function f() { () => new.target; }",
+    "x = { m() { new.target; } };",
+    "function f() { x = () => new.target; }",
+    "function f() { `${new.target}`; }",
+    "x = `${new.target}`",
+    "new.target = 1",
+    "function f() { new.target = 1; }",
+    "function f() { new.target++; }",
+    # Cabeceras de for-in y for-of
+    "for (let x in a, b);",
+    "for (var x in a, b);",
+    "for (x in a, b);",
+    "for (let x of a, b);",
+    "for ((x) of y);",
+    "for ((x) in y);",
+    "for ([a, b] of c);",
+    "for ({a} of c);",
+    "for (let [a, b] of c);",
+    "for (let in x);",
+    "for (let of x);",
+    "for (let.x of y);",
+    "for (async of x);",
+    "for (let x = 1 of y);",
+    "for ({a = 1} of x);",
+    "for ([{a = 1}] of x);",
+    "for (var x = 1 in y);",
+    "for (let x = 1 in y);",
+    "for (const x = 1 in y);",
+    "for (var [x] = 1 in y);",
+    "for (var x = 1 of y);",
+    "for (let in x, y);",
+    "for (let.x in y);",
+    "for (let[a] in y);",
+    "for (async.x of y);",
+    "for ((async) of x);",
+    "for (let of of x);",
+    "for (let x, y of z);",
+    "for (let x, y in z);",
+    "for (x, y of z);",
+    "for (a = 1 of b);",
+    "for (f() in x);",
+    "for (f() of x);",
+    "for ([f()] of x);",
+    "for (let x of y, z);",
+    # Destinos de asignación y patrones
+    "new.foo",
+    "({...a, b} = c)",
+    "({...a, ...b} = c)",
+    "({a, ...b} = c)",
+    "({...a.b} = c)",
+    "({...[a]} = c)",
+    "[...a, b] = c",
+    "[a, ...b] = c",
+    "[...a,] = c",
+    "({...a,} = c)",
+    "let {...a, b} = c;",
+    "let [...a, b] = c;",
+    "(x) = 1",
+    "(x.y) = 1",
+    "((x)) = 1",
+    "(x) += 1",
+    "(x)++",
+    "([x]) = 1",
+    "({x}) = 1",
+    "(x = 1) = 2",
+    "(a, b) = 1",
+    "(x.y)++",
+    "x = {a: 1} = y",
+    "[a.b, c[0]] = d",
+    "[a(), b] = c",
+    "({a: b.c} = d)",
+    "({a: b()} = d)",
+    "({a = 1} = b)",
+    "x = {a = 1}",
+    "[(a)] = b",
+    "[(a) = 1] = b",
+    "({a: (b)} = c)",
+    "[([a])] = b",
+    "({a: (b = 1)} = c)",
+    "({...a()} = c)",
+    "({...a = 1} = c)",
+    "[...a = 1] = c",
+    "[...[a]] = c",
+    "[...{a}] = c",
+    "({a() {}} = c)",
+    "({get a() {}} = c)",
+    "({a: 1} = c)",
+    "({'a': b} = c)",
+    "({[k]: b} = c)",
+    "({1: b} = c)",
+    "({a: b = 1} = c)",
+    "({a: [b]} = c)",
+    "({a: {b}} = c)",
+    "({a: ([b])} = c)",
+    "[a, , b] = c",
+    "[, a] = c",
+    "[a = 1, [b] = []] = c",
+    "[a.b = 1] = c",
+    "[this] = c",
+    "[null] = c",
+    "[a + b] = c",
+    "[`x`] = c",
+    "[a?.b] = c",
+    "({a: b?.c} = d)",
+    "(a) = 1",
+    "(a.b.c) = 1",
+    "(a[0]) = 1",
+    "(a()) = 1",
+    "(a)++",
+    "++(a)",
+    "--(a.b)",
+    "(a = b) = 1",
+    "((a)) += 1",
+    "({a}) = 1",
+    "([a]) = 1",
+    "({a} = {b} = c)",
+    "[a] += 1",
+    "f({a = 1})",
+    "[{a = 1}] = b",
+    "[{a = 1}]",
+    "({b: {a = 1}} = c)",
+    "({b: {a = 1}})",
+    "({a = 1}) => a",
+    "({a = 1} = x) => a",
+    "x = {a = 1} = y",
+    "async ({a = 1}) => a",
+    "async ({a = 1})",
+    "f() = 1",
+    "f()++",
+    "++f()",
+    "f() += 1",
+    "new A() = 1",
+    "(a?.b) = 1",
+    "this = 1",
+    "(this) = 1",
+    "a.b() = 1",
+    "(f()) += 1",
+    "f()\n++b",
+    "[f()] = 1",
+    "let [...a = 1] = c;",
+    "let [...a,] = c;",
+    "let {...[a]} = c;",
+    "let {...{a}} = c;",
+    "let [...[a]] = c;",
+    "function f(...a,) {}",
+    "function f(...a = 1) {}",
+    "(...a, b) => 1",
+    "(...a,) => 1",
+    "a: b: function f() {}",
+]
+
+# Lee un arreglo JSON de programas por stdin y responde, por cada uno, null o
+# {message, line}
+NODE_ORACLE = r"""
+const vm = require('vm');
+const codes = JSON.parse(require('fs').readFileSync(0, 'utf8'));
+process.stdout.write(JSON.stringify(codes.map((code) => {
+  try {
+    new vm.Script(code, { filename: 'probe' });
+    return null;
+  } catch (e) {
+    const m = /^probe:(\d+)\n/.exec(String(e.stack));
+    return { message: e.message, line: m ? Number(m[1]) : 1 };
+  }
+})));
+"""
+
+
+@pytest.fixture(scope="module")
+def node_results():
+    node = shutil.which("node")
+    if node is None:
+        pytest.skip("Node.js no disponible")
+    result = subprocess.run([node, "-e", NODE_ORACLE], input=json.dumps(PARITY_PROBES),
+                            capture_output=True, text=True, encoding="utf-8", timeout=60, check=True)
+    return json.loads(result.stdout)
+
+
+class TestNodeParity:
+    """Tests que comparan check_syntax con Node.js"""
+
+    def test_probes_match_node(self, node_results):
+        """Test que cada programa de la tabla es válido o inválido igual que en Node.js"""
+        mismatches = []
+        for code, expected in zip(PARITY_PROBES, node_results):
+            error = check_syntax(code)
+            actual = None if error is None else {"message": error.message, "line": error.line}
+            if actual != expected:
+                mismatches.append((code[:60], expected, actual))
+        assert mismatches == []
@@ -0,0 +1,139 @@
+"""
+Tests para las tablas de posiciones por nivel
+"""
+import bisect
+import random
+from fastapi.testclient import TestClient
+from app.services.leaderboard import (
+    LeaderboardEntry, LeaderboardRegistry, LevelLeaderboard, RankedIndex, code_length
+)
+from main import app
+from tests.test_movement_simulator import LEVEL_1_PATH_TRACE
+
+client = TestClient(app)
+
+
+def entry(player, steps=20, rotations=4, length=100, submitted_at=1.0):
+    return LeaderboardEntry(steps, rotations, length, submitted_at, player)
+
+
+class TestRankedIndex:
+    """Tests para RankedIndex"""
+
+    def test_matches_sorted_list(self):
+        """Test que inserciones y eliminaciones mezcladas mantienen orden y posiciones"""
+        rng = random.Random(7)
+        keys = rng.sample(range(100000), 3000)
+        index, expected = RankedIndex(keys[:500], load=8), sorted(keys[:500])
+        for key in keys[500:]:
+            index.add(key)
+            bisect.insort(expected, key)
+        for key in keys[:1500:2]:
+            index.remove(key)
+            expected.remove(key)
+
+        assert list(index) == expected
+        assert all(index[i] == expected[i] and index.index(expected[i]) == i for i in range(0, len(expected), 13))
+        assert list(index.islice(40, 90)) == expected[40:90]
+        assert index[-1] == expected[-1]
+
+
+class TestLevelLeaderboard:
+    """Tests para LevelLeaderboard"""
+
+    def test_ranks_by_steps_rotations_and_code(self):
+        """Test del orden: pasos, rotaciones, largo del código y antigüedad"""
+        board = LevelLeaderboard(max_size=10)
+        board.submit(entry("ana", steps=21))
+        board.submit(entry("beto", steps=19, rotations=6))
+        board.submit(entry("caro", steps=19, rotations=4, length=120))
+        board.submit(entry("dani", steps=19, rotations=4, length=120, submitted_at=0.5))
+
+        assert [item["playerId"] for item in board.top(10)] == ["dani", "caro", "beto", "ana"]
+        assert board.rank("beto")["rank"] == 3
+        assert board.top(2, offset=2)[0] == board.rank("beto")
+
+    def test_only_improvements_replace_a_player_entry(self):
+        """Test que cada jugador aparece una vez, con su mejor solución"""
+        board = LevelLeaderboard(max_size=10)
+        board.submit(entry("ana", steps=30))
+        board.submit(entry("beto", steps=25))
+        assert board.submit(entry("ana", steps=40, submitted_at=2.0)) == 2
+        assert board.submit(entry("ana", steps=20, submitted_at=3.0)) == 1
+
+        assert len(board) == 2
+        assert board.rank("ana")["stepsMoved"] == 20
+
+    def test_bounded_size(self):
+        """Test que con la tabla llena solo entran soluciones mejores que la última"""
+        board = LevelLeaderboard(max_size=2)
+        board.submit(entry("ana", steps=10))
+        board.submit(entry("beto", steps=20))
+        assert board.submit(entry("caro", steps=30)) is None
+        assert board.submit(entry("dani", steps=15)) == 2
+
+        assert [item["playerId"] for item in board.top(5)] == ["ana", "dani"]
+        assert board.rank("beto") is None
+
+
+class TestLeaderboardRegistry:
+    """Tests para LeaderboardRegistry"""
+
+    async def test_save_and_load(self, tmp_path):
+        """Test que las tablas guardadas se recuperan al iniciar"""
+        path = str(tmp_path / "leaderboards.json")
+        registry = LeaderboardRegistry(path, max_size=10)
+        registry.submit("1", entry("ana", steps=19))
+        registry.submit("1", entry("beto", steps=25))
+        assert await registry.save() is True
+        assert await registry.save() is False
+
+        restored = LeaderboardRegistry(path, max_size=10)
+        restored.load()
+        assert restored.board("1").top(10) == registry.board("1").top(10)
+
+    def test_code_length_ignores_comments_and_spacing(self):
+        """Test que el largo del código no penaliza comentarios ni indentación"""
+        assert code_length("// avanzar\n  moveForward(3);\n\n") == code_length("moveForward(3);")
+
+
+SOLUTION = "for (const n of [3, 2, 2, 1, 1, 1]) {\n  moveForward(n);\n  turnRight();\n  turnLeft();\n}"
+
+
+class TestLeaderboardEndpoints:
+    """Tests para GET /api/levels/{id}/leaderboard"""
+
+    def test_completed_simulated_solution_is_ranked(self, tmp_path, monkeypatch):
+        """Test que una solución completada y simulada entra en la tabla"""
+        registry = LeaderboardRegistry(str(tmp_path / "leaderboards.json"))
+        monkeypatch.setattr("app.routers.game_data.leaderboards", registry)
+        monkeypatch.setattr("app.routers.game_data.progress_recorder.record", lambda entry: None)
+        commands = [{"name": name, "args": args} for name, args in LEVEL_1_PATH_TRACE]
+        body = {"levelId": "1", "playerPosition": {}, "playerAngle": 0, "commands": commands,
+                "playerId": "ana", "code": SOLUTION}
+
+        assert client.post("/api/levels/1/validate", json=body).json()["leaderboardRank"] == 1
+        reported = dict(body, commands=None, playerId="beto", playerPosition={"x": 1110, "y": 530},
+                        stepsMoved=19, rotationsMade=4)
+        assert client.post("/api/levels/1/validate", json=reported).json()["leaderboardRank"] is None
+
+        leaderboard = client.get("/api/levels/1/leaderboard").json()
+        assert leaderboard["total"] == 1
+        assert leaderboard["entries"][0]["playerId"] == "ana"
+        assert client.get("/api/levels/1/leaderboard/ana").json()["rank"] == 1
+        assert client.get("/api/levels/1/leaderboard/beto").status_code == 404
+        assert client.get("/api/levels/no-existe/leaderboard").status_code == 404
+
+    def test_unvalidated_code_is_not_ranked(self, tmp_path, monkeypatch):
+        """Test que solo entra el código que pasa /execute y llama a los comandos de la traza"""
+        registry = LeaderboardRegistry(str(tmp_path / "leaderboards.json"))
+        monkeypatch.setattr("app.routers.game_data.leaderboards", registry)
+        monkeypatch.setattr("app.routers.game_data.progress_recorder.record", lambda entry: None)
+        commands = [{"name": name, "args": args} for name, args in LEVEL_1_PATH_TRACE]
+        body = {"levelId": "1", "playerPosition": {}, "playerAngle": 0, "commands": commands, "playerId": "ana"}
+
+        for code in ("x", "moveForward(3", "moveForward(3); eval('turnRight()')", "moveForward(3);"):
+            response = client.post("/api/levels/1/validate", json=dict(body, code=code)).json()
+            assert response["completed"] is True
+            assert response["leaderboardRank"] is None
+        assert registry.board("1") is None
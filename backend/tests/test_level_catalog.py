@@ -0,0 +1,124 @@
+"""
+Tests unitarios para el catálogo de niveles en archivos JSON
+"""
+import json
+import os
+from app.config import LEVELS_DIR
+from app.services.level_catalog import LevelCatalog
+
+
+def write_level(directory, level_id, **fields):
+    path = directory / f"{level_id}.json"
+    level = {"id": level_id, "title": f"Nivel {level_id}", "validation": {"minSteps": 1}, **fields}
+    path.write_text(json.dumps(level), encoding="utf-8")
+    # Forzar un mtime distinto aunque el sistema de archivos tenga poca resolución
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    return path
+
+
+class TestLevelCatalog:
+    """Tests para LevelCatalog"""
+
+    def test_repository_levels(self):
+        """Test que el índice del repositorio lista los niveles en orden"""
+        catalog = LevelCatalog(LEVELS_DIR)
+        assert catalog.ids()[:3] == ["1", "2", "3"]
+        assert catalog.get("1")["startPosition"] == {"gridX": 1, "gridY": 1}
+
+    def test_levels_are_loaded_lazily(self, tmp_path):
+        """Test que un nivel se lee solo al pedirlo y luego se reutiliza"""
+        write_level(tmp_path, "1")
+        write_level(tmp_path, "2")
+        catalog = LevelCatalog(str(tmp_path))
+
+        assert catalog.ids() == ["1", "2"]
+        assert catalog._levels == {}
+        level = catalog.get("1")
+        assert list(catalog._levels) == ["1"]
+        assert catalog.get("1") is level
+        assert catalog.get("no-existe") is None
+
+    def test_reload_replaces_changed_level(self, tmp_path):
+        """Test que un nivel modificado se recarga y se notifica"""
+        write_level(tmp_path, "1")
+        catalog = LevelCatalog(str(tmp_path))
+        reloaded = []
+        catalog.add_listener(reloaded.append)
+        old = catalog.get("1")
+
+        assert catalog.reload_changed() == []
+        write_level(tmp_path, "1", title="Editado")
+        assert catalog.reload_changed() == ["1"]
+        assert reloaded == ["1"]
+        assert catalog.get("1")["title"] == "Editado"
+        assert old["title"] == "Nivel 1"
+
+    def test_invalid_file_keeps_last_valid_version(self, tmp_path):
+        """Test que un archivo inválido no reemplaza la versión en memoria"""
+        path = write_level(tmp_path, "1")
+        catalog = LevelCatalog(str(tmp_path))
+        catalog.get("1")
+
+        path.write_text('{"id": "1", "validation": {"minSteps": "muchos"}}', encoding="utf-8")
+        assert catalog.reload_changed() == []
+        assert catalog.get("1")["title"] == "Nivel 1"
+
+    def test_index_controls_listing(self, tmp_path):
+        """Test que el índice define qué niveles existen y se relee al cambiar"""
+        write_level(tmp_path, "a")
+        write_level(tmp_path, "b")
+        index = tmp_path / "index.json"
+        index.write_text(json.dumps({"levels": [{"id": "b", "file": "b.json"}]}), encoding="utf-8")
+        catalog = LevelCatalog(str(tmp_path))
+
+        assert catalog.ids() == ["b"]
+        catalog.get("b")
+        index.write_text(json.dumps({"levels": [{"id": "a", "file": "a.json"}]}), encoding="utf-8")
+        stat = os.stat(index)
+        os.utime(index, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert catalog.reload_changed() == ["b", "a"]
+        assert catalog.ids() == ["a"]
+        assert catalog.get("b") is None
+
+    def test_added_and_removed_levels_are_notified(self, tmp_path):
+        """Test que los niveles agregados o eliminados se notifican aunque no se hayan leído"""
+        write_level(tmp_path, "1")
+        write_level(tmp_path, "2")
+        catalog = LevelCatalog(str(tmp_path))
+        notified = []
+        catalog.add_listener(notified.append)
+        assert catalog.ids() == ["1", "2"]
+
+        write_level(tmp_path, "3")
+        (tmp_path / "2.json").unlink()
+        # Forzar un mtime distinto del directorio aunque tenga poca resolución
+        stat = os.stat(tmp_path)
+        os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert catalog.reload_changed() == ["2", "3"]
+        assert notified == ["2", "3"]
+        assert catalog.ids() == ["1", "3"]
+        assert catalog.get("3")["title"] == "Nivel 3"
+        assert catalog.reload_changed() == []
+
+    def test_index_additions_are_notified(self, tmp_path):
+        """Test que un nivel agregado al índice se notifica"""
+        write_level(tmp_path, "1")
+        write_level(tmp_path, "2")
+        index = tmp_path / "index.json"
+        index.write_text(json.dumps({"levels": [{"id": "1", "file": "1.json"}]}), encoding="utf-8")
+        catalog = LevelCatalog(str(tmp_path))
+        notified = []
+        catalog.add_listener(notified.append)
+        assert catalog.ids() == ["1"]
+
+        index.write_text(json.dumps({"levels": [{"id": "1", "file": "1.json"}, {"id": "2", "file": "2.json"}]}),
+                         encoding="utf-8")
+        stat = os.stat(index)
+        os.utime(index, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert catalog.reload_changed() == ["2"]
+        assert notified == ["2"]
+        assert catalog.ids() == ["1", "2"]
@@ -0,0 +1,62 @@
+"""
+Tests para el listado paginado de niveles
+"""
+from fastapi.testclient import TestClient
+from app.services.data_provider import DataProvider
+from app.services.level_summaries import LevelSummaries
+from main import app
+
+client = TestClient(app)
+
+
+class TestListLevels:
+    """Tests para GET /api/levels"""
+
+    def test_first_page_has_summaries_only(self):
+        """Test que los resúmenes no incluyen los datos pesados del nivel"""
+        data = client.get("/api/levels").json()
+        first = data["levels"][0]
+
+        assert data["total"] == len(DataProvider.get_all_levels())
+        assert first["id"] == "1"
+        assert first["objectiveCount"] == 3
+        assert "path" not in first and "initialCode" not in first
+        assert data["nextCursor"] is None
+
+    def test_cursor_pagination_visits_every_level_once(self):
+        """Test que seguir nextCursor recorre todos los niveles sin repetir"""
+        ids, cursor = [], None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            data = client.get("/api/levels", params=params).json()
+            ids.extend(level["id"] for level in data["levels"])
+            cursor = data["nextCursor"]
+            if cursor is None:
+                break
+
+        assert ids == list(DataProvider.get_all_levels())
+
+    def test_projection_and_character_filter(self):
+        """Test de la proyección de campos y el filtro por personaje"""
+        data = client.get("/api/levels", params={"fields": "title", "character": "kitu"}).json()
+        assert all(set(level) == {"id", "title"} for level in data["levels"])
+
+        assert client.get("/api/levels", params={"character": "nadie"}).json() == {
+            "levels": [], "nextCursor": None, "total": 0
+        }
+
+    def test_invalid_parameters(self):
+        """Test que campos desconocidos, cursores inválidos y límites fuera de rango fallan"""
+        assert client.get("/api/levels", params={"fields": "path"}).status_code == 400
+        assert client.get("/api/levels", params={"cursor": "bm8tZXhpc3Rl"}).status_code == 400
+        assert client.get("/api/levels", params={"limit": 0}).status_code == 422
+
+    def test_invalidate_rebuilds_summaries(self, monkeypatch):
+        """Test que tras invalidar se recalculan los resúmenes"""
+        summaries = LevelSummaries()
+        assert summaries.page(10)[2] == len(DataProvider.get_all_levels())
+
+        monkeypatch.setattr(DataProvider, "get_all_levels", staticmethod(lambda: {}))
+        assert summaries.page(10)[2] > 0
+        summaries.invalidate()
+        assert summaries.page(10) == ([], None, 0)
@@ -0,0 +1,74 @@
+"""
+Tests unitarios para la compilación de reglas de los niveles
+"""
+import dataclasses
+import pytest
+from app.services.data_provider import DataProvider
+from app.services.level_rules import LevelDefinitionError, LevelSpecRegistry, PlayerOutcome, compile_level
+
+LEVELS = DataProvider.get_all_levels()
+
+
+def outcome(x=0, y=0, angle=0, actions=(), steps=0, rotations=0):
+    return PlayerOutcome(x, y, angle, frozenset(actions), steps, rotations)
+
+
+class TestCompileLevel:
+    """Tests para compile_level"""
+
+    def test_all_levels_compile(self):
+        """Test que todos los niveles de la aplicación compilan"""
+        for level in LEVELS.values():
+            spec = compile_level(level)
+            assert spec.objectives_count == len(level["objectives"])
+
+    def test_spec_is_immutable(self):
+        """Test que el nivel compilado no se puede modificar"""
+        spec = compile_level(LEVELS["1"])
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            spec.rules = ()
+
+    def test_rules_follow_validation_block(self):
+        """Test que cada regla reporta su objetivo con el mismo texto que antes"""
+        spec = compile_level(LEVELS["2"])
+        results = [rule(outcome(x=430, y=300, actions=["moveForward"], steps=3)) for rule in spec.rules]
+
+        assert results == [
+            (True, "Llegar al objetivo"),
+            (False, "Mover al menos 5 pasos (moviste 3)"),
+            (False, "Usar las acciones requeridas: faltan turnRight, turnLeft"),
+        ]
+
+    def test_target_tolerance_is_inclusive(self):
+        """Test que la distancia igual a la tolerancia cuenta como llegada"""
+        level = {"id": "t", "validation": {"targetPosition": {"x": 0, "y": 0, "tolerance": 5}}}
+        rule, = compile_level(level).rules
+
+        assert rule(outcome(x=3, y=4))[0] is True
+        assert rule(outcome(x=3, y=4.1))[0] is False
+
+    @pytest.mark.parametrize("validation", [
+        {"minSteps": "5"},
+        {"minRotations": -1},
+        {"targetPosition": [1110, 530]},
+        {"requiredActions": "moveForward"},
+        {"requiresLoop": "yes"},
+        {"minStep": 5},
+    ])
+    def test_malformed_levels_fail_to_compile(self, validation):
+        """Test que una definición inválida falla al compilar, no al validar"""
+        with pytest.raises(LevelDefinitionError):
+            compile_level({"id": "roto", "validation": validation})
+
+
+class TestLevelSpecRegistry:
+    """Tests para LevelSpecRegistry"""
+
+    def test_recompiles_only_when_level_changes(self):
+        """Test que el nivel se compila una vez por configuración"""
+        registry = LevelSpecRegistry()
+        registry.compile_all(LEVELS)
+        spec = registry.get(LEVELS["1"])
+
+        assert registry.get(LEVELS["1"]) is spec
+        assert registry.get(dict(LEVELS["1"])) is not spec
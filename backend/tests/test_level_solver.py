@@ -0,0 +1,107 @@
+"""
+Tests para la solución óptima precalculada y el puntaje de eficiencia
+"""
+import threading
+from fastapi.testclient import TestClient
+from app.services.data_provider import DataProvider
+from app.services.level_rules import LevelSpecRegistry
+from app.services.level_solver import LevelOptimum, available_commands, solve_level
+from app.services.level_validator import LevelValidator
+from app.services.movement_simulator import LevelGeometry
+from main import app
+from tests.test_movement_simulator import LEVEL_1_PATH_TRACE
+
+client = TestClient(app)
+LEVELS = DataProvider.get_all_levels()
+
+# Llega a la celda (18, 4), dentro de la tolerancia del objetivo, y completa las 4 rotaciones
+LEVEL_1_OPTIMAL_TRACE = [
+    ("moveForward", [17]), ("turnRight", []), ("moveForward", [3]),
+    ("turnRight", [360]), ("turnRight", [360]), ("turnRight", [360]),
+]
+
+CORRIDOR_LEVEL = {
+    "id": "corredor",
+    "startPosition": {"gridX": 0, "gridY": 0},
+    "goalPosition": {"gridX": 3, "gridY": 1},
+    "path": [{"x": 0, "y": 0}, {"x": 1, "y": 0}, {"x": 2, "y": 0}, {"x": 3, "y": 0}, {"x": 3, "y": 1}],
+    "maizePositions": [{"gridX": 2, "gridY": 0}],
+    "validation": {"reachGoal": True, "collectAllMaize": True, "stayOnPath": True},
+}
+
+
+def solve(level):
+    return solve_level(level, LevelGeometry.from_level(level))
+
+
+class TestSolveLevel:
+    """Tests para solve_level"""
+
+    def test_application_levels(self):
+        """Test de los mínimos de los niveles de la aplicación"""
+        assert solve(LEVELS["1"]) == LevelOptimum(commands=6, steps=20)
+        assert solve(LEVELS["2"]) == LevelOptimum(commands=4, steps=6)
+        assert solve(LEVELS["3"]) == LevelOptimum(commands=6, steps=8)
+
+    def test_optimum_is_a_valid_solution(self):
+        """Test que una solución con los mínimos calculados completa el nivel"""
+        completed, _, _, pending = LevelValidator.validate_level("1", {}, 0, [], commands=LEVEL_1_OPTIMAL_TRACE)
+        assert completed, pending
+        assert len(LEVEL_1_OPTIMAL_TRACE) == solve(LEVELS["1"]).commands
+
+    def test_path_maize_and_goal_rules(self):
+        """Test que se respetan el camino, el maíz y el premio final"""
+        assert solve(CORRIDOR_LEVEL) == LevelOptimum(commands=3, steps=4)
+
+    def test_unsolvable_level(self):
+        """Test que un camino que no se puede seguir en el grid no tiene óptimo"""
+        level = dict(LEVELS["1"], validation={"stayOnPath": True, "reachGoal": True})
+        assert solve(level) is None
+
+    def test_available_commands(self):
+        """Test que se usan los comandos habilitados del nivel que existen en FUNCTIONS_DEFINITION"""
+        level = {"availableFunctions": {"movement": ["moveForward(steps=1)", "volar()"], "rotation": ["turn(degrees)"]}}
+        assert available_commands(level) == {"moveForward", "turn"}
+
+
+class TestEfficiencyScore:
+    """Tests para el puntaje de eficiencia"""
+
+    def test_score(self):
+        """Test del promedio de pasos y comandos respecto del óptimo"""
+        optimum = LevelOptimum(commands=6, steps=20)
+        assert LevelValidator.efficiency_score(optimum, 20, 6) == 1.0
+        assert LevelValidator.efficiency_score(optimum, 21, 13) == round((20 / 21 + 6 / 13) / 2, 3)
+        assert LevelValidator.efficiency_score(optimum, 40) == 0.5
+
+    async def test_computed_once_per_level_version(self, monkeypatch):
+        """Test que el óptimo se busca una vez por versión del nivel, fuera del event loop"""
+        calls = []
+
+        def counting_solve(level, geometry):
+            calls.append(threading.current_thread() is threading.main_thread())
+            return solve_level(level, geometry)
+
+        monkeypatch.setattr("app.services.level_rules.solve_level", counting_solve)
+        registry = LevelSpecRegistry()
+        spec = registry.get(LEVELS["1"])
+        assert not registry.cached_optimum(spec)[0]
+
+        assert await registry.optimum_async(spec) == LevelOptimum(commands=6, steps=20)
+        assert registry.optimum(spec) == LevelOptimum(commands=6, steps=20)
+        assert calls == [False]
+
+        changed = registry.get(dict(LEVELS["1"]))
+        assert not registry.cached_optimum(changed)[0]
+
+    def test_validation_response(self):
+        """Test que /validate informa la eficiencia solo si el nivel se completó"""
+        def validate(trace):
+            commands = [{"name": name, "args": args} for name, args in trace]
+            return client.post("/api/levels/1/validate", json={
+                "levelId": "1", "playerPosition": {}, "playerAngle": 0, "commands": commands
+            }).json()
+
+        assert validate(LEVEL_1_OPTIMAL_TRACE)["efficiency"] == 1.0
+        assert validate(LEVEL_1_PATH_TRACE)["efficiency"] == round((20 / 21 + 6 / 13) / 2, 3)
+        assert validate(LEVEL_1_PATH_TRACE[:3])["efficiency"] is None
@@ -0,0 +1,159 @@
+"""
+Tests para la validación en vivo por WebSocket
+"""
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from app.services.live_validation import EditError, LiveDocument, LiveValidationSession, parse_diagnostics
+from main import app
+
+client = TestClient(app)
+
+
+class TestLiveDocument:
+    """Tests para LiveDocument"""
+
+    def test_applies_monaco_changes(self):
+        """Test que los cambios se aplican con offsets del texto anterior"""
+        document = LiveDocument()
+        document.apply({"version": 1, "code": "moveForward(1);\nturnRight();"})
+        document.apply({"version": 2, "changes": [
+            {"offset": 12, "length": 1, "text": "3"},
+            {"offset": 16, "length": 9, "text": "turnLeft"},
+        ]})
+        assert document.text == "moveForward(3);\nturnLeft();"
+
+    def test_stale_versions_are_ignored(self):
+        """Test que una versión ya superada no modifica el texto"""
+        document = LiveDocument()
+        document.apply({"version": 5, "code": "a"})
+        assert document.apply({"version": 4, "code": "b"}) is False
+        assert document.text == "a"
+
+    def test_invalid_edits_request_resync(self):
+        """Test que cambios fuera de rango o sin forma válida fallan"""
+        document = LiveDocument()
+        document.apply({"version": 1, "code": "abc"})
+        with pytest.raises(EditError):
+            document.apply({"version": 2, "changes": [{"offset": 2, "length": 5, "text": ""}]})
+        with pytest.raises(EditError):
+            document.apply({"version": 2})
+        assert document.text == "abc"
+
+
+class TestParseDiagnostics:
+    """Tests para parse_diagnostics"""
+
+    def test_python_engine_and_pattern_messages(self):
+        """Test de mensajes con sufijo (línea, columna)"""
+        assert parse_diagnostics("Patrón no permitido: eval( (línea 2, columna 5)") == [
+            {"severity": "error", "message": "Patrón no permitido: eval(", "line": 2, "column": 5}
+        ]
+
+    def test_node_format(self):
+        """Test de mensajes con formato de Node.js"""
+        message = "tu código:1:14\nmoveForward(1;\n             ^\n\nSyntaxError: missing ) after argument list"
+        assert parse_diagnostics(message) == [
+            {"severity": "error", "message": "SyntaxError: missing ) after argument list", "line": 1, "column": 14}
+        ]
+
+
+class TestLiveValidationSession:
+    """Tests para el debounce y la cancelación de LiveValidationSession"""
+
+    async def test_burst_of_edits_is_validated_once(self):
+        """Test que una ráfaga de ediciones produce una sola validación de la última versión"""
+        sent, validated = [], []
+
+        async def validate(code):
+            validated.append(code)
+            return True, "Código válido", None
+
+        async def send(message):
+            sent.append(message)
+
+        session = LiveValidationSession(send, debounce=0.02, max_delay=1.0, validate=validate)
+        runner = asyncio.ensure_future(session.run())
+        try:
+            for version in range(1, 6):
+                session.edit({"version": version, "code": f"moveForward({version});"})
+                await asyncio.sleep(0.002)
+            await asyncio.sleep(0.1)
+        finally:
+            runner.cancel()
+
+        assert validated == ["moveForward(5);"]
+        assert sent == [{"type": "diagnostics", "version": 5, "valid": True, "diagnostics": []}]
+
+    async def test_superseded_validation_is_cancelled(self):
+        """Test que una validación en curso superada por una edición no se reporta"""
+        sent, started = [], []
+
+        async def validate(code):
+            started.append(code)
+            await asyncio.sleep(0.05)
+            return False, None, f"{code} (línea 1, columna 1)"
+
+        async def send(message):
+            sent.append(message)
+
+        session = LiveValidationSession(send, debounce=0.01, max_delay=1.0, validate=validate)
+        runner = asyncio.ensure_future(session.run())
+        try:
+            session.edit({"version": 1, "code": "v1"})
+            await asyncio.sleep(0.03)  # la validación de v1 está en curso
+            session.edit({"version": 2, "code": "v2"})
+            await asyncio.sleep(0.15)
+        finally:
+            runner.cancel()
+
+        assert started == ["v1", "v2"]
+        assert session.superseded == 1
+        assert [message["version"] for message in sent] == [2]
+        assert sent[0]["diagnostics"][0]["message"] == "v2"
+
+    async def test_validation_waits_for_rate_limit(self):
+        """Test que sin tokens la validación espera y luego valida la última versión"""
+        sent, delays = [], [0.03, 0.0]
+
+        async def validate(code):
+            return True, "Código válido", None
+
+        async def send(message):
+            sent.append(message)
+
+        session = LiveValidationSession(send, debounce=0.01, max_delay=1.0, validate=validate,
+                                        acquire=lambda: delays.pop(0))
+        runner = asyncio.ensure_future(session.run())
+        try:
+            session.edit({"version": 1, "code": "moveForward(1);"})
+            await asyncio.sleep(0.02)
+            assert sent == []
+            session.edit({"version": 2, "code": "moveForward(2);"})
+            await asyncio.sleep(0.1)
+        finally:
+            runner.cancel()
+
+        assert session.throttled == 1
+        assert [message["version"] for message in sent] == [2]
+
+
+class TestLiveValidationEndpoint:
+    """Tests para WS /api/execute/live"""
+
+    def test_diagnostics_for_latest_version(self):
+        """Test que el editor recibe los diagnósticos de la última versión"""
+        with client.websocket_connect("/api/execute/live?levelId=1") as websocket:
+            websocket.send_json({"version": 1, "code": "moveForward(1);"})
+            websocket.send_json({"version": 2, "changes": [{"offset": 13, "length": 1, "text": ""}]})
+            message = websocket.receive_json()
+
+        assert message["version"] == 2
+        assert message["valid"] is False
+        assert message["diagnostics"][0]["line"] == 1
+
+    def test_invalid_message_requests_resync(self):
+        """Test que un mensaje inválido pide reenviar el código completo"""
+        with client.websocket_connect("/api/execute/live") as websocket:
+            websocket.send_text("no es json")
+            assert websocket.receive_json()["resync"] is True
@@ -0,0 +1,45 @@
+"""
+Tests unitarios para el pipeline de logging
+"""
+import json
+import logging
+import queue
+from app.logger import JsonFormatter, LazyQueueHandler, SamplingFilter
+
+
+def make_record(level=logging.INFO, msg="Validando nivel %s", args=("1",), **extra):
+    record = logging.LogRecord("app.test", level, "test.py", 10, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class TestLoggingPipeline:
+    """Tests para el logging asíncrono"""
+
+    def test_json_formatter_includes_extra_fields(self):
+        """Test que el formato de producción es JSON con los campos de extra"""
+        entry = json.loads(JsonFormatter().format(make_record(level_id="1", code_length=42)))
+
+        assert entry["message"] == "Validando nivel 1"
+        assert entry["level"] == "INFO"
+        assert entry["level_id"] == "1"
+        assert entry["code_length"] == 42
+
+    def test_queue_handler_does_not_format(self):
+        """Test que el mensaje se formatea en el listener, no al encolar"""
+        log_queue = queue.SimpleQueue()
+        record = make_record()
+        LazyQueueHandler(log_queue).handle(record)
+
+        queued = log_queue.get_nowait()
+        assert queued.msg == "Validando nivel %s"
+        assert queued.args == ("1",)
+
+    def test_sampling_keeps_one_in_n_info_records(self):
+        """Test que se muestrea INFO pero WARNING siempre pasa"""
+        sampling = SamplingFilter(0.25)
+        kept = [sampling.filter(make_record()) for _ in range(8)]
+
+        assert kept.count(True) == 2
+        assert sampling.filter(make_record(level=logging.WARNING)) is True
+        assert SamplingFilter(0).filter(make_record()) is False
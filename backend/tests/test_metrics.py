@@ -0,0 +1,58 @@
+"""
+Tests para las métricas y el endpoint /metrics
+"""
+from fastapi.testclient import TestClient
+from app.services.metrics import MetricsRegistry, validation_outcomes_total
+from main import app
+
+client = TestClient(app)
+
+
+class TestMetricsRegistry:
+    """Tests para MetricsRegistry"""
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test que los buckets se exponen acumulados con +Inf, suma y conteo"""
+        registry = MetricsRegistry()
+        histogram = registry.histogram("latencia", "Latencia", ("route",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, "/a")
+
+        lines = registry.render().splitlines()
+        assert 'latencia_bucket{route="/a",le="0.1"} 2' in lines
+        assert 'latencia_bucket{route="/a",le="1.0"} 3' in lines
+        assert 'latencia_bucket{route="/a",le="+Inf"} 4' in lines
+        assert 'latencia_sum{route="/a"} 3.65' in lines
+        assert 'latencia_count{route="/a"} 4' in lines
+
+    def test_counter_labels_are_escaped(self):
+        """Test que los valores de etiquetas se escapan"""
+        registry = MetricsRegistry()
+        registry.counter("errores_total", "Errores", ("message",)).inc('dice "hola"')
+
+        assert 'errores_total{message="dice \\"hola\\""} 1' in registry.render()
+
+
+class TestMetricsEndpoint:
+    """Tests para GET /metrics"""
+
+    def test_requests_are_counted_by_route_template(self):
+        """Test que las requests se agrupan por plantilla de ruta, no por URL"""
+        client.get("/api/levels/1")
+        body = client.get("/metrics").text
+
+        assert 'codeshyri_http_requests_total{method="GET",route="/api/levels/{level_id}",status="200"}' in body
+        assert 'codeshyri_http_request_duration_seconds_bucket{method="GET",route="/api/levels/{level_id}",le="+Inf"}' in body
+        assert "codeshyri_http_requests_in_flight" in body
+        assert "codeshyri_validation_cache_hit_ratio" in body
+
+    def test_validation_outcomes(self):
+        """Test que se cuentan los resultados por tipo"""
+        before_dangerous = validation_outcomes_total.value("dangerous_pattern")
+        before_syntax = validation_outcomes_total.value("syntax_error")
+        client.post("/api/execute", json={"code": "eval('x');", "levelId": "1"})
+        client.post("/api/execute", json={"code": "moveForward(2;", "levelId": "1"})
+
+        assert validation_outcomes_total.value("dangerous_pattern") == before_dangerous + 1
+        assert validation_outcomes_total.value("syntax_error") == before_syntax + 1
+        assert 'codeshyri_validation_outcomes_total{outcome="syntax_error"}' in client.get("/metrics").text
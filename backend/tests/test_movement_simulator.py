@@ -0,0 +1,135 @@
+"""
+Tests unitarios para el simulador de movimiento y la validación de niveles con traza
+"""
+import pytest
+from app.exceptions import ValidationError
+from app.services.data_provider import DataProvider
+from app.services.level_validator import LevelValidator
+from app.services.movement_simulator import (
+    LevelGeometry, MovementSimulator, geometry_for_level, grid_to_pixel_for_player,
+    pixel_to_grid, simulate_level, wrap_angle
+)
+
+LEVELS = DataProvider.get_all_levels()
+
+LEVEL_1_INITIAL_TRACE = [
+    ("moveForward", [2]), ("turnRight", []), ("moveForward", [2]), ("turnRight", []),
+    ("moveForward", [2]), ("turnRight", []), ("moveForward", [2]), ("turnRight", []),
+    ("moveForward", [11]),
+]
+LEVEL_1_PATH_TRACE = [
+    ("moveForward", [3]), ("turnRight", []), ("moveForward", [2]), ("turnLeft", []),
+    ("moveForward", [2]), ("turnRight", []), ("moveForward", [1]), ("turnLeft", []),
+    ("moveForward", [1]), ("turnRight", []), ("moveForward", [1]), ("turnLeft", []),
+    ("moveForward", [11]),
+]
+
+
+class TestGeometry:
+    """Tests para la geometría del grid"""
+
+    def test_grid_pixel_round_trip(self):
+        """Test que la posición del personaje cae en la celda siguiente (parte inferior)"""
+        assert grid_to_pixel_for_player(18, 5) == (1110, 558)
+        assert pixel_to_grid(1110, 558 - 1) == (18, 5)
+
+    def test_wrap_angle(self):
+        """Test que los ángulos se normalizan a [-180, 180) como en Phaser"""
+        assert wrap_angle(270) == -90
+        assert wrap_angle(180) == -180
+        assert wrap_angle(-450) == -90
+
+    def test_maize_excludes_start_and_goal(self):
+        """Test que no hay maíz en la celda inicial ni en la del objetivo"""
+        level = {"startPosition": {"gridX": 0, "gridY": 0}, "goalPosition": {"gridX": 2, "gridY": 0},
+                 "maizePositions": [{"gridX": 0, "gridY": 0}, {"gridX": 1, "gridY": 0}, {"gridX": 2, "gridY": 0}]}
+        assert LevelGeometry.from_level(level).maize == frozenset({(1, 0)})
+
+    def test_geometry_is_cached_per_level(self):
+        """Test que la geometría se calcula una vez por configuración de nivel"""
+        assert geometry_for_level(LEVELS["1"]) is geometry_for_level(LEVELS["1"])
+
+
+class TestMovementSimulator:
+    """Tests para MovementSimulator"""
+
+    def test_level_1_initial_code(self):
+        """Test que la traza del código inicial del nivel 1 reproduce el recorrido del frontend"""
+        state = simulate_level(LEVELS["1"], LEVEL_1_INITIAL_TRACE)
+
+        assert (state.grid_x, state.grid_y) == (12, 1)
+        assert state.position == {"x": 750, "y": 318}
+        assert state.angle == 0
+        assert state.steps_moved == 19
+        assert state.rotations_made == 4
+        assert state.actions_executed == ["moveForward", "turnRight"]
+        assert (2, 1) in state.maize_collected
+        assert state.goal_reached is False
+
+    def test_reaches_goal_following_path(self):
+        """Test que seguir el camino del nivel 1 recoge todo el maíz y el premio"""
+        geometry = geometry_for_level(LEVELS["1"])
+        state = MovementSimulator(geometry).run(LEVEL_1_PATH_TRACE)
+
+        assert (state.grid_x, state.grid_y) == (18, 5)
+        assert state.goal_reached is True
+        assert state.maize_collected == geometry.maize
+        assert state.off_path_cells == [(7, 4)]  # el camino pasa en diagonal de (6, 4) a (7, 5)
+
+    def test_free_moves_do_not_change_grid_cell(self):
+        """Test que los movimientos libres cambian píxeles pero no la celda"""
+        state = simulate_level(LEVELS["1"], [("moveRight", [2]), ("moveTo", [10, 20]), ("sprint", [])])
+
+        assert (state.grid_x, state.grid_y) == (1, 1)
+        assert state.position == {"x": 85, "y": 20}
+        assert state.steps_moved == 3
+
+    def test_face_direction_and_spin(self):
+        """Test de faceDirection (sin distinguir mayúsculas) y spin"""
+        state = simulate_level(LEVELS["1"], [("faceDirection", ["Norte"]), ("spin", []), ("moveForward", [])])
+
+        assert state.angle == -90
+        assert (state.grid_x, state.grid_y) == (1, 0)
+        assert state.rotations_made == 2
+
+    @pytest.mark.parametrize("trace", [
+        [("fly", [])],
+        [("turn", [])],
+        [("moveForward", ["2"])],
+        [("moveForward", [10 ** 9])],
+    ])
+    def test_invalid_traces_are_rejected(self, trace):
+        """Test que comandos desconocidos, argumentos inválidos y trazas enormes se rechazan"""
+        with pytest.raises(ValidationError):
+            simulate_level(LEVELS["1"], trace)
+
+
+class TestLevelValidatorWithTrace:
+    """Tests para LevelValidator con traza de comandos"""
+
+    def test_trace_overrides_reported_state(self):
+        """Test que la posición reportada por el cliente se ignora si hay traza"""
+        completed, _, _, pending = LevelValidator.validate_level(
+            "1", {"x": 1110, "y": 530}, 0, [], steps_moved=50, rotations_made=10,
+            commands=[("moveForward", [1])]
+        )
+
+        assert completed is False
+        assert "Llegar al objetivo" in pending
+
+    def test_level_1_path_completes(self):
+        """Test que recorrer el camino del nivel 1 completa el nivel al simularse"""
+        completed, _, _, pending = LevelValidator.validate_level("1", {}, 0, [], commands=LEVEL_1_PATH_TRACE)
+
+        assert completed is True
+        assert pending == []
+
+    def test_simulated_only_rules(self, monkeypatch):
+        """Test que reachGoal y collectAllMaize solo se cumplen con traza"""
+        level = dict(LEVELS["1"], validation={"reachGoal": True, "collectAllMaize": True})
+        monkeypatch.setattr(DataProvider, "get_level", staticmethod(lambda level_id: level))
+
+        assert LevelValidator.validate_level("1", {}, 0, [], commands=LEVEL_1_PATH_TRACE)[0] is True
+        completed, _, _, pending = LevelValidator.validate_level("1", {}, 0, [])
+        assert completed is False
+        assert pending == ["Recolectar el premio final", "Recolectar todo el maíz"]
@@ -0,0 +1,80 @@
+"""
+Tests unitarios para el pool de workers Node.js
+"""
+import shutil
+import pytest
+from app.services import node_worker_pool as pool_module
+from app.services.node_worker_pool import NodeWorkerPool
+
+requires_node = pytest.mark.skipif(shutil.which("node") is None, reason="Node.js no disponible")
+
+
+@requires_node
+class TestNodeWorkerPool:
+    """Tests para NodeWorkerPool"""
+
+    def setup_method(self):
+        self.pool = NodeWorkerPool(size=1, max_jobs=3)
+
+    def teardown_method(self):
+        self.pool.shutdown()
+
+    def test_valid_code(self):
+        """Test que código válido pasa usando los stubs precargados"""
+        is_valid, error = self.pool.check("moveForward(2); turnRight();", timeout=5)
+
+        assert is_valid is True
+        assert error is None
+
+    def test_syntax_error(self):
+        """Test que un error de sintaxis se reporta sin rutas internas"""
+        is_valid, error = self.pool.check("moveForward(2; turnRight(90)", timeout=5)
+
+        assert is_valid is False
+        assert "SyntaxError" in error
+        assert "tu código" in error
+        assert "    at " not in error
+
+    def test_top_level_return_is_rejected(self):
+        """Test que el código se compila como script: return fuera de una función es inválido"""
+        is_valid, error = self.pool.check("moveForward();\nreturn 5;", timeout=5)
+
+        assert is_valid is False
+        assert "Illegal return statement" in error
+
+        is_valid, _ = self.pool.check("function f() { return 5; }\nf();", timeout=5)
+        assert is_valid is True
+
+    def test_worker_is_reused_and_recycled(self):
+        """Test que el worker se reutiliza y se recicla tras max_jobs trabajos"""
+        self.pool.check("moveForward();", timeout=5)
+        first = self.pool._slots.queue[0]
+        self.pool.check("moveForward();", timeout=5)
+        assert self.pool._slots.queue[0] is first
+
+        self.pool.check("moveForward();", timeout=5)
+        assert self.pool._slots.queue[0] is None
+        assert not first.alive
+
+    def test_respawn_after_crash(self):
+        """Test que un worker muerto se reemplaza automáticamente"""
+        self.pool.check("moveForward();", timeout=5)
+        worker = self.pool._slots.queue[0]
+        worker.process.kill()
+        worker.process.wait()
+
+        is_valid, _ = self.pool.check("turnLeft();", timeout=5)
+        assert is_valid is True
+        assert self.pool._slots.queue[0] is not worker
+
+
+def test_missing_node_raises_file_not_found(monkeypatch):
+    """Test que la ausencia de Node.js se reporta como FileNotFoundError"""
+    monkeypatch.setattr(pool_module, "NODE_CHECK_COMMAND", ["node-inexistente-codeshyri"])
+    pool = NodeWorkerPool(size=1)
+
+    with pytest.raises(FileNotFoundError):
+        pool.check("moveForward();", timeout=1)
+
+    # El espacio del pool se libera para el siguiente intento
+    assert pool._slots.qsize() == 1
@@ -0,0 +1,75 @@
+"""
+Tests unitarios para el detector de patrones peligrosos
+"""
+import time
+from app.services.pattern_scanner import DangerousPatternScanner, dangerous_pattern_scanner
+
+
+class TestDangerousPatternScanner:
+    """Tests para DangerousPatternScanner"""
+
+    def test_reports_every_hit_with_position(self):
+        """Test que se reportan todos los hallazgos con línea y columna"""
+        code = "moveForward();\n  eval('x');\nwindow.alert(1); fetch('/api')"
+        hits = dangerous_pattern_scanner.scan(code)
+
+        assert [(h.pattern, h.line, h.column) for h in hits] == [
+            ("eval(", 2, 3),
+            ("window.", 3, 1),
+            ("fetch(", 3, 18),
+        ]
+
+    def test_ignores_comments_and_strings(self):
+        """Test que los patrones en comentarios y strings no se reportan"""
+        code = "// no uses eval(\n/* ni process.exit */\nconsole.log('fetch(url)');"
+        assert dangerous_pattern_scanner.scan(code) == []
+
+    def test_matches_whole_identifiers_only(self):
+        """Test que un identificador que solo contiene el patrón no se reporta"""
+        assert dangerous_pattern_scanner.scan("myfs.x = 1; prefetch(2); evaluate(3);") == []
+
+    def test_detects_evasions(self):
+        """Test que espacios, comentarios, escapes y templates no evitan la detección"""
+        for code in [
+            "eval (x)",
+            "eval/* */(x)",
+            "eval?.(x)",
+            "\\u0065val(x)",
+            "Function`alert(1)```",
+            "window['alert'](1)",
+            "console.log(`${eval(x)}`)",
+        ]:
+            assert dangerous_pattern_scanner.first(code) is not None, code
+
+    def test_quotes_and_comments_inside_templates_and_regex(self):
+        """Test que comillas o /* dentro de templates y regex no ocultan el código siguiente"""
+        for code in [
+            "let t = `don't`; eval('moveForward()')",
+            "let t = `it's`; require('fs')",
+            "let q = /'/; eval('x')",
+            "let q = /a\\/*/; eval('x')",
+            "let q = /\"/; fetch('http://x')",
+            "if (ok) /'/.test(s); eval('x') // '",
+        ]:
+            assert dangerous_pattern_scanner.first(code) is not None, code
+
+    def test_untokenizable_code_is_scanned_whole(self):
+        """Test que si el código no se puede tokenizar se busca en todo el texto"""
+        hit = dangerous_pattern_scanner.first("let s = 'sin cerrar; eval(x)")
+        assert hit is not None and hit.pattern == "eval("
+
+    def test_literal_patterns(self):
+        """Test que los patrones sin forma de identificador se buscan como texto"""
+        scanner = DangerousPatternScanner(["<script", "eval("])
+        hits = scanner.scan("x = '<script>'; eval(1)")
+
+        assert [h.pattern for h in hits] == ["<script", "eval("]
+
+    def test_large_payload_is_linear(self):
+        """Test que un payload de cientos de KB se analiza rápidamente"""
+        code = "moveForward(1); // comentario\n" * 20000 + "eval(x)"
+        start = time.perf_counter()
+        hit = dangerous_pattern_scanner.first(code)
+
+        assert hit is not None and hit.line == 20001
+        assert time.perf_counter() - start < 1.0
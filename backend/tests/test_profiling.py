@@ -0,0 +1,105 @@
+"""
+Tests para el perfilado por request
+"""
+import cProfile
+import pstats
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.middleware import ProfilingMiddleware
+from app.services.code_validator import CodeValidator
+from app.services.profiling import RequestProfile, activate, collapse_stats, deactivate, phase
+
+
+def _leaf():
+    return sum(range(20000))
+
+
+def _branch():
+    return _leaf() + _leaf()
+
+
+def _profiled_app(tmp_path, **options) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, directory=str(tmp_path), **options)
+
+    @app.post("/validar")
+    async def validar(code: str):
+        is_valid, _, _ = await CodeValidator.validate_async(code)
+        return {"valid": is_valid}
+
+    return TestClient(app)
+
+
+class TestPhases:
+    """Tests para la medición de fases"""
+
+    def test_phase_without_profile_records_nothing(self):
+        """Test que sin perfil activo las fases no se registran"""
+        with phase("cache") as measured:
+            pass
+        assert measured.profile is None
+
+    def test_server_timing_sums_repeated_phases(self):
+        """Test que las fases repetidas se suman en Server-Timing"""
+        profile = RequestProfile(with_cprofile=False)
+        token = activate(profile)
+        try:
+            for _ in range(2):
+                with phase("tempfile"):
+                    pass
+        finally:
+            deactivate(token)
+        assert [name for name, _ in profile.phases] == ["tempfile", "tempfile"]
+
+        profile.phases[:] = [("tempfile", 0.001), ("node", 0.002), ("tempfile", 0.0005)]
+
+        assert profile.server_timing(total=0.004) == "tempfile;dur=1.500, node;dur=2.000, total;dur=4.000"
+
+
+class TestCollapseStats:
+    """Tests para la conversión de cProfile a pilas colapsadas"""
+
+    def test_stacks_follow_call_graph(self):
+        """Test que cada función aparece bajo su llamador"""
+        profiler = cProfile.Profile()
+        profiler.runcall(_branch)
+        stacks = collapse_stats(pstats.Stats(profiler).stats)
+
+        leaf_stacks = [stack for stack in stacks if stack.split(";")[-1].startswith("_leaf ")]
+        assert leaf_stacks
+        assert all(stack.split(";")[-2].startswith("_branch ") for stack in leaf_stacks)
+        assert all(count >= 0 for count in stacks.values())
+
+
+class TestProfilingMiddleware:
+    """Tests para ProfilingMiddleware"""
+
+    def test_header_token_enables_profiling(self, tmp_path):
+        """Test que X-Profile con el token agrega Server-Timing y escribe el perfil"""
+        client = _profiled_app(tmp_path, token="secreto", sample_rate=0)
+
+        response = client.post("/validar", params={"code": "moveForward(7);"}, headers={"X-Profile": "secreto"})
+
+        timing = response.headers["server-timing"]
+        for name in ("queue", "cache", "pattern_scan", "total"):
+            assert f"{name};dur=" in timing
+        files = list(tmp_path.glob("*.folded"))
+        assert len(files) == 1
+        assert files[0].name in timing
+        assert "validate (code_validator.py" in files[0].read_text(encoding="utf-8")
+
+    def test_requests_without_token_are_not_profiled(self, tmp_path):
+        """Test que sin cabecera válida ni muestreo no se perfila"""
+        client = _profiled_app(tmp_path, token="secreto", sample_rate=0)
+
+        assert "server-timing" not in client.post("/validar", params={"code": "x"}).headers
+        assert "server-timing" not in client.post(
+            "/validar", params={"code": "x"}, headers={"X-Profile": "otro"}
+        ).headers
+        assert list(tmp_path.iterdir()) == []
+
+    def test_sampling_profiles_without_header(self, tmp_path):
+        """Test que con tasa de muestreo 1 se perfila toda request"""
+        client = _profiled_app(tmp_path, sample_rate=1.0)
+
+        assert "total;dur=" in client.post("/validar", params={"code": "moveForward(8);"}).headers["server-timing"]
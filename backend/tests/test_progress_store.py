@@ -0,0 +1,170 @@
+"""
+Tests para el progreso de los jugadores y su escritura diferida
+"""
+import asyncio
+import sqlite3
+import threading
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.services.progress_store import ProgressEntry, ProgressRecorder, ProgressStore
+from main import app
+from tests.test_movement_simulator import LEVEL_1_PATH_TRACE
+
+client = TestClient(app)
+
+
+def entry(completed=False, steps=10, rotations=2, done=1, player="ana", level="1", updated_at=1.0):
+    return ProgressEntry(player, level, completed, steps, rotations,
+                         ["objetivo"] * done, ["pendiente"] * (3 - done), updated_at=updated_at)
+
+
+@pytest.fixture
+def recorder(tmp_path):
+    return ProgressRecorder(ProgressStore(str(tmp_path / "progress.sqlite3")), flush_interval=60, batch_size=3)
+
+
+class TestProgressStore:
+    """Tests para ProgressStore"""
+
+    def test_keeps_best_attempt_and_counts_attempts(self, tmp_path):
+        """Test que el upsert solo reemplaza el mejor intento si el nuevo es mejor"""
+        store = ProgressStore(str(tmp_path / "progress.sqlite3"))
+        store.write_batch([entry(done=1, steps=10)])
+        store.write_batch([entry(completed=True, done=3, steps=30, updated_at=2.0)])
+        store.write_batch([entry(completed=True, done=3, steps=40, updated_at=3.0)])
+        store.write_batch([entry(completed=True, done=3, steps=20, updated_at=4.0), entry(level="2")])
+
+        best = store.get("ana", "1")
+        assert (best.completed, best.steps, best.attempts, best.updated_at) == (True, 20, 4, 4.0)
+        assert best.objectives_completed == ["objetivo"] * 3
+        assert [item.level_id for item in store.for_player("ana")] == ["1", "2"]
+        assert store.get("beto", "1") is None
+
+    def test_merge_matches_sqlite_order(self):
+        """Test que merge en memoria elige el mismo intento que el upsert"""
+        merged = entry(completed=True, done=3, steps=30).merge(entry(completed=True, done=3, steps=30, rotations=1))
+        assert (merged.rotations, merged.attempts) == (1, 2)
+        assert entry(done=2, steps=99).merge(entry(done=1, steps=1)).steps == 99
+
+
+class TestProgressRecorder:
+    """Tests para ProgressRecorder"""
+
+    async def test_pending_attempts_are_coalesced_and_readable(self, recorder):
+        """Test que los intentos se combinan en memoria y se leen antes de guardarse"""
+        recorder.record(entry(steps=10))
+        recorder.record(entry(steps=5))
+        assert recorder.pending == 1
+        assert recorder.store.get("ana", "1") is None
+        assert (recorder.get("ana", "1").steps, recorder.get("ana", "1").attempts) == (5, 2)
+
+        assert await recorder.flush() == 1
+        recorder.record(entry(steps=7))
+        best = recorder.get("ana", "1")
+        assert (best.steps, best.attempts) == (5, 3)
+        assert [(item.level_id, item.attempts) for item in recorder.for_player("ana")] == [("1", 3)]
+
+    async def test_full_batch_is_written_early(self, recorder):
+        """Test que al juntar batch_size intentos se guardan sin esperar el intervalo"""
+        recorder.start()
+        try:
+            for level in ("1", "2", "3"):
+                recorder.record(entry(level=level))
+            await asyncio.sleep(0.1)
+            assert recorder.pending == 0
+            assert len(recorder.store.for_player("ana")) == 3
+        finally:
+            await recorder.stop()
+
+    async def test_failed_write_is_retried(self, recorder, monkeypatch):
+        """Test que un lote que no se pudo guardar vuelve a quedar pendiente"""
+        def locked(entries):
+            raise sqlite3.OperationalError("database is locked")
+        monkeypatch.setattr(recorder.store, "write_batch", locked)
+        recorder.record(entry())
+
+        assert await recorder.flush() == 0
+        assert recorder.pending == 1
+        monkeypatch.undo()
+        await recorder.stop()
+        assert recorder.store.get("ana", "1").attempts == 1
+
+    async def test_filesystem_error_keeps_loop_alive(self, tmp_path):
+        """Test que un error del sistema de archivos no detiene el bucle de escritura"""
+        blocker = tmp_path / "archivo"
+        blocker.write_text("")
+        recorder = ProgressRecorder(ProgressStore(str(blocker / "db" / "progress.sqlite3")),
+                                    flush_interval=0.01, batch_size=100)
+        recorder.record(entry())
+        task = recorder.start()
+        try:
+            await asyncio.sleep(0.05)
+            assert not task.done()
+            assert recorder.pending == 1
+
+            recorder.store.path = str(tmp_path / "progress.sqlite3")
+            for _ in range(100):
+                if not recorder.pending:
+                    break
+                await asyncio.sleep(0.01)
+            assert recorder.pending == 0
+            assert (await recorder.get_async("ana", "1")).attempts == 1
+        finally:
+            await recorder.stop()
+
+    async def test_async_reads_see_pending_and_saved_attempts(self, recorder):
+        """Test que las lecturas asíncronas combinan lo guardado con lo pendiente"""
+        recorder.record(entry(level="1"))
+        await recorder.flush()
+        recorder.record(entry(level="2", completed=True, done=3))
+
+        entries = await recorder.for_player_async("ana")
+        assert [e.level_id for e in entries] == ["1", "2"]
+        assert (await recorder.get_async("ana", "2")).completed is True
+        assert await recorder.get_async("ana", "3") is None
+
+    async def test_read_during_flush_counts_attempts_once(self, recorder, monkeypatch):
+        """Test que una lectura que ve el lote ya confirmado no vuelve a sumarle el lote en curso"""
+        written = threading.Event()
+        write_batch, get = recorder.store.write_batch, recorder.store.get
+
+        def slow_write(entries):
+            write_batch(entries)
+            written.set()
+            time.sleep(0.2)  # commit hecho, flush() aún no descarta el lote
+
+        def get_after_commit(*args):
+            written.wait(5)
+            return get(*args)
+
+        monkeypatch.setattr(recorder.store, "write_batch", slow_write)
+        monkeypatch.setattr(recorder.store, "get", get_after_commit)
+        recorder.record(entry())
+        flush = asyncio.create_task(recorder.flush())
+        await asyncio.sleep(0)
+
+        assert (await recorder.get_async("ana", "1")).attempts == 1
+        await flush
+        assert recorder.get("ana", "1").attempts == 1
+
+
+class TestProgressEndpoints:
+    """Tests para el registro desde /validate y GET /api/players/{id}/progress"""
+
+    def test_validated_attempt_is_recorded(self, recorder, monkeypatch):
+        """Test que validar con playerId guarda el mejor intento simulado"""
+        monkeypatch.setattr("app.routers.game_data.progress_recorder", recorder)
+        monkeypatch.setattr("app.routers.progress.progress_recorder", recorder)
+        commands = [{"name": name, "args": args} for name, args in LEVEL_1_PATH_TRACE]
+        response = client.post("/api/levels/1/validate", json={
+            "levelId": "1", "playerPosition": {}, "playerAngle": 0, "commands": commands, "playerId": "ana"
+        })
+        assert response.json()["completed"] is True
+
+        progress = client.get("/api/players/ana/progress").json()
+        assert progress["playerId"] == "ana"
+        assert progress["levels"][0]["levelId"] == "1"
+        assert progress["levels"][0]["stepsMoved"] == 21
+        assert client.get("/api/players/ana/progress/1").json()["completed"] is True
+        assert client.get("/api/players/ana/progress/2").status_code == 404
@@ -0,0 +1,152 @@
+"""
+Tests para el límite de requests por cliente
+"""
+import pytest
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+from app.services.rate_limiter import (
+    TokenBucketLimiter, client_ip, client_key, execute_limiter, parse_networks,
+)
+from main import app
+
+client = TestClient(app)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _request(host: str = "10.0.0.1", session: str = None, forwarded_for: str = None) -> Request:
+    headers = [(b"x-session-id", session.encode())] if session else []
+    if forwarded_for:
+        headers.append((b"x-forwarded-for", forwarded_for.encode()))
+    return Request({"type": "http", "headers": headers, "client": (host, 1234)})
+
+
+class TestTokenBucketLimiter:
+    """Tests para TokenBucketLimiter"""
+
+    def test_burst_then_sustained_rate(self):
+        """Test que se permite la ráfaga y luego se informa cuándo reintentar"""
+        clock = FakeClock()
+        limiter = TokenBucketLimiter("prueba", rate=2, burst=3, clock=clock)
+
+        assert [limiter.acquire("a") for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert limiter.acquire("a") == pytest.approx(0.5)
+
+        clock.now = 0.5
+        assert limiter.acquire("a") == 0.0
+        assert limiter.acquire("a") > 0
+
+    def test_clients_have_separate_buckets(self):
+        """Test que un cliente sin tokens no afecta a otro"""
+        limiter = TokenBucketLimiter("prueba", rate=1, burst=1, clock=FakeClock())
+        assert limiter.acquire("a") == 0.0
+        assert limiter.acquire("a") > 0
+        assert limiter.acquire("b") == 0.0
+
+    def test_sweep_drops_only_refilled_buckets(self):
+        """Test que el barrido descarta buckets inactivos que ya se llenaron"""
+        clock = FakeClock()
+        limiter = TokenBucketLimiter("prueba", rate=1, burst=4, sweep_interval=10, clock=clock)
+        limiter.acquire("inactivo")
+        clock.now = 2.0
+        for _ in range(4):
+            limiter.acquire("activo")
+
+        clock.now = 3.0
+        assert limiter.sweep() == 1
+        assert len(limiter) == 1
+
+        # El barrido también ocurre solo al pasar el intervalo
+        clock.now = 20.0
+        limiter.acquire("nuevo")
+        assert len(limiter) == 1
+
+    def test_cost_above_burst_leaves_debt(self):
+        """Test que un costo mayor que la ráfaga se permite con el bucket lleno y deja deuda"""
+        clock = FakeClock()
+        limiter = TokenBucketLimiter("prueba", rate=2, burst=4, clock=clock)
+        assert limiter.acquire("a", cost=10) == 0.0
+        assert limiter.acquire("a") == pytest.approx(3.5)
+        clock.now = 5.0
+        assert limiter.acquire("a", cost=10) == 0.0
+
+    def test_disabled_when_rate_is_zero(self):
+        """Test que una tasa 0 desactiva el límite"""
+        limiter = TokenBucketLimiter("prueba", rate=0, burst=0)
+        assert all(limiter.acquire("a") == 0.0 for _ in range(100))
+
+
+class TestClientKey:
+    """Tests para la identificación del cliente"""
+
+    def test_key_modes(self):
+        """Test de las claves por IP, sesión e IP+sesión"""
+        request = _request(session="abc")
+        assert client_key(request, "ip") == "10.0.0.1"
+        assert client_key(request, "session") == "s:abc"
+        assert client_key(request, "ip+session") == "10.0.0.1|abc"
+        assert client_key(_request(), "session") == "10.0.0.1"
+
+    def test_default_mode_separates_sessions_behind_one_ip(self):
+        """Test que por defecto dos sesiones tras la misma IP no comparten bucket"""
+        assert client_key(_request(session="a")) != client_key(_request(session="b"))
+
+    def test_forwarded_for_only_from_trusted_proxies(self):
+        """Test que X-Forwarded-For solo se usa si la conexión viene de un proxy de confianza"""
+        proxies = parse_networks(["10.0.0.0/8", "127.0.0.1"])
+        forwarded = _request("127.0.0.1", forwarded_for="6.6.6.6, 203.0.113.5, 10.1.2.3")
+
+        assert client_ip(forwarded, proxies) == "203.0.113.5"
+        assert client_ip(forwarded, []) == "127.0.0.1"
+        assert client_ip(_request("198.51.100.7", forwarded_for="203.0.113.5"), proxies) == "198.51.100.7"
+        assert client_ip(_request("127.0.0.1"), proxies) == "127.0.0.1"
+        assert client_ip(_request("127.0.0.1", forwarded_for="10.0.0.2"), proxies) == "10.0.0.2"
+
+
+class TestExecuteRateLimit:
+    """Tests para el límite de POST /api/execute"""
+
+    def test_returns_429_with_retry_after(self, monkeypatch):
+        """Test que al agotar la ráfaga se responde 429 con Retry-After"""
+        monkeypatch.setattr(execute_limiter, "enabled", True)
+        monkeypatch.setattr(execute_limiter, "burst", 2)
+        monkeypatch.setattr(execute_limiter, "rate", 0.5)
+        execute_limiter.reset()
+        try:
+            payload = {"code": "moveForward(1);", "levelId": "1"}
+            statuses = [client.post("/api/execute", json=payload).status_code for _ in range(2)]
+            response = client.post("/api/execute", json=payload)
+        finally:
+            execute_limiter.reset()
+
+        assert statuses == [200, 200]
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "2"
+        assert response.json()["type"] == "RateLimitError"
+
+    def test_batch_and_live_validation_consume_tokens(self, monkeypatch):
+        """Test que /execute/batch cuesta un token por programa y la validación en vivo uno por validación"""
+        monkeypatch.setattr(execute_limiter, "enabled", True)
+        monkeypatch.setattr(execute_limiter, "burst", 4)
+        monkeypatch.setattr(execute_limiter, "rate", 0.5)
+        execute_limiter.reset()
+        try:
+            batch = [{"code": f"moveForward({i});", "levelId": "1"} for i in range(3)]
+            first = client.post("/api/execute/batch", json=batch)
+            second = client.post("/api/execute/batch", json=batch)
+            with client.websocket_connect("/api/execute/live") as websocket:
+                websocket.send_json({"version": 1, "code": "moveForward(1);"})
+                assert websocket.receive_json()["valid"] is True
+            response = client.post("/api/execute", json=batch[0])
+        finally:
+            execute_limiter.reset()
+
+        assert first.status_code == 200
+        assert second.status_code == 429
+        assert response.status_code == 429
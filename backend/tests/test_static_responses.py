@@ -0,0 +1,118 @@
+"""
+Tests para las respuestas pre-serializadas de datos estáticos
+"""
+import brotli
+import pytest
+from fastapi.testclient import TestClient
+from app.services.data_provider import DataProvider
+from app.services.static_responses import StaticResponseCache, static_responses
+from main import app
+
+LEVELS = DataProvider.get_all_levels()
+
+client = TestClient(app)
+
+
+class TestStaticResponses:
+    """Tests para GET /api/levels/{id}, /api/characters y /api/functions"""
+
+    @pytest.mark.parametrize("path", ["/api/levels/1", "/api/characters", "/api/functions"])
+    def test_etag_and_not_modified(self, path):
+        """Test que se envía ETag y que If-None-Match con el mismo ETag retorna 304"""
+        response = client.get(path)
+        etag = response.headers["etag"]
+
+        assert response.status_code == 200
+        assert response.headers["cache-control"]
+        assert etag.startswith('"')
+
+        cached = client.get(path, headers={"If-None-Match": f'"otro", W/{etag}'})
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert cached.headers["etag"] == etag
+
+    def test_body_matches_level_data(self):
+        """Test que el cuerpo pre-serializado es el nivel completo"""
+        assert client.get("/api/levels/1").json() == LEVELS["1"]
+
+    def test_unknown_level_is_404(self):
+        """Test que un nivel inexistente no se cachea y retorna 404"""
+        assert client.get("/api/levels/no-existe").status_code == 404
+
+    def test_invalidate_reserializes_changed_data(self, monkeypatch):
+        """Test que tras invalidar se sirven los datos nuevos con otro ETag"""
+        old_etag = client.get("/api/levels/2").headers["etag"]
+        level = dict(LEVELS["2"], title="Nuevo título")
+        monkeypatch.setattr(DataProvider, "get_level", staticmethod(lambda level_id: level))
+        static_responses.invalidate("level:2")
+
+        response = client.get("/api/levels/2")
+        assert response.json()["title"] == "Nuevo título"
+        assert response.headers["etag"] != old_etag
+        static_responses.invalidate("level:2")
+
+    def test_invalidate_during_load_discards_stale_payload(self):
+        """Test que un payload cargado antes de invalidar no queda en cache"""
+        cache = StaticResponseCache()
+        titles = iter(["Viejo", "Nuevo"])
+
+        def load():
+            data = {"title": next(titles)}
+            if data["title"] == "Viejo":
+                cache.invalidate("level:x")  # los datos cambian mientras se serializa
+            return data
+
+        assert b"Viejo" in cache.get("level:x", load).body
+        assert b"Nuevo" in cache.get("level:x", load).body
+
+    def test_payload_is_serialized_once(self):
+        """Test que el payload se reutiliza entre accesos"""
+        cache = StaticResponseCache()
+        assert cache.functions() is cache.functions()
+
+
+class TestCompressedVariants:
+    """Tests para las variantes comprimidas de los datos estáticos"""
+
+    def test_gzip_variant_is_negotiated(self):
+        """Test que con Accept-Encoding gzip se sirve la variante precomprimida"""
+        response = client.get("/api/functions", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.headers["etag"].endswith('-gzip"')
+        assert response.json() == client.get("/api/functions", headers={"Accept-Encoding": "identity"}).json()
+
+    def test_brotli_variant_is_preferred(self):
+        """Test que con br y gzip aceptados se sirve la variante brotli"""
+        response = client.get("/api/functions", headers={"Accept-Encoding": "gzip, br"})
+
+        assert response.headers["content-encoding"] == "br"
+        assert response.headers["etag"].endswith('-br"')
+        assert response.json() == client.get("/api/functions", headers={"Accept-Encoding": "identity"}).json()
+        payload = static_responses.functions()
+        assert brotli.decompress(payload.variants["br"][0]) == payload.body
+
+    def test_rejected_encoding_is_not_used(self):
+        """Test que una codificación con q=0 no se usa"""
+        response = client.get("/api/levels/1", headers={"Accept-Encoding": "gzip;q=0, br;q=0"})
+
+        assert "content-encoding" not in response.headers
+        assert response.json() == LEVELS["1"]
+
+    def test_variant_etag_revalidates(self):
+        """Test que el ETag de la variante comprimida también produce 304"""
+        headers = {"Accept-Encoding": "gzip"}
+        etag = client.get("/api/levels/1", headers=headers).headers["etag"]
+
+        assert client.get("/api/levels/1", headers={**headers, "If-None-Match": etag}).status_code == 304
+
+    def test_compression_report(self):
+        """Test que el reporte incluye tamaños y ratios por payload"""
+        static_responses.warm_up()
+        report = client.get("/api/health/compression").json()
+        functions = next(p for p in report["payloads"] if p["key"] == "functions")
+
+        assert report["encodings"] == ["br", "gzip"]
+        assert functions["sizes"]["gzip"] < functions["sizes"]["identity"]
+        assert 0 < report["total"]["ratios"]["gzip"] < 1
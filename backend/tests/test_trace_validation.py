@@ -0,0 +1,168 @@
+"""
+Tests para la validación incremental de trazas y WS /api/levels/{id}/trace
+"""
+import pytest
+from fastapi.testclient import TestClient
+from app.exceptions import ValidationError
+from app.services.data_provider import DataProvider
+from app.services.level_rules import compile_level
+from app.services.level_validator import LevelValidator
+from app.services.trace_validation import TraceValidation
+from main import app
+from tests.test_movement_simulator import LEVEL_1_PATH_TRACE, LEVELS
+
+client = TestClient(app)
+
+PATH_LEVEL = dict(LEVELS["1"], validation={"reachGoal": True, "stayOnPath": True})
+
+# Cumple todos los objetivos tras el comando 9 y luego se pasa del objetivo
+OVERSHOOT_TRACE = [
+    ("moveForward", [2]), ("turnRight", []), ("moveForward", [2]), ("turnLeft", []),
+    ("moveForward", [2]), ("turnRight", []), ("moveForward", [2]), ("turnLeft", []),
+    ("moveForward", [13]), ("moveForward", [5]),
+]
+
+
+class TestTraceValidation:
+    """Tests para TraceValidation"""
+
+    def test_objectives_are_reported_as_they_complete(self):
+        """Test que cada objetivo se informa en el comando que lo cumple"""
+        trace = TraceValidation(compile_level(LEVELS["1"]))
+        events = [event for name, args in LEVEL_1_PATH_TRACE for event in trace.feed(name, args)]
+
+        completed = [(event["objective"], event["command"]) for event in events if event["type"] == "objective"]
+        assert completed == [
+            ("Realizar al menos 4 rotaciones", 8),
+            ("Llegar al objetivo", 13),
+            ("Mover al menos 19 pasos", 13),
+        ]
+        assert all(event["type"] == "objective" for event in events)
+        assert not trace.decided
+        decision = trace.finish()
+        assert decision["completed"] is True
+        assert decision["reason"] == "end"
+        assert decision["commands"] == len(LEVEL_1_PATH_TRACE)
+
+    def test_objectives_met_midway_do_not_decide(self):
+        """Test que cumplir los objetivos a mitad de traza no decide: pueden dejar de cumplirse"""
+        trace = TraceValidation(compile_level(LEVELS["1"]))
+        events = [event for name, args in OVERSHOOT_TRACE for event in trace.feed(name, args)]
+
+        assert ("Llegar al objetivo", True, 9) in [
+            (event["objective"], event["completed"], event["command"]) for event in events
+        ]
+        assert not trace.decided
+        decision = trace.finish()
+
+        completed, message, completed_obj, pending_obj = LevelValidator.validate_level(
+            "1", {}, 0, [], commands=OVERSHOOT_TRACE
+        )
+        assert completed is False
+        assert (decision["completed"], decision["message"]) == (completed, message)
+        assert (decision["objectivesCompleted"], decision["objectivesPending"]) == (completed_obj, pending_obj)
+
+    def test_matches_batch_validation_at_end(self):
+        """Test que al terminar la traza el resultado coincide con /validate"""
+        trace = TraceValidation(compile_level(LEVELS["1"]))
+        for name, args in LEVEL_1_PATH_TRACE[:5]:
+            trace.feed(name, args)
+        decision = trace.finish()
+
+        completed, message, completed_obj, pending_obj = LevelValidator.validate_level(
+            "1", {}, 0, [], commands=LEVEL_1_PATH_TRACE[:5]
+        )
+        assert (decision["completed"], decision["message"]) == (completed, message)
+        assert (decision["objectivesCompleted"], decision["objectivesPending"]) == (completed_obj, pending_obj)
+        assert decision["reason"] == "end"
+
+    def test_leaving_the_path_decides_failure(self):
+        """Test que salir del camino decide el nivel sin esperar el resto de la traza"""
+        trace = TraceValidation(compile_level(PATH_LEVEL))
+        assert trace.feed("turnLeft", []) == []
+        events = trace.feed("moveForward", [1])
+
+        assert events[0]["objective"] == "Seguir el camino (saliste en la celda 1, 0)"
+        assert events[0]["completed"] is False
+        assert events[-1]["completed"] is False
+        assert events[-1]["reason"] == "irreversible"
+        assert trace.feed("moveForward", [1]) == []
+        assert trace.commands == 2
+
+    def test_invalid_command_raises(self):
+        """Test que un comando inválido se rechaza igual que en la traza completa"""
+        trace = TraceValidation(compile_level(LEVELS["1"]))
+        with pytest.raises(ValidationError):
+            trace.feed("teleport", [])
+
+
+class TestTraceEndpoint:
+    """Tests para WS /api/levels/{level_id}/trace"""
+
+    def test_completes_at_end_of_trace(self):
+        """Test que el nivel se completa al terminar la traza, como en /validate"""
+        with client.websocket_connect("/api/levels/1/trace") as websocket:
+            websocket.send_json({"commands": [
+                {"name": name, "args": args} for name, args in LEVEL_1_PATH_TRACE
+            ]})
+            websocket.send_json({"type": "end"})
+            messages = []
+            while not messages or messages[-1]["type"] != "decided":
+                messages.append(websocket.receive_json())
+
+        assert [message["type"] for message in messages] == ["objective"] * 3 + ["decided"]
+        assert messages[-1]["completed"] is True
+        assert messages[-1]["commands"] == len(LEVEL_1_PATH_TRACE)
+
+    def test_agrees_with_validate_after_overshooting(self):
+        """Test que pasarse del objetivo tras cumplirlo no se informa como completado"""
+        with client.websocket_connect("/api/levels/1/trace") as websocket:
+            websocket.send_json({"commands": [
+                {"name": name, "args": args} for name, args in OVERSHOOT_TRACE
+            ]})
+            websocket.send_json({"type": "end"})
+            messages = []
+            while not messages or messages[-1]["type"] != "decided":
+                messages.append(websocket.receive_json())
+
+        assert messages[-1]["completed"] is False
+        assert messages[-1]["commands"] == len(OVERSHOOT_TRACE)
+
+    def test_stops_once_decided(self, monkeypatch):
+        """Test que la conexión se cierra al fallar de forma irreversible, sin procesar el resto"""
+        monkeypatch.setattr(DataProvider, "get_level", staticmethod(lambda level_id: PATH_LEVEL))
+        with client.websocket_connect("/api/levels/1/trace") as websocket:
+            websocket.send_json({"commands": [
+                {"name": "turnLeft", "args": []}, {"name": "moveForward", "args": [1]},
+                {"name": "moveForward", "args": [1]},
+            ]})
+            messages = []
+            while not messages or messages[-1]["type"] != "decided":
+                messages.append(websocket.receive_json())
+
+        assert messages[-1]["completed"] is False
+        assert messages[-1]["reason"] == "irreversible"
+        assert messages[-1]["commands"] == 2
+
+    def test_end_of_trace(self, monkeypatch):
+        """Test que `end` decide el nivel con el estado actual"""
+        monkeypatch.setattr(DataProvider, "get_level", staticmethod(lambda level_id: PATH_LEVEL))
+        with client.websocket_connect("/api/levels/1/trace") as websocket:
+            websocket.send_json({"name": "moveForward", "args": [1]})
+            websocket.send_json({"type": "end"})
+            decision = websocket.receive_json()
+
+        assert decision["completed"] is False
+        assert decision["reason"] == "end"
+        assert decision["objectivesPending"] == ["Recolectar el premio final"]
+
+    @pytest.mark.parametrize("path, message", [
+        ("/api/levels/no-existe/trace", {"name": "moveForward"}),
+        ("/api/levels/1/trace", {"name": "moveForward", "args": ["x"]}),
+        ("/api/levels/1/trace", {"args": []}),
+    ])
+    def test_errors_close_the_trace(self, path, message):
+        """Test que un nivel inexistente o un comando inválido responden error"""
+        with client.websocket_connect(path) as websocket:
+            websocket.send_json(message)
+            assert websocket.receive_json()["type"] == "error"
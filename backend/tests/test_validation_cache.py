@@ -0,0 +1,192 @@
+"""
+Tests unitarios para el cache de resultados de validación
+"""
+from app.services.code_validator import CodeValidator
+import multiprocessing
+import sqlite3
+import pytest
+from app.services.validation_cache import (
+    CacheBackend, SQLiteCacheBackend, ValidationCache, create_backend, normalize_code, validation_cache
+)
+
+VALID = (True, "Código válido", None)
+INVALID = (False, None, "SyntaxError: missing ) after argument list")
+
+
+class TestNormalizeCode:
+    """Tests para normalize_code"""
+
+    def test_strips_comments_and_whitespace(self):
+        """Test que se ignoran comentarios, indentación y líneas vacías"""
+        code = "// Nivel 1\n\n  moveForward(2);   /* avanzar */\n\tturnRight();\n"
+        assert normalize_code(code) == "moveForward(2);\nturnRight();"
+
+    def test_preserves_strings(self):
+        """Test que el contenido de los strings no se modifica"""
+        code = 'console.log("a  // b");'
+        assert normalize_code(code) == code
+
+    def test_preserves_line_breaks(self):
+        """Test que los saltos de línea se conservan (inserción de punto y coma)"""
+        assert normalize_code("let x = 1\nlet y = 2") != normalize_code("let x = 1 let y = 2")
+
+    def test_regex_literals_are_tokens(self):
+        """Test que un /* dentro de una regex no se toma como comentario"""
+        valid = "let r = /[/*]/;\nmoveForward(1); // */"
+        broken = "let r = /[/* ))) */"
+        assert normalize_code(valid) != normalize_code(broken)
+
+        cache = ValidationCache(maxsize=10, ttl=60)
+        cache.put(valid, VALID)
+        assert cache.get_equivalent(broken) is None
+
+    def test_adjacent_tokens_keep_their_meaning(self):
+        """Test que se conservan los espacios que separan tokens"""
+        assert normalize_code("a + ++b;  let  x = typeof y") == "a+ ++b;let x=typeof y"
+
+
+class TestValidationCache:
+    """Tests para ValidationCache"""
+
+    def test_exact_hit_and_miss_counters(self):
+        """Test que se cuentan aciertos y fallos"""
+        cache = ValidationCache(maxsize=10, ttl=60)
+        assert cache.get("moveForward();") is None
+        cache.put("moveForward();", VALID)
+
+        assert cache.get("moveForward();") == VALID
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_equivalent_only_for_valid_results(self):
+        """Test que solo los resultados válidos se comparten entre códigos equivalentes"""
+        cache = ValidationCache(maxsize=10, ttl=60)
+        cache.put("moveForward();", VALID)
+        cache.put("moveForward(2;", INVALID)
+
+        assert cache.get_equivalent("  moveForward();  // hola") == VALID
+        assert cache.get_equivalent("moveForward(2;   ") is None
+
+    def test_lru_eviction(self):
+        """Test que se expulsa la entrada menos usada recientemente"""
+        cache = ValidationCache(maxsize=2, ttl=60)
+        cache.put("a", INVALID)
+        cache.put("b", INVALID)
+        cache.get("a")
+        cache.put("c", INVALID)
+
+        assert cache.get("a") == INVALID
+        assert cache.get("b") is None
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiration(self):
+        """Test que las entradas expiradas no se retornan"""
+        cache = ValidationCache(maxsize=10, ttl=-1)
+        cache.put("moveForward(2;", INVALID)
+
+        assert cache.get("moveForward(2;") is None
+        assert cache.stats()["size"] == 0
+
+    def test_validator_reuses_result_for_equivalent_code(self):
+        """Test que un programa reformateado reutiliza el resultado válido"""
+        validation_cache.clear()
+        code = "moveForward(1);\nturnLeft();"
+        assert CodeValidator.validate(code)[0] is True
+        assert CodeValidator.validate(code)[0] is True
+        assert validation_cache.stats()["hits"] == 1
+
+        assert CodeValidator.validate("  moveForward(1); // avanzar\nturnLeft();")[0] is True
+        assert validation_cache.stats()["normalizedHits"] == 1
+
+        is_valid, _, error_msg = CodeValidator.validate(code + "\neval('x');")
+        assert is_valid is False
+        assert "eval" in error_msg.lower()
+
+
+def _validate_in_child(path: str, code: str) -> None:
+    cache = ValidationCache(maxsize=10, ttl=60, backend=SQLiteCacheBackend(10, 60, path=path))
+    cache.put(code, VALID)
+
+
+class TestSQLiteCacheBackend:
+    """Tests para el cache compartido entre procesos en SQLite"""
+
+    def test_result_is_shared_between_processes(self, tmp_path):
+        """Test que un resultado guardado por otro proceso se reutiliza"""
+        path = str(tmp_path / "cache.sqlite3")
+        cache = ValidationCache(maxsize=10, ttl=60, backend=SQLiteCacheBackend(10, 60, path=path))
+        child = multiprocessing.get_context("spawn").Process(target=_validate_in_child, args=(path, "turnLeft();"))
+        child.start()
+        child.join(timeout=30)
+
+        assert child.exitcode == 0
+        assert cache.get("turnLeft();") == VALID
+        assert cache.get_equivalent("turnLeft();  // girar") == VALID
+        assert cache.stats()["size"] == 2
+
+    def test_engines_do_not_share_results(self, tmp_path):
+        """Test que los motores python y node no reutilizan resultados del otro en el mismo archivo"""
+        path = str(tmp_path / "cache.sqlite3")
+        python = ValidationCache(maxsize=10, ttl=60, backend=SQLiteCacheBackend(10, 60, path=path), engine="python")
+        node = ValidationCache(maxsize=10, ttl=60, backend=SQLiteCacheBackend(10, 60, path=path), engine="node")
+        python.put("turnLeft();", VALID)
+
+        assert python.get("turnLeft();") == VALID
+        assert node.get("turnLeft();") is None
+        assert node.get_equivalent("turnLeft(); // girar") is None
+
+    def test_results_round_trip(self, tmp_path):
+        """Test que se conservan los tres campos del resultado"""
+        backend = SQLiteCacheBackend(10, 60, path=str(tmp_path / "cache.sqlite3"))
+        backend.put(["raw:a"], INVALID)
+        backend.put(["raw:b"], VALID)
+
+        assert backend.get("raw:a") == INVALID
+        assert backend.get("raw:b") == VALID
+        assert backend.get("raw:c") is None
+
+    def test_ttl_and_size_bound(self, tmp_path):
+        """Test que se descartan entradas vencidas y las menos usadas al exceder el tamaño"""
+        path = str(tmp_path / "cache.sqlite3")
+        expired = SQLiteCacheBackend(2, -1, path=path)
+        expired.put(["raw:vieja"], INVALID)
+        assert expired.get("raw:vieja") is None
+
+        backend = SQLiteCacheBackend(2, 60, path=path, evict_every=1)
+        evicted = sum(backend.put([f"raw:{i}"], INVALID) for i in range(4))
+
+        assert evicted == 2
+        assert len(backend) == 2
+        assert backend.get("raw:3") == INVALID
+
+    def test_clear_and_len_survive_sqlite_errors(self, tmp_path, monkeypatch):
+        """Test que clear() y len() tratan un error de SQLite como get() y put()"""
+        backend = SQLiteCacheBackend(10, 60, path=str(tmp_path / "cache.sqlite3"))
+        backend.put(["raw:a"], VALID)
+        assert len(backend) == 1
+
+        def locked():
+            raise sqlite3.OperationalError("database is locked")
+        monkeypatch.setattr(backend, "_connection", locked)
+        assert len(backend) == 0
+        backend.clear()
+        assert backend.get("raw:a") is None
+
+        monkeypatch.undo()
+        backend.clear()
+        assert len(backend) == 0
+
+    def test_backend_must_implement_every_method(self):
+        """Test que un backend incompleto no se puede instanciar"""
+        class Incomplete(CacheBackend):
+            def get(self, key):
+                return None
+
+        with pytest.raises(TypeError):
+            Incomplete(10, 60)
+
+    def test_backend_selection(self):
+        """Test que el backend se elige por configuración"""
+        assert type(create_backend("memory", 10, 60)).__name__ == "MemoryCacheBackend"
+        with pytest.raises(ValueError):
+            create_backend("redis", 10, 60)
@@ -0,0 +1,88 @@
+"""
+Tests para el calentamiento de inicio y las sondas de liveness/readiness
+"""
+import threading
+from fastapi.testclient import TestClient
+from app.services.code_validator import CodeValidator
+from app.services.data_provider import DataProvider
+from app.services.warmup import Warmup
+from main import app
+
+client = TestClient(app)
+
+
+class TestWarmup:
+    """Tests para Warmup"""
+
+    async def test_all_steps_complete(self):
+        """Test que tras los cuatro pasos el worker queda listo"""
+        warmup = Warmup()
+        await warmup.run()
+
+        report = warmup.report()
+        assert warmup.ready
+        assert list(report["steps"]) == ["levelRules", "staticPayloads", "syntaxBackend", "validationCache"]
+        assert all(step["status"] == "ready" for step in report["steps"].values())
+        assert report["steps"]["levelRules"]["levels"] == len(DataProvider.get_all_levels())
+        assert report["steps"]["syntaxBackend"]["engine"]
+
+    async def test_failed_step_is_reported(self, monkeypatch):
+        """Test que un motor de sintaxis roto deja el worker no listo"""
+        def broken():
+            raise RuntimeError("Node.js no disponible")
+        monkeypatch.setattr(CodeValidator, "check_backend", staticmethod(broken))
+
+        warmup = Warmup()
+        await warmup.run()
+
+        assert warmup.status == "failed"
+        assert warmup.steps["syntaxBackend"] == {"status": "failed", "error": "Node.js no disponible"}
+        assert "validationCache" not in warmup.steps
+
+    async def test_cpu_steps_run_off_the_event_loop(self, monkeypatch):
+        """Test que la serialización de payloads no corre en el hilo del event loop"""
+        threads = []
+        monkeypatch.setattr(
+            "app.services.warmup.static_responses.warm_up", lambda: threads.append(threading.current_thread())
+        )
+        monkeypatch.setattr(
+            "app.services.warmup.level_summaries.warm_up", lambda: threads.append(threading.current_thread())
+        )
+
+        warmup = Warmup()
+        await warmup.run()
+
+        assert warmup.ready
+        assert len(threads) == 2
+        assert threading.main_thread() not in threads
+
+    async def test_stop_marks_not_ready(self):
+        """Test que al cerrar el worker deja de estar listo"""
+        warmup = Warmup()
+        warmup.start()
+        await warmup.wait()
+        await warmup.stop()
+        assert warmup.status == "stopping"
+
+
+class TestHealthProbes:
+    """Tests para /api/health/live y /api/health/ready"""
+
+    def test_live_while_warming_up(self, monkeypatch):
+        """Test que liveness responde 200 y readiness 503 antes del calentamiento"""
+        monkeypatch.setattr("app.routers.health.warmup", Warmup())
+
+        assert client.get("/api/health/live").status_code == 200
+        response = client.get("/api/health/ready")
+        assert response.status_code == 503
+        assert response.json()["status"] == "pending"
+
+    async def test_ready_after_warmup(self, monkeypatch):
+        """Test que readiness responde 200 cuando terminó el calentamiento"""
+        warmup = Warmup()
+        await warmup.run()
+        monkeypatch.setattr("app.routers.health.warmup", warmup)
+
+        response = client.get("/api/health/ready")
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"